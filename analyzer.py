@@ -1,42 +1,372 @@
-import difflib
-from collections import Counter
+import os
+import heapq
+import multiprocessing
+from difflib import SequenceMatcher
+from collections import Counter, deque
+from itertools import islice
 from logger import log
-from config import DUPLICATE_SIMILARITY_THRESHOLD, BATCH_SIZE
+from config import DUPLICATE_SIMILARITY_THRESHOLD, DUPLICATE_PROCESS_WORKERS, DUPLICATE_PROCESS_MIN_PAIRS, DUPLICATE_PROCESS_CHUNK_SIZE
+from config import DUPLICATE_SIMILARITY_ENGINE, DUPLICATE_VECTOR_SIMILARITY_THRESHOLD, DUPLICATE_INDEX_ENABLED
+from config import DUPLICATE_MIXED_STEPS_WEIGHT, DUPLICATE_MIXED_SIMILARITY_THRESHOLD, DUPLICATE_TOKEN_JACCARD_RATIO
+from testcase_model import normalize_test_cases
+from minhash_lsh import find_candidate_pairs, similarity_to_jaccard
+from tokenizer import token_set
+from vector_similarity import VECTOR_BACKEND_AVAILABLE, find_similar_text_pairs
+from disjoint_set import DisjointSet
 import concurrent.futures
-import functools
 
 
-def find_duplicate_test_cases(test_cases):
+# 词项Jaccard预筛选阈值：二元组集合的Jaccard相似度通常低于字符多重集合的相似度，按比例放宽以保证召回率
+_TOKEN_JACCARD_BOUND = similarity_to_jaccard(DUPLICATE_SIMILARITY_THRESHOLD) * DUPLICATE_TOKEN_JACCARD_RATIO
+
+# 进程池工作进程中的步骤文本，由初始化函数在每个工作进程启动时设置一次，任务只传输用例下标对
+_worker_steps_texts = None
+
+
+def compare_steps_similarity(steps_texts, pairs):
     """
-    查找重复的测试用例，并提供合并建议
+    对候选用例对进行快速预筛选和步骤相似度计算
 
-    :param test_cases: 测试用例列表
-    :return: 重复的测试用例信息、重复率和合并建议
+    :param steps_texts: 步骤文本列表
+    :param pairs: (下标i, 下标j) 列表
+    :return: 相似度超过阈值的 (下标i, 下标j, 相似度) 列表
     """
-    # 存储标题、步骤和预期结果的哈希值
-    title_hash = {}
-    steps_hash = {}
-    expected_results_hash = {}
-    duplicate_info = {
-        "duplicate_count": 0,
-        "duplicate_rate": 0.0,
-        "title_duplicates": [],
-        "steps_duplicates": [],
-        "mixed_duplicates": [],  # 步骤和预期结果高度相似但标题不同的测试用例
-        "merge_suggestions": [],  # 新增：测试用例合并建议
-        "duplicate_types": {  # 新增：不同类型重复的详细统计
-            "title": 0,
-            "steps": 0,
-            "expected_results": 0,
-            "mixed": 0
-        },
-        "duplicate_categories": {},  # 新增：按测试类别统计重复情况
-        "categories": []  # 新增：测试用例类别列表
-    }
+    results = []
+    for i, j in pairs:
+        steps1 = steps_texts[i]
+        steps2 = steps_texts[j]
+
+        # 快速预筛选：比较长度和简单特征
+        len1, len2 = len(steps1), len(steps2)
+        if abs(len1 - len2) > min(len1, len2) * 0.3:
+            continue  # 长度差异过大，跳过详细比较
+
+        # 快速特征比较：比较首尾几个字符和词袋特征
+        if len1 > 20 and len2 > 20:
+            # 比较首尾字符
+            if steps1[:10] != steps2[:10] and steps1[-10:] != steps2[-10:]:
+                # 使用中文二元组和英文单词的词项ID集合进行快速比较，每段文本只分词一次
+                words1 = token_set(steps1)
+                words2 = token_set(steps2)
+                # 计算Jaccard相似度
+                intersection = len(words1 & words2)
+                union = len(words1) + len(words2) - intersection
+                if union > 0 and intersection / union < _TOKEN_JACCARD_BOUND:
+                    continue  # 词袋相似度过低，跳过详细比较
+
+        # 只有在快速预筛选通过后，才使用序列匹配算法计算相似度
+        similarity = SequenceMatcher(None, steps1, steps2).quick_ratio()
+        if similarity > DUPLICATE_SIMILARITY_THRESHOLD:  # 使用配置参数作为相似度阈值
+            results.append((i, j, similarity))
+    return results
+
+
+def _init_similarity_worker(steps_texts):
+    """进程池工作进程初始化：保存步骤文本"""
+    global _worker_steps_texts
+    _worker_steps_texts = steps_texts
+
+
+def _compare_in_worker(pairs):
+    """在工作进程中比较一批候选对"""
+    return compare_steps_similarity(_worker_steps_texts, pairs)
+
+
+def resolve_similarity_workers(workers=None):
+    """
+    确定相似度比较使用的进程数
+
+    :param workers: 指定的进程数，None则使用配置中的DUPLICATE_PROCESS_WORKERS，0表示CPU核数
+    :return: 进程数，1表示在当前进程中计算
+    """
+    workers = DUPLICATE_PROCESS_WORKERS if workers is None else workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(workers, 1)
+
+
+def verify_candidate_pairs(steps_texts, pairs, workers=None):
+    """
+    计算候选用例对的步骤相似度，候选对较多且有多个CPU核时使用进程池并行计算
+
+    SequenceMatcher和词袋预筛选都是持有GIL的纯Python计算，线程池无法并行，因此使用进程池：
+    步骤文本通过初始化函数在每个工作进程中只传输一次，候选对按DUPLICATE_PROCESS_CHUNK_SIZE分块分发。
+
+    :param steps_texts: 步骤文本列表
+    :param pairs: (下标i, 下标j) 列表
+    :param workers: 进程数，None则使用配置值
+    :return: 相似度超过阈值的 (下标i, 下标j, 相似度) 列表，顺序与候选对顺序一致
+    """
+    workers = resolve_similarity_workers(workers)
+    if workers <= 1 or len(pairs) < DUPLICATE_PROCESS_MIN_PAIRS:
+        return compare_steps_similarity(steps_texts, pairs)
+
+    chunk_size = DUPLICATE_PROCESS_CHUNK_SIZE
+    chunks = [pairs[offset:offset + chunk_size] for offset in range(0, len(pairs), chunk_size)]
+    log(f"使用{min(workers, len(chunks))}个进程并行比较步骤相似度，分块数: {len(chunks)}")
+    try:
+        # 使用spawn启动工作进程，避免在持有日志线程和事件循环的进程中fork
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(workers, len(chunks)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_similarity_worker,
+                initargs=(steps_texts,)) as executor:
+            results = []
+            for chunk_result in executor.map(_compare_in_worker, chunks):
+                results.extend(chunk_result)
+            return results
+    except (OSError, concurrent.futures.BrokenExecutor) as e:
+        log(f"进程池相似度比较失败，改为在当前进程中计算: {str(e)}", level="WARNING")
+        return compare_steps_similarity(steps_texts, pairs)
+
+
+def iter_verified_pair_batches(steps_texts, batches, workers=None):
+    """
+    逐批计算候选用例对的步骤相似度，按批次顺序产出结果，候选对较多且有多个CPU核时使用进程池
+
+    与verify_candidate_pairs相同，进程池中的步骤文本只在每个工作进程启动时传输一次；
+    调用方处理完前面批次的结果后即可继续，不必等待全部批次比较完成。
+    进程池中最多同时提交2倍进程数的批次，每产出一批再补充一批，未取走的结果不会堆积在内存中。
+
+    :param steps_texts: 步骤文本列表
+    :param batches: 候选对列表的列表
+    :param workers: 进程数，None则使用配置值
+    :return: 每批相似度超过阈值的 (下标i, 下标j, 相似度) 列表的生成器
+    """
+    workers = resolve_similarity_workers(workers)
+    finished = 0
+    if workers > 1 and len(batches) > 1 and sum(len(batch) for batch in batches) >= DUPLICATE_PROCESS_MIN_PAIRS:
+        pool_size = min(workers, len(batches))
+        log(f"使用{pool_size}个进程并行比较步骤相似度，分块数: {len(batches)}")
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=pool_size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_similarity_worker,
+                    initargs=(steps_texts,)) as executor:
+                remaining = iter(batches)
+                in_flight = deque(executor.submit(_compare_in_worker, batch)
+                                  for batch in islice(remaining, 2 * pool_size))
+                try:
+                    while in_flight:
+                        batch_result = in_flight.popleft().result()
+                        # 先补充下一批再产出结果，调用方处理结果时工作进程不空闲
+                        for batch in islice(remaining, 1):
+                            in_flight.append(executor.submit(_compare_in_worker, batch))
+                        finished += 1
+                        yield batch_result
+                finally:
+                    # 调用方提前停止迭代时不再计算尚未开始的批次
+                    for future in in_flight:
+                        future.cancel()
+            return
+        except (OSError, concurrent.futures.BrokenExecutor) as e:
+            log(f"进程池相似度比较失败，剩余批次改为在当前进程中计算: {str(e)}", level="WARNING")
+    for batch in batches[finished:]:
+        yield compare_steps_similarity(steps_texts, batch)
+
+
+def select_similarity_engine(suite_id=None):
+    """
+    确定本次相似度计算使用的引擎，配置为向量化引擎但未安装numpy或scipy时记录警告并改用逐对比较
+
+    :param suite_id: 用例集标识（可选），提供且启用增量重复索引时逐对比较通过索引进行
+    :return: "vector"（向量化引擎）、"index"（增量重复索引）或"sequence"（逐对比较）
+    """
+    if DUPLICATE_SIMILARITY_ENGINE == "vector":
+        if VECTOR_BACKEND_AVAILABLE:
+            return "vector"
+        log("未安装numpy或scipy，无法使用向量化相似度引擎，改用逐对比较引擎", level="WARNING")
+    if suite_id and DUPLICATE_INDEX_ENABLED:
+        return "index"
+    return "sequence"
+
+
+def find_similar_texts(texts, label="步骤", engine=None):
+    """
+    按配置的相似度引擎找出文本相似的用例对
+
+    :param texts: 文本列表（步骤或预期结果）
+    :param label: 日志中的文本类型名称
+    :param engine: select_similarity_engine选定的引擎（可选），None则按配置选择
+    :return: 相似度超过阈值的 (下标i, 下标j, 相似度) 列表
+    """
+    engine = engine or select_similarity_engine()
+    if engine == "vector":
+        log(f"使用向量化引擎计算{label}相似度（字符n-gram余弦相似度），用例数: {len(texts)}")
+        return find_similar_text_pairs(texts, DUPLICATE_VECTOR_SIMILARITY_THRESHOLD)
+
+    # 用MinHash-LSH筛选可能相似的候选对（用例较少时为全部用例对），只对候选对计算相似度
+    candidate_pairs = find_candidate_pairs(texts)
+    total_pairs = len(texts) * (len(texts) - 1) // 2
+    log(f"{label}相似性候选对: {len(candidate_pairs)}/{total_pairs}")
+    return verify_candidate_pairs(texts, candidate_pairs)
+
+
+def find_similar_case_pairs(case_text_map, suite_id=None, label="步骤", engine=None):
+    """
+    找出文本相似的用例对，提供用例集标识时使用增量重复索引
+
+    :param case_text_map: {case_id: 文本}，只包含文本非空的用例
+    :param suite_id: 索引的用例集标识（可选）
+    :param label: 日志中的文本类型名称
+    :param engine: select_similarity_engine选定的引擎（可选），None则按配置和suite_id选择
+    :return: 相似度超过阈值的 (下标i, 下标j, 相似度) 列表，下标对应case_text_map的键顺序
+    """
+    engine = engine or select_similarity_engine(suite_id)
+    if engine == "index":
+        # 延迟导入，duplicate_index需要使用本模块的相似度计算
+        from duplicate_index import find_similar_pairs_incremental
+        return find_similar_pairs_incremental(suite_id, case_text_map)
+    return find_similar_texts(list(case_text_map.values()), label, engine)
+
+
+def iter_similar_case_clusters(case_text_map, suite_id=None, similar_pairs=None):
+    """
+    找出步骤相似的用例并逐个产出重复用例簇，每个簇在其全部用例的候选对都比较完成后立即产出
+
+    使用逐对比较引擎时，候选对按较大下标升序分批比较：处理完较大下标不超过J的全部候选对后，
+    候选对的另一端都不超过J的簇不会再变化，可以立即产出并释放，不必等待其余候选对。
+    增量重复索引和向量化引擎一次性给出全部相似用例对，这时各簇在比较完成后依次产出。
+
+    :param case_text_map: {case_id: 步骤文本}，只包含有步骤的用例
+    :param suite_id: 增量重复索引的用例集标识（可选）
+    :param similar_pairs: 列表（可选），确认的 (下标i, 下标j, 相似度) 依次追加到其中
+    :return: 簇的生成器，每个簇是按升序排列的下标列表（至少两个），下标对应case_text_map的键顺序
+    """
+    similar_pairs = [] if similar_pairs is None else similar_pairs
+    texts = list(case_text_map.values())
+    # 每个用例的候选对中较大下标的最大值，簇内全部用例的该值都已处理到时簇不再变化
+    last_partner = list(range(len(texts)))
+
+    engine = select_similarity_engine(suite_id)
+    if engine != "sequence":
+        pairs = find_similar_case_pairs(case_text_map, suite_id, engine=engine)
+        bounds = [len(texts) - 1]
+        verified_batches = iter([pairs])
+    else:
+        # 用MinHash-LSH筛选可能相似的候选对（用例较少时为全部用例对），只对候选对计算相似度
+        candidate_pairs = find_candidate_pairs(texts)
+        total_pairs = len(texts) * (len(texts) - 1) // 2
+        log(f"步骤相似性候选对: {len(candidate_pairs)}/{total_pairs}")
+        candidate_pairs.sort(key=lambda pair: (pair[1], pair[0]))
+        batches, bounds = [], []
+        for i, j in candidate_pairs:
+            last_partner[i] = max(last_partner[i], j)
+            # 较大下标相同的候选对放在同一批，批次边界上的下标之前的候选对都已比较
+            if not batches or (len(batches[-1]) >= DUPLICATE_PROCESS_CHUNK_SIZE and j != bounds[-1]):
+                batches.append([])
+                bounds.append(j)
+            batches[-1].append((i, j))
+            bounds[-1] = j
+        del candidate_pairs
+        verified_batches = iter_verified_pair_batches(texts, batches)
+
+    disjoint_set = DisjointSet(len(texts))
+    # 尚未产出的簇：根 -> 成员下标，根 -> 成员候选对的最大较大下标
+    members = {}
+    reach = {}
+    pending = []
+    for bound, batch_pairs in zip(bounds, verified_batches):
+        similar_pairs.extend(batch_pairs)
+        for i, j, _ in batch_pairs:
+            root_i, root_j = disjoint_set.find(i), disjoint_set.find(j)
+            if root_i == root_j:
+                continue
+            disjoint_set.union(root_i, root_j)
+            root = disjoint_set.find(root_i)
+            members[root] = members.pop(root_i, [root_i]) + members.pop(root_j, [root_j])
+            reach[root] = max(reach.pop(root_i, last_partner[root_i]), reach.pop(root_j, last_partner[root_j]))
+            heapq.heappush(pending, (reach[root], root))
+        while pending and pending[0][0] <= bound:
+            cluster_reach, root = heapq.heappop(pending)
+            # 簇合并后旧的记录已失效
+            if reach.get(root) == cluster_reach:
+                del reach[root]
+                yield sorted(members.pop(root))
+    for cluster_reach, root in sorted(pending):
+        if reach.get(root) == cluster_reach:
+            del reach[root]
+            yield sorted(members.pop(root))
+
+
+def _upper_bound_similarity(text1, text2):
+    """quick_ratio的上界：只由两段文本的长度决定"""
+    total = len(text1) + len(text2)
+    return 2 * min(len(text1), len(text2)) / total if total else 0.0
+
+
+def score_mixed_pairs(steps_pairs, results_pairs, case_steps_map, case_results_map, threshold=None):
+    """
+    计算步骤或预期结果相似的用例对的步骤+预期结果综合相似度，只保留超过阈值的用例对
+
+    只对已找出的相似用例对补算另一项的相似度，并先用长度上界排除不可能超过阈值的用例对，不额外进行两两比较。
+
+    :param steps_pairs: {(case_id_a, case_id_b): 步骤相似度}
+    :param results_pairs: {(case_id_a, case_id_b): 预期结果相似度}
+    :param case_steps_map: {case_id: 步骤文本}
+    :param case_results_map: {case_id: 预期结果文本}
+    :param threshold: 综合相似度阈值，None则使用配置中的DUPLICATE_MIXED_SIMILARITY_THRESHOLD
+    :return: (case_id_a, case_id_b, 步骤相似度, 预期结果相似度, 综合相似度) 列表，按用例对出现顺序
+    """
+    threshold = DUPLICATE_MIXED_SIMILARITY_THRESHOLD if threshold is None else threshold
+    steps_weight = DUPLICATE_MIXED_STEPS_WEIGHT
+    scored = []
+    for pair in dict.fromkeys(list(steps_pairs) + list(results_pairs)):
+        a, b = pair
+        if a not in case_steps_map or b not in case_steps_map or \
+                a not in case_results_map or b not in case_results_map:
+            continue
+        steps_similarity = steps_pairs.get(pair)
+        results_similarity = results_pairs.get(pair)
+        if steps_similarity is None:
+            bound = _upper_bound_similarity(case_steps_map[a], case_steps_map[b])
+            if steps_weight * bound + (1 - steps_weight) * results_similarity <= threshold:
+                continue
+            steps_similarity = SequenceMatcher(None, case_steps_map[a], case_steps_map[b]).quick_ratio()
+        if results_similarity is None:
+            bound = _upper_bound_similarity(case_results_map[a], case_results_map[b])
+            if steps_weight * steps_similarity + (1 - steps_weight) * bound <= threshold:
+                continue
+            results_similarity = SequenceMatcher(None, case_results_map[a], case_results_map[b]).quick_ratio()
+        score = steps_weight * steps_similarity + (1 - steps_weight) * results_similarity
+        if score > threshold:
+            scored.append((a, b, steps_similarity, results_similarity, score))
+    return scored
+
+
+def iter_duplicate_findings(test_cases, suite_id=None):
+    """
+    逐个产出重复用例的发现，每个重复用例组确认后立即产出，合并建议随该组一起产出，不在内存中累积
+
+    产出顺序：标题重复（无需相似度计算，最先产出）、步骤重复用例簇（每个簇的候选对比较完成后立即产出，
+    按完成先后排列）、混合重复用例对，最后是汇总统计。
 
+    :param test_cases: 测试用例（TestCase列表或任意支持的格式）
+    :param suite_id: 用例集标识（可选），提供时通过该用例集的增量重复索引只比较新增或变化的用例
+    :return: 发现的生成器，每个发现是带"type"字段的字典：
+             "title_duplicate"/"steps_duplicate"包含用例组信息和merge_suggestion，
+             "mixed_duplicate"包含用例对和相似度，"summary"包含重复数、重复率、重复类型和类别统计
+    """
+    test_cases = normalize_test_cases(test_cases)
+
+    duplicate_types = {
+        "title": 0,
+        "steps": 0,
+        "expected_results": 0,
+        "mixed": 0
+    }
     total_cases = len(test_cases)
     if total_cases <= 1:
-        return duplicate_info
+        yield {
+            "type": "summary",
+            "duplicate_count": 0,
+            "duplicate_rate": 0.0,
+            "duplicate_types": duplicate_types,
+            "duplicate_categories": {},
+            "categories": []
+        }
+        return
 
     log(f"开始查找重复测试用例，总数: {total_cases}")
 
@@ -49,8 +379,8 @@ def find_duplicate_test_cases(test_cases):
 
     # 收集所有标题和对应的测试用例
     for i, case in enumerate(test_cases):
-        case_id = case.get("case_id", str(i))
-        title = case.get("title", "")
+        case_id = case.case_id
+        title = case.title
 
         # 记录测试用例ID到索引的映射
         case_id_to_index[case_id] = i
@@ -63,31 +393,21 @@ def find_duplicate_test_cases(test_cases):
             title_case_map[title] = []
         title_case_map[title].append((case_id, case))
 
-        # 预处理并存储步骤和预期结果
-        steps = case.get("steps", [])
-        if steps:
-            if isinstance(steps, list):
-                steps_text = "\n".join(str(s) for s in steps)
-            else:
-                steps_text = str(steps)
-            case_steps_map[case_id] = steps_text
+        # 存储步骤和预期结果的拼接文本
+        if case.steps:
+            case_steps_map[case_id] = case.steps_text
 
-        expected_results = case.get("expected_results", [])
-        if expected_results:
-            if isinstance(expected_results, list):
-                results_text = "\n".join(str(r) for r in expected_results)
-            else:
-                results_text = str(expected_results)
-            case_results_map[case_id] = results_text
+        if case.expected_results:
+            case_results_map[case_id] = case.expected_text
 
     # 按类别分组测试用例（假设有case_category字段或根据标题提取）
     categories = {}
     for case in test_cases:
         # 尝试获取类别
-        category = case.get("category", "")
+        category = case.category
         if not category:
             # 尝试从标题中提取类别
-            title = case.get("title", "")
+            title = case.title
             if " - " in title:
                 category = title.split(" - ")[0].strip()
             elif "：" in title or ":" in title:
@@ -99,8 +419,8 @@ def find_duplicate_test_cases(test_cases):
             categories[category] = []
         categories[category].append(case)
 
-    # 记录类别信息
-    duplicate_info["categories"] = list(categories.keys())
+    # 标题重复组和步骤重复用例簇的数量
+    duplicate_count = 0
 
     # 优化：使用Counter一次性计算标题重复
     title_counter = Counter(all_titles)
@@ -113,14 +433,9 @@ def find_duplicate_test_cases(test_cases):
             case_ids = [case_id for case_id, _ in same_title_cases]
             case_objs = [case for _, case in same_title_cases]
 
-            duplicate_info["title_duplicates"].append({
-                "title": title,
-                "count": count,
-                "case_ids": case_ids
-            })
-
             # 更新重复类型计数
-            duplicate_info["duplicate_types"]["title"] += count - 1
+            duplicate_types["title"] += count - 1
+            duplicate_count += 1
 
             # 为标题重复的测试用例生成合并建议
             if count > 1:
@@ -129,216 +444,150 @@ def find_duplicate_test_cases(test_cases):
                 all_expected_results = []
 
                 for case in case_objs:
-                    steps = case.get("steps", "")
-                    if isinstance(steps, list):
-                        all_steps.extend(steps)
-                    elif steps:
-                        all_steps.append(steps)
-
-                    expected = case.get("expected_results", "")
-                    if isinstance(expected, list):
-                        all_expected_results.extend(expected)
-                    elif expected:
-                        all_expected_results.append(expected)
-
-                # 去重 - 使用集合而不是字典
-                unique_steps = list({str(step).strip() for step in all_steps if str(step).strip()})
-                unique_expected = list({str(result).strip() for result in all_expected_results if str(result).strip()})
+                    all_steps.extend(case.steps)
+                    all_expected_results.extend(case.expected_results)
+
+                # 去重并保持原有顺序，保证多次运行的合并建议一致
+                unique_steps = list(dict.fromkeys(str(step).strip() for step in all_steps if str(step).strip()))
+                unique_expected = list(dict.fromkeys(str(result).strip() for result in all_expected_results if str(result).strip()))
 
                 # 生成合并建议
-                duplicate_info["merge_suggestions"].append({
+                yield {
                     "type": "title_duplicate",
                     "title": title,
+                    "count": count,
                     "case_ids": case_ids,
-                    "merged_case": {
+                    "merge_suggestion": {
+                        "type": "title_duplicate",
                         "title": title,
-                        "case_id": f"MERGED-{case_ids[0]}",
-                        "preconditions": case_objs[0].get("preconditions", ""),
-                        "steps": unique_steps,
-                        "expected_results": unique_expected
-                    },
-                    "original_case_ids": case_ids  # 确保保留原始case_ids
-                })
+                        "case_ids": case_ids,
+                        "merged_case": {
+                            "title": title,
+                            "case_id": f"MERGED-{case_ids[0]}",
+                            "preconditions": case_objs[0].preconditions,
+                            "steps": unique_steps,
+                            "expected_results": unique_expected
+                        },
+                        "original_case_ids": case_ids  # 确保保留原始case_ids
+                    }
+                }
 
     # 查找步骤或预期结果高度相似的测试用例
-    # 优化：使用哈希表和集合加速相似度检查
-    from difflib import SequenceMatcher
-
-    # 记录已处理的相似度比较，避免重复计算
-    processed_comparisons = set()
-    steps_similar_cases = {}
-
     # 使用预先计算的映射关系
-    case_ids = list(case_steps_map.keys())
+    steps_case_ids = list(case_steps_map.keys())
     
-    log(f"进行步骤相似性比较，用例数: {len(case_ids)}")
-
-    # 优化：实现批量处理比较操作
-    def batch_compare_similarity(cases_batch):
-        results = {}
-        for case_id1, case_id2 in cases_batch:
-            if case_id1 not in case_steps_map or case_id2 not in case_steps_map:
-                continue
-
-            steps1 = case_steps_map[case_id1]
-            steps2 = case_steps_map[case_id2]
-
-            # 快速预筛选：比较长度和简单特征
-            len1, len2 = len(steps1), len(steps2)
-            if abs(len1 - len2) > min(len1, len2) * 0.3:
-                continue  # 长度差异过大，跳过详细比较
-
-            # 快速特征比较：比较首尾几个字符和词袋特征
-            if len1 > 20 and len2 > 20:
-                # 比较首尾字符
-                if steps1[:10] != steps2[:10] and steps1[-10:] != steps2[-10:]:
-                    # 使用词袋模型进行快速比较
-                    words1 = set(steps1.lower().split())
-                    words2 = set(steps2.lower().split())
-                    # 计算Jaccard相似度
-                    intersection = len(words1.intersection(words2))
-                    union = len(words1.union(words2))
-                    if union > 0 and intersection / union < DUPLICATE_SIMILARITY_THRESHOLD * 0.8:
-                        continue  # 词袋相似度过低，跳过详细比较
-
-            # 只有在快速预筛选通过后，才使用序列匹配算法计算相似度
-            similarity = SequenceMatcher(None, steps1, steps2).quick_ratio()
-            if similarity > DUPLICATE_SIMILARITY_THRESHOLD:  # 使用配置参数作为相似度阈值
-                results[(case_id1, case_id2)] = similarity
-        return results
-
-    # 准备批量比较任务
-    comparison_batches = []
-    batch_size = BATCH_SIZE  # 使用配置中的批处理大小
-    current_batch = []
-
-    for i, case_id1 in enumerate(case_ids):
-        for j in range(i + 1, len(case_ids)):
-            case_id2 = case_ids[j]
-
-            # 跳过已处理的比较
-            pair_key = f"{case_id1}-{case_id2}"
-            if pair_key in processed_comparisons:
-                continue
-
-            # 添加到当前批次
-            current_batch.append((case_id1, case_id2))
-            processed_comparisons.add(pair_key)
-
-            # 如果当前批次达到指定大小，添加到批量列表
-            if len(current_batch) >= batch_size:
-                comparison_batches.append(current_batch)
-                current_batch = []
-
-    # 添加最后一批
-    if current_batch:
-        comparison_batches.append(current_batch)
-
-    log(f"分批处理相似性比较，批次数: {len(comparison_batches)}")
-
-    # 使用线程池并行执行批量比较
-    batch_results = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-        # 提交所有批次任务
-        future_to_batch = {executor.submit(batch_compare_similarity, batch): i for i, batch in enumerate(comparison_batches)}
-
-        # 处理完成的任务
-        for future in concurrent.futures.as_completed(future_to_batch):
-            batch_index = future_to_batch[future]
-            try:
-                result = future.result()
-                batch_results.update(result)
-            except Exception as e:
-                log(f"批次 {batch_index} 处理出错: {str(e)}")
-
-    log(f"相似性比较完成，找到 {len(batch_results)} 对相似步骤")
-
-    # 处理批量比较结果
-    for (case_id1, case_id2), similarity in batch_results.items():
-        # 更新重复类型计数
-        duplicate_info["duplicate_types"]["steps"] += 1
-
-        # 记录相似步骤的用例
-        if case_id1 not in steps_similar_cases:
-            steps_similar_cases[case_id1] = []
-        steps_similar_cases[case_id1].append(case_id2)
-
-        if case_id2 not in steps_similar_cases:
-            steps_similar_cases[case_id2] = []
-        steps_similar_cases[case_id2].append(case_id1)
-
-    # 构建步骤重复的测试用例组
-    processed_case_ids = set()
-    for case_id, similar_ids in steps_similar_cases.items():
-        if case_id in processed_case_ids:
-            continue
-
-        # 构建一组相似的测试用例
-        group = {case_id} | set(similar_ids)
-        processed_case_ids.update(group)
-
-        # 如果组中有多个测试用例，记录为步骤重复
-        if len(group) > 1:
-            case_ids = list(group)
-            titles = []
-
-            for case_id in case_ids:
-                # 通过映射直接获取测试用例，避免遍历
-                if case_id in case_id_to_index:
-                    case_index = case_id_to_index[case_id]
-                    case = test_cases[case_index]
-                    titles.append(case.get("title", ""))
-
-            duplicate_info["steps_duplicates"].append({
-                "count": len(case_ids),
+    log(f"进行步骤相似性比较，用例数: {len(steps_case_ids)}")
+
+    # 用并查集把相似用例对聚合为传递闭包下的重复用例簇，簇的划分与比较顺序无关，每个簇确认后立即产出
+    similar_pairs = []
+    for members in iter_similar_case_clusters(case_steps_map, suite_id, similar_pairs):
+        case_ids = [steps_case_ids[member] for member in members]
+        titles = []
+
+        for case_id in case_ids:
+            # 通过映射直接获取测试用例，避免遍历
+            if case_id in case_id_to_index:
+                case_index = case_id_to_index[case_id]
+                case = test_cases[case_index]
+                titles.append(case.title)
+
+        duplicate_count += 1
+
+        # 查找具有相似步骤的测试用例详情
+        similar_cases = []
+        for case_id in case_ids:
+            if case_id in case_id_to_index:
+                case_index = case_id_to_index[case_id]
+                similar_cases.append(test_cases[case_index])
+
+        if similar_cases:
+            # 为步骤相似的测试用例生成合并建议
+            # 合并标题：使用最长或最具描述性的标题
+            titles_sorted = sorted(titles, key=len, reverse=True)
+            merged_title = titles_sorted[0] if titles_sorted else "合并测试用例"
+
+            # 合并预期结果
+            all_expected_results = []
+            for case in similar_cases:
+                all_expected_results.extend(case.expected_results)
+
+            # 去重并保持原有顺序
+            unique_expected = list(dict.fromkeys(str(result).strip() for result in all_expected_results if str(result).strip()))
+
+            # 生成合并建议
+            merge_suggestion = {
+                "type": "steps_duplicate",
                 "case_ids": case_ids,
-                "titles": titles
-            })
-
-            # 查找具有相似步骤的测试用例详情
-            similar_cases = []
-            for case_id in case_ids:
-                if case_id in case_id_to_index:
-                    case_index = case_id_to_index[case_id]
-                    similar_cases.append(test_cases[case_index])
-
-            if similar_cases:
-                # 为步骤相似的测试用例生成合并建议
-                # 合并标题：使用最长或最具描述性的标题
-                titles_sorted = sorted(titles, key=len, reverse=True)
-                merged_title = titles_sorted[0] if titles_sorted else "合并测试用例"
-
-                # 合并预期结果
-                all_expected_results = []
-                for case in similar_cases:
-                    expected = case.get("expected_results", "")
-                    if isinstance(expected, list):
-                        all_expected_results.extend(expected)
-                    elif expected:
-                        all_expected_results.append(expected)
-
-                # 去重 - 使用集合
-                unique_expected = list({str(result).strip() for result in all_expected_results if str(result).strip()})
+                "titles": titles,
+                "merged_case": {
+                    "title": merged_title,
+                    "case_id": f"MERGED-STEPS-{case_ids[0]}",
+                    "preconditions": similar_cases[0].preconditions if similar_cases else "",
+                    "steps": list(similar_cases[0].steps) if similar_cases else "",  # 使用相似的步骤
+                    "expected_results": unique_expected
+                },
+                "original_case_ids": case_ids  # 确保保留原始case_ids
+            }
+        else:
+            merge_suggestion = None
+
+        yield {
+            "type": "steps_duplicate",
+            "count": len(case_ids),
+            "case_ids": case_ids,
+            "titles": titles,
+            "merge_suggestion": merge_suggestion
+        }
 
-                # 生成合并建议
-                duplicate_info["merge_suggestions"].append({
-                    "type": "steps_duplicate",
-                    "case_ids": case_ids,
-                    "titles": titles,
-                    "merged_case": {
-                        "title": merged_title,
-                        "case_id": f"MERGED-STEPS-{case_ids[0]}",
-                        "preconditions": similar_cases[0].get("preconditions", "") if similar_cases else "",
-                        "steps": similar_cases[0].get("steps", "") if similar_cases else "",  # 使用相似的步骤
-                        "expected_results": unique_expected
-                    },
-                    "original_case_ids": case_ids  # 确保保留原始case_ids
-                })
+    similar_pairs.sort()
+    log(f"相似性比较完成，找到 {len(similar_pairs)} 对相似步骤")
+
+    # 每对相似步骤计一次步骤重复
+    duplicate_types["steps"] += len(similar_pairs)
+
+    # 查找预期结果高度相似的测试用例，使用与步骤相同的候选筛选和相似度计算
+    results_case_ids = list(case_results_map.keys())
+    log(f"进行预期结果相似性比较，用例数: {len(results_case_ids)}")
+    similar_results_pairs = find_similar_case_pairs(
+        case_results_map, f"{suite_id}:expected_results" if suite_id else None, "预期结果")
+    log(f"相似性比较完成，找到 {len(similar_results_pairs)} 对相似预期结果")
+
+    def case_pair(case_id_a, case_id_b):
+        """按用例下标统一用例对的方向，使步骤相似对和预期结果相似对可以相互对照"""
+        if case_id_to_index[case_id_a] > case_id_to_index[case_id_b]:
+            return case_id_b, case_id_a
+        return case_id_a, case_id_b
+
+    steps_pair_map = {case_pair(steps_case_ids[i], steps_case_ids[j]): similarity
+                      for i, j, similarity in similar_pairs}
+    results_pair_map = {case_pair(results_case_ids[i], results_case_ids[j]): similarity
+                        for i, j, similarity in similar_results_pairs}
+
+    # 预期结果相似但步骤不相似的用例对计为预期结果重复
+    duplicate_types["expected_results"] += sum(
+        1 for pair in results_pair_map if pair not in steps_pair_map)
+
+    # 步骤和预期结果综合相似度超过阈值且标题不同的用例对计为混合重复
+    for a, b, steps_similarity, results_similarity, score in score_mixed_pairs(
+            steps_pair_map, results_pair_map, case_steps_map, case_results_map):
+        titles = [test_cases[case_id_to_index[a]].title, test_cases[case_id_to_index[b]].title]
+        if titles[0] == titles[1]:
+            continue
+        duplicate_types["mixed"] += 1
+        yield {
+            "type": "mixed_duplicate",
+            "case_ids": [a, b],
+            "titles": titles,
+            "steps_similarity": round(steps_similarity, 4),
+            "expected_results_similarity": round(results_similarity, 4),
+            "score": round(score, 4)
+        }
 
     # 按类别统计重复情况 - 使用哈希表和Counter优化
+    duplicate_categories = {}
     for category, cases in categories.items():
         # 直接使用Counter计算标题重复
-        category_titles = [case.get("title", "") for case in cases]
+        category_titles = [case.title for case in cases]
         title_counter = Counter(category_titles)
         title_duplicates = sum(count - 1 for count in title_counter.values() if count > 1)
 
@@ -347,18 +596,15 @@ def find_duplicate_test_cases(test_cases):
         steps_duplicates = 0
 
         for case in cases:
-            steps = case.get("steps", "")
-            if steps:
-                if isinstance(steps, list):
-                    steps = "\n".join([str(s) for s in steps])
-                steps_hash_val = hash(steps)
+            if case.steps:
+                steps_hash_val = hash(case.steps_text)
                 if steps_hash_val in steps_set:
                     steps_duplicates += 1
                 else:
                     steps_set.add(steps_hash_val)
 
         # 记录该类别的重复情况
-        duplicate_info["duplicate_categories"][category] = {
+        duplicate_categories[category] = {
             "total": len(cases),
             "title_duplicates": title_duplicates,
             "steps_duplicates": steps_duplicates,
@@ -366,10 +612,72 @@ def find_duplicate_test_cases(test_cases):
         }
 
     # 计算重复测试用例数量和比率
-    duplicate_count = len(duplicate_info["title_duplicates"]) + len(duplicate_info["steps_duplicates"])
-    duplicate_info["duplicate_count"] = duplicate_count
-    duplicate_info["duplicate_rate"] = round(duplicate_count / total_cases * 100, 2) if total_cases > 0 else 0
+    duplicate_rate = round(duplicate_count / total_cases * 100, 2) if total_cases > 0 else 0
+
+    log(f"重复用例分析完成，重复率: {duplicate_rate}%, 重复数: {duplicate_count}")
+
+    yield {
+        "type": "summary",
+        "duplicate_count": duplicate_count,
+        "duplicate_rate": duplicate_rate,
+        "duplicate_types": duplicate_types,
+        "duplicate_categories": duplicate_categories,
+        "categories": list(categories.keys())
+    }
+
+
+def find_duplicate_test_cases(test_cases, suite_id=None):
+    """
+    查找重复的测试用例，并提供合并建议
+
+    :param test_cases: 测试用例（TestCase列表或任意支持的格式）
+    :param suite_id: 用例集标识（可选），提供时通过该用例集的增量重复索引只比较新增或变化的用例
+    :return: 重复的测试用例信息、重复率和合并建议
+    """
+    duplicate_info = {
+        "duplicate_count": 0,
+        "duplicate_rate": 0.0,
+        "title_duplicates": [],
+        "steps_duplicates": [],
+        "mixed_duplicates": [],  # 步骤和预期结果高度相似但标题不同的测试用例
+        "merge_suggestions": [],  # 新增：测试用例合并建议
+        "duplicate_types": {},  # 新增：不同类型重复的详细统计
+        "duplicate_categories": {},  # 新增：按测试类别统计重复情况
+        "categories": []  # 新增：测试用例类别列表
+    }
+
+    test_cases = normalize_test_cases(test_cases)
+    # 步骤重复用例簇按完成先后产出，汇总时按簇内第一个用例在有步骤的用例中的位置排序
+    steps_positions = {case_id: position for position, case_id in
+                       enumerate(dict.fromkeys(case.case_id for case in test_cases if case.steps))}
+    steps_findings = []
+
+    for finding in iter_duplicate_findings(test_cases, suite_id):
+        finding_type = finding["type"]
+        if finding_type == "title_duplicate":
+            duplicate_info["title_duplicates"].append({
+                "title": finding["title"],
+                "count": finding["count"],
+                "case_ids": finding["case_ids"]
+            })
+            duplicate_info["merge_suggestions"].append(finding["merge_suggestion"])
+        elif finding_type == "steps_duplicate":
+            steps_findings.append(finding)
+        elif finding_type == "mixed_duplicate":
+            duplicate_info["mixed_duplicates"].append({
+                key: value for key, value in finding.items() if key != "type"
+            })
+        else:
+            duplicate_info.update((key, value) for key, value in finding.items() if key != "type")
+
+    steps_findings.sort(key=lambda finding: steps_positions[finding["case_ids"][0]])
+    for finding in steps_findings:
+        duplicate_info["steps_duplicates"].append({
+            "count": finding["count"],
+            "case_ids": finding["case_ids"],
+            "titles": finding["titles"]
+        })
+        if finding["merge_suggestion"]:
+            duplicate_info["merge_suggestions"].append(finding["merge_suggestion"])
 
-    log(f"重复用例分析完成，重复率: {duplicate_info['duplicate_rate']}%, 重复数: {duplicate_count}")
-    
     return duplicate_info
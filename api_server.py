@@ -6,14 +6,14 @@ import aiohttp
 import json
 import traceback
 import uuid  # 添加uuid导入
-from typing import Optional
-from config import MODEL_NAME, API_URL
+from typing import Dict, Optional
+from config import MODEL_NAME, API_URL, TASK_STATUS_MAX_ENTRIES
 from logger import log, log_error, start_logging, end_logging
 from llm_api import clear_cache  # 导入清除缓存函数
 
 try:
     from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Request
-    from fastapi.responses import JSONResponse, HTMLResponse
+    from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
     from fastapi.staticfiles import StaticFiles
     from fastapi.templating import Jinja2Templates
     from pydantic import BaseModel
@@ -28,12 +28,28 @@ try:
         save_results: bool = True  # 可选，是否保存结果文件
         is_iteration: bool = False  # 可选，是否启用迭代前后对比功能
         prev_iteration: Optional[str] = None  # 可选，上一次迭代的测试用例，JSON字符串
+        use_cache: bool = True  # 可选，是否使用评测结果缓存，False则强制重新评测
+        sample_size: Optional[int] = None  # 可选，启用分层抽样评测的样本量，0表示根据目标精度推算
+        suite_id: Optional[str] = None  # 可选，AI测试用例集标识，同一用例集重复评测时增量进行重复分析
+        golden_suite_id: Optional[str] = None  # 可选，黄金标准用例集标识，用于增量重复分析
 
         # 添加model_config配置，禁用保护命名空间检查
         model_config = {
             "protected_namespaces": ()
         }
     
+    # 定义排行榜评测请求模型
+    class LeaderboardRequest(BaseModel):
+        candidates: Dict[str, str]  # 候选名称到AI测试用例JSON字符串的映射
+        golden_test_cases: Optional[str] = None  # 黄金标准测试用例，JSON字符串，可选
+        use_cache: bool = True  # 可选，是否复用已有的评测结果缓存
+        sample_size: Optional[int] = None  # 可选，启用分层抽样评测的样本量，0表示根据目标精度推算
+
+    # 定义重复用例流式分析请求模型
+    class DuplicateFindingsRequest(BaseModel):
+        test_cases: str  # 测试用例，JSON字符串
+        suite_id: Optional[str] = None  # 可选，用例集标识，提供时使用增量重复索引
+
     # 定义保存黄金标准测试用例的请求模型
     class SaveGoldenCasesRequest(BaseModel):
         golden_test_cases: str  # 黄金标准测试用例，JSON字符串
@@ -88,8 +104,23 @@ try:
     # 状态追踪
     evaluation_tasks = {}
 
+
+    def record_task_status(task_id: str, content: dict):
+        """
+        记录任务状态，超过TASK_STATUS_MAX_ENTRIES时丢弃最早的任务
+
+        :param task_id: 任务ID
+        :param content: 任务状态和结果
+        """
+        evaluation_tasks[task_id] = content
+        while len(evaluation_tasks) > TASK_STATUS_MAX_ENTRIES:
+            evaluation_tasks.pop(next(iter(evaluation_tasks)))
+
     # 导入主程序模块
     from core import async_main
+    from leaderboard import async_leaderboard_main
+    from analyzer import iter_duplicate_findings
+    from judge_cache import get_judge_cache_stats
 
 
     # 全局异常处理中间件
@@ -392,11 +423,29 @@ try:
                 else:
                     log(f"请求启用迭代对比但未提供上一次迭代数据，迭代对比功能将被禁用", level="WARNING")
             
+            def publish_result_update(updated_result):
+                """迟到评委的结果合并后，更新任务状态中的评测结果"""
+                task_status = evaluation_tasks.get(request_id)
+                if task_status is None:
+                    return
+                task_status["evaluation_result"] = updated_result["evaluation_result"]
+                for key in ("report", "report_iteration"):
+                    if key in updated_result and key in task_status:
+                        task_status[key] = updated_result[key]
+                task_status["late_results_pending"] = False
+                task_status["updated_at"] = time.time()
+                log(f"评测任务 {request_id} 已合并迟到评委的结果", important=True)
+
             result = await async_main(
                 ai_test_cases, 
                 golden_test_cases, 
                 is_iteration=request.is_iteration, 
-                prev_iteration_data=request.prev_iteration
+                prev_iteration_data=request.prev_iteration,
+                use_cache=request.use_cache,
+                sample_size=request.sample_size,
+                suite_id=request.suite_id,
+                golden_suite_id=request.golden_suite_id,
+                on_result_update=publish_result_update
             )
 
             if result and result.get("success", False):
@@ -407,8 +456,13 @@ try:
                     "evaluation_result": result["evaluation_result"],
                     "files": result["files"],
                     "finish_task": True,
-                    "request_id": request_id
+                    "request_id": request_id,
+                    "cache_hit": result.get("cache_hit", False)
                 }
+
+                # 法定人数模式下仍有评委在评测时，合并后的结果可通过/task-status/{request_id}获取
+                panel = result["evaluation_result"].get("committee_summary", {}).get("panel", {})
+                response_content["late_results_pending"] = bool(panel.get("late_judges")) and not result.get("cache_hit", False)
                 
                 # 标准报告
                 if "report" in result:
@@ -428,7 +482,8 @@ try:
                 
                 # 打印响应内容中包含的字段
                 log(f"最终API响应包含以下字段: {', '.join(response_content.keys())}", important=True)
-                
+
+                record_task_status(request_id, response_content)
                 return JSONResponse(content=response_content)
             else:
                 error_msg = result.get("error", "未知错误")
@@ -464,6 +519,104 @@ try:
             )
 
 
+    @app.post("/leaderboard")
+    async def leaderboard_api(request: LeaderboardRequest):
+        """
+        排行榜评测：多个AI测试用例集对比同一黄金标准，共用黄金标准的预处理并发评测
+
+        :param request: 请求数据，包含各候选的AI测试用例和黄金标准测试用例
+        :return: 排行榜结果
+        """
+        request_id = f"leaderboard-{str(uuid.uuid4())}-{int(time.time() * 1000)}"
+        log(f"接收到排行榜评测请求: {request_id}，候选数量: {len(request.candidates)}", important=True)
+
+        if not request.candidates:
+            return JSONResponse(
+                content={
+                    "success": False,
+                    "error": "没有提供候选测试用例集",
+                    "message": "请至少提供一个候选AI测试用例集",
+                    "finish_task": True,
+                    "request_id": request_id
+                }
+            )
+
+        try:
+            result = await async_leaderboard_main(
+                request.candidates,
+                request.golden_test_cases,
+                use_cache=request.use_cache,
+                sample_size=request.sample_size
+            )
+            if result.get("success", False):
+                log(f"排行榜评测 {request_id} 完成", important=True)
+                return JSONResponse(content={
+                    "success": True,
+                    "message": "排行榜评测完成",
+                    "leaderboard": result["leaderboard"],
+                    "report": result["markdown_report"],
+                    "evaluation_results": result["evaluation_results"],
+                    "files": result["files"],
+                    "finish_task": True,
+                    "request_id": request_id
+                })
+
+            error_msg = result.get("error", "所有候选评测均失败")
+            log_error(f"排行榜评测 {request_id} 失败: {error_msg}")
+            return JSONResponse(
+                content={
+                    "success": False,
+                    "error": error_msg,
+                    "leaderboard": result.get("leaderboard", []),
+                    "message": "排行榜评测失败",
+                    "finish_task": True,
+                    "request_id": request_id
+                }
+            )
+        except Exception as e:
+            error_info = {
+                "request_id": request_id,
+                "error_type": type(e).__name__,
+                "error_message": str(e),
+                "traceback": traceback.format_exc()
+            }
+            log_error("排行榜评测过程中发生未知错误", error_info)
+            return JSONResponse(
+                content={
+                    "success": False,
+                    "error": str(e),
+                    "message": "排行榜评测过程中发生未知错误",
+                    "finish_task": True,
+                    "request_id": request_id
+                }
+            )
+
+
+    @app.post("/duplicate-findings/stream")
+    async def stream_duplicate_findings(request: DuplicateFindingsRequest):
+        """
+        流式返回重复用例分析结果，每行一个JSON对象（NDJSON），每个重复用例组确认后立即发送，
+        可与评测请求并行调用，在评委评测期间先展示重复用例和合并建议
+
+        :param request: 请求数据，包含测试用例和可选的用例集标识
+        :return: application/x-ndjson流，最后一行的type为summary，出错时为error
+        """
+        request_id = f"duplicates-{str(uuid.uuid4())}-{int(time.time() * 1000)}"
+        log(f"接收到重复用例流式分析请求: {request_id}", important=True)
+
+        def generate_findings():
+            # 同步生成器由StreamingResponse在线程池中迭代，不阻塞事件循环
+            try:
+                for finding in iter_duplicate_findings(request.test_cases, suite_id=request.suite_id):
+                    yield json.dumps(finding, ensure_ascii=False) + "\n"
+                log(f"重复用例流式分析 {request_id} 完成")
+            except Exception as e:
+                log_error(f"重复用例流式分析 {request_id} 失败", {"error": str(e), "traceback": traceback.format_exc()})
+                yield json.dumps({"type": "error", "error": str(e), "request_id": request_id}, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(generate_findings(), media_type="application/x-ndjson")
+
+
     # 保留task-status接口以兼容旧版本调用
     @app.get("/task-status/{task_id}")
     async def get_task_status(task_id: str):
@@ -621,7 +774,8 @@ try:
                 "status": "healthy",
                 "timestamp": time.time(),
                 "dirs_status": dirs_status,
-                "model_info": model_info
+                "model_info": model_info,
+                "judge_cache": get_judge_cache_stats()
             })
         except Exception as e:
             error_info = {
@@ -0,0 +1,322 @@
+"""
+性能基准测试脚本
+1. 用示例用例生成合成用例集，测量重复分析中步骤相似度比较在单进程、进程池和向量化引擎下的耗时和加速比
+2. 生成指定规模、重复率和类别分布的合成中文用例集，测量find_duplicate_test_cases在各相似度引擎下的耗时、
+   内存峰值、相似用例对数量和植入重复的召回率，结果写入JSON文件，便于在版本之间对比
+
+用法: python benchmark.py --cases 3000 --workers 4
+      python benchmark.py --sizes 1000 10000 50000 --engines sequence vector --output benchmark_results.json
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+import analyzer
+import config
+from config import FORMATTED_AI_CASES_FILE, FORMATTED_GOLDEN_CASES_FILE, DUPLICATE_VECTOR_SIMILARITY_THRESHOLD
+from testcase_model import normalize_test_cases
+from minhash_lsh import find_candidate_pairs
+from analyzer import compare_steps_similarity, verify_candidate_pairs, resolve_similarity_workers, find_duplicate_test_cases
+from vector_similarity import VECTOR_BACKEND_AVAILABLE, find_similar_text_pairs
+
+# 合成用例时随机替换进步骤文本的字符
+MUTATION_CHARS = "的是在输入点击验证登录页面"
+
+# 合成用例集的类别及其权重
+SYNTHETIC_CATEGORIES = {
+    "登录": 3, "注册": 2, "支付": 2, "订单": 2, "搜索": 1, "购物车": 1, "个人中心": 1, "消息通知": 1
+}
+SYNTHETIC_PAGES = ["首页", "登录页面", "注册页面", "支付页面", "订单列表页", "搜索结果页", "购物车页面", "设置页面", "消息中心"]
+SYNTHETIC_ELEMENTS = ["用户名输入框", "密码输入框", "验证码输入框", "手机号输入框", "搜索框", "提交按钮", "确认按钮",
+                      "取消按钮", "下拉菜单", "复选框", "商品卡片", "分页控件", "头像上传控件", "优惠券列表"]
+SYNTHETIC_VALUES = ["测试账号", "错误密码", "空字符串", "超长文本", "特殊字符", "过期验证码", "合法手机号", "非法邮箱"]
+SYNTHETIC_RESULTS = ["页面跳转成功", "提示操作成功", "显示错误提示", "按钮置灰不可点击", "数据保存成功", "列表刷新",
+                     "弹出确认对话框", "输入框标红提示", "订单状态更新", "消息角标数量变化"]
+
+# 相似度引擎名称，对应DUPLICATE_SIMILARITY_ENGINE的取值
+BENCHMARK_ENGINES = ("sequence", "vector")
+
+
+def load_seed_cases():
+    """
+    读取示例AI用例和黄金标准用例作为合成用例的种子
+
+    :return: TestCase列表
+    """
+    seed_cases = []
+    for path in (FORMATTED_AI_CASES_FILE, FORMATTED_GOLDEN_CASES_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            seed_cases.extend(normalize_test_cases(json.load(f)))
+    return seed_cases
+
+
+def build_steps_texts(case_count, seed=7):
+    """
+    随机挑选种子用例并改动少量字符、追加步骤，生成近似重复的步骤文本
+
+    :param case_count: 用例数量
+    :param seed: 随机种子
+    :return: 步骤文本列表
+    """
+    rng = random.Random(seed)
+    seed_cases = [case for case in load_seed_cases() if case.steps]
+    texts = []
+    for _ in range(case_count):
+        steps = list(rng.choice(seed_cases).steps)
+        for _ in range(rng.randint(0, 3)):
+            index = rng.randrange(len(steps))
+            if steps[index]:
+                position = rng.randrange(len(steps[index]))
+                steps[index] = steps[index][:position] + rng.choice(MUTATION_CHARS) + steps[index][position + 1:]
+        if rng.random() < 0.3:
+            steps.append(f"检查页面显示第{rng.randint(1, 99)}项")
+        texts.append("\n".join(steps))
+    return texts
+
+
+def benchmark_similarity(case_count, workers=None):
+    """
+    比较单进程、进程池和向量化引擎计算步骤相似度的耗时
+
+    :param case_count: 合成用例数量
+    :param workers: 进程数，None则使用配置值
+    :return: 基准测试结果
+    """
+    texts = build_steps_texts(case_count)
+    candidate_pairs = find_candidate_pairs(texts)
+    workers = resolve_similarity_workers(workers)
+
+    start_time = time.perf_counter()
+    serial_result = compare_steps_similarity(texts, candidate_pairs)
+    serial_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    parallel_result = verify_candidate_pairs(texts, candidate_pairs, workers=workers)
+    parallel_seconds = time.perf_counter() - start_time
+
+    vector_seconds = None
+    vector_pairs = None
+    if VECTOR_BACKEND_AVAILABLE:
+        start_time = time.perf_counter()
+        vector_pairs = len(find_similar_text_pairs(texts, DUPLICATE_VECTOR_SIMILARITY_THRESHOLD))
+        vector_seconds = round(time.perf_counter() - start_time, 3)
+
+    return {
+        "cases": case_count,
+        "candidate_pairs": len(candidate_pairs),
+        "similar_pairs": len(serial_result),
+        "results_match": sorted(serial_result) == sorted(parallel_result),
+        "workers": workers,
+        "serial_seconds": round(serial_seconds, 3),
+        "parallel_seconds": round(parallel_seconds, 3),
+        "speedup": round(serial_seconds / parallel_seconds, 2) if parallel_seconds > 0 else None,
+        # 向量化引擎直接计算全部用例对，不经过候选对筛选
+        "vector_similar_pairs": vector_pairs,
+        "vector_seconds": vector_seconds
+    }
+
+
+def _synthetic_step(rng):
+    """随机生成一条合成测试步骤"""
+    template = rng.randrange(4)
+    if template == 0:
+        return f"打开{rng.choice(SYNTHETIC_PAGES)}"
+    if template == 1:
+        return f"在{rng.choice(SYNTHETIC_ELEMENTS)}中输入{rng.choice(SYNTHETIC_VALUES)}{rng.randint(1, 9999)}"
+    if template == 2:
+        return f"点击{rng.choice(SYNTHETIC_PAGES)}的{rng.choice(SYNTHETIC_ELEMENTS)}"
+    return f"等待{rng.randint(1, 30)}秒后检查{rng.choice(SYNTHETIC_ELEMENTS)}状态"
+
+
+def _mutate_steps(steps, rng):
+    """对步骤做少量字符替换，生成近似重复的步骤"""
+    steps = list(steps)
+    index = rng.randrange(len(steps))
+    if steps[index]:
+        position = rng.randrange(len(steps[index]))
+        steps[index] = steps[index][:position] + rng.choice(MUTATION_CHARS) + steps[index][position + 1:]
+    return steps
+
+
+def build_synthetic_suite(case_count, duplicate_rate=0.2, categories=None, seed=7):
+    """
+    生成合成中文测试用例集，按比例植入近似重复的用例
+
+    重复用例复制某个原始用例的步骤和预期结果并改动少量字符，标题不同，与原始用例属于同一类别。
+
+    :param case_count: 用例数量
+    :param duplicate_rate: 植入的重复用例占全部用例的比例
+    :param categories: {类别: 权重}，None则使用SYNTHETIC_CATEGORIES
+    :param seed: 随机种子
+    :return: (用例字典列表, 植入的重复用例对列表 [(原始用例ID, 重复用例ID)])
+    """
+    rng = random.Random(seed)
+    categories = categories or SYNTHETIC_CATEGORIES
+    category_names = list(categories)
+    category_weights = [categories[name] for name in category_names]
+
+    cases = []
+    planted_pairs = []
+    for index in range(case_count):
+        case_id = f"TC-SYN-{index + 1:06d}"
+        if cases and rng.random() < duplicate_rate:
+            original = rng.choice(cases)
+            cases.append({
+                "case_id": case_id,
+                "title": f"验证{original['category']}功能场景{index + 1}",
+                "category": original["category"],
+                "preconditions": original["preconditions"],
+                "steps": _mutate_steps(original["steps"], rng),
+                "expected_results": list(original["expected_results"])
+            })
+            planted_pairs.append((original["case_id"], case_id))
+            continue
+
+        category = rng.choices(category_names, weights=category_weights)[0]
+        cases.append({
+            "case_id": case_id,
+            "title": f"验证{category}功能场景{index + 1}",
+            "category": category,
+            "preconditions": f"用户已打开{rng.choice(SYNTHETIC_PAGES)}",
+            "steps": [_synthetic_step(rng) for _ in range(rng.randint(3, 6))],
+            "expected_results": [f"{rng.choice(SYNTHETIC_ELEMENTS)}{result}"
+                                 for result in rng.sample(SYNTHETIC_RESULTS, rng.randint(1, 3))]
+        })
+    return cases, planted_pairs
+
+
+def planted_recall(duplicate_info, planted_pairs):
+    """
+    计算植入的重复用例对中被分到同一个步骤重复用例簇的比例
+
+    :param duplicate_info: find_duplicate_test_cases的返回值
+    :param planted_pairs: [(原始用例ID, 重复用例ID)]
+    :return: 召回率，没有植入重复时返回None
+    """
+    if not planted_pairs:
+        return None
+    cluster_of = {}
+    for cluster_index, group in enumerate(duplicate_info["steps_duplicates"]):
+        for case_id in group["case_ids"]:
+            cluster_of[case_id] = cluster_index
+    found = sum(1 for a, b in planted_pairs if a in cluster_of and cluster_of.get(a) == cluster_of.get(b))
+    return round(found / len(planted_pairs), 4)
+
+
+def _run_duplicate_analysis(cases, engine, trace_memory):
+    """在指定相似度引擎下运行一次重复分析，返回 (结果, 耗时秒数, 内存峰值字节数)"""
+    original_engine = analyzer.DUPLICATE_SIMILARITY_ENGINE
+    analyzer.DUPLICATE_SIMILARITY_ENGINE = engine
+    try:
+        if trace_memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        result = find_duplicate_test_cases(cases)
+        seconds = time.perf_counter() - start_time
+        peak = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return result, seconds, peak
+    finally:
+        analyzer.DUPLICATE_SIMILARITY_ENGINE = original_engine
+
+
+def benchmark_duplicate_analysis(case_count, engine="sequence", duplicate_rate=0.2, seed=7, measure_memory=True):
+    """
+    测量find_duplicate_test_cases在合成用例集上的性能和召回率
+
+    耗时和内存峰值分两次运行测量，避免tracemalloc的开销计入耗时。
+
+    :param case_count: 合成用例数量
+    :param engine: 相似度引擎，"sequence"或"vector"
+    :param duplicate_rate: 植入的重复用例比例
+    :param seed: 随机种子
+    :param measure_memory: 是否额外运行一次测量Python内存分配峰值
+    :return: 基准测试结果
+    """
+    if engine == "vector" and not VECTOR_BACKEND_AVAILABLE:
+        return {"cases": case_count, "engine": engine, "skipped": "未安装numpy或scipy"}
+
+    cases, planted_pairs = build_synthetic_suite(case_count, duplicate_rate, seed=seed)
+    result, seconds, _ = _run_duplicate_analysis(cases, engine, trace_memory=False)
+    peak_memory = None
+    if measure_memory:
+        _, _, peak_memory = _run_duplicate_analysis(cases, engine, trace_memory=True)
+
+    duplicate_types = result["duplicate_types"]
+    return {
+        "cases": case_count,
+        "engine": engine,
+        "duplicate_rate_planted": duplicate_rate,
+        "planted_pairs": len(planted_pairs),
+        "seconds": round(seconds, 3),
+        "peak_memory_mb": round(peak_memory / 1024 / 1024, 2) if peak_memory is not None else None,
+        "similar_steps_pairs": duplicate_types["steps"],
+        "similar_expected_results_pairs": duplicate_types["expected_results"],
+        "mixed_pairs": duplicate_types["mixed"],
+        "steps_clusters": len(result["steps_duplicates"]),
+        "duplicate_rate": result["duplicate_rate"],
+        "recall": planted_recall(result, planted_pairs)
+    }
+
+
+def run_benchmark_suite(sizes, engines=BENCHMARK_ENGINES, duplicate_rate=0.2, seed=7, measure_memory=True,
+                        output_file=None):
+    """
+    按用例规模和相似度引擎运行重复分析基准测试，结果写入JSON文件
+
+    :param sizes: 用例数量列表
+    :param engines: 相似度引擎列表
+    :param duplicate_rate: 植入的重复用例比例
+    :param seed: 随机种子
+    :param measure_memory: 是否测量内存峰值
+    :param output_file: 结果文件路径（可选）
+    :return: 基准测试报告
+    """
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            key: getattr(config, key) for key in (
+                "DUPLICATE_SIMILARITY_THRESHOLD", "DUPLICATE_LSH_MIN_CASES", "DUPLICATE_LSH_NUM_PERM",
+                "DUPLICATE_LSH_THRESHOLD_RATIO", "DUPLICATE_TOKEN_JACCARD_RATIO", "DUPLICATE_PROCESS_WORKERS",
+                "DUPLICATE_VECTOR_SIMILARITY_THRESHOLD"
+            )
+        },
+        "results": []
+    }
+    for case_count in sizes:
+        for engine in engines:
+            entry = benchmark_duplicate_analysis(case_count, engine, duplicate_rate, seed, measure_memory)
+            print(json.dumps(entry, ensure_ascii=False))
+            report["results"].append(entry)
+
+    if output_file:
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="重复分析的性能基准测试")
+    parser.add_argument("--cases", type=int, default=3000, help="步骤相似度比较基准测试的合成用例数量")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认使用配置中的DUPLICATE_PROCESS_WORKERS")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="运行重复分析基准测试的合成用例集规模，例如 1000 10000 50000")
+    parser.add_argument("--engines", nargs="+", choices=BENCHMARK_ENGINES, default=list(BENCHMARK_ENGINES),
+                        help="参与重复分析基准测试的相似度引擎")
+    parser.add_argument("--duplicate-rate", type=float, default=0.2, help="植入的重复用例比例")
+    parser.add_argument("--seed", type=int, default=7, help="生成合成用例集的随机种子")
+    parser.add_argument("--no-memory", action="store_true", help="不测量内存峰值（测量需要额外运行一次）")
+    parser.add_argument("--output", default="benchmark_results.json", help="重复分析基准测试结果文件")
+    args = parser.parse_args()
+
+    if args.sizes:
+        run_benchmark_suite(args.sizes, args.engines, args.duplicate_rate, args.seed,
+                            measure_memory=not args.no_memory, output_file=args.output)
+    else:
+        print(json.dumps(benchmark_similarity(args.cases, args.workers), ensure_ascii=False, indent=2))
@@ -0,0 +1,187 @@
+"""
+AI测试用例与黄金标准测试用例的本地词法匹配模块
+基于中文字符二元组和英文单词（tokenizer模块的词项ID）的BM25加权向量余弦相似度，预先为黄金标准用例建立倒排索引，
+计算每个黄金用例是否被AI用例覆盖、每个AI用例是否对应某个黄金用例
+"""
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+from config import CASE_MATCH_THRESHOLD
+from testcase_model import TestCase, normalize_test_cases
+from tokenizer import token_ids
+
+# BM25参数
+BM25_K1 = 1.5
+BM25_B = 0.75
+# 文档频率超过该比例的词项区分度很低，不纳入索引
+MAX_DF_RATIO = 0.5
+
+
+class GoldenCaseIndex:
+    """黄金标准测试用例的BM25加权向量倒排索引"""
+
+    def __init__(self, golden_cases: List[TestCase]):
+        """
+        为黄金标准测试用例预先计算BM25加权向量并建立倒排索引
+
+        :param golden_cases: 黄金标准测试用例（TestCase列表或任意支持的格式）
+        """
+        golden_cases = normalize_test_cases(golden_cases)
+        self.cases = golden_cases
+        self.doc_count = len(golden_cases)
+
+        doc_terms = [Counter(token_ids(case.text)) for case in golden_cases]
+        doc_lengths = [sum(term_counts.values()) for term_counts in doc_terms]
+        self.avg_doc_length = (sum(doc_lengths) / self.doc_count) if self.doc_count else 0.0
+
+        document_frequency = Counter()
+        for term_counts in doc_terms:
+            document_frequency.update(term_counts.keys())
+        # 文档频率过高的词项区分度很低，不纳入索引
+        max_df = max(1, int(self.doc_count * MAX_DF_RATIO)) if self.doc_count > 2 else self.doc_count
+        self.idf = {
+            term: math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items() if df <= max_df
+        }
+        # 黄金标准中未出现的词项使用最大idf，使AI用例中的无关内容降低相似度
+        self.unseen_idf = math.log(1 + (self.doc_count + 0.5) / 0.5)
+        self.ignored_terms = {term for term in document_frequency if term not in self.idf}
+
+        self.postings: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        self.doc_norms: List[float] = []
+        for doc_index, term_counts in enumerate(doc_terms):
+            weights = self._weights(term_counts, doc_lengths[doc_index])
+            for term, weight in weights.items():
+                self.postings[term].append((doc_index, weight))
+            self.doc_norms.append(math.sqrt(sum(weight * weight for weight in weights.values())))
+
+    def _weights(self, term_counts: Counter, length: int) -> Dict[int, float]:
+        """计算词项的BM25权重（idf乘以饱和后的词频）"""
+        length_norm = 1 - BM25_B + BM25_B * length / (self.avg_doc_length or 1)
+        weights = {}
+        for term, tf in term_counts.items():
+            if term in self.ignored_terms:
+                continue
+            idf = self.idf.get(term, self.unseen_idf)
+            weights[term] = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+        return weights
+
+    def score(self, text: str) -> Dict[int, float]:
+        """
+        计算文本与各黄金用例的余弦相似度
+
+        :param text: 小写查询文本
+        :return: 黄金用例下标到相似度的映射（只包含有共同词项的用例）
+        """
+        term_counts = Counter(token_ids(text))
+        weights = self._weights(term_counts, sum(term_counts.values()))
+        query_norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if not query_norm:
+            return {}
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weight in weights.items():
+            for doc_index, doc_weight in self.postings.get(term, ()):
+                scores[doc_index] += weight * doc_weight
+        return {
+            doc_index: value / (query_norm * self.doc_norms[doc_index])
+            for doc_index, value in scores.items() if self.doc_norms[doc_index] > 0
+        }
+
+
+def match_test_cases(ai_cases: List[TestCase], golden_cases: List[TestCase], threshold: float = None,
+                     index: GoldenCaseIndex = None) -> Dict:
+    """
+    计算AI测试用例与黄金标准测试用例的对应关系
+
+    :param ai_cases: AI测试用例（TestCase列表或任意支持的格式）
+    :param golden_cases: 黄金标准测试用例（TestCase列表或任意支持的格式）
+    :param threshold: 判定为匹配的最低相似度，None则使用配置中的CASE_MATCH_THRESHOLD
+    :param index: 已为golden_cases建立的索引（可选），多个AI用例集对比同一黄金标准时复用
+    :return: 匹配结果，包含每个黄金用例的覆盖情况、每个AI用例的对应情况以及覆盖率和对应率
+    """
+    threshold = CASE_MATCH_THRESHOLD if threshold is None else threshold
+    ai_cases = normalize_test_cases(ai_cases)
+    golden_cases = normalize_test_cases(golden_cases)
+    index = index or GoldenCaseIndex(golden_cases)
+
+    best_golden_for_ai: List[Tuple[int, float]] = []
+    best_ai_for_golden: Dict[int, Tuple[int, float]] = {}
+    for ai_index, ai_case in enumerate(ai_cases):
+        scores = index.score(ai_case.text)
+        if not scores:
+            best_golden_for_ai.append((-1, 0.0))
+            continue
+        best_index = max(scores, key=scores.get)
+        best_golden_for_ai.append((best_index, scores[best_index]))
+        for golden_index, value in scores.items():
+            if value > best_ai_for_golden.get(golden_index, (-1, 0.0))[1]:
+                best_ai_for_golden[golden_index] = (ai_index, value)
+
+    golden_coverage = []
+    for golden_index, golden_case in enumerate(golden_cases):
+        ai_index, value = best_ai_for_golden.get(golden_index, (-1, 0.0))
+        golden_coverage.append({
+            "case_id": golden_case.case_id,
+            "title": golden_case.title,
+            "covered": value >= threshold,
+            "best_ai_case_id": ai_cases[ai_index].case_id if ai_index >= 0 else None,
+            "score": round(value, 3)
+        })
+
+    ai_precision = []
+    for ai_index, ai_case in enumerate(ai_cases):
+        golden_index, value = best_golden_for_ai[ai_index]
+        ai_precision.append({
+            "case_id": ai_case.case_id,
+            "title": ai_case.title,
+            "matched": value >= threshold,
+            "best_golden_case_id": golden_cases[golden_index].case_id if golden_index >= 0 else None,
+            "score": round(value, 3)
+        })
+
+    covered_count = sum(1 for item in golden_coverage if item["covered"])
+    matched_count = sum(1 for item in ai_precision if item["matched"])
+    return {
+        "threshold": threshold,
+        "golden_count": len(golden_cases),
+        "ai_count": len(ai_cases),
+        "covered_count": covered_count,
+        "matched_count": matched_count,
+        "coverage_ratio": round(covered_count / len(golden_cases), 4) if golden_cases else 0.0,
+        "precision_ratio": round(matched_count / len(ai_cases), 4) if ai_cases else 0.0,
+        "golden_coverage": golden_coverage,
+        "ai_precision": ai_precision
+    }
+
+
+def format_match_facts(match_result: Dict, max_items: int = 10) -> str:
+    """
+    将匹配结果整理为供评测提示使用的简明事实
+
+    :param match_result: match_test_cases的返回值
+    :param max_items: 未覆盖/未对应用例最多列出的数量
+    :return: Markdown文本
+    """
+    uncovered = [item for item in match_result["golden_coverage"] if not item["covered"]]
+    unmatched = [item for item in match_result["ai_precision"] if not item["matched"]]
+
+    text = f"""
+# 用例对应关系（本地词法匹配）
+- 黄金标准用例覆盖率: {match_result['coverage_ratio'] * 100:.1f}% ({match_result['covered_count']}/{match_result['golden_count']})
+- AI用例对应率: {match_result['precision_ratio'] * 100:.1f}% ({match_result['matched_count']}/{match_result['ai_count']}个AI用例能对应到黄金标准用例)
+"""
+    if uncovered:
+        text += "- 未被AI用例覆盖的黄金标准用例:\n"
+        for item in uncovered[:max_items]:
+            text += f"  - {item['case_id']}: {item['title']}\n"
+        if len(uncovered) > max_items:
+            text += f"  - ...等{len(uncovered)}个\n"
+    if unmatched:
+        text += "- 未对应任何黄金标准用例的AI用例（可能是新增场景或无关用例）:\n"
+        for item in unmatched[:max_items]:
+            text += f"  - {item['case_id']}: {item['title']}\n"
+        if len(unmatched) > max_items:
+            text += f"  - ...等{len(unmatched)}个\n"
+    text += "\n请结合以上对应关系评估功能覆盖度，并在missed_features_or_scenarios中优先列出未被覆盖的黄金标准用例场景。\n"
+    return text
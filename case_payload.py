@@ -0,0 +1,83 @@
+"""
+评测提示词负载模块
+每次评测只把AI用例和黄金标准用例序列化一次，得到不可变、带内容哈希的用例负载（CasePayload）。
+委员会各评委的提示词和单一模型回退的提示词都由负载和预先定义的片段拼接而成，
+评委数量增加时不再重复序列化用例，内容哈希可直接作为评测结果的缓存键
+"""
+import json
+import hashlib
+from typing import Dict
+
+# 负载序列化格式版本，序列化方式或片段文本变化时递增，使基于哈希的缓存失效
+CASE_PAYLOAD_VERSION = 1
+
+# 评测提示词中各评委共用的片段
+EVALUATION_TASK_SEGMENT = """
+# 任务
+评估AI生成的测试用例与黄金标准测试用例的质量对比。
+"""
+
+EVALUATION_DIMENSIONS_SEGMENT = """
+# 评估维度和权重
+1. **功能覆盖度**（权重30%）：评估需求覆盖率、边界值覆盖度、分支路径覆盖率
+2. **缺陷发现能力**（权重25%）：评估缺陷检测率、突变分数、失败用例比例
+3. **工程效率**（权重20%）：评估测试用例生成速度、维护成本、CI/CD集成度
+4. **语义质量**（权重15%）：评估语义准确性、人工可读性、断言描述清晰度
+5. **安全与经济性**（权重10%）：评估恶意代码率、冗余用例比例、综合成本
+"""
+
+SCORING_FORMULA_SEGMENT = """
+# 评分公式
+总分 = 0.3×功能覆盖得分 + 0.25×缺陷发现得分 + 0.2×工程效率得分 + 0.15×语义质量得分 + 0.1×安全经济得分
+各维度得分 = (AI指标值/人工基准值)×10（满分10分）
+
+"""
+
+
+def json_block(title: str, content_json: str) -> str:
+    """
+    生成带标题的JSON代码块片段
+
+    :param title: 一级标题文本
+    :param content_json: 已序列化的JSON文本
+    :return: 提示词片段
+    """
+    return f"# {title}\n```json\n{content_json}\n```\n\n"
+
+
+class CasePayload:
+    """一次评测共用的用例负载，创建后不可修改"""
+
+    __slots__ = ("ai_cases_json", "golden_cases_json", "context_text", "cases_block", "digest")
+
+    def __init__(self, ai_cases: Dict, golden_cases: Dict, context_text: str = ""):
+        """
+        序列化用例并计算内容哈希
+
+        :param ai_cases: AI生成的测试用例
+        :param golden_cases: 黄金标准测试用例
+        :param context_text: 随用例一起提供给评委的分析信息（重复分析、迭代对比等）
+        """
+        ai_cases_json = json.dumps(ai_cases, ensure_ascii=False, indent=2)
+        golden_cases_json = json.dumps(golden_cases, ensure_ascii=False, indent=2)
+        object.__setattr__(self, "ai_cases_json", ai_cases_json)
+        object.__setattr__(self, "golden_cases_json", golden_cases_json)
+        object.__setattr__(self, "context_text", context_text or "")
+        # AI用例和黄金标准用例的代码块，紧跟在评分公式之后
+        object.__setattr__(self, "cases_block", json_block("AI生成的测试用例", ai_cases_json) + "\n" +
+                           json_block("黄金标准测试用例", golden_cases_json))
+
+        digest = hashlib.sha256(f"v{CASE_PAYLOAD_VERSION}".encode("utf-8"))
+        for part in (ai_cases_json, golden_cases_json, self.context_text):
+            digest.update(b"\x00")
+            digest.update(part.encode("utf-8"))
+        object.__setattr__(self, "digest", digest.hexdigest())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CasePayload创建后不可修改")
+
+    def __delattr__(self, name):
+        raise AttributeError("CasePayload创建后不可修改")
+
+    def __repr__(self) -> str:
+        return f"CasePayload(digest={self.digest[:12]}, size={len(self.cases_block)})"
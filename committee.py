@@ -1,109 +1,72 @@
 import asyncio
 import json
+import time
 import aiohttp
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Callable, Set
 from logger import log, log_error
 from llm_api import async_call_llm, extract_valid_json
-from config import JUDGE_MODELS, MAX_JUDGES_CONCURRENCY, EVALUATION_DIMENSIONS, ENABLE_COLLAB_EVAL
+from case_payload import CasePayload, EVALUATION_TASK_SEGMENT, EVALUATION_DIMENSIONS_SEGMENT, SCORING_FORMULA_SEGMENT
+from judge_cache import build_judge_cache_key, get_cached_judge_result, save_judge_result
+from config import (
+    JUDGE_MODELS, MAX_JUDGES_CONCURRENCY, EVALUATION_DIMENSIONS, ENABLE_COLLAB_EVAL, DEBATE_STAGE_TIMEOUT,
+    DEBATE_BATCH_MODE, CHAIRMAN_MODEL, LOW_CONSENSUS_THRESHOLD, HIGH_DISAGREEMENT_THRESHOLD,
+    COMMITTEE_EARLY_STOP, COMMITTEE_EARLY_STOP_QUORUM, COMMITTEE_LAUNCH_MODE, COMMITTEE_QUORUM,
+    COMMITTEE_QUORUM_SOFT_DEADLINE
+)
+from score_matrix import ScoreMatrix
 import re
 
+# 后台合并迟到评委结果的任务，按aiohttp会话分组，会话关闭前需等待这些任务完成
+_late_merge_tasks: Dict[Any, Set[asyncio.Task]] = {}
 
-class EvaluationCommittee:
-    """评估委员会类，管理多个LLM评委对测试用例的评估，实现CollabEval三阶段评测框架"""
 
-    def __init__(self, session: aiohttp.ClientSession):
-        """
-        初始化评估委员会
+def _register_late_merge(session: Any, task: asyncio.Task):
+    """登记后台合并任务，任务结束后自动移除"""
+    tasks = _late_merge_tasks.setdefault(session, set())
+    tasks.add(task)
 
-        :param session: aiohttp会话
-        """
-        self.session = session
-        self.judges = JUDGE_MODELS
-        self.dimensions = EVALUATION_DIMENSIONS
-        self.max_concurrency = MAX_JUDGES_CONCURRENCY
-        # 添加主席模型，使用deepseek-r1
-        self.chairman_model = "deepseek-r1-250528"
-        # 定义低共识阈值
-        self.low_consensus_threshold = 0.5
-        # 高争议阈值
-        self.high_disagreement_threshold = 1.0
+    def discard(finished: asyncio.Task):
+        tasks.discard(finished)
+        if not tasks:
+            _late_merge_tasks.pop(session, None)
 
-    def _build_evaluation_prompt(self, ai_cases: Dict, golden_cases: Dict, duplicate_info_text: str, judge_model: str = None) -> str:
-        """
-        构建评测提示，可针对不同评委定制
+    task.add_done_callback(discard)
 
-        :param ai_cases: AI生成的测试用例
-        :param golden_cases: 黄金标准测试用例
-        :param duplicate_info_text: 重复测试用例分析信息
-        :param judge_model: 评委模型名称，用于定制提示
-        :return: 完整的评测提示
-        """
-        # 序列化测试用例
-        ai_cases_json = json.dumps(ai_cases, ensure_ascii=False, indent=2)
-        golden_cases_json = json.dumps(golden_cases, ensure_ascii=False, indent=2)
 
-        # 基础提示
-        prompt = """
-# 任务
-评估AI生成的测试用例与黄金标准测试用例的质量对比。
-"""
+def late_merge_tasks(session: Any) -> List[asyncio.Task]:
+    """
+    获取使用该会话、尚未完成的迟到评委合并任务
+
+    :param session: aiohttp会话
+    :return: 任务列表
+    """
+    return [task for task in _late_merge_tasks.get(session, ()) if not task.done()]
+
 
-        # 针对不同模型定制评测角度和提示
-        if judge_model:
-            if "doubao" in judge_model.lower():
-                prompt += """
+# 阶段1评测提示模板版本，评委视角或输出要求片段变化时递增，使评委结果缓存失效
+JUDGE_PROMPT_VERSION = 1
+
+# 评委特定视角片段，按模型名称选择
+JUDGE_PERSPECTIVES = {
+    "doubao": """
 ## 评委特定视角
 你是功能测试专家，请重点关注测试用例的**功能覆盖度**和**缺陷发现能力**。
 你应该特别注意评估边界值测试、异常路径和边缘场景的覆盖情况。
-"""
-            elif "deepseek" in judge_model.lower():
-                prompt += """
+""",
+    "deepseek": """
 ## 评委特定视角
 你是工程质量专家，请重点关注测试用例的**工程效率**和**语义质量**。
 你应该特别注意评估测试用例的可维护性、重复度、可读性以及与需求描述的符合度。
-"""
-            else:
-                prompt += """
+""",
+    "default": """
 ## 评委特定视角
 你是测试安全专家，请重点关注测试用例的**安全与经济性**。
 你应该特别注意评估测试用例对安全场景的覆盖、恶意输入的处理以及资源使用效率。
 """
+}
 
-        # 标准评估维度
-        prompt += """
-# 评估维度和权重
-1. **功能覆盖度**（权重30%）：评估需求覆盖率、边界值覆盖度、分支路径覆盖率
-2. **缺陷发现能力**（权重25%）：评估缺陷检测率、突变分数、失败用例比例
-3. **工程效率**（权重20%）：评估测试用例生成速度、维护成本、CI/CD集成度
-4. **语义质量**（权重15%）：评估语义准确性、人工可读性、断言描述清晰度
-5. **安全与经济性**（权重10%）：评估恶意代码率、冗余用例比例、综合成本
-"""
-
-        # 添加重复测试用例信息
-        if duplicate_info_text:
-            prompt += "\n" + duplicate_info_text + "\n"
-
-        # 添加评分公式
-        prompt += """
-# 评分公式
-总分 = 0.3×功能覆盖得分 + 0.25×缺陷发现得分 + 0.2×工程效率得分 + 0.15×语义质量得分 + 0.1×安全经济得分
-各维度得分 = (AI指标值/人工基准值)×10（满分10分）
-
-# AI生成的测试用例
-```json
-"""
-        # 添加AI测试用例
-        prompt += ai_cases_json + "\n```\n\n"
-
-        # 添加黄金标准测试用例
-        prompt += """
-# 黄金标准测试用例
-```json
-"""
-        prompt += golden_cases_json + "\n```\n\n"
-
-        # 添加输出要求
-        prompt += """
+# 阶段1评测的输出要求片段
+EVALUATION_OUTPUT_SEGMENT = """
 # 输出要求
 必须严格按照以下JSON格式输出评估结果，不要添加任何额外内容，不要使用```json或其他代码块包装，不要返回Markdown格式内容。直接输出下面这种JSON结构：
 
@@ -157,6 +120,73 @@ class EvaluationCommittee:
 ```
 """
 
+
+class EvaluationCommittee:
+    """评估委员会类，管理多个LLM评委对测试用例的评估，实现CollabEval三阶段评测框架"""
+
+    def __init__(self, session: aiohttp.ClientSession):
+        """
+        初始化评估委员会
+
+        :param session: aiohttp会话
+        """
+        self.session = session
+        self.judges = JUDGE_MODELS
+        self.dimensions = EVALUATION_DIMENSIONS
+        self.max_concurrency = MAX_JUDGES_CONCURRENCY
+        # 阶段1评测的并发限制，法定人数模式下仍在评测的迟到评委只占用这里的名额
+        self.judge_semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 阶段2辩论的并发限制，与阶段1分开，提前返回后的辩论不必等待迟到评委释放名额
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 主席模型
+        self.chairman_model = CHAIRMAN_MODEL
+        # 低共识阈值
+        self.low_consensus_threshold = LOW_CONSENSUS_THRESHOLD
+        # 高争议阈值
+        self.high_disagreement_threshold = HIGH_DISAGREEMENT_THRESHOLD
+        # 是否执行CollabEval三阶段评测
+        self.use_collab_eval = ENABLE_COLLAB_EVAL
+        # 是否读取评委结果缓存，False时仍调用全部评委并刷新缓存
+        self.use_judge_cache = True
+        # 本次评测命中和未命中评委结果缓存的评委
+        self.judge_cache_usage: Dict[str, List[str]] = {"hits": [], "misses": []}
+        # (负载哈希, 评委视角) -> 评测提示
+        self._prompt_cache: Dict[Tuple[str, str], str] = {}
+
+    def _judge_perspective(self, judge_model: str = None) -> str:
+        """
+        获取评委的特定视角片段
+
+        :param judge_model: 评委模型名称，None则不添加视角
+        :return: 提示词片段
+        """
+        if not judge_model:
+            return ""
+        model = judge_model.lower()
+        if "doubao" in model:
+            return JUDGE_PERSPECTIVES["doubao"]
+        if "deepseek" in model:
+            return JUDGE_PERSPECTIVES["deepseek"]
+        return JUDGE_PERSPECTIVES["default"]
+
+    def _build_evaluation_prompt(self, payload: CasePayload, judge_model: str = None) -> str:
+        """
+        构建评测提示，由共用的用例负载和评委视角片段拼接，同一视角的评委共用同一提示
+
+        :param payload: 本次评测的用例负载
+        :param judge_model: 评委模型名称，用于定制提示
+        :return: 完整的评测提示
+        """
+        perspective = self._judge_perspective(judge_model)
+        key = (payload.digest, perspective)
+        prompt = self._prompt_cache.get(key)
+        if prompt is None:
+            context = "\n" + payload.context_text + "\n" if payload.context_text else ""
+            prompt = "".join((
+                EVALUATION_TASK_SEGMENT, perspective, EVALUATION_DIMENSIONS_SEGMENT, context,
+                SCORING_FORMULA_SEGMENT, payload.cases_block, EVALUATION_OUTPUT_SEGMENT
+            ))
+            self._prompt_cache[key] = prompt
         return prompt
 
     def _build_debate_prompt(self, dimension: str, initial_scores: List[Dict], reasons: List[str]) -> str:
@@ -211,6 +241,55 @@ class EvaluationCommittee:
   ]
 }}
 ```
+"""
+        return prompt
+
+    def _build_batch_debate_prompt(self, disputed: Dict[str, Dict]) -> str:
+        """
+        构建批量辩论提示，一次覆盖评委需要重新考虑的全部低共识维度
+
+        :param disputed: {维度: {"initial": 该评委的初始评分和理由, "peers": 其他评委的评分和理由列表}}
+        :return: 辩论提示
+        """
+        sections = []
+        for dimension, data in disputed.items():
+            peers = "\n".join(f"- 评委{i + 1}（{peer['score']}分）：{peer['reason']}"
+                               for i, peer in enumerate(data["peers"])) or "- 无"
+            sections.append(f"""
+## 评测维度: {dimension}
+### 你的初始评分
+{data['initial']['score']} - {data['initial']['reason']}
+
+### 其他评委的评分理由
+{peers}
+""")
+        dimension_template = ",\n".join(f"""    "{dimension}": {{
+      "score": "修订后的分数（1-5之间的一位小数）",
+      "reason": "修订后的理由，请明确指出为何修改了评分",
+      "confidence": "你对修订评分的信心（1-5之间的一位小数）",
+      "thought_process": ["思考点1", "思考点2"]
+    }}""" for dimension in disputed)
+
+        prompt = f"""
+# 评测辩论阶段
+以下{len(disputed)}个维度上各评委的评分分歧较大，请逐个维度重新考虑你的评分。
+{"".join(sections)}
+## 辩论指南
+你收到其他评委的评分依据，请逐个维度分析分歧点，重点检查：
+- 是否遗漏需求隐含条件？
+- 边界值覆盖是否充分？
+- 测试用例的质量与标准是否一致评判？
+
+## 输出要求
+请基于思维树框架，从多个角度思考每个维度，然后给出修订评分和理由。必须覆盖上面列出的全部维度，按以下格式输出：
+
+```json
+{{
+  "revised_evaluations": {{
+{dimension_template}
+  }}
+}}
+```
 """
         return prompt
 
@@ -286,22 +365,18 @@ class EvaluationCommittee:
 
     async def evaluate_with_judge(self,
                                   judge_model: str,
-                                  ai_cases: Dict,
-                                  golden_cases: Dict,
-                                  duplicate_info_text: str = "") -> Dict:
+                                  payload: CasePayload) -> Dict:
         """
         阶段1：使用单个评委模型进行独立评测
 
         :param judge_model: 评委模型名称
-        :param ai_cases: AI生成的测试用例
-        :param golden_cases: 黄金标准测试用例
-        :param duplicate_info_text: 重复测试用例分析信息
+        :param payload: 本次评测的用例负载
         :return: 评测结果
         """
         log(f"评委 {judge_model} 开始阶段1独立评测", important=True, model_name=judge_model)
 
         # 构建评测提示，针对不同评委定制
-        prompt = self._build_evaluation_prompt(ai_cases, golden_cases, duplicate_info_text, judge_model)
+        prompt = self._build_evaluation_prompt(payload, judge_model)
         system_prompt = "你是一位精通软件测试和质量评估的专家。请根据提供的测试用例进行客观、专业的评估，注重你擅长的领域。"
 
         # 调用LLM进行评测
@@ -396,6 +471,132 @@ class EvaluationCommittee:
 
         return result
 
+    async def debate_dimensions(self, judge_model: str, disputed: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        阶段2（批量模式）：评委在一次调用中对全部低共识维度进行辩论
+
+        :param judge_model: 评委模型名称
+        :param disputed: {维度: {"initial": 初始评分和理由, "peers": 其他评委的评分和理由列表}}
+        :return: {维度: 辩论结果}，结构与debate_dimension的返回值一致，未给出修订评分的维度不包含在内
+        """
+        log(f"评委 {judge_model} 开始阶段2批量辩论，维度: {', '.join(disputed)}", model_name=judge_model)
+
+        prompt = self._build_batch_debate_prompt(disputed)
+        system_prompt = "你是一位参与评测辩论的专家评委，需要根据其他评委的意见重新思考你在多个维度上的评分。请用批判性思维分析问题，但也要保持开放的态度接受合理的不同观点。"
+
+        result = await async_call_llm(
+            self.session,
+            prompt,
+            system_prompt,
+            model_name=judge_model
+        )
+
+        if not result:
+            log_error(f"评委 {judge_model} 的批量辩论失败", model_name=judge_model)
+            return {}
+
+        parsed_result = result
+        if isinstance(result, dict) and "text" in result:
+            text_content = result["text"]
+            try:
+                parsed_result = json.loads(text_content)
+            except json.JSONDecodeError:
+                parsed_result = extract_valid_json(text_content)
+                if not parsed_result:
+                    log_error(f"评委 {judge_model} 的批量辩论结果无法解析为JSON", {"text": text_content[:200]},
+                              model_name=judge_model)
+                    return {}
+
+        revised_evaluations = parsed_result.get("revised_evaluations") if isinstance(parsed_result, dict) else None
+        if not isinstance(revised_evaluations, dict):
+            log_error(f"评委 {judge_model} 的批量辩论结果缺少revised_evaluations", model_name=judge_model)
+            return {}
+
+        # 拆分为逐维度的辩论结果，便于与单维度辩论统一合并
+        debate_results = {}
+        for dimension in disputed:
+            revised = revised_evaluations.get(dimension)
+            if not isinstance(revised, dict) or "score" not in revised:
+                log(f"评委 {judge_model} 的批量辩论未给出维度 {dimension} 的修订评分，保留初始评分",
+                    level="WARNING", model_name=judge_model)
+                continue
+            debate_result = {"revised_evaluation": {key: value for key, value in revised.items() if key != "thought_process"}}
+            if "thought_process" in revised:
+                debate_result["thought_process"] = revised["thought_process"]
+            debate_results[dimension] = debate_result
+
+        log(f"评委 {judge_model} 完成批量辩论，修订{len(debate_results)}/{len(disputed)}个维度", model_name=judge_model)
+        return debate_results
+
+    async def run_debate_stage(self, low_consensus_dimensions: Dict[str, Dict]) -> Tuple[Dict[str, Dict], Dict[str, int]]:
+        """
+        阶段2：辩论同时调度，受评委并发数限制，整个阶段在DEBATE_STAGE_TIMEOUT内结束
+
+        DEBATE_BATCH_MODE开启时每个评委一次调用覆盖其参与的全部维度，否则每个 (评委, 维度) 单独调用。
+
+        :param low_consensus_dimensions: {维度: 维度评分数据}，数据中包含judge_data和reasons
+        :return: ({维度: {评委: 辩论结果}}, 调度统计)，只保留给出修订评分的辩论，超时被取消的辩论保留初始评分
+        """
+        async def debate_with_semaphore(judge_model, dimension, judge_data, all_reasons):
+            """使用信号量限制并发辩论"""
+            async with self.semaphore:
+                return {dimension: await self.debate_dimension(judge_model, dimension, [judge_data], all_reasons)}
+
+        async def batch_debate_with_semaphore(judge_model, disputed):
+            """使用信号量限制并发的批量辩论"""
+            async with self.semaphore:
+                return await self.debate_dimensions(judge_model, disputed)
+
+        # (评委, 涉及的维度, 任务)，批量模式下一个任务覆盖多个维度
+        scheduled = []
+        judge_disputes = {}
+        for dimension, data in low_consensus_dimensions.items():
+            log(f"对维度 {dimension} 进行辩论，方差: {data['variance']}", important=True)
+            for judge, judge_data in data["judge_data"].items():
+                if DEBATE_BATCH_MODE:
+                    peers = [peer_data for peer, peer_data in data["judge_data"].items() if peer != judge]
+                    judge_disputes.setdefault(judge, {})[dimension] = {"initial": judge_data, "peers": peers}
+                else:
+                    task = asyncio.ensure_future(debate_with_semaphore(judge, dimension, judge_data, data["reasons"]))
+                    scheduled.append((judge, [dimension], task))
+        for judge, disputed in judge_disputes.items():
+            scheduled.append((judge, list(disputed), asyncio.ensure_future(batch_debate_with_semaphore(judge, disputed))))
+
+        debate_results = {dimension: {} for dimension in low_consensus_dimensions}
+        stats = {"mode": "batch" if DEBATE_BATCH_MODE else "per_dimension", "calls": len(scheduled),
+                 "scheduled": sum(len(dimensions) for _, dimensions, _ in scheduled),
+                 "completed": 0, "failed": 0, "cancelled": 0}
+        if not scheduled:
+            return debate_results, stats
+
+        done, pending = await asyncio.wait([task for _, _, task in scheduled], timeout=DEBATE_STAGE_TIMEOUT)
+        if pending:
+            log_error(f"阶段2辩论超过{DEBATE_STAGE_TIMEOUT}秒，取消{len(pending)}个未完成的辩论调用", important=True)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        # 按调度顺序收集结果，与完成顺序无关
+        for judge, dimensions, task in scheduled:
+            if task not in done:
+                stats["cancelled"] += len(dimensions)
+                continue
+            if task.exception() is not None:
+                log_error(f"评委 {judge} 在维度 {', '.join(dimensions)} 的辩论出错: {str(task.exception())}",
+                          model_name=judge)
+                stats["failed"] += len(dimensions)
+                continue
+            judge_debates = task.result()
+            for dimension in dimensions:
+                debate_result = judge_debates.get(dimension)
+                if debate_result and "revised_evaluation" in debate_result:
+                    debate_results[dimension][judge] = debate_result
+                    stats["completed"] += 1
+                else:
+                    stats["failed"] += 1
+
+        return debate_results, stats
+
     async def chairman_decision(self, dimension_results: Dict, judge_scores: Dict, 
                                 high_variance_dimensions: List[str]) -> Dict:
         """
@@ -446,56 +647,279 @@ class EvaluationCommittee:
 
         return result
 
+    @staticmethod
+    def _is_valid_result(result: Any) -> bool:
+        """判断评委结果是否包含总体评价和逐维度评分"""
+        return isinstance(result, dict) and "evaluation_summary" in result and "detailed_report" in result
+
+    def _has_consensus(self, valid_results: Dict[str, Dict]) -> bool:
+        """
+        判断有效评委是否在全部评分维度上达成共识
+
+        :param valid_results: {评委: 评测结果}
+        :return: 每个维度都有全部评委的评分且方差低于低共识阈值时返回True
+        """
+        return ScoreMatrix.from_results(valid_results).has_consensus(self.low_consensus_threshold)
+
+    async def _evaluate_judge_with_limit(self, judge_model: str, payload: CasePayload) -> Dict:
+        """
+        在并发限制和超时控制下执行单个评委的阶段1评测，评委结果缓存中已有有效结果时直接返回
+
+        :return: 评测结果，超时或出错时返回包含error的字典
+        """
+        cache_key = build_judge_cache_key(judge_model, JUDGE_PROMPT_VERSION, payload.digest)
+        if self.use_judge_cache:
+            cached_result = get_cached_judge_result(judge_model, cache_key)
+            if self._is_valid_result(cached_result):
+                self.judge_cache_usage["hits"].append(judge_model)
+                return cached_result
+        self.judge_cache_usage["misses"].append(judge_model)
+
+        async with self.judge_semaphore:
+            log(f"评委 {judge_model} 开始评测", important=True)
+            try:
+                # 设置较短的超时时间，避免单个评委阻塞整个流程
+                result = await asyncio.wait_for(
+                    self.evaluate_with_judge(judge_model, payload),
+                    timeout=300  # 5分钟超时
+                )
+                log(f"评委 {judge_model} 评测完成", important=True)
+                # 只缓存有效结果，失败的评委下次评测时重新调用
+                if self._is_valid_result(result):
+                    save_judge_result(judge_model, cache_key, result)
+                return result
+            except asyncio.TimeoutError:
+                log_error(f"评委 {judge_model} 评测超时", important=True)
+                return {"error": "评测超时"}
+            except Exception as e:
+                log_error(f"评委 {judge_model} 评测出错: {str(e)}", important=True)
+                return {"error": str(e)}
+
+    async def run_judge_stage(self, payload: CasePayload,
+                              allow_late: bool = False) -> Tuple[Dict[str, Dict], Dict[str, Any], Dict[asyncio.Task, str]]:
+        """
+        阶段1：执行评委独立评测
+
+        COMMITTEE_EARLY_STOP开启时，有效评委达到COMMITTEE_EARLY_STOP_QUORUM且全部维度达成共识后取消仍在评测的评委；
+        COMMITTEE_LAUNCH_MODE为"priority"时按JUDGE_MODELS顺序只启动补足法定人数所需的评委，未达成共识再逐个追加。
+        allow_late为True且COMMITTEE_QUORUM大于0时，COMMITTEE_QUORUM位评委给出有效结果或超过软截止时间后即返回，
+        其余评委不取消，作为迟到评委交给调用方在后台合并。
+
+        :param payload: 本次评测的用例负载
+        :param allow_late: 是否允许以法定人数提前返回
+        :return: ({评委: 评测结果}, 评委组信息, {迟到评委的任务: 评委})，评测结果按JUDGE_MODELS顺序排列
+        """
+        result_quorum = min(COMMITTEE_QUORUM, len(self.judges)) if allow_late else 0
+        if not COMMITTEE_EARLY_STOP and not result_quorum:
+            results = await asyncio.gather(*[
+                self._evaluate_judge_with_limit(judge, payload)
+                for judge in self.judges
+            ])
+            judge_results = dict(zip(self.judges, results))
+            return judge_results, {
+                "mode": "full",
+                "contributors": [judge for judge, result in judge_results.items() if self._is_valid_result(result)],
+                "cancelled": [],
+                "not_launched": [],
+                "late_judges": [],
+                "stopped_early": False,
+                "stop_reason": "全部评委完成评测"
+            }, {}
+
+        quorum = max(1, min(COMMITTEE_EARLY_STOP_QUORUM, len(self.judges)))
+        priority = COMMITTEE_LAUNCH_MODE == "priority"
+        waiting = list(self.judges)
+        running = {}
+        judge_results = {}
+        valid_results = {}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + COMMITTEE_QUORUM_SOFT_DEADLINE if result_quorum else None
+
+        def launch(count: int):
+            """按顺序启动count个尚未启动的评委"""
+            for _ in range(min(count, len(waiting))):
+                judge = waiting.pop(0)
+                task = asyncio.ensure_future(
+                    self._evaluate_judge_with_limit(judge, payload))
+                running[task] = judge
+
+        launch(quorum if priority else len(waiting))
+        stop_reason = None
+        quorum_reason = None
+        while running:
+            # 软截止时间已过但还没有有效结果时，继续等待第一个有效结果
+            timeout = deadline - loop.time() if deadline is not None and deadline > loop.time() else None
+            done, _ = await asyncio.wait(list(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                judge = running.pop(task)
+                judge_results[judge] = task.result()
+                if self._is_valid_result(judge_results[judge]):
+                    valid_results[judge] = judge_results[judge]
+
+            if COMMITTEE_EARLY_STOP and len(valid_results) >= quorum and self._has_consensus(valid_results):
+                stop_reason = f"{len(valid_results)}位评委在全部维度上的评分方差均低于{self.low_consensus_threshold}"
+                break
+            if result_quorum and valid_results and running:
+                if len(valid_results) >= result_quorum:
+                    quorum_reason = f"{len(valid_results)}/{len(self.judges)}位评委已给出有效结果，达到法定人数{result_quorum}"
+                    break
+                if loop.time() >= deadline:
+                    quorum_reason = f"超过{COMMITTEE_QUORUM_SOFT_DEADLINE}秒软截止时间，{len(valid_results)}位评委已给出有效结果"
+                    break
+            if priority:
+                # 保持足够的评委在评测中：未达到法定人数时补足，已达到但未达成共识时每次追加一位
+                launch(max(1, quorum - len(valid_results)) - len(running))
+
+        late_tasks = {}
+        cancelled = []
+        if quorum_reason:
+            # 法定人数模式下其余评委继续评测，结果稍后合并
+            late_tasks = dict(running)
+            log(f"评委组按法定人数返回：{quorum_reason}，{len(late_tasks)}位评委的结果将在后台合并", important=True)
+        else:
+            cancelled = list(running.values())
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        stopped_early = stop_reason is not None and bool(cancelled or waiting)
+        if stopped_early:
+            log(f"评委组提前停止：{stop_reason}，取消{len(cancelled)}位评委，{len(waiting)}位评委未启动", important=True)
+        if stopped_early:
+            final_reason = stop_reason
+        elif quorum_reason:
+            final_reason = quorum_reason
+        else:
+            final_reason = "全部评委完成评测，" + ("已达成共识" if stop_reason else "未达成共识")
+        panel = {
+            "mode": COMMITTEE_LAUNCH_MODE,
+            "contributors": [judge for judge in self.judges if judge in valid_results],
+            "cancelled": cancelled,
+            "not_launched": waiting,
+            "late_judges": list(late_tasks.values()),
+            "stopped_early": stopped_early,
+            "stop_reason": final_reason
+        }
+        return {judge: judge_results[judge] for judge in self.judges if judge in judge_results}, panel, late_tasks
+
+    async def merge_late_results(self,
+                                 published: Dict,
+                                 judge_results: Dict[str, Dict],
+                                 late_tasks: Dict[asyncio.Task, str],
+                                 panel: Dict[str, Any],
+                                 on_late_result: Callable[[Dict], None]) -> Dict:
+        """
+        等待迟到评委完成，将其结果并入已发布的评测结果，并通过回调发布更新后的评测结果
+
+        合并不调用LLM，按全部有效评委重新计算平均分。只用于标准多评委模式，CollabEval模式不启用法定人数返回，
+        见run_committee_evaluation。
+
+        :param published: 法定人数返回时已发布的评测结果
+        :param judge_results: 返回时已有的评委结果
+        :param late_tasks: {迟到评委的任务: 评委}
+        :param panel: 返回时的评委组信息
+        :param on_late_result: 接收更新后评测结果的回调
+        :return: 更新后的评测结果，没有迟到评委给出有效结果时返回published
+        """
+        stage_start = time.perf_counter()
+        await asyncio.wait(list(late_tasks))
+        late_results = {}
+        for task, judge in late_tasks.items():
+            result = {"error": "评测已取消"} if task.cancelled() else task.result()
+            if self._is_valid_result(result):
+                late_results[judge] = result
+        log(f"迟到评委完成评测，合并{len(late_results)}/{len(late_tasks)}位评委的结果", important=True)
+        published_summary = published.get("committee_summary", {})
+        if not late_results or "score_matrix" not in published_summary:
+            return published
+
+        merged_panel = dict(panel)
+        merged_panel.update({
+            "contributors": [judge for judge in self.judges
+                             if judge in late_results or self._is_valid_result(judge_results.get(judge))],
+            "late_judges": [],
+            "late_merged": list(late_results)
+        })
+
+        valid_results = {judge: late_results.get(judge, judge_results.get(judge)) for judge in merged_panel["contributors"]}
+        result = aggregate_standard_results(valid_results)
+        result["committee_summary"].update({
+            key: published_summary[key] for key in ("evaluation_framework", "payload_digest", "judge_cache")
+            if key in published_summary
+        })
+
+        stage_timings = dict(published_summary.get("stage_timings", {}))
+        stage_timings["late_merge_seconds"] = round(time.perf_counter() - stage_start, 2)
+        result["committee_summary"]["panel"] = merged_panel
+        result["committee_summary"]["stage_timings"] = stage_timings
+        try:
+            on_late_result(result)
+        except Exception as e:
+            log_error(f"发布迟到评委合并结果失败: {str(e)}", important=True)
+        return result
+
     async def run_committee_evaluation(self,
                                        ai_cases: Dict,
                                        golden_cases: Dict,
-                                       duplicate_info_text: str = "") -> Dict:
+                                       duplicate_info_text: str = "",
+                                       payload: CasePayload = None,
+                                       on_late_result: Callable[[Dict], None] = None) -> Dict:
         """
         运行委员会评测，由多个评委进行评测，并汇总结果
 
         :param ai_cases: AI生成的测试用例
         :param golden_cases: 黄金标准测试用例
         :param duplicate_info_text: 重复测试用例分析信息
+        :param payload: 预先构建的用例负载，提供时不再使用前三个参数
+        :param on_late_result: 迟到评委结果合并后的回调，提供时在标准多评委模式下启用COMMITTEE_QUORUM法定人数模式
         :return: 汇总后的评测结果
         """
         log("开始委员会评测流程", important=True)
+        # CollabEval的评分来自辩论修订和主席决策，迟到评委的评分只能通过重新辩论和主席决策并入，
+        # 这正是法定人数模式要避免的等待，因此CollabEval模式下始终等待全部评委
+        allow_late = on_late_result is not None and not self.use_collab_eval
+        if on_late_result is not None and self.use_collab_eval and COMMITTEE_QUORUM:
+            log("CollabEval模式下不启用法定人数返回，等待全部评委完成评测", important=True)
+        # 用例只序列化一次，所有评委共用
+        if payload is None:
+            payload = CasePayload(ai_cases, golden_cases, duplicate_info_text)
+        # 各阶段耗时（秒）
+        stage_timings = {}
+        stage_start = time.perf_counter()
+
+        # 阶段1：各评委独立评测，自适应评委组模式下达成共识后提前停止，法定人数模式下不等待较慢的评委
+        judge_results, panel, late_tasks = await self.run_judge_stage(payload, allow_late=allow_late)
+        stage_timings["stage1_seconds"] = round(time.perf_counter() - stage_start, 2)
+        log(f"阶段1耗时{stage_timings['stage1_seconds']}秒", important=True)
+
+        result = await self.aggregate_judge_results(judge_results, panel, payload, stage_timings)
+
+        if late_tasks:
+            # 迟到评委的结果在后台并入已发布的结果，不再重新辩论和主席决策
+            merge_task = asyncio.ensure_future(
+                self.merge_late_results(result, judge_results, late_tasks, panel, on_late_result))
+            _register_late_merge(self.session, merge_task)
+        return result
 
-        # 创建信号量，限制并发评委数量
-        semaphore = asyncio.Semaphore(self.max_concurrency)
-
-        # 定义带有信号量的评测函数
-        async def evaluate_with_semaphore(judge_model):
-            """使用信号量限制并发评测"""
-            async with semaphore:
-                log(f"评委 {judge_model} 开始评测", important=True)
-                try:
-                    # 设置较短的超时时间，避免单个评委阻塞整个流程
-                    result = await asyncio.wait_for(
-                        self.evaluate_with_judge(judge_model, ai_cases, golden_cases, duplicate_info_text),
-                        timeout=300  # 5分钟超时
-                    )
-                    log(f"评委 {judge_model} 评测完成", important=True)
-                    return judge_model, result
-                except asyncio.TimeoutError:
-                    log_error(f"评委 {judge_model} 评测超时", important=True)
-                    return judge_model, {"error": "评测超时"}
-                except Exception as e:
-                    log_error(f"评委 {judge_model} 评测出错: {str(e)}", important=True)
-                    return judge_model, {"error": str(e)}
-
-        # 并行执行所有评委的评测
-        tasks = [evaluate_with_semaphore(judge) for judge in self.judges]
-        all_results = await asyncio.gather(*tasks)
-
-        # 记录每个评委的结果
-        judge_results = {}
-        for judge_model, result in all_results:
-            judge_results[judge_model] = result
+    async def aggregate_judge_results(self,
+                                      judge_results: Dict[str, Dict],
+                                      panel: Dict[str, Any],
+                                      payload: CasePayload,
+                                      stage_timings: Dict[str, float]) -> Dict:
+        """
+        聚合阶段1的评委结果：标准模式直接平均，CollabEval模式继续执行辩论和主席决策
 
+        :param judge_results: {评委: 阶段1评测结果}，有效结果在CollabEval模式下会被辩论结果修改
+        :param panel: 评委组信息
+        :param payload: 本次评测的用例负载
+        :param stage_timings: 已记录的阶段耗时，后续阶段的耗时追加到其中
+        :return: 汇总后的评测结果
+        """
         # 提取有效的评委结果
         valid_results = {}
         for judge, result in judge_results.items():
-            if isinstance(result, dict) and "evaluation_summary" in result and "detailed_report" in result:
+            if self._is_valid_result(result):
                 valid_results[judge] = result
             else:
                 log_error(f"评委 {judge} 返回的结果格式不正确，将被排除在后续阶段外", {"result": result})
@@ -504,180 +928,53 @@ class EvaluationCommittee:
             log_error("没有有效的评委结果可供后续阶段使用", important=True)
             return {
                 "error": "没有有效的评委结果",
-                "committee_results": judge_results
+                "committee_results": judge_results,
+                "committee_summary": {"panel": panel, "judge_cache": self.judge_cache_usage}
             }
 
         log(f"阶段1完成，有效评委数量: {len(valid_results)}/{len(judge_results)}", important=True)
         
+        # 各评委逐维度的评分矩阵，标准评测、辩论和主席决策共用
+        matrix = ScoreMatrix.from_results(valid_results)
+
         # 如果不启用CollabEval，使用简单的平均评分方法
-        if not ENABLE_COLLAB_EVAL:
+        if not self.use_collab_eval:
             log("使用标准多评委评测方法（不执行辩论和主席决策阶段）", important=True)
 
-            # 计算各维度的平均分
-            dimensions = [
-                "format_compliance", "content_accuracy", "test_coverage",
-                "functional_coverage", "defect_detection", "engineering_efficiency",
-                "semantic_quality", "security_economy", "duplicate_analysis"
-            ]
-
-            # 构建最终结果
-            final_result = {
-                "evaluation_summary": {},
-                "detailed_report": {},
-                "committee_summary": {
-                    "judge_count": len(valid_results),
-                    "judge_scores": {},
-                    "evaluation_framework": "Standard"
-                }
-            }
-
-            # 计算各评委的总体评分
-            judge_overall_scores = {}
-            for judge, result in valid_results.items():
-                try:
-                    overall_score = float(result["evaluation_summary"]["overall_score"])
-                    judge_overall_scores[judge] = overall_score
-                except (ValueError, KeyError):
-                    judge_overall_scores[judge] = "N/A"
-
-            final_result["committee_summary"]["judge_scores"] = judge_overall_scores
-
-            # 计算总体平均分
-            overall_scores = [score for score in judge_overall_scores.values() if isinstance(score, (int, float))]
-            if overall_scores:
-                final_result["evaluation_summary"]["overall_score"] = round(sum(overall_scores) / len(overall_scores), 1)
-            else:
-                final_result["evaluation_summary"]["overall_score"] = "N/A"
-
-            # 合并所有评委的建议
-            suggestions = []
-            for judge, result in valid_results.items():
-                suggestion = result["evaluation_summary"].get("final_suggestion", "")
-                if suggestion:
-                    suggestions.append(suggestion)
-            
-            if suggestions:
-                final_result["evaluation_summary"]["final_suggestion"] = max(suggestions, key=len)
-            else:
-                final_result["evaluation_summary"]["final_suggestion"] = "无法获取有效建议"
-
-            # 计算各维度的平均分和汇总理由
-            for dimension in dimensions:
-                scores = []
-                reasons = []
-
-                for judge, result in valid_results.items():
-                    if dimension in result.get("detailed_report", {}):
-                        dim_data = result["detailed_report"][dimension]
-                        try:
-                            score = float(dim_data.get("score", 0))
-                            scores.append(score)
-                            reason = dim_data.get("reason", "")
-                            if reason:
-                                reasons.append(reason)
-                        except (ValueError, TypeError):
-                            pass
-
-                if scores:
-                    if dimension not in final_result["detailed_report"]:
-                        final_result["detailed_report"][dimension] = {}
-
-                    final_result["detailed_report"][dimension]["score"] = round(sum(scores) / len(scores), 1)
-
-                    # 使用最长的理由作为汇总理由
-                    if reasons:
-                        final_result["detailed_report"][dimension]["reason"] = max(reasons, key=len)
-
-            # 添加是否为委员会结果的标记
-            final_result["is_committee_result"] = True
-            final_result["collab_eval_result"] = False
+            final_result = aggregate_standard_results(valid_results, matrix)
+            final_result["committee_summary"].update({
+                "evaluation_framework": "Standard",
+                "panel": panel,
+                "payload_digest": payload.digest,
+                "judge_cache": self.judge_cache_usage,
+                "stage_timings": stage_timings
+            })
 
             log(f"标准多评委评测完成，最终评分: {final_result['evaluation_summary'].get('overall_score', 'N/A')}", important=True)
 
             return final_result
 
         # 以下是CollabEval三阶段评测流程（仅在ENABLE_COLLAB_EVAL=True时执行）
-        # 计算各维度方差，识别低共识维度
-        dimension_variances = {}
-        dimension_scores = {}
-        
-        # 评分维度列表
-        dimensions = [
-            "format_compliance", "content_accuracy", "test_coverage",
-            "functional_coverage", "defect_detection", "engineering_efficiency",
-            "semantic_quality", "security_economy", "duplicate_analysis"
-        ]
-
-        # 收集每个维度的评分和理由
-        for dimension in dimensions:
-            scores = []
-            reasons = []
-            judge_dimension_data = {}
-
-            for judge, result in valid_results.items():
-                if dimension in result.get("detailed_report", {}):
-                    dim_data = result["detailed_report"][dimension]
-                    try:
-                        score = float(dim_data.get("score", 0))
-                        scores.append(score)
-                        reason = dim_data.get("reason", "")
-                        if reason:
-                            reasons.append(reason)
-                            judge_dimension_data[judge] = {
-                                "score": score,
-                                "reason": reason
-                            }
-                    except (ValueError, TypeError):
-                        pass
-
-            if scores:
-                variance = self._calculate_variance(scores)
-                dimension_variances[dimension] = variance
-                dimension_scores[dimension] = {
-                    "scores": scores,
-                    "reasons": reasons,
-                    "judge_data": judge_dimension_data,
-                    "variance": variance
-                }
-
-        # 识别需要辩论的低共识维度
-        low_consensus_dimensions = {
-            dim: data for dim, data in dimension_scores.items()
-            if data["variance"] >= self.low_consensus_threshold
-        }
-        
+        # 计算各维度方差，识别需要辩论的低共识维度
+        variances = matrix.variances()
+        low_consensus_dimensions = {}
+        for dimension in matrix.disagreements(self.low_consensus_threshold):
+            low_consensus_dimensions[dimension] = dict(matrix.dimension_details(dimension),
+                                                       variance=variances[dimension])
+        stage1_matrix = matrix.to_dict()
+
         # 阶段2：辩论协作
+        debate_stats = {"scheduled": 0, "completed": 0, "failed": 0, "cancelled": 0}
         if low_consensus_dimensions:
             log(f"开始阶段2：辩论协作，发现{len(low_consensus_dimensions)}个低共识维度", important=True)
+            stage_start = time.perf_counter()
 
-            # 存储辩论后的修订结果
-            debate_results = {}
-            
-            # 为每个低共识维度进行辩论
-            for dimension, data in low_consensus_dimensions.items():
-                log(f"对维度 {dimension} 进行辩论，方差: {data['variance']}", important=True)
-                debate_dimension_results = {}
-
-                # 所有评委的理由，用于辩论
-                all_reasons = data["reasons"]
-
-                # 每个评委对该维度进行辩论
-                debate_tasks = []
-                for judge, judge_data in data["judge_data"].items():
-                    # 准备辩论参数
-                    initial_scores = [judge_data]
-                    debate_task = self.debate_dimension(judge, dimension, initial_scores, all_reasons)
-                    debate_tasks.append((judge, debate_task))
-
-                # 并行执行辩论
-                for judge, debate_task in debate_tasks:
-                    debate_result = await debate_task
-                    if debate_result and "revised_evaluation" in debate_result:
-                        debate_dimension_results[judge] = debate_result
-
-                debate_results[dimension] = debate_dimension_results
+            # 所有维度的辩论并发执行
+            debate_results, debate_stats = await self.run_debate_stage(low_consensus_dimensions)
 
-            log(f"阶段2完成，{len(debate_results)}个维度完成辩论", important=True)
+            stage_timings["stage2_seconds"] = round(time.perf_counter() - stage_start, 2)
+            log(f"阶段2完成，{len(debate_results)}个维度完成辩论，修订{debate_stats['completed']}/{debate_stats['scheduled']}个评分，"
+                f"耗时{stage_timings['stage2_seconds']}秒", important=True)
 
             # 更新评委结果，将辩论结果合并到原始评估中
             for dimension, judge_debates in debate_results.items():
@@ -688,6 +985,7 @@ class EvaluationCommittee:
                             # 更新评分和理由
                             valid_results[judge]["detailed_report"][dimension]["score"] = revised["score"]
                             valid_results[judge]["detailed_report"][dimension]["reason"] = revised["reason"]
+                            matrix.set_score(judge, dimension, revised["score"], revised["reason"])
                             # 保存思考过程
                             if "thought_process" in debate:
                                 valid_results[judge]["detailed_report"][dimension]["debate_thoughts"] = debate["thought_process"]
@@ -696,57 +994,38 @@ class EvaluationCommittee:
                             log_error(f"更新评委 {judge} 在维度 {dimension} 的评分失败: {str(e)}", model_name=judge)
         else:
             log("所有维度共识度较高，跳过阶段2辩论", important=True)
-            
-        # 重新计算各维度的评分数据，准备主席决策
+
+        # 由更新后的评分矩阵整理各维度的评分数据，准备主席决策
         updated_dimension_scores = {}
-        judge_overall_scores = {}
-        high_variance_dimensions = []
-
-        # 收集更新后的各维度评分
-        for dimension in dimensions:
-            scores = []
-            reasons = []
-            for judge, result in valid_results.items():
-                if dimension in result.get("detailed_report", {}):
-                    dim_data = result["detailed_report"][dimension]
-                    try:
-                        score = float(dim_data.get("score", 0))
-                        scores.append(score)
-                        reason = dim_data.get("reason", "")
-                        if reason:
-                            reasons.append(reason)
-                    except (ValueError, TypeError):
-                        pass
-
-            if scores:
-                variance = self._calculate_variance(scores)
-                updated_dimension_scores[dimension] = {
-                    "scores": scores,
-                    "average": sum(scores) / len(scores),
-                    "variance": variance,
-                    "reasons": reasons
-                }
-
-                # 标记高争议维度
-                if variance >= self.high_disagreement_threshold:
-                    high_variance_dimensions.append(dimension)
+        means, variances, trimmed_means = matrix.means(), matrix.variances(), matrix.trimmed_means()
+        for dimension in matrix.dimensions:
+            if means[dimension] is None:
+                continue
+            details = matrix.dimension_details(dimension)
+            updated_dimension_scores[dimension] = {
+                "scores": details["scores"],
+                "average": means[dimension],
+                "trimmed_average": trimmed_means[dimension],
+                "variance": variances[dimension],
+                "reasons": details["reasons"]
+            }
+
+        # 标记高争议维度
+        high_variance_dimensions = matrix.disagreements(self.high_disagreement_threshold)
 
         # 收集各评委的总体评分
-        for judge, result in valid_results.items():
-            try:
-                overall_score = float(result["evaluation_summary"]["overall_score"])
-                judge_overall_scores[judge] = overall_score
-            except (ValueError, KeyError):
-                judge_overall_scores[judge] = "N/A"
+        judge_overall_scores = matrix.overall_scores()
         
         # 阶段3：主席决策
         log("开始阶段3：主席决策", important=True)
+        stage_start = time.perf_counter()
 
         chairman_result = await self.chairman_decision(
             updated_dimension_scores,
             judge_overall_scores,
             high_variance_dimensions
         )
+        stage_timings["stage3_seconds"] = round(time.perf_counter() - stage_start, 2)
 
         # 构建最终结果
         final_result = {
@@ -758,7 +1037,15 @@ class EvaluationCommittee:
                 "high_disagreement_dimensions": high_variance_dimensions,
                 "stage1_results": {judge: result["evaluation_summary"] for judge, result in valid_results.items()},
                 "stage2_debate_occurred": len(low_consensus_dimensions) > 0,
-                "stage3_chairman_decision": chairman_result
+                "stage2_debate_stats": debate_stats,
+                "stage3_chairman_decision": chairman_result,
+                "panel": panel,
+                "payload_digest": payload.digest,
+                "judge_cache": self.judge_cache_usage,
+                "stage_timings": stage_timings,
+                "stage1_score_matrix": stage1_matrix,
+                "score_matrix": matrix.to_dict(),
+                "score_statistics": matrix.statistics()
             }
         }
 
@@ -773,7 +1060,7 @@ class EvaluationCommittee:
                     final_result["evaluation_summary"]["overall_score"] = final_scores["overall_score"]
 
                 # 设置各维度评分
-                for dimension in dimensions:
+                for dimension in matrix.dimensions:
                     if dimension in final_scores:
                         if dimension not in final_result["detailed_report"]:
                             final_result["detailed_report"][dimension] = {}
@@ -794,63 +1081,75 @@ class EvaluationCommittee:
             # 如果主席决策失败，使用评委平均分作为备选
             log_error("主席决策失败或格式不正确，使用评委平均分作为备选", important=True)
             
-            # 计算评委平均分作为备选
-            overall_scores = [score for score in judge_overall_scores.values() if isinstance(score, (int, float))]
-            if overall_scores:
-                final_result["evaluation_summary"]["overall_score"] = round(sum(overall_scores) / len(overall_scores), 1)
-            else:
-                final_result["evaluation_summary"]["overall_score"] = "N/A"
-                
-            # 使用所有评委的综合建议
-            suggestions = []
-            for judge, result in valid_results.items():
-                suggestion = result["evaluation_summary"].get("final_suggestion", "")
-                if suggestion:
-                    suggestions.append(suggestion)
-
-            if suggestions:
-                final_result["evaluation_summary"]["final_suggestion"] = max(suggestions, key=len)
-            else:
-                final_result["evaluation_summary"]["final_suggestion"] = "无法获取有效建议"
-
-            # 为各维度设置平均分
-            for dimension, data in updated_dimension_scores.items():
-                if dimension not in final_result["detailed_report"]:
-                    final_result["detailed_report"][dimension] = {}
-                final_result["detailed_report"][dimension]["score"] = round(data["average"], 1)
-
-                # 使用最长的理由
-                if data["reasons"]:
-                    final_result["detailed_report"][dimension]["reason"] = max(data["reasons"], key=len)
+            # 使用评委平均分、综合建议和各维度平均分作为备选
+            fallback = aggregate_standard_results(valid_results, matrix)
+            final_result["evaluation_summary"].update(fallback["evaluation_summary"])
+            final_result["detailed_report"].update(fallback["detailed_report"])
 
         # 添加是否为委员会结果的标记
         final_result["is_committee_result"] = True
-        final_result["collab_eval_result"] = ENABLE_COLLAB_EVAL  # 标记使用了CollabEval框架
+        final_result["collab_eval_result"] = self.use_collab_eval  # 标记使用了CollabEval框架
 
         log(f"CollabEval三阶段评测完成，最终评分: {final_result['evaluation_summary'].get('overall_score', 'N/A')}", important=True)
 
         return final_result
 
-    def _calculate_variance(self, scores: List[float]) -> float:
-        """
-        计算评分的方差
 
-        :param scores: 评分列表
-        :return: 方差
-        """
-        if not scores or len(scores) <= 1:
-            return 0
+def aggregate_standard_results(valid_results: Dict[str, Dict], matrix: ScoreMatrix = None) -> Dict:
+    """
+    标准多评委聚合：总体评分和各维度评分取评委平均值，建议和理由取最长的一条
 
-        mean = sum(scores) / len(scores)
-        variance = sum((x - mean) ** 2 for x in scores) / len(scores)
-        return variance
+    不调用LLM，也可用于离线重放已保存的评委结果（如评委结果缓存中的阶段1结果）
+
+    :param valid_results: {评委: 有效的评测结果}
+    :param matrix: 由valid_results构建的评分矩阵，None则重新构建
+    :return: 包含evaluation_summary、detailed_report和committee_summary的评测结果
+    """
+    matrix = matrix or ScoreMatrix.from_results(valid_results)
+    judge_overall_scores = matrix.overall_scores()
+    overall_mean = matrix.overall_mean()
+
+    # 合并所有评委的建议
+    suggestions = [result["evaluation_summary"].get("final_suggestion", "") for result in valid_results.values()]
+    suggestions = [suggestion for suggestion in suggestions if suggestion]
+
+    final_result = {
+        "evaluation_summary": {
+            "overall_score": "N/A" if overall_mean is None else round(overall_mean, 1),
+            "final_suggestion": max(suggestions, key=len) if suggestions else "无法获取有效建议"
+        },
+        "detailed_report": {},
+        "committee_summary": {
+            "judge_count": len(valid_results),
+            "judge_scores": judge_overall_scores,
+            "score_matrix": matrix.to_dict(),
+            "score_statistics": matrix.statistics()
+        },
+        "is_committee_result": True,
+        "collab_eval_result": False
+    }
+
+    # 各维度的平均分，使用最长的理由作为汇总理由
+    means = matrix.means()
+    for dimension in matrix.dimensions:
+        if means[dimension] is None:
+            continue
+        final_result["detailed_report"][dimension] = {"score": round(means[dimension], 1)}
+        reasons = matrix.dimension_details(dimension)["reasons"]
+        if reasons:
+            final_result["detailed_report"][dimension]["reason"] = max(reasons, key=len)
+
+    return final_result
 
 
 async def evaluate_with_committee(session: aiohttp.ClientSession,
                                   ai_cases: Dict,
                                   golden_cases: Dict,
                                   duplicate_info_text: str = "",
-                                  use_collab_eval: bool = None) -> Dict:
+                                  use_collab_eval: bool = None,
+                                  payload: CasePayload = None,
+                                  on_late_result: Callable[[Dict], None] = None,
+                                  use_judge_cache: bool = True) -> Dict:
     """
     使用评委委员会评测测试用例
 
@@ -859,29 +1158,23 @@ async def evaluate_with_committee(session: aiohttp.ClientSession,
     :param golden_cases: 黄金标准测试用例
     :param duplicate_info_text: 重复测试用例分析信息
     :param use_collab_eval: 是否使用CollabEval框架，如果为None则使用配置文件中的设置
+    :param payload: 预先构建的用例负载，提供时不再使用ai_cases、golden_cases和duplicate_info_text
+    :param on_late_result: 迟到评委结果合并后的回调，提供时在标准多评委模式下启用COMMITTEE_QUORUM法定人数模式，
+                           调用方需在关闭session前等待late_merge_tasks(session)
+    :param use_judge_cache: 是否复用评委结果缓存，False则调用全部评委并刷新缓存
     :return: 汇总后的评测结果
     """
     committee = EvaluationCommittee(session)
-    
-    # 临时修改配置
-    from config import ENABLE_COLLAB_EVAL
-    original_collab_eval = ENABLE_COLLAB_EVAL
-    
     if use_collab_eval is not None:
-        # 如果明确指定了是否使用CollabEval，则临时修改全局配置
-        import config
-        config.ENABLE_COLLAB_EVAL = use_collab_eval
-        
-    try:
-        # 执行评测
-        result = await committee.run_committee_evaluation(ai_cases, golden_cases, duplicate_info_text)
-        
-        # 添加明确的评测框架标识
-        if result and isinstance(result, dict):
-            result["evaluation_framework"] = "CollabEval" if config.ENABLE_COLLAB_EVAL else "Standard"
-            
-        return result
-    finally:
-        # 恢复原始配置
-        if use_collab_eval is not None:
-            config.ENABLE_COLLAB_EVAL = original_collab_eval
+        committee.use_collab_eval = use_collab_eval
+    committee.use_judge_cache = use_judge_cache
+
+    # 执行评测
+    result = await committee.run_committee_evaluation(ai_cases, golden_cases, duplicate_info_text, payload,
+                                                      on_late_result=on_late_result)
+
+    # 添加明确的评测框架标识
+    if result and isinstance(result, dict):
+        result["evaluation_framework"] = "CollabEval" if committee.use_collab_eval else "Standard"
+
+    return result
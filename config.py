@@ -36,7 +36,21 @@ CHAIRMAN_MODEL = "deepseek-r1-250528"  # 主席模型
 #CHAIRMAN_MODEL = "doubao-seed-1-6-250615"  # 主席模型
 LOW_CONSENSUS_THRESHOLD = 0.5  # 低共识阈值，方差大于此值触发辩论
 HIGH_DISAGREEMENT_THRESHOLD = 1.0  # 高争议阈值，方差大于此值标记为高争议
+COMMITTEE_TRIM_RATIO = 0.2  # 计算各维度截尾均值时两端各去掉的评分比例
 DEBATE_MAX_ROUNDS = 1  # 最大辩论轮数
+DEBATE_STAGE_TIMEOUT = 300  # 阶段2辩论的整体时限（秒），超时未完成的辩论被取消，相应评委保留初始评分
+DEBATE_BATCH_MODE = True  # 批量辩论：每个评委一次调用修订全部低共识维度，关闭则每个 (评委, 维度) 单独调用
+
+# 自适应评委组：有效评委达到法定人数且各维度评分方差均低于LOW_CONSENSUS_THRESHOLD时，取消其余评委
+COMMITTEE_EARLY_STOP = False  # 启用提前停止
+COMMITTEE_EARLY_STOP_QUORUM = 2  # 提前停止所需的最少有效评委数
+COMMITTEE_LAUNCH_MODE = "parallel"  # 评委启动方式："parallel"同时启动，"priority"按JUDGE_MODELS顺序只启动补足法定人数所需的评委
+
+# 法定人数聚合：交互式评测在部分评委完成后即返回，其余评委的结果在后台合并并更新已保存的评测结果
+# 只用于标准多评委模式：CollabEval的评分经过辩论和主席决策，迟到评委无法在不重新调用LLM的情况下并入，因此始终等待全部评委
+COMMITTEE_QUORUM = 0  # 返回所需的有效评委数，0表示等待全部评委
+COMMITTEE_QUORUM_SOFT_DEADLINE = 120  # 软截止时间（秒），超过后只要有一位评委给出有效结果即返回
+TASK_STATUS_MAX_ENTRIES = 200  # API保留的任务状态数量，超过后丢弃最早的任务
 
 # 评测维度及权重配置
 EVALUATION_DIMENSIONS = {
@@ -58,6 +72,12 @@ BATCH_CONCURRENCY = 5  # 增加批处理并发数
 LLM_TEMPERATURE = 0.2  # 评测时使用低temperature确保结果一致性
 LLM_TEMPERATURE_REPORT = 0.4  # 生成报告时使用稍高的temperature
 
+# 报告生成配置（报告主体由评测结果直接渲染，LLM只撰写叙述段落）
+REPORT_NARRATIVE_TIMEOUT = 90  # 单个叙述段落的LLM调用超时时间（秒），超时则使用本地生成的段落
+REPORT_NARRATIVE_MAX_CHARS = 400  # 每个叙述段落的最大字数
+REPORT_NARRATIVE_REASON_CHARS = 200  # 提供给叙述段落的各维度评分理由截断长度
+REPORT_GENERATION_DEADLINE = 180  # 各报告变体并发生成的共享截止时间（秒）
+
 # 输入文件名
 AI_CASES_FILE = "testset/test_cases.json"  # 从testset文件夹读取
 GOLDEN_CASES_FILE = "goldenset/golden_cases.json"  # 从goldenset文件夹读取
@@ -70,6 +90,14 @@ def get_report_file_paths():
     report_json_file = f"output_evaluation/evaluation_json/evaluation_report-{current_time}.json"
     return report_file, report_json_file
 
+
+def get_leaderboard_file_paths():
+    """获取带有当前时间戳的排行榜报告文件路径"""
+    current_time = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    leaderboard_file = f"output_evaluation/evaluation_markdown/leaderboard_report-{current_time}.md"
+    leaderboard_json_file = f"output_evaluation/evaluation_json/leaderboard_report-{current_time}.json"
+    return leaderboard_file, leaderboard_json_file
+
 # 固定路径
 FORMATTED_AI_CASES_FILE = "testset/formatted_test_cases.json"  # 保存在testset文件夹
 FORMATTED_GOLDEN_CASES_FILE = "goldenset/formatted_golden_cases.json"  # 保存在goldenset文件夹
@@ -92,12 +120,68 @@ AIOHTTP_TIMEOUT = 300  # 优化请求超时时间（秒）
 LLM_CACHE_SIZE = 2000  # 增加LLM请求缓存大小
 LLM_CACHE_ENABLED = False  # 禁用LLM API调用缓存，确保每次请求都是全新的
 DUPLICATE_SIMILARITY_THRESHOLD = 0.85  # 重复检测相似度阈值
+DUPLICATE_MIXED_STEPS_WEIGHT = 0.6  # 步骤+预期结果综合相似度中步骤相似度的权重，其余为预期结果相似度的权重
+DUPLICATE_MIXED_SIMILARITY_THRESHOLD = 0.85  # 综合相似度超过该值且标题不同的用例对计为混合重复
+RESULT_CACHE_ENABLED = True  # 启用评测结果缓存，相同输入和配置直接返回已有评测结果和报告
+RESULT_CACHE_TTL = 24 * 3600  # 评测结果缓存有效期（秒）
+RESULT_CACHE_DIR = "cache/evaluation_results"  # 评测结果缓存目录
+JUDGE_RESULT_CACHE_ENABLED = True  # 启用评委结果缓存，同一批用例只调用缺少阶段1结果的评委
+JUDGE_RESULT_CACHE_TTL = 24 * 3600  # 评委结果缓存有效期（秒）
+JUDGE_RESULT_CACHE_DIR = "cache/judge_results"  # 评委结果缓存目录
+TOKEN_CACHE_SIZE = 100000  # 缓存分词结果（词项ID数组）的文本数量
+
+# --- 重复检测候选生成配置 ---
+# 用例较多时先用MinHash签名和分段局部敏感哈希筛选可能相似的用例对，只对候选对计算步骤相似度
+DUPLICATE_LSH_MIN_CASES = 300  # 有步骤的用例数量不超过该值时直接两两比较
+DUPLICATE_LSH_NUM_PERM = 128  # MinHash签名长度，越长估计越准确，计算签名越慢
+DUPLICATE_LSH_SHINGLE_SIZE = 2  # 计算签名的字符n-gram长度，中文用例适合使用二元组
+DUPLICATE_LSH_THRESHOLD_RATIO = 0.7  # 候选阈值相对DUPLICATE_SIMILARITY_THRESHOLD等价Jaccard阈值的比例，越小召回率越高
+DUPLICATE_LSH_FALSE_NEGATIVE_WEIGHT = 0.8  # 选择LSH分段参数时漏检相对误检的权重（0-1），越大召回率越高、候选对越多
+DUPLICATE_LSH_SEED = 1  # MinHash哈希参数的随机种子，保证相同输入得到相同候选对
+DUPLICATE_TOKEN_JACCARD_RATIO = 0.5  # 词项Jaccard预筛选阈值相对等价Jaccard阈值的比例，越小召回率越高、预筛选排除的用例对越少
+DUPLICATE_PROCESS_WORKERS = 0  # 步骤相似度比较的进程数，0表示CPU核数，1表示在当前进程中计算
+DUPLICATE_PROCESS_MIN_PAIRS = 20000  # 候选对数量达到该值才使用进程池，避免小规模比较承担进程启动开销
+DUPLICATE_PROCESS_CHUNK_SIZE = 5000  # 每次分发给工作进程的候选对数量
+
+# --- 向量化相似度引擎配置 ---
+# "sequence"：MinHash-LSH筛选候选对后逐对计算SequenceMatcher相似度；
+# "vector"：字符n-gram稀疏向量的分块矩阵乘法计算余弦相似度，需要安装numpy和scipy，未安装时自动使用"sequence"
+DUPLICATE_SIMILARITY_ENGINE = "sequence"
+DUPLICATE_VECTOR_SIMILARITY_THRESHOLD = 0.85  # 向量引擎的余弦相似度阈值
+DUPLICATE_VECTOR_NGRAM_SIZES = (2, 3)  # 字符n-gram长度，不依赖分词，中文和英文都适用
+DUPLICATE_VECTOR_DIMENSION = 2 ** 20  # n-gram哈希空间维度
+DUPLICATE_VECTOR_BLOCK_SIZE = 1024  # 分块矩阵乘法每块的行数，越大越快，内存占用越高
+
+# --- 增量重复索引配置 ---
+# 评测请求提供用例集标识时，按标识持久化每个用例的签名和相似用例对，再次分析同一用例集时只比较新增或变化的用例
+DUPLICATE_INDEX_ENABLED = True  # 启用增量重复索引，仅在使用"sequence"相似度引擎时生效
+DUPLICATE_INDEX_DIR = "cache/duplicate_index"  # 增量重复索引保存目录
+DUPLICATE_INDEX_MAX_SUITES = 32  # 内存中保留的用例集索引数量，超出时移除最久未使用的索引
+
+# --- 分层抽样评测配置 ---
+# 用例数量很大时只评测按类别和重复用例簇分层抽取的样本，并给出各维度得分的置信区间
+SAMPLING_ENABLED = False  # 是否对大规模用例集自动启用抽样评测（调用时指定样本量则总是抽样）
+SAMPLING_MIN_CASES = 1000  # AI用例数量超过该值才自动启用抽样评测
+SAMPLING_SAMPLE_SIZE = 0  # 固定样本量，0表示根据目标精度推算
+SAMPLING_TARGET_MARGIN = 0.25  # 目标精度：得分置信区间半宽（5分制）
+SAMPLING_SCORE_STD = 1.0  # 单个用例得分标准差的先验估计，用于推算样本量
+SAMPLING_CONFIDENCE = 0.95  # 置信水平
+SAMPLING_REPLICATES = 4  # 样本组数量，各组独立评测，用于估计得分的不确定性
+SAMPLING_BOOTSTRAP_ROUNDS = 2000  # 自助法重抽样次数
+SAMPLING_BOOTSTRAP_MIN_REPLICATES = 30  # 成功的样本组达到该数量才用自助法估计置信区间，否则使用t分布区间
+SAMPLING_RANDOM_SEED = 42  # 抽样随机种子，保证相同输入得到相同样本
+
+# --- 排行榜评测配置 ---
+LEADERBOARD_MAX_CONCURRENT_CANDIDATES = 4  # 排行榜模式下同时评测的候选用例集数量，各候选共用一个HTTP连接池
 
 # --- 测试覆盖率分析配置 ---
 # 测试覆盖率分析阈值
 COVERAGE_FULL_THRESHOLD = 3  # 至少需要几个测试用例才认为是完全覆盖
 COVERAGE_PARTIAL_THRESHOLD = 1  # 至少需要几个测试用例才认为是部分覆盖
 
+# AI用例与黄金标准用例本地匹配的最低相似度（BM25加权向量余弦相似度）
+CASE_MATCH_THRESHOLD = 0.1  # 余弦相似度，AI用例通常比黄金标准用例描述更长，阈值不宜过高
+
 # 测试覆盖率分析关键词
 COVERAGE_KEYWORDS = {
     "功能验证": ["功能", "流程", "正常", "基本", "基础", "主流程", "核心功能", "FUNC", "function", "feature"],
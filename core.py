@@ -5,6 +5,7 @@ import aiohttp
 import asyncio
 import argparse
 import traceback
+import contextlib
 import uuid  # 添加uuid模块导入
 from config import (
     FORMATTED_AI_CASES_FILE,
@@ -19,12 +20,110 @@ from config import (
 )
 from logger import log, log_error, start_logging, end_logging
 from formatter import format_test_cases
-from evaluator import evaluate_test_cases, generate_markdown_report, evaluate_and_generate_report
+from evaluator import evaluate_test_cases, generate_markdown_report, evaluate_and_generate_report, precompute_report_artifacts
+from evaluator import render_local_reports
 from llm_api import clear_cache  # 导入清除缓存函数
+from result_cache import build_result_cache_key, get_cached_result, save_result_to_cache
+from committee import late_merge_tasks
+
+# 评测返回后仍在后台运行的任务，保持引用避免被垃圾回收
+_background_tasks = set()
+
+
+def load_default_golden_cases():
+    """
+    从goldenset文件夹加载默认的黄金标准测试用例
+
+    :return: 黄金标准测试用例文件内容，找不到或读取失败时返回None
+    """
+    log("从文件加载黄金标准测试用例", important=True)
+    # 查找goldenset文件夹中的所有golden_cases*.json文件
+    golden_files = glob.glob("goldenset/golden_cases*.json")
+
+    if not golden_files:
+        error_info = {
+            "search_pattern": "goldenset/golden_cases*.json",
+            "current_dir": os.getcwd(),
+            "goldenset_exists": os.path.exists("goldenset"),
+            "goldenset_files": os.listdir("goldenset") if os.path.exists("goldenset") else "目录不存在"
+        }
+        log_error("在goldenset文件夹中找不到黄金标准测试用例文件", error_info)
+        return None
+
+    # 默认使用第一个找到的文件
+    golden_file = golden_files[0]
+    log(f"使用黄金标准测试用例文件: {golden_file}", important=True)
+
+    try:
+        with open(golden_file, 'r', encoding='utf-8') as f:
+            golden_text = f.read()
+            log(f"黄金标准测试用例文件大小: {len(golden_text)} 字节")
+            return golden_text
+    except FileNotFoundError:
+        error_info = {
+            "file_path": os.path.abspath(golden_file),
+            "current_dir": os.getcwd()
+        }
+        log_error(f"找不到黄金标准测试用例文件 {golden_file}", error_info)
+        return None
+    except Exception as e:
+        log_error(f"读取黄金标准测试用例文件 {golden_file} 失败", e)
+        return None
+
+
+def create_client_session(session_id):
+    """
+    创建评测使用的aiohttp会话，使用配置文件中的优化参数设置
+
+    :param session_id: 会话唯一标识符
+    :return: aiohttp.ClientSession
+    """
+    timeout = aiohttp.ClientTimeout(total=AIOHTTP_TIMEOUT)
+    connector = aiohttp.TCPConnector(
+        limit=AIOHTTP_CONNECTOR_LIMIT,
+        ttl_dns_cache=AIOHTTP_CONNECTOR_TTL,
+        force_close=True,  # 强制关闭连接，避免复用
+        enable_cleanup_closed=True  # 自动清理关闭的连接
+    )
+    return aiohttp.ClientSession(
+        timeout=timeout,
+        connector=connector,
+        headers={"Connection": "close", "X-Session-ID": session_id}  # 修改为不保持连接
+    )
+
+
+async def _close_session_after(session, tasks):
+    """等待后台任务结束后关闭会话"""
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await session.close()
+    log("迟到评委结果合并完成，已关闭评测会话")
+
+
+@contextlib.asynccontextmanager
+async def evaluation_session(session_id):
+    """
+    评测会话的上下文管理器，退出时如果仍有迟到评委在后台合并结果，会话延迟到合并完成后再关闭
+
+    :param session_id: 会话唯一标识符
+    :return: aiohttp.ClientSession
+    """
+    session = create_client_session(session_id)
+    try:
+        yield session
+    finally:
+        pending = late_merge_tasks(session)
+        if pending:
+            log(f"{len(pending)}个迟到评委合并任务仍在后台进行，评测会话将在其完成后关闭", important=True)
+            task = asyncio.ensure_future(_close_session_after(session, pending))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        else:
+            await session.close()
 
 
 # --- 主程序 ---
-async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=False, prev_iteration_data=None):
+async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=False, prev_iteration_data=None,
+                     use_cache=True, sample_size=None, suite_id=None, golden_suite_id=None, on_result_update=None):
     """
     主程序的异步版本
 
@@ -32,6 +131,12 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
     :param golden_cases_data: 黄金标准测试用例数据（可选），JSON字符串
     :param is_iteration: 是否启用迭代前后对比功能
     :param prev_iteration_data: 上一次迭代的测试用例数据（可选），JSON字符串
+    :param use_cache: 是否使用评测结果缓存，False则强制重新评测并刷新缓存
+    :param sample_size: 抽样评测的样本量（可选），None表示按配置决定是否抽样，0表示根据目标精度推算
+    :param suite_id: AI测试用例集标识（可选），提供时重复分析使用按标识持久化的增量重复索引，上一次迭代使用"<标识>:prev"
+    :param golden_suite_id: 黄金标准用例集标识（可选），提供时黄金标准的重复分析使用增量重复索引
+    :param on_result_update: 结果更新回调（可选），提供时多评委评测按COMMITTEE_QUORUM法定人数提前返回，
+                             迟到评委的结果合并后更新JSON结果文件和结果缓存，再以更新后的完整结果调用该回调
     """
     # 清除之前的LLM API调用缓存，确保每次评测都是全新的
     clear_cache()
@@ -103,39 +208,7 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
 
         async def load_golden_cases():
             if golden_cases_data is None:
-                log("从文件加载黄金标准测试用例", important=True)
-                # 查找goldenset文件夹中的所有golden_cases*.json文件
-                golden_files = glob.glob("goldenset/golden_cases*.json")
-
-                if not golden_files:
-                    error_info = {
-                        "search_pattern": "goldenset/golden_cases*.json",
-                        "current_dir": os.getcwd(),
-                        "goldenset_exists": os.path.exists("goldenset"),
-                        "goldenset_files": os.listdir("goldenset") if os.path.exists("goldenset") else "目录不存在"
-                    }
-                    log_error("在goldenset文件夹中找不到黄金标准测试用例文件", error_info)
-                    return None
-
-                # 默认使用第一个找到的文件
-                golden_file = golden_files[0]
-                log(f"使用黄金标准测试用例文件: {golden_file}", important=True)
-
-                try:
-                    with open(golden_file, 'r', encoding='utf-8') as f:
-                        golden_text = f.read()
-                        log(f"黄金标准测试用例文件大小: {len(golden_text)} 字节")
-                        return golden_text
-                except FileNotFoundError:
-                    error_info = {
-                        "file_path": os.path.abspath(golden_file),
-                        "current_dir": os.getcwd()
-                    }
-                    log_error(f"找不到黄金标准测试用例文件 {golden_file}", error_info)
-                    return None
-                except Exception as e:
-                    log_error(f"读取黄金标准测试用例文件 {golden_file} 失败", e)
-                    return None
+                return load_default_golden_cases()
             else:
                 log("使用传入的黄金标准测试用例数据", important=True)
                 return golden_cases_data
@@ -227,6 +300,19 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
             "traceback": traceback.format_exc()
         }
 
+    # 相同输入和配置已有评测结果时直接返回
+    result_cache_key = build_result_cache_key(ai_cases_raw_text, golden_cases_raw_text,
+                                              is_iteration, prev_iteration_raw_text, sample_size=sample_size)
+    if use_cache:
+        cached_result = get_cached_result(result_cache_key)
+        if cached_result:
+            cached_result["cache_hit"] = True
+            log("使用缓存的评测结果，跳过评测流程", important=True)
+            end_logging()
+            return cached_result
+    else:
+        log("已跳过评测结果缓存，强制重新评测", important=True)
+
     # 确保输出目录存在
     try:
         os.makedirs(os.path.dirname(report_file), exist_ok=True)
@@ -244,19 +330,7 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
     session_id = str(uuid.uuid4())
     log(f"创建新的评测会话: {session_id}", important=True)
 
-    timeout = aiohttp.ClientTimeout(total=AIOHTTP_TIMEOUT)
-    connector = aiohttp.TCPConnector(
-        limit=AIOHTTP_CONNECTOR_LIMIT,
-        ttl_dns_cache=AIOHTTP_CONNECTOR_TTL,
-        force_close=True,  # 强制关闭连接，避免复用
-        enable_cleanup_closed=True  # 自动清理关闭的连接
-    )
-
-    async with aiohttp.ClientSession(
-            timeout=timeout,
-            connector=connector,
-            headers={"Connection": "close", "X-Session-ID": session_id}  # 修改为不保持连接
-    ) as session:
+    async with evaluation_session(session_id) as session:
         try:
             # 2. 格式化测试用例 - 并行执行
             log("开始格式化测试用例", important=True)
@@ -332,6 +406,52 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
             # 添加小延迟，确保日志顺序
             await asyncio.sleep(0.05)
 
+            # 重复分析完成后，在等待评委评测期间于后台线程中预先生成与评分无关的报告部分
+            loop = asyncio.get_running_loop()
+            report_artifacts_futures = []
+
+            def start_report_precompute(duplicate_fields):
+                report_artifacts_futures.append(
+                    loop.run_in_executor(None, precompute_report_artifacts, formatted_ai_cases, duplicate_fields)
+                )
+                log("已开始在后台预生成报告中与评分无关的部分", important=True)
+
+            # 法定人数模式下迟到评委的结果合并后，更新已保存的评测结果和报告并通知调用方
+            published_result = {}
+            late_updates = []
+
+            def refresh_late_reports(result):
+                """根据合并后的评测结果在本地重新渲染报告，使缓存和任务状态中的报告与评分一致"""
+                try:
+                    reports = render_local_reports(result["evaluation_result"], formatted_ai_cases, report_artifacts,
+                                                   include_iteration="report_iteration" in result)
+                except Exception as e:
+                    log_error("合并迟到评委后重新渲染报告失败", e)
+                    return
+                result["report"] = result["markdown_report"] = reports["standard"]
+                if "iteration" in reports:
+                    result["report_iteration"] = reports["iteration"]
+                try:
+                    with open(report_file, 'w', encoding='utf-8') as f:
+                        f.write(reports["standard"])
+                    log(f"合并迟到评委后的评测报告已更新到 {report_file}", important=True)
+                except Exception as e:
+                    log_error(f"更新Markdown格式的评测报告到 {report_file} 失败", e)
+
+            def publish_late_result(updated_evaluation_result):
+                try:
+                    with open(report_json_file, 'w', encoding='utf-8') as f:
+                        json.dump(updated_evaluation_result, f, ensure_ascii=False, indent=2)
+                    log(f"合并迟到评委后的评测结果已更新到 {report_json_file}", important=True)
+                except Exception as e:
+                    log_error(f"更新JSON格式的评测结果到 {report_json_file} 失败", e)
+                late_updates.append(updated_evaluation_result)
+                # 结果尚未返回时，最终结果会直接包含已合并的评分，报告在返回前刷新
+                if "result" in published_result:
+                    refresh_late_reports(published_result["result"])
+                    save_result_to_cache(result_cache_key, published_result["result"])
+                    on_result_update(published_result["result"])
+
             # 启动评测任务
             evaluation_task = asyncio.create_task(
                 evaluate_test_cases(
@@ -339,13 +459,30 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
                     formatted_ai_cases, 
                     formatted_golden_cases,
                     is_iteration=is_iteration,
-                    prev_iteration_cases=formatted_prev_iteration
+                    prev_iteration_cases=formatted_prev_iteration,
+                    on_duplicates_ready=start_report_precompute,
+                    sample_size=sample_size,
+                    suite_ids={
+                        "ai": suite_id,
+                        "prev": f"{suite_id}:prev" if suite_id else None,
+                        "golden": golden_suite_id
+                    },
+                    on_late_result=publish_late_result if on_result_update else None,
+                    use_judge_cache=use_cache
                 )
             )
 
             # 等待评测完成
             evaluation_result = await evaluation_task
 
+            # 获取预生成的报告部分，失败时报告生成阶段会重新计算
+            report_artifacts = None
+            if report_artifacts_futures:
+                try:
+                    report_artifacts = await report_artifacts_futures[0]
+                except Exception as e:
+                    log_error(f"报告预生成失败，将在报告生成阶段重新计算: {str(e)}")
+
             if not evaluation_result:
                 log_error("评测测试用例失败，退出评测")
                 end_logging()
@@ -374,6 +511,9 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
             # 添加小延迟，确保日志顺序
             await asyncio.sleep(0.05)
 
+            # 报告生成期间合并的迟到评委结果只有部分反映在报告中，返回前需要重新渲染报告
+            late_updates_before_report = len(late_updates)
+
             # 调用evaluate_and_generate_report函数，传递迭代参数和已有的评测结果
             report_result = await evaluate_and_generate_report(
                 session, 
@@ -382,7 +522,8 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
                 report_file,
                 is_iteration=is_iteration,
                 prev_iteration_cases=formatted_prev_iteration,
-                evaluation_result=evaluation_result  # 传递已有的评测结果
+                evaluation_result=evaluation_result,  # 传递已有的评测结果
+                report_artifacts=report_artifacts  # 传递预生成的报告部分
             )
 
             if not report_result.get("success", False):
@@ -745,6 +886,13 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
             # 记录最终返回的字段
             log(f"最终结果包含以下字段: {', '.join(result.keys())}", important=True)
 
+            if len(late_updates) > late_updates_before_report:
+                refresh_late_reports(result)
+
+            # 缓存本次评测结果
+            save_result_to_cache(result_cache_key, result)
+            published_result["result"] = result
+
             log("测试用例评测流程完成！", important=True)
             # 添加小延迟，确保日志顺序
             await asyncio.sleep(0.05)
@@ -790,7 +938,8 @@ async def async_main(ai_cases_data=None, golden_cases_data=None, is_iteration=Fa
             }
 
 
-def main(ai_cases_file=None, golden_cases_file=None, is_iteration=False, prev_iteration_file=None):
+def main(ai_cases_file=None, golden_cases_file=None, is_iteration=False, prev_iteration_file=None, use_cache=True,
+         sample_size=None, suite_id=None, golden_suite_id=None):
     """
     兼容原有入口点的主函数
 
@@ -798,6 +947,10 @@ def main(ai_cases_file=None, golden_cases_file=None, is_iteration=False, prev_it
     :param golden_cases_file: 黄金标准测试用例文件路径（可选）
     :param is_iteration: 是否启用迭代前后对比功能
     :param prev_iteration_file: 上一次迭代的测试用例文件路径（可选），仅在is_iteration为true时有效
+    :param use_cache: 是否使用评测结果缓存
+    :param sample_size: 抽样评测的样本量（可选），None表示按配置决定是否抽样，0表示根据目标精度推算
+    :param suite_id: AI测试用例集标识（可选），用于增量重复分析
+    :param golden_suite_id: 黄金标准用例集标识（可选），用于增量重复分析
     """
     # 如果是Windows平台，需要显式设置事件循环策略
     if os.name == 'nt':
@@ -838,4 +991,5 @@ def main(ai_cases_file=None, golden_cases_file=None, is_iteration=False, prev_it
             is_iteration = False
 
     # 运行异步主函数
-    return asyncio.run(async_main(ai_cases_data, golden_cases_data, is_iteration, prev_iteration_data))
+    return asyncio.run(async_main(ai_cases_data, golden_cases_data, is_iteration, prev_iteration_data, use_cache=use_cache,
+                                  sample_size=sample_size, suite_id=suite_id, golden_suite_id=golden_suite_id))
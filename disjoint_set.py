@@ -0,0 +1,69 @@
+"""
+并查集（不相交集合）模块
+用于把相似用例对聚合为传递闭包意义下的重复用例簇：路径压缩加按下标合并，
+每个簇的根总是簇内最小下标，簇的划分和输出顺序只取决于输入的用例对集合，与处理顺序无关
+"""
+from typing import Dict, Iterable, List, Tuple
+
+
+class DisjointSet:
+    """以0..size-1为元素的并查集"""
+
+    def __init__(self, size: int):
+        """
+        :param size: 元素数量
+        """
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        """
+        查找元素所在集合的根（簇内最小下标），同时压缩路径
+
+        :param item: 元素下标
+        :return: 根下标
+        """
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        """
+        合并两个元素所在的集合，较大的根挂到较小的根下
+
+        :param a: 元素下标
+        :param b: 元素下标
+        :return: 两个元素原本是否属于不同集合
+        """
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if root_a < root_b:
+            self.parent[root_b] = root_a
+        else:
+            self.parent[root_a] = root_b
+        return True
+
+    def union_pairs(self, pairs: Iterable[Tuple]):
+        """
+        依次合并用例对，只使用每个元组的前两个元素，可直接传入 (i, j, 相似度) 流
+
+        :param pairs: 用例对的可迭代对象
+        """
+        for pair in pairs:
+            self.union(pair[0], pair[1])
+
+    def clusters(self, min_size: int = 1) -> List[List[int]]:
+        """
+        输出所有集合
+
+        :param min_size: 最小集合大小，例如传2只输出存在重复的簇
+        :return: 下标列表的列表，簇内按下标升序，簇之间按最小下标升序
+        """
+        groups: Dict[int, List[int]] = {}
+        for item in range(len(self.parent)):
+            groups.setdefault(self.find(item), []).append(item)
+        return [members for members in groups.values() if len(members) >= min_size]
@@ -0,0 +1,321 @@
+"""
+增量重复索引模块
+按用例集标识持久化每个用例的步骤文本哈希、MinHash签名和已确认的相似用例对。
+同一用例集再次分析时只对新增或内容变化的用例查询LSH桶并计算相似度，删除的用例直接从索引中移除，
+重复用例簇由当前的相似用例对重新聚合，用例集不断增长时重复分析的耗时只随变化的用例数量增长
+"""
+import os
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import config
+from config import DUPLICATE_INDEX_DIR, DUPLICATE_INDEX_MAX_SUITES, DUPLICATE_LSH_MIN_CASES
+from logger import log, log_error
+from minhash_lsh import create_lsh, shingle_hashes
+from disjoint_set import DisjointSet
+from analyzer import verify_candidate_pairs
+
+# 影响相似用例对的配置项，任一项变化时已持久化的索引作废并重新构建
+DUPLICATE_INDEX_CONFIG_KEYS = (
+    "DUPLICATE_SIMILARITY_THRESHOLD",
+    "DUPLICATE_LSH_MIN_CASES",
+    "DUPLICATE_LSH_NUM_PERM",
+    "DUPLICATE_LSH_SHINGLE_SIZE",
+    "DUPLICATE_LSH_THRESHOLD_RATIO",
+    "DUPLICATE_LSH_FALSE_NEGATIVE_WEIGHT",
+    "DUPLICATE_LSH_SEED",
+    "DUPLICATE_TOKEN_JACCARD_RATIO"
+)
+
+# 索引文件格式版本，存储结构变化时递增以使旧索引失效
+DUPLICATE_INDEX_VERSION = 2
+
+# 已加载的索引，按最近使用顺序保留DUPLICATE_INDEX_MAX_SUITES个
+_indexes: "OrderedDict[str, DuplicateIndex]" = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def _steps_hash(steps_text: str) -> str:
+    """计算步骤文本的内容哈希"""
+    return hashlib.blake2b(steps_text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def index_fingerprint() -> str:
+    """
+    计算影响相似用例对的配置指纹
+
+    :return: SHA-256十六进制字符串
+    """
+    settings = [f"{key}={getattr(config, key, None)!r}" for key in DUPLICATE_INDEX_CONFIG_KEYS]
+    settings.append(f"__version__={DUPLICATE_INDEX_VERSION}")
+    return hashlib.sha256("|".join(settings).encode("utf-8")).hexdigest()
+
+
+class DuplicateIndex:
+    """单个用例集的增量重复索引"""
+
+    def __init__(self, suite_id: str):
+        """
+        :param suite_id: 用例集标识
+        """
+        self.suite_id = suite_id
+        self.fingerprint = index_fingerprint()
+        # case_id -> (步骤文本哈希, 步骤文本, MinHash签名)
+        self.entries: Dict[str, Tuple[str, str, Tuple[int, ...]]] = {}
+        # case_id -> {相似用例case_id: 相似度}，双向记录
+        self.edges: Dict[str, Dict[str, float]] = {}
+        # 已有相似用例对的比较方式：True为两两比较，False为LSH候选比较，None表示索引为空
+        self.exhaustive: Optional[bool] = None
+        self.lock = threading.Lock()
+        self._hasher, self._lsh = create_lsh()
+
+    def _reset(self):
+        """清空索引中的用例、相似用例对和LSH桶"""
+        self.entries = {}
+        self.edges = {}
+        self.exhaustive = None
+        _, self._lsh = create_lsh()
+
+    @property
+    def file_path(self) -> str:
+        """索引文件路径，文件名为用例集标识的哈希，避免标识中的特殊字符"""
+        name = hashlib.sha256(self.suite_id.encode("utf-8")).hexdigest()
+        return os.path.join(DUPLICATE_INDEX_DIR, f"{name}.pkl")
+
+    def _remove_case(self, case_id: str):
+        """从LSH桶和相似用例对中移除一个用例"""
+        _, _, signature = self.entries.pop(case_id)
+        self._lsh.remove(case_id, signature)
+        for other_id in self.edges.pop(case_id, {}):
+            neighbours = self.edges.get(other_id)
+            if neighbours is not None:
+                neighbours.pop(case_id, None)
+                if not neighbours:
+                    del self.edges[other_id]
+
+    def sync(self, case_steps_map: Dict[str, str]) -> Dict[str, int]:
+        """
+        将索引同步为给定用例集的当前内容，只比较新增或步骤变化的用例
+
+        用例总数不超过DUPLICATE_LSH_MIN_CASES时新用例与全部已有用例比较，否则只与LSH桶中的用例比较，
+        与find_similar_texts的候选规则一致；未变化用例之间已确认的相似用例对一直保留，不再重新比较。
+        用例总数跨过DUPLICATE_LSH_MIN_CASES导致比较方式变化时，已有的相似用例对与当前规则不一致，索引整体重建。
+
+        :param case_steps_map: {case_id: 步骤文本}，只包含有步骤的用例
+        :return: 本次新增、变化、删除和未变化的用例数量，以及是否重建了索引
+        """
+        exhaustive = len(case_steps_map) <= DUPLICATE_LSH_MIN_CASES
+        rebuilt = self.exhaustive is not None and self.exhaustive != exhaustive
+        if rebuilt:
+            log(f"重复索引 {self.suite_id} 的比较方式变为{'两两比较' if exhaustive else 'LSH候选比较'}"
+                f"（用例数: {len(case_steps_map)}），将重新构建", level="WARNING")
+            self._reset()
+        self.exhaustive = exhaustive
+
+        removed = [case_id for case_id in self.entries if case_id not in case_steps_map]
+        changed = []
+        added = []
+        for case_id, steps_text in case_steps_map.items():
+            entry = self.entries.get(case_id)
+            if entry is None:
+                added.append(case_id)
+            elif entry[0] != _steps_hash(steps_text):
+                changed.append(case_id)
+
+        for case_id in removed + changed:
+            self._remove_case(case_id)
+
+        candidate_pairs = []
+        for case_id in changed + added:
+            steps_text = case_steps_map[case_id]
+            signature = self._hasher.signature(shingle_hashes(steps_text))
+            candidates = list(self.entries) if exhaustive else self._lsh.query(signature)
+            candidate_pairs.extend((other_id, case_id) for other_id in candidates)
+            # 先查询再加入，新用例之间的候选对也只出现一次
+            self.entries[case_id] = (_steps_hash(steps_text), steps_text, signature)
+            self._lsh.add(case_id, signature)
+
+        if candidate_pairs:
+            # 只把涉及的步骤文本交给相似度计算，候选对较多时同样使用进程池
+            positions = {}
+            texts = []
+            for pair in candidate_pairs:
+                for case_id in pair:
+                    if case_id not in positions:
+                        positions[case_id] = len(texts)
+                        texts.append(self.entries[case_id][1])
+            position_ids = list(positions)
+            position_pairs = [(positions[a], positions[b]) for a, b in candidate_pairs]
+            for i, j, similarity in verify_candidate_pairs(texts, position_pairs):
+                a, b = position_ids[i], position_ids[j]
+                self.edges.setdefault(a, {})[b] = similarity
+                self.edges.setdefault(b, {})[a] = similarity
+
+        return {
+            "added": len(added),
+            "changed": len(changed),
+            "removed": len(removed),
+            "unchanged": len(case_steps_map) - len(added) - len(changed),
+            "compared_pairs": len(candidate_pairs),
+            "rebuilt": rebuilt
+        }
+
+    def similar_pairs(self, case_ids: List[str]) -> List[Tuple[int, int, float]]:
+        """
+        输出给定用例之间的相似用例对
+
+        :param case_ids: 用例ID列表，返回值中的下标对应该列表
+        :return: (下标i, 下标j, 相似度) 列表，i < j，按i、j升序
+        """
+        positions = {case_id: position for position, case_id in enumerate(case_ids)}
+        pairs = []
+        for case_id, neighbours in self.edges.items():
+            i = positions.get(case_id)
+            if i is None:
+                continue
+            for other_id, similarity in neighbours.items():
+                j = positions.get(other_id)
+                if j is not None and i < j:
+                    pairs.append((i, j, similarity))
+        pairs.sort()
+        return pairs
+
+    def clusters(self, case_ids: List[str] = None) -> List[List[str]]:
+        """
+        输出当前的重复用例簇
+
+        :param case_ids: 用例ID列表，决定簇内和簇之间的顺序，None则使用索引中的全部用例
+        :return: 用例ID列表的列表，只包含至少两个用例的簇
+        """
+        case_ids = list(self.entries) if case_ids is None else case_ids
+        disjoint_set = DisjointSet(len(case_ids))
+        disjoint_set.union_pairs(self.similar_pairs(case_ids))
+        return [[case_ids[member] for member in members] for members in disjoint_set.clusters(min_size=2)]
+
+    def save(self) -> bool:
+        """
+        将索引保存到DUPLICATE_INDEX_DIR，LSH桶不保存，加载时由签名重建
+
+        :return: 是否保存成功
+        """
+        os.makedirs(DUPLICATE_INDEX_DIR, exist_ok=True)
+        index_file = self.file_path
+        temp_file = f"{index_file}.{threading.get_ident()}.tmp"
+        state = {
+            "version": DUPLICATE_INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "suite_id": self.suite_id,
+            "saved_at": time.time(),
+            "entries": self.entries,
+            "edges": self.edges,
+            "exhaustive": self.exhaustive
+        }
+        try:
+            with open(temp_file, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # 原子替换，避免并发请求读到写了一半的文件
+            os.replace(temp_file, index_file)
+            return True
+        except Exception as e:
+            log_error(f"保存重复索引失败: {str(e)}")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            return False
+
+    @classmethod
+    def load(cls, suite_id: str) -> "DuplicateIndex":
+        """
+        加载用例集的索引，文件不存在、损坏或配置指纹不一致时返回空索引
+
+        :param suite_id: 用例集标识
+        :return: DuplicateIndex
+        """
+        index = cls(suite_id)
+        if not os.path.exists(index.file_path):
+            return index
+        try:
+            with open(index.file_path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            log_error(f"读取重复索引失败，将重新构建: {str(e)}")
+            return index
+
+        if state.get("fingerprint") != index.fingerprint or state.get("suite_id") != suite_id:
+            log(f"重复索引的配置已变化，将重新构建: {suite_id}", level="WARNING")
+            return index
+
+        index.entries = state["entries"]
+        index.edges = state["edges"]
+        index.exhaustive = state["exhaustive"]
+        for case_id, (_, _, signature) in index.entries.items():
+            index._lsh.add(case_id, signature)
+        return index
+
+
+def get_duplicate_index(suite_id: str) -> DuplicateIndex:
+    """
+    获取用例集的增量重复索引，优先使用已加载到内存的索引
+
+    :param suite_id: 用例集标识
+    :return: DuplicateIndex
+    """
+    with _registry_lock:
+        index = _indexes.get(suite_id)
+        if index is None:
+            index = DuplicateIndex.load(suite_id)
+            _indexes[suite_id] = index
+        _indexes.move_to_end(suite_id)
+        while len(_indexes) > DUPLICATE_INDEX_MAX_SUITES:
+            _indexes.popitem(last=False)
+        return index
+
+
+def find_similar_pairs_incremental(suite_id: str, case_text_map: Dict[str, str]) -> List[Tuple[int, int, float]]:
+    """
+    通过用例集的增量重复索引找出文本相似的用例对
+
+    :param suite_id: 用例集标识，同一用例集的步骤和预期结果使用不同的标识
+    :param case_text_map: {case_id: 文本}，只包含文本非空的用例
+    :return: 相似度超过阈值的 (下标i, 下标j, 相似度) 列表，下标对应case_text_map的键顺序
+    """
+    index = get_duplicate_index(suite_id)
+    with index.lock:
+        stats = index.sync(case_text_map)
+        log(f"增量重复索引 {suite_id}: 新增{stats['added']}个、变化{stats['changed']}个、删除{stats['removed']}个、"
+            f"未变化{stats['unchanged']}个用例，比较候选对{stats['compared_pairs']}个")
+        if stats["added"] or stats["changed"] or stats["removed"] or stats["rebuilt"]:
+            index.save()
+        return index.similar_pairs(list(case_text_map))
+
+
+def clear_duplicate_index(suite_id: str = None) -> int:
+    """
+    清除增量重复索引
+
+    :param suite_id: 用例集标识，None则清除全部
+    :return: 删除的索引文件数量
+    """
+    removed = 0
+    with _registry_lock:
+        if suite_id is None:
+            _indexes.clear()
+            file_paths = []
+            if os.path.isdir(DUPLICATE_INDEX_DIR):
+                file_paths = [os.path.join(DUPLICATE_INDEX_DIR, name)
+                              for name in os.listdir(DUPLICATE_INDEX_DIR) if name.endswith(".pkl")]
+        else:
+            _indexes.pop(suite_id, None)
+            file_paths = [DuplicateIndex(suite_id).file_path]
+        for file_path in file_paths:
+            try:
+                os.remove(file_path)
+                removed += 1
+            except OSError:
+                pass
+    log(f"已清除{removed}个重复索引", important=True)
+    return removed
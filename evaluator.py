@@ -1,15 +1,23 @@
 import json
 import aiohttp
 from logger import log, log_error, end_logging
-from llm_api import async_call_llm, extract_valid_json
+from llm_api import async_call_llm
 from analyzer import find_duplicate_test_cases
+from keyword_matcher import get_keyword_automaton
+from case_matcher import GoldenCaseIndex, match_test_cases, format_match_facts
+from sampling import (
+    resolve_sample_size, build_sample_plan, combine_sample_results, format_sampling_note, format_interval
+)
+from testcase_model import normalize_test_cases, test_cases_to_dicts
+from case_payload import (
+    CasePayload, json_block, EVALUATION_TASK_SEGMENT, EVALUATION_DIMENSIONS_SEGMENT, SCORING_FORMULA_SEGMENT
+)
 import re
 import asyncio
-import concurrent.futures
 from config import MAX_CONCURRENT_REQUESTS, LLM_TEMPERATURE, LLM_TEMPERATURE_REPORT, ENABLE_MULTI_JUDGES, ENABLE_COLLAB_EVAL
+from config import REPORT_NARRATIVE_TIMEOUT, REPORT_NARRATIVE_MAX_CHARS, REPORT_NARRATIVE_REASON_CHARS, REPORT_GENERATION_DEADLINE
 from typing import Dict
 import time
-import uuid
 import os
 
 # 在文件顶部导入委员会评测功能
@@ -21,8 +29,90 @@ except ImportError:
     log_error("无法导入评委委员会模块，将使用单一模型评测", level="WARNING")
     COMMITTEE_IMPORTED = False
 
+# 覆盖率分析的辅助规则关键词，与COVERAGE_KEYWORDS一同编译进关键词自动机
+COVERAGE_RULE_KEYWORDS = {
+    "__core__": ["登录", "注册", "查询", "搜索", "创建", "删除", "修改", "更新", "上传", "下载"],
+    "__input__": ["输入", "填写", "输入框", "字段", "表单", "必填", "选填", "有效", "无效"],
+    "__validation__": ["验证", "检查", "校验"],
+    "__boundary__": ["边界", "极限", "临界"],
+    "__value__": ["值", "数量", "长度", "大小", "范围"],
+    "__max__": ["最大", "上限", "最高", "最多"],
+    "__min__": ["最小", "下限", "最低", "最少"]
+}
+
+# evaluate_test_cases写入评测结果的重复信息字段
+DUPLICATE_RESULT_FIELDS = ("duplicate_types", "duplicate_categories", "duplicate_info")
+
+# 评测维度英文键到中文名称的映射
+DIMENSION_CHINESE_NAMES = {
+    "format_compliance": "格式合规性",
+    "content_accuracy": "内容准确性",
+    "test_coverage": "测试覆盖度",
+    "functional_coverage": "功能覆盖度",
+    "defect_detection": "缺陷发现能力",
+    "engineering_efficiency": "工程效率",
+    "semantic_quality": "语义质量",
+    "security_economy": "安全与经济性",
+    "duplicate_analysis": "重复性分析"
+}
+
+# 报告中由LLM撰写的叙述段落：段落键 -> (段落标题, 写作要求)，其余部分由评测结果直接渲染
+REPORT_NARRATIVE_SECTIONS = {
+    "summary": ("报告摘要", "用2-3句话总结本次评估的总体结论，点明总体评分和最突出的优缺点；如果是抽样评测，说明评分为估计值并给出置信区间"),
+    "detailed_analysis": ("详细分析", "逐项点评功能覆盖度、缺陷发现能力、工程效率、语义质量、安全与经济性，每项1-2句，使用Markdown列表"),
+    "pros_cons": ("优缺点对比", "分别列出AI生成测试用例相对于人工标准的2-3个优势和2-3个劣势，使用Markdown列表"),
+    "suggestions": ("改进建议", "给出3-5条具体可行的改进建议，包括如何减少重复，使用Markdown有序列表"),
+    "conclusion": ("综合结论", "用2-3句话总结AI测试用例的整体表现和适用场景")
+}
+
+# 迭代对比时从标题中提取功能点的分隔词
+FEATURE_MARKER_KEYWORDS = {
+    "功能": ["功能"],
+    "测试": ["测试"]
+}
+
+
+def prepare_golden_context(golden_testcases, suite_id=None):
+    """
+    预处理黄金标准测试用例（重复分析和用例匹配索引），多次评测对比同一黄金标准时只需计算一次
+
+    :param golden_testcases: 黄金标准测试用例（任意支持的格式）
+    :param suite_id: 黄金标准用例集标识（可选），提供时重复分析使用增量重复索引
+    :return: 黄金标准上下文，可传给evaluate_test_cases的golden_context参数
+    """
+    golden_testcases = normalize_test_cases(golden_testcases)
+    return {
+        "golden_testcases": golden_testcases,
+        "golden_duplicate_info": find_duplicate_test_cases(golden_testcases, suite_id=suite_id),
+        "golden_index": GoldenCaseIndex(golden_testcases)
+    }
+
+
+def extract_feature_points(test_cases):
+    """
+    从测试用例的类别和标题中提取功能点，用于迭代前后的功能覆盖对比
 
-async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_cases, is_iteration=False, prev_iteration_cases=None):
+    :param test_cases: TestCase列表
+    :return: 功能点集合
+    """
+    automaton = get_keyword_automaton(FEATURE_MARKER_KEYWORDS)
+    features = set()
+    for case in test_cases:
+        if case.category:
+            features.add(case.category)
+        # 从标题中提取功能点：取第一个"功能"之前的部分，否则取第一个"测试"之前的部分
+        title = case.title
+        positions = automaton.first_positions(title)
+        if "功能" in positions:
+            features.add(title[:positions["功能"]] + "功能")
+        elif "测试" in positions:
+            features.add(title[:positions["测试"]])
+    return features
+
+
+async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_cases, is_iteration=False, prev_iteration_cases=None,
+                              on_duplicates_ready=None, sample_size=None, sample_context=None, golden_context=None,
+                              suite_ids=None, on_late_result=None, use_judge_cache=True):
     """
     评测测试用例质量
 
@@ -31,6 +121,15 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
     :param golden_cases: 黄金标准测试用例
     :param is_iteration: 是否启用迭代前后对比功能
     :param prev_iteration_cases: 上一次迭代的测试用例（可选），仅在is_iteration为true时有效
+    :param on_duplicates_ready: 重复分析完成、评委评测开始前的回调（可选），参数为将写入评测结果的重复信息字段，
+                                用于在等待评委期间预先生成报告中与评分无关的部分
+    :param sample_size: 抽样评测的样本量（可选），None表示按配置决定是否抽样，0表示根据目标精度推算，迭代对比模式下不抽样
+    :param sample_context: 抽样评测中单个样本组的上下文（内部使用），包含全量用例的重复分析和对应关系结果
+    :param golden_context: prepare_golden_context预处理的黄金标准上下文（可选），提供时不再重复提取和分析黄金标准用例
+    :param suite_ids: 用例集标识（可选），键为"ai"、"golden"、"prev"，提供标识的用例集使用增量重复索引进行重复分析
+    :param on_late_result: 迟到评委结果合并后的回调（可选），提供时多评委评测启用法定人数模式，
+                           回调参数为原地更新后的评测结果
+    :param use_judge_cache: 是否复用评委结果缓存，False则调用全部评委并刷新缓存
     :return: 评测结果
     """
     log("开始测试用例评测", important=True)
@@ -40,98 +139,28 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
     # 添加小延迟，确保日志顺序
     await asyncio.sleep(0.05)
 
-    # 获取所有测试用例
-    ai_testcases = []
-    golden_testcases = []
-    prev_testcases = []
-
-    # 定义格式化函数，便于并行处理
-    def extract_ai_testcases(ai_cases):
-        result = []
-        # 提取AI测试用例，适配新的格式化结构
-        if isinstance(ai_cases, dict):
-            if "testcases" in ai_cases and isinstance(ai_cases["testcases"], dict):
-                # 新的统一格式
-                if "test_cases" in ai_cases["testcases"]:
-                    # 处理test_cases可能是字典(包含不同类别的测试用例)的情况
-                    if isinstance(ai_cases["testcases"]["test_cases"], dict):
-                        for category, cases in ai_cases["testcases"]["test_cases"].items():
-                            if isinstance(cases, list):
-                                for case in cases:
-                                    if isinstance(case, dict):
-                                        case["category"] = category
-                                    result.append(case)
-                    # 处理test_cases是列表的情况
-                    elif isinstance(ai_cases["testcases"]["test_cases"], list):
-                        result = ai_cases["testcases"]["test_cases"]
-            elif "test_cases" in ai_cases:
-                if isinstance(ai_cases["test_cases"], dict):
-                    # 旧格式，分类测试用例
-                    for category, cases in ai_cases["test_cases"].items():
-                        if isinstance(cases, list):
-                            result.extend(cases)
-                elif isinstance(ai_cases["test_cases"], list):
-                    # 旧格式，直接列表
-                    result = ai_cases["test_cases"]
-        return result
-
-    def extract_golden_testcases(golden_cases):
-        result = []
-        # 提取黄金标准测试用例，适配新的格式化结构
-        if isinstance(golden_cases, dict):
-            if "testcases" in golden_cases and isinstance(golden_cases["testcases"], dict):
-                # 新的统一格式
-                if "test_cases" in golden_cases["testcases"]:
-                    # 处理test_cases可能是字典(包含不同类别的测试用例)的情况
-                    if isinstance(golden_cases["testcases"]["test_cases"], dict):
-                        for category, cases in golden_cases["testcases"]["test_cases"].items():
-                            if isinstance(cases, list):
-                                for case in cases:
-                                    if isinstance(case, dict):
-                                        case["category"] = category
-                                    result.append(case)
-                    # 处理test_cases是列表的情况
-                    elif isinstance(golden_cases["testcases"]["test_cases"], list):
-                        result = golden_cases["testcases"]["test_cases"]
-            elif "test_cases" in golden_cases:
-                if isinstance(golden_cases["test_cases"], dict):
-                    # 旧格式，分类测试用例
-                    for category, cases in golden_cases["test_cases"].items():
-                        if isinstance(cases, list):
-                            result.extend(cases)
-                elif isinstance(golden_cases["test_cases"], list):
-                    # 旧格式，直接列表
-                    result = golden_cases["test_cases"]
-        return result
-        
-    # 提取上一次迭代测试用例
-    def extract_prev_testcases(prev_cases):
-        # 复用提取AI测试用例的逻辑
-        return extract_ai_testcases(prev_cases)
-
-    # 并行执行AI测试用例和黄金标准测试用例的格式化处理
-    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-        ai_future = executor.submit(extract_ai_testcases, ai_cases)
-        golden_future = executor.submit(extract_golden_testcases, golden_cases)
-        
-        if is_iteration and prev_iteration_cases:
-            prev_future = executor.submit(extract_prev_testcases, prev_iteration_cases)
-            prev_testcases = prev_future.result()
-
-        ai_testcases = ai_future.result()
-        golden_testcases = golden_future.result()
+    # 一次遍历将各种输入格式规范化为TestCase列表，后续分析、匹配和评测提示都基于该列表
+    ai_testcases = normalize_test_cases(ai_cases)
+    golden_testcases = golden_context["golden_testcases"] if golden_context else normalize_test_cases(golden_cases)
+    prev_testcases = normalize_test_cases(prev_iteration_cases) if is_iteration and prev_iteration_cases else []
 
     log(f"AI测试用例数量: {len(ai_testcases)}, 黄金标准测试用例数量: {len(golden_testcases)}", important=True)
     if is_iteration and prev_testcases:
         log(f"上一次迭代测试用例数量: {len(prev_testcases)}", important=True)
 
-    # 检查重复的测试用例
-    ai_duplicate_info = find_duplicate_test_cases(ai_testcases)
-    golden_duplicate_info = find_duplicate_test_cases(golden_testcases)
+    # 检查重复的测试用例，抽样评测的样本组沿用全量用例的分析结果
+    suite_ids = suite_ids or {}
+    if golden_context is None:
+        golden_context = prepare_golden_context(golden_testcases, suite_id=suite_ids.get("golden"))
+    golden_duplicate_info = golden_context["golden_duplicate_info"]
+    if sample_context:
+        ai_duplicate_info = sample_context["ai_duplicate_info"]
+    else:
+        ai_duplicate_info = find_duplicate_test_cases(ai_testcases, suite_id=suite_ids.get("ai"))
     
     # 如果启用迭代对比，也检查上一次迭代的测试用例重复情况
     if is_iteration and prev_testcases:
-        prev_duplicate_info = find_duplicate_test_cases(prev_testcases)
+        prev_duplicate_info = find_duplicate_test_cases(prev_testcases, suite_id=suite_ids.get("prev"))
         log(f"上一次迭代测试用例重复率: {prev_duplicate_info['duplicate_rate']}% ({prev_duplicate_info['duplicate_count']}个)",
             important=True)
 
@@ -151,6 +180,30 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
     merge_suggestions_count = len(ai_duplicate_info.get("merge_suggestions", []))
     log(f"生成了 {merge_suggestions_count} 条AI测试用例合并建议", important=True)
 
+    # 写入评测结果的重复信息字段，与评委结果无关，可提前交给报告预生成
+    duplicate_fields = {
+        "duplicate_types": ai_duplicate_info['duplicate_types'],
+        "duplicate_categories": ai_duplicate_info.get('duplicate_categories', {}),
+        "duplicate_info": {
+            "ai_duplicate_rate": ai_duplicate_info['duplicate_rate'],
+            "golden_duplicate_rate": golden_duplicate_info['duplicate_rate'],
+            "merge_suggestions": ai_duplicate_info.get("merge_suggestions", [])
+        }
+    }
+    if on_duplicates_ready:
+        try:
+            on_duplicates_ready(duplicate_fields)
+        except Exception as e:
+            log_error(f"重复分析完成回调执行失败: {str(e)}")
+
+    # 本地计算AI用例与黄金标准用例的对应关系，作为评测提示中的客观事实
+    match_start_time = time.time()
+    case_matching = sample_context["case_matching"] if sample_context else \
+        match_test_cases(ai_testcases, golden_testcases, index=golden_context["golden_index"])
+    log(f"用例对应关系计算完成: 黄金标准用例覆盖率{case_matching['coverage_ratio'] * 100:.1f}%, "
+        f"AI用例对应率{case_matching['precision_ratio'] * 100:.1f}%, 耗时{(time.time() - match_start_time) * 1000:.0f}毫秒",
+        important=True)
+
     # 构建评测提示
     duplicate_info_text = f"""
 # 测试用例重复情况
@@ -169,6 +222,7 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
 
 如果AI测试用例的重复率明显高于黄金标准，请在改进建议中提出减少重复测试用例的建议。
 """
+    duplicate_info_text += format_match_facts(case_matching)
 
     # 如果启用迭代对比，添加迭代对比信息
     iteration_comparison_text = ""
@@ -185,34 +239,8 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
         duplicate_rate_change = current_duplicate_rate - prev_duplicate_rate
         
         # 计算功能覆盖变化（通过分类或标题分析）
-        prev_categories = set()
-        current_categories = set()
-        
-        for case in prev_testcases:
-            category = case.get("category", "")
-            if category:
-                prev_categories.add(category)
-            # 从标题中提取功能点
-            title = case.get("title", "")
-            if "功能" in title:
-                feature = title.split("功能")[0] + "功能"
-                prev_categories.add(feature)
-            elif "测试" in title:
-                feature = title.split("测试")[0]
-                prev_categories.add(feature)
-        
-        for case in ai_testcases:
-            category = case.get("category", "")
-            if category:
-                current_categories.add(category)
-            # 从标题中提取功能点
-            title = case.get("title", "")
-            if "功能" in title:
-                feature = title.split("功能")[0] + "功能"
-                current_categories.add(feature)
-            elif "测试" in title:
-                feature = title.split("测试")[0]
-                current_categories.add(feature)
+        prev_categories = extract_feature_points(prev_testcases)
+        current_categories = extract_feature_points(ai_testcases)
         
         # 新增功能点
         new_categories = current_categories - prev_categories
@@ -252,13 +280,13 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
         iteration_comparison_text += "\n## 测试用例质量变化分析\n"
         
         # 对比具体测试用例属性，如步骤数量、预期结果数量等
-        prev_avg_steps = sum(len(case.get("steps", [])) for case in prev_testcases) / prev_count if prev_count > 0 else 0
-        current_avg_steps = sum(len(case.get("steps", [])) for case in ai_testcases) / current_count if current_count > 0 else 0
+        prev_avg_steps = sum(len(case.steps) for case in prev_testcases) / prev_count if prev_count > 0 else 0
+        current_avg_steps = sum(len(case.steps) for case in ai_testcases) / current_count if current_count > 0 else 0
         steps_change = current_avg_steps - prev_avg_steps
         steps_change_percent = (steps_change / prev_avg_steps * 100) if prev_avg_steps > 0 else 0
         
-        prev_avg_expected = sum(len(case.get("expected_results", [])) for case in prev_testcases) / prev_count if prev_count > 0 else 0
-        current_avg_expected = sum(len(case.get("expected_results", [])) for case in ai_testcases) / current_count if current_count > 0 else 0
+        prev_avg_expected = sum(len(case.expected_results) for case in prev_testcases) / prev_count if prev_count > 0 else 0
+        current_avg_expected = sum(len(case.expected_results) for case in ai_testcases) / current_count if current_count > 0 else 0
         expected_change = current_avg_expected - prev_avg_expected
         expected_change_percent = (expected_change / prev_avg_expected * 100) if prev_avg_expected > 0 else 0
         
@@ -300,6 +328,25 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
                     expected_preview += f" ... 等{len(expected)}个预期结果"
                 duplicate_info_text += f"- 合并后预期结果: {expected_preview}\n"
 
+    # 用例数量很大时只评测分层抽样的样本，迭代对比需要完整用例，不抽样
+    if sample_context:
+        duplicate_info_text += sample_context["note"]
+    elif not (is_iteration and prev_testcases):
+        effective_sample_size = resolve_sample_size(len(ai_testcases), sample_size)
+        if effective_sample_size:
+            return await evaluate_sampled_test_cases(session, ai_testcases, golden_cases, effective_sample_size, {
+                "ai_duplicate_info": ai_duplicate_info,
+                "case_matching": case_matching
+            }, golden_context, use_judge_cache)
+
+    # 用例只序列化一次，委员会各评委和单一模型回退共用同一负载
+    committee_context_text = duplicate_info_text
+    if is_iteration and iteration_comparison_text:
+        committee_context_text = duplicate_info_text + "\n" + iteration_comparison_text
+    ai_case_dicts = test_cases_to_dicts(ai_testcases)
+    golden_case_dicts = test_cases_to_dicts(golden_testcases)
+    case_payload = CasePayload(ai_case_dicts, golden_case_dicts, committee_context_text)
+
     # 判断是否使用多评委委员会评测
     if ENABLE_MULTI_JUDGES and COMMITTEE_IMPORTED:
         log("启用多评委委员会评测", important=True)
@@ -314,23 +361,38 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
             else:
                 log("使用标准多评委评测框架 (独立评分->结果聚合)", important=True)
             
+        evaluation_result = None
+
+        def merge_late_committee_result(committee_result):
+            """迟到评委的结果合并后，原地更新已返回的评测结果并通知调用方"""
+            if evaluation_result is None or not committee_result.get("is_committee_result"):
+                return
+            apply_late_committee_result(evaluation_result, committee_result)
+            on_late_result(evaluation_result)
+
         try:
             # 调用委员会评测，添加迭代对比信息
             if is_iteration and iteration_comparison_text:
                 evaluation_result = await evaluate_with_committee(
                     session,
-                    ai_testcases,
-                    golden_testcases,
-                    duplicate_info_text + "\n" + iteration_comparison_text,
-                    use_collab_eval=False  # 迭代对比模式下强制使用标准多评委评测
+                    ai_case_dicts,
+                    golden_case_dicts,
+                    committee_context_text,
+                    use_collab_eval=False,  # 迭代对比模式下强制使用标准多评委评测
+                    payload=case_payload,
+                    on_late_result=merge_late_committee_result if on_late_result else None,
+                    use_judge_cache=use_judge_cache
                 )
             else:
                 evaluation_result = await evaluate_with_committee(
                     session,
-                    ai_testcases,
-                    golden_testcases,
-                    duplicate_info_text,
-                    use_collab_eval=use_collab_eval  # 根据条件决定是否使用CollabEval
+                    ai_case_dicts,
+                    golden_case_dicts,
+                    committee_context_text,
+                    use_collab_eval=use_collab_eval,  # 根据条件决定是否使用CollabEval
+                    payload=case_payload,
+                    on_late_result=merge_late_committee_result if on_late_result else None,
+                    use_judge_cache=use_judge_cache
                 )
 
             if evaluation_result:
@@ -340,13 +402,8 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
                     log("多评委委员会评测完成", important=True)
 
                 # 将重复测试用例信息添加到评测结果中
-                evaluation_result["duplicate_types"] = ai_duplicate_info['duplicate_types']
-                evaluation_result["duplicate_categories"] = ai_duplicate_info.get('duplicate_categories', {})
-                evaluation_result["duplicate_info"] = {
-                    "ai_duplicate_rate": ai_duplicate_info['duplicate_rate'],
-                    "golden_duplicate_rate": golden_duplicate_info['duplicate_rate'],
-                    "merge_suggestions": ai_duplicate_info.get("merge_suggestions", [])
-                }
+                evaluation_result.update(duplicate_fields)
+                evaluation_result["case_matching"] = case_matching
                 
                 # 如果启用迭代对比，添加迭代对比信息
                 if is_iteration and prev_testcases:
@@ -403,10 +460,7 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
     log("使用单一模型进行评测", important=True)
 
     # 构建完整提示
-    prompt = f"""
-# 任务
-评估AI生成的测试用例与黄金标准测试用例的质量对比。
-"""
+    prompt = EVALUATION_TASK_SEGMENT
 
     # 如果是迭代对比，增加迭代对比任务说明
     if is_iteration and prev_testcases:
@@ -415,14 +469,7 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
 本次评估包含迭代前后对比分析，需要重点关注测试用例在本次迭代中的质量改进情况，并提出针对性建议。
 """
 
-    prompt += """
-# 评估维度和权重
-1. **功能覆盖度**（权重30%）：评估需求覆盖率、边界值覆盖度、分支路径覆盖率
-2. **缺陷发现能力**（权重25%）：评估缺陷检测率、突变分数、失败用例比例
-3. **工程效率**（权重20%）：评估测试用例生成速度、维护成本、CI/CD集成度
-4. **语义质量**（权重15%）：评估语义准确性、人工可读性、断言描述清晰度
-5. **安全与经济性**（权重10%）：评估恶意代码率、冗余用例比例、综合成本
-"""
+    prompt += EVALUATION_DIMENSIONS_SEGMENT
 
     # 添加重复测试用例信息
     prompt += "\n" + duplicate_info_text + "\n"
@@ -431,32 +478,13 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
     if is_iteration and iteration_comparison_text:
         prompt += "\n" + iteration_comparison_text + "\n"
 
-    # 添加评分公式
-    prompt += """
-# 评分公式
-总分 = 0.3×功能覆盖得分 + 0.25×缺陷发现得分 + 0.2×工程效率得分 + 0.15×语义质量得分 + 0.1×安全经济得分
-各维度得分 = (AI指标值/人工基准值)×10（满分10分）
-
-# AI生成的测试用例
-```json
-"""
-    # 添加AI测试用例
-    prompt += json.dumps(ai_testcases, ensure_ascii=False, indent=2) + "\n```\n\n"
+    # 添加评分公式和复用委员会负载中已序列化的AI用例、黄金标准用例
+    prompt += SCORING_FORMULA_SEGMENT + case_payload.cases_block
 
-    # 添加黄金标准测试用例
-    prompt += """
-# 黄金标准测试用例
-```json
-"""
-    prompt += json.dumps(golden_testcases, ensure_ascii=False, indent=2) + "\n```\n\n"
-    
     # 如果启用迭代对比，添加上一次迭代的测试用例
     if is_iteration and prev_testcases:
-        prompt += """
-# 上一次迭代的测试用例
-```json
-"""
-        prompt += json.dumps(prev_testcases, ensure_ascii=False, indent=2) + "\n```\n\n"
+        prompt += "\n" + json_block("上一次迭代的测试用例",
+                                     json.dumps(test_cases_to_dicts(prev_testcases), ensure_ascii=False, indent=2))
 
     # 添加输出要求
     prompt += """
@@ -588,18 +616,98 @@ async def evaluate_test_cases(session: aiohttp.ClientSession, ai_cases, golden_c
         log("测试用例评测失败", important=True)
         return None
 
+    if isinstance(result, dict):
+        # 重复信息以本地分析结果为准，与委员会评测路径保持一致
+        result.update(duplicate_fields)
+        result["case_matching"] = case_matching
+
     log("测试用例评测完成", important=True)
     return result
 
 
-# 添加测试覆盖流程图生成函数
-def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
+def apply_late_committee_result(evaluation_result, committee_result):
     """
-    根据测试用例内容动态生成测试覆盖流程图
+    将合并迟到评委后的委员会结果写入已返回的评测结果，保留重复分析、用例对应关系和带前缀的改进建议
 
-    :param test_cases: 测试用例列表或包含分类测试用例的字典
-    :param evaluation_result: 评测结果数据（可选）
-    :return: Mermaid格式的流程图
+    :param evaluation_result: 已返回的评测结果，原地更新
+    :param committee_result: 重新聚合后的委员会评测结果
+    """
+    summary = evaluation_result.setdefault("evaluation_summary", {})
+    for key in ("overall_score", "chairman_rationale"):
+        if key in committee_result.get("evaluation_summary", {}):
+            summary[key] = committee_result["evaluation_summary"][key]
+
+    detailed_report = evaluation_result.setdefault("detailed_report", {})
+    for dimension, data in committee_result.get("detailed_report", {}).items():
+        detailed_report.setdefault(dimension, {}).update(data)
+
+    committee_summary = committee_result.get("committee_summary", {})
+    evaluation_result["committee_summary"] = committee_summary
+    committee_info = evaluation_result.setdefault("committee_info", {})
+    committee_info["judge_count"] = len(committee_summary.get("judge_scores", {}))
+    committee_info["judges"] = list(committee_summary.get("judge_scores", {}).keys())
+    log(f"已合并迟到评委的结果，更新后的总体评分: {summary.get('overall_score', 'N/A')}", important=True)
+
+
+async def evaluate_sampled_test_cases(session: aiohttp.ClientSession, ai_testcases, golden_cases, sample_size,
+                                      sample_context, golden_context=None, use_judge_cache=True):
+    """
+    分层抽样评测：抽取若干组分层样本并发评测，合并各组得分并以样本组为单位估计置信区间
+
+    :param session: aiohttp会话
+    :param ai_testcases: 全部AI测试用例（TestCase列表）
+    :param golden_cases: 黄金标准测试用例
+    :param sample_size: 样本量
+    :param sample_context: 全量用例的重复分析和对应关系结果，各样本组共用
+    :param golden_context: 黄金标准上下文（可选），各样本组共用
+    :param use_judge_cache: 是否复用评委结果缓存
+    :return: 合并后的评测结果，包含sampling字段
+    """
+    plan = build_sample_plan(ai_testcases, sample_context["ai_duplicate_info"], sample_size)
+    log(f"启用分层抽样评测: 从{plan['population']}个AI测试用例（{plan['cluster_count']}个重复用例簇、"
+        f"{len(plan['strata'])}个类别）中抽取{plan['sample_size']}个，分为{len(plan['replicates'])}组并发评测",
+        important=True)
+
+    start_time = time.time()
+    results = await asyncio.gather(*[
+        evaluate_test_cases(
+            session,
+            sample,
+            golden_cases,
+            sample_context=dict(sample_context, note=format_sampling_note(plan, index)),
+            golden_context=golden_context,
+            use_judge_cache=use_judge_cache
+        )
+        for index, sample in enumerate(plan["replicates"])
+    ], return_exceptions=True)
+
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            log_error(f"第{index + 1}组样本评测出错: {str(result)}")
+            results[index] = None
+        elif not result:
+            log_error(f"第{index + 1}组样本评测失败")
+
+    evaluation_result = combine_sample_results(results, plan)
+    if not evaluation_result:
+        log_error("所有样本组评测均失败", important=True)
+        return None
+
+    overall = evaluation_result["sampling"].get("overall_score")
+    if overall:
+        log(f"抽样评测完成，耗时{time.time() - start_time:.2f}秒，总分估计: {overall['mean']} "
+            f"（{evaluation_result['sampling']['confidence'] * 100:.0f}%置信区间 {format_interval(overall)}）",
+            important=True)
+    return evaluation_result
+
+
+# 测试覆盖流程图主体生成函数
+def build_test_coverage_chart_parts(test_cases):
+    """
+    根据测试用例内容动态生成测试覆盖流程图的主体部分，不包含依赖评测结果的覆盖分析说明
+
+    :param test_cases: 测试用例（TestCase列表或任意支持的格式）
+    :return: (Mermaid流程图及图例, 覆盖现状描述)
     """
     # 从配置文件导入测试覆盖率分析相关配置
     from config import COVERAGE_KEYWORDS, COVERAGE_FULL_THRESHOLD, COVERAGE_PARTIAL_THRESHOLD
@@ -660,47 +768,16 @@ def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
     # 使用配置文件中的关键词列表
     keywords = COVERAGE_KEYWORDS
     
-    # 处理测试用例，统一转换为列表格式
-    all_test_cases = []
-    
-    # 检查test_cases是否是字典（包含分类的测试用例）
-    if isinstance(test_cases, dict):
-        # 遍历字典中的每个分类
-        for category, cases in test_cases.items():
-            if isinstance(cases, list):
-                # 为每个测试用例添加category标记
-                for case in cases:
-                    if isinstance(case, dict):
-                        case_copy = case.copy()
-                        case_copy["category"] = category.lower()
-                        all_test_cases.append(case_copy)
-    elif isinstance(test_cases, list):
-        # 如果已经是列表，直接使用
-        all_test_cases = test_cases
-    
-    # 如果all_test_cases为空，尝试其他格式解析
-    if not all_test_cases:
-        # 尝试处理testcases.test_cases格式
-        if isinstance(test_cases, dict) and "testcases" in test_cases:
-            if isinstance(test_cases["testcases"], dict) and "test_cases" in test_cases["testcases"]:
-                test_cases_data = test_cases["testcases"]["test_cases"]
-                if isinstance(test_cases_data, dict):
-                    # 处理按类别组织的测试用例
-                    for category, cases in test_cases_data.items():
-                        if isinstance(cases, list):
-                            for case in cases:
-                                if isinstance(case, dict):
-                                    case_copy = case.copy()
-                                    case_copy["category"] = category.lower()
-                                    all_test_cases.append(case_copy)
-                elif isinstance(test_cases_data, list):
-                    all_test_cases = test_cases_data
+    # 处理测试用例，统一规范化为TestCase列表
+    all_test_cases = normalize_test_cases(test_cases)
 
     # 从测试用例分析覆盖情况
+    case_texts = []
+    case_rule_flags = []  # 记录用例是否已按类别/ID计入边界测试，避免重复计数
     for case in all_test_cases:
-        case_id = case.get("case_id", "")
-        title = case.get("title", "").lower()
-        category = case.get("category", "").lower()
+        case_id = case.case_id
+        title = case.title.lower()
+        category = case.category.lower()
         
         # 直接检查category是否为特定类型
         if category == "functional" or case_id.startswith("FT-"):
@@ -725,58 +802,12 @@ def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
                 feature_counts["最大值测试"] += 1
                 feature_counts["最小值测试"] += 1
         
-        # 深入分析测试用例内容
-        steps = []
-        if "steps" in case and isinstance(case["steps"], list):
-            steps = [step.lower() if isinstance(step, str) else "" for step in case["steps"]]
-        
-        expected_results = []
-        if "expected_results" in case and isinstance(case["expected_results"], list):
-            expected_results = [result.lower() if isinstance(result, str) else "" for result in case["expected_results"]]
-        elif "expected_results" in case and isinstance(case["expected_results"], str):
-            expected_results = [case["expected_results"].lower()]
-        
-        preconditions = ""
-        if "preconditions" in case and case["preconditions"]:
-            if isinstance(case["preconditions"], str):
-                preconditions = case["preconditions"].lower()
-            elif isinstance(case["preconditions"], list):
-                preconditions = " ".join([p.lower() if isinstance(p, str) else "" for p in case["preconditions"]])
-        
-        # 合并所有文本内容进行分析
-        all_text = title + " " + category + " " + case_id + " " + preconditions + " " + " ".join(steps) + " " + " ".join(expected_results)
+        # 合并所有文本内容进行分析：预先拼接的小写文本再加上类别和用例ID
+        all_text = case.text + " " + category + " " + case_id
         
-        # 基于关键词分析覆盖类型
-        for feature, feature_keywords in keywords.items():
-            for keyword in feature_keywords:
-                if keyword.lower() in all_text:
-                    feature_counts[feature] += 1
-                    break  # 找到一个关键词就跳出内层循环
-        
-        # 特殊规则：如果测试用例包含"登录"、"注册"等核心功能词，视为功能验证
-        core_features = ["登录", "注册", "查询", "搜索", "创建", "删除", "修改", "更新", "上传", "下载"]
-        for core in core_features:
-            if core in all_text:
-                feature_counts["功能验证"] += 1
-                break
-        
-        # 特殊规则：如果测试用例描述了输入验证相关内容
-        input_validation_patterns = ["输入", "填写", "输入框", "字段", "表单", "必填", "选填", "有效", "无效"]
-        for pattern in input_validation_patterns:
-            if pattern in all_text and ("验证" in all_text or "检查" in all_text or "校验" in all_text):
-                feature_counts["输入验证"] += 1
-                break
-        
-        # 特殊规则：识别边界测试 - 基于内容关键词
-        if not (category == "boundary" or case_id.startswith("BT-")):  # 避免重复计数
-            if any(boundary in all_text for boundary in ["边界", "极限", "临界"]):
-                if any(value in all_text for value in ["值", "数量", "长度", "大小", "范围"]):
-                    feature_counts["边界测试"] += 1
-                    # 细分为最大值或最小值测试
-                    if any(max_val in all_text for max_val in ["最大", "上限", "最高", "最多"]):
-                        feature_counts["最大值测试"] += 1
-                    if any(min_val in all_text for min_val in ["最小", "下限", "最低", "最少"]):
-                        feature_counts["最小值测试"] += 1
+        # 收集文本，循环结束后交给自动机批量匹配
+        case_texts.append(all_text)
+        case_rule_flags.append(category == "boundary" or case_id.startswith("BT-"))
 
         # 提取主要功能模块和子功能模块
         parts = case_id.split('-')
@@ -800,6 +831,31 @@ def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
                     }
                 submodules[module_key]["count"] += 1
 
+    # 基于关键词分析覆盖类型 - 所有用例一次性批量扫描，每条文本只扫描一遍
+    automaton = get_keyword_automaton({**keywords, **COVERAGE_RULE_KEYWORDS})
+    for hits, is_boundary_case in zip(automaton.batch_match(case_texts), case_rule_flags):
+        # 每个覆盖类别命中任一关键词即计数一次
+        for feature in keywords:
+            if feature in hits:
+                feature_counts[feature] += 1
+
+        # 特殊规则：如果测试用例包含"登录"、"注册"等核心功能词，视为功能验证
+        if "__core__" in hits:
+            feature_counts["功能验证"] += 1
+
+        # 特殊规则：如果测试用例描述了输入验证相关内容
+        if "__input__" in hits and "__validation__" in hits:
+            feature_counts["输入验证"] += 1
+
+        # 特殊规则：识别边界测试 - 基于内容关键词
+        if not is_boundary_case and "__boundary__" in hits and "__value__" in hits:  # 避免重复计数
+            feature_counts["边界测试"] += 1
+            # 细分为最大值或最小值测试
+            if "__max__" in hits:
+                feature_counts["最大值测试"] += 1
+            if "__min__" in hits:
+                feature_counts["最小值测试"] += 1
+
     # 根据功能计数调整覆盖状态
     # 如果计数大于0但评估结果未覆盖，设为"partial"
     for feature, count in feature_counts.items():
@@ -833,7 +889,7 @@ def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
     # 如果测试用例标题中包含类似"xx流程"、"xx功能"、"xx验证"等词语，提取为功能点
     features = {}
     for case in all_test_cases:
-        title = case.get("title", "")
+        title = case.title
         if not title:
             continue
 
@@ -866,9 +922,8 @@ def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
             features[feature]["count"] += 1
 
             # 尝试提取子功能点
-            steps = case.get("steps", [])
-            for step in steps:
-                if isinstance(step, str) and step:
+            for step in case.steps:
+                if step:
                     # 提取步骤中的关键动作
                     words = step.split("。")[0].split()
                     action = ""
@@ -1033,606 +1088,93 @@ def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
     if missing_features:
         coverage_description += "- 🔴 **未覆盖**：" + "、".join(missing_features) + "  \n"
     
+    # 记录诊断信息到日志文件，不输出到控制台
+    log(f"测试覆盖流程图: 测试用例总数: {len(all_test_cases)}，功能计数: {feature_counts}，覆盖状态: {coverage_status}")
+    log(f"测试覆盖流程图节点: 已覆盖: {covered_nodes}，部分覆盖: {partial_nodes}，未覆盖: {missing_nodes}")
+
+    return chart, coverage_description
+
+
+def fix_mermaid_chart_syntax(chart_text):
+    """修复Mermaid图表中的语法问题，特别是双引号相关问题"""
+    # 替换所有中文双引号为英文双引号
+    chart_text = chart_text.replace(""", "\"").replace(""", "\"")
+
+    # 修复节点定义中的双引号问题 - 确保使用英文双引号
+    chart_text = re.sub(r'(\w+)\["([^"]+)"\]', r'\1["\2"]', chart_text)
+
+    return chart_text
+
+
+def assemble_test_coverage_chart(chart_parts, evaluation_result=None):
+    """
+    将测试覆盖流程图主体与评测结果中的覆盖分析说明组装为完整的流程图
+
+    :param chart_parts: build_test_coverage_chart_parts返回的(流程图, 覆盖现状描述)
+    :param evaluation_result: 评测结果数据（可选）
+    :return: Mermaid格式的流程图
+    """
+    chart, coverage_description = chart_parts
     # 补充详细分析，根据评测结果中的描述
-    if evaluation_result and isinstance(evaluation_result, dict):
-        if "detailed_report" in evaluation_result and "test_coverage" in evaluation_result["detailed_report"]:
-            test_coverage = evaluation_result["detailed_report"]["test_coverage"]
-            if "reason" in test_coverage:
-                reason = test_coverage["reason"]
-                if reason:
-                    coverage_description += "\n**测试覆盖分析**：  \n" + reason + "  \n"
-    
+    coverage_description += render_coverage_reason(evaluation_result)
+
     # 将覆盖状态描述添加到测试覆盖图后面
     chart += "\n" + coverage_description + "\n"
-    
-    # 打印调试信息，帮助诊断问题
-    print(f"DEBUG: 测试用例总数: {len(all_test_cases)}")
-    print(f"DEBUG: 功能计数: {feature_counts}")
-    print(f"DEBUG: 覆盖状态: {coverage_status}")
-    print(f"DEBUG: 已覆盖节点: {covered_nodes}")
-    print(f"DEBUG: 部分覆盖节点: {partial_nodes}")
-    print(f"DEBUG: 未覆盖节点: {missing_nodes}")
-
-    # 修复图表语法中的双引号问题
-    def fix_mermaid_chart_syntax(chart_text):
-        """修复Mermaid图表中的语法问题，特别是双引号相关问题"""
-        # 替换所有中文双引号为英文双引号
-        chart_text = chart_text.replace(""", "\"").replace(""", "\"")
-        
-        # 修复节点定义中的双引号问题 - 确保使用英文双引号
-        chart_text = re.sub(r'(\w+)\["([^"]+)"\]', r'\1["\2"]', chart_text)
-        
-        return chart_text
 
     # 在返回图表前修复语法
-    chart = fix_mermaid_chart_syntax(chart)
-
-    return chart
+    return fix_mermaid_chart_syntax(chart)
 
 
-async def generate_markdown_report(session: aiohttp.ClientSession, evaluation_result, is_iteration=False, formatted_ai_cases=None, formatted_prev_cases=None):
+# 添加测试覆盖流程图生成函数
+def generate_test_coverage_flow_chart(test_cases, evaluation_result=None):
     """
-    生成Markdown格式的评测报告
+    根据测试用例内容动态生成测试覆盖流程图
 
-    :param session: aiohttp会话
-    :param evaluation_result: 评测结果
-    :param is_iteration: 是否启用迭代前后对比功能
-    :param formatted_ai_cases: 格式化后的AI测试用例（可选），用于迭代对比
-    :param formatted_prev_cases: 格式化后的上一次迭代测试用例（可选），用于迭代对比
-    :return: Markdown格式的报告
+    :param test_cases: 测试用例（TestCase列表或任意支持的格式）
+    :param evaluation_result: 评测结果数据（可选）
+    :return: Mermaid格式的流程图
     """
-    log("开始生成Markdown报告", important=True)
-    
-    # 在迭代模式下生成精简报告，只包含合并建议和改进建议
-    if is_iteration:
-        log("生成包含迭代对比分析的精简报告，只包含合并建议和改进建议", important=True)
-        log(f"参数检查: is_iteration={is_iteration}, formatted_ai_cases类型={type(formatted_ai_cases)}, formatted_prev_cases类型={type(formatted_prev_cases)}")
-        log(f"评测结果类型: {type(evaluation_result)}, 是字典: {isinstance(evaluation_result, dict)}")
-        if isinstance(evaluation_result, dict):
-            log(f"评测结果键: {', '.join(evaluation_result.keys())}")
-            if "iteration_comparison" in evaluation_result:
-                log("评测结果中包含迭代对比数据")
-            elif "iteration_comparison_data" in evaluation_result:
-                log("评测结果中包含迭代对比数据(data)")
-            else:
-                log("警告: 评测结果中不包含迭代对比数据", level="WARNING")
-        
-        # 确保日志记录按照正确的顺序执行
-        await asyncio.sleep(0.05)  # 添加小延迟，确保日志顺序
-        
-        if not isinstance(evaluation_result, dict):
-            return "# 迭代评测报告生成失败\n\n无法解析评测结果，请检查数据格式。"
-        
-        # 检查实际使用的评估框架
-        actual_framework = "Standard"
-        if "evaluation_framework" in evaluation_result:
-            actual_framework = evaluation_result["evaluation_framework"]
-        elif "committee_summary" in evaluation_result and "evaluation_framework" in evaluation_result["committee_summary"]:
-            actual_framework = evaluation_result["committee_summary"]["evaluation_framework"]
-        elif "committee_info" in evaluation_result and "evaluation_framework" in evaluation_result["committee_info"]:
-            actual_framework = evaluation_result["committee_info"]["evaluation_framework"]
-        
-        # 根据实际评估框架设置标志
-        is_using_collab_eval = actual_framework == "CollabEval"
-        
-        # 生成精简的迭代对比报告
-        simplified_report = "# 🔄 迭代前后对比分析报告\n\n"
-        
-        # 添加总体评分信息
-        if "evaluation_summary" in evaluation_result:
-            overall_score = evaluation_result["evaluation_summary"].get("overall_score", "N/A")
-            simplified_report += f"## 总体评分\n\n**总体评分**: {overall_score}/5.0\n\n"
-            
-            # 添加最终建议
-            final_suggestion = evaluation_result["evaluation_summary"].get("final_suggestion", "无建议")
-            
-            # 替换可能不正确的评测框架描述
-            if "【CollabEval三阶段综合评测】" in final_suggestion and not is_using_collab_eval:
-                final_suggestion = final_suggestion.replace("【CollabEval三阶段综合评测】", "【多评委综合评测】")
-            elif "【多评委综合评测】" in final_suggestion and is_using_collab_eval:
-                final_suggestion = final_suggestion.replace("【多评委综合评测】", "【CollabEval三阶段综合评测】")
-                
-            simplified_report += f"## 总体建议\n\n{final_suggestion}\n\n"
-        
-        # 添加合并建议部分
-        simplified_report += "## 🛠️ 合并建议\n\n"
-        
-        # 从evaluation_result中提取合并建议
-        merge_suggestions = []
-        if "duplicate_info" in evaluation_result and "merge_suggestions" in evaluation_result["duplicate_info"]:
-            merge_suggestions = evaluation_result["duplicate_info"]["merge_suggestions"]
-        elif "detailed_report" in evaluation_result and "duplicate_analysis" in evaluation_result["detailed_report"]:
-            if "merge_suggestions" in evaluation_result["detailed_report"]["duplicate_analysis"]:
-                merge_suggestions = evaluation_result["detailed_report"]["duplicate_analysis"]["merge_suggestions"]
-        
-        if merge_suggestions:
-            if isinstance(merge_suggestions, str):
-                # 如果merge_suggestions是字符串，直接添加
-                simplified_report += merge_suggestions + "\n\n"
-            elif isinstance(merge_suggestions, list) and len(merge_suggestions) > 0:
-                # 如果是列表，遍历添加每个合并建议
-                for i, suggestion in enumerate(merge_suggestions):
-                    simplified_report += f"### 合并建议 {i+1}\n\n"
-                    if isinstance(suggestion, dict):
-                        # 提取重要信息
-                        case_ids = suggestion.get("case_ids", [])
-                        case_ids_str = ", ".join(str(case_id) for case_id in case_ids[:5])
-                        if len(case_ids) > 5:
-                            case_ids_str += f"... 等{len(case_ids)}个"
-                            
-                        if "merged_case" in suggestion:
-                            merged_case = suggestion["merged_case"]
-                            simplified_report += f"- **涉及测试用例**: {case_ids_str}\n"
-                            simplified_report += f"- **合并后标题**: {merged_case.get('title', '无标题')}\n"
-                            
-                            # 添加步骤和预期结果摘要
-                            steps = merged_case.get("steps", [])
-                            if steps and len(steps) > 0:
-                                simplified_report += "- **合并后步骤**:\n"
-                                for step in steps[:3]:
-                                    simplified_report += f"  - {step}\n"
-                                if len(steps) > 3:
-                                    simplified_report += f"  - ...等{len(steps)}个步骤\n"
-                                    
-                            expected = merged_case.get("expected_results", [])
-                            if expected and len(expected) > 0:
-                                simplified_report += "- **合并后预期结果**:\n"
-                                for exp in expected[:3]:
-                                    simplified_report += f"  - {exp}\n"
-                                if len(expected) > 3:
-                                    simplified_report += f"  - ...等{len(expected)}个预期结果\n"
-                    else:
-                        simplified_report += f"{suggestion}\n"
-                    
-                    simplified_report += "\n"
-            else:
-                simplified_report += "未找到需要合并的测试用例。\n\n"
-        else:
-            simplified_report += "未找到需要合并的测试用例。\n\n"
-        
-        # 添加改进建议部分
-        simplified_report += "## 📝 改进建议\n\n"
-        
-        # 从迭代对比中提取改进建议
-        if "detailed_report" in evaluation_result and "iteration_comparison" in evaluation_result["detailed_report"]:
-            iteration_comparison = evaluation_result["detailed_report"]["iteration_comparison"]
-            
-            # 添加迭代对比分数
-            score = iteration_comparison.get("score", "N/A")
-            simplified_report += f"**迭代改进得分**: {score}/5.0\n\n"
-            
-            # 添加主要改进点
-            if "key_improvements" in iteration_comparison and iteration_comparison["key_improvements"]:
-                simplified_report += "### 主要改进点\n\n"
-                for improvement in iteration_comparison["key_improvements"]:
-                    simplified_report += f"✅ {improvement}\n"
-                simplified_report += "\n"
-                
-            # 添加主要退步点
-            if "key_regressions" in iteration_comparison and iteration_comparison["key_regressions"]:
-                simplified_report += "### 主要退步点\n\n"
-                for regression in iteration_comparison["key_regressions"]:
-                    simplified_report += f"⚠️ {regression}\n"
-                simplified_report += "\n"
-                
-            # 添加下一次迭代建议
-            if "next_iteration_suggestions" in iteration_comparison and iteration_comparison["next_iteration_suggestions"]:
-                simplified_report += "### 下一次迭代建议\n\n"
-                for suggestion in iteration_comparison["next_iteration_suggestions"]:
-                    simplified_report += f"📝 {suggestion}\n"
-                simplified_report += "\n"
-                
-            # 添加简要理由说明
-            if "reason" in iteration_comparison:
-                reason = iteration_comparison["reason"]
-                # 如果理由太长，只取前300个字符
-                if len(reason) > 300:
-                    simplified_report += f"### 简要分析\n\n{reason[:300]}...\n\n"
-                else:
-                    simplified_report += f"### 简要分析\n\n{reason}\n\n"
-        else:
-            # 提取一般性改进建议
-            if "evaluation_summary" in evaluation_result and "final_suggestion" in evaluation_result["evaluation_summary"]:
-                suggestion = evaluation_result["evaluation_summary"]["final_suggestion"]
-                simplified_report += f"{suggestion}\n\n"
-            else:
-                simplified_report += "无具体改进建议。\n\n"
-        
-        # 添加重复率信息
-        if "duplicate_info" in evaluation_result:
-            duplicate_info = evaluation_result["duplicate_info"]
-            ai_duplicate_rate = duplicate_info.get("ai_duplicate_rate", 0)
-            
-            # 如果迭代对比数据可用，添加重复率变化
-            if "iteration_comparison_data" in evaluation_result:
-                iteration_data = evaluation_result["iteration_comparison_data"]
-                prev_duplicate_rate = iteration_data.get("prev_duplicate_rate", 0)
-                duplicate_rate_change = ai_duplicate_rate - prev_duplicate_rate
-                
-                simplified_report += "## 📊 重复率分析\n\n"
-                simplified_report += f"- **当前迭代重复率**: {ai_duplicate_rate}%\n"
-                simplified_report += f"- **上一次迭代重复率**: {prev_duplicate_rate}%\n"
-                simplified_report += f"- **变化**: {'+' if duplicate_rate_change > 0 else ''}{duplicate_rate_change:.2f}个百分点\n\n"
-        
-        # 添加页脚
-        from datetime import datetime
-        # 确保使用实时时间
-        current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
-
-        # 构建页脚
-        footer = f"**生成时间：{current_time} • gogogo出发喽评估中心**"
-        
-        # 检查是否已有页脚，如果有则替换，否则添加
-        import re
-        footer_pattern = r"\*\*生成时间：(.*?)(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-        placeholder_patterns = [
-            r"\*\*生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心\*\*",
-            r"\*\*生成时间：DATETIME_PLACEHOLDER(?:•|·|\*) *gogogo出发喽评估中心\*\*",
-            r"\*\*生成时间：<.*?>(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-        ]
-        
-        # 先检查是否有明确的占位符
-        placeholder_found = False
-        for pattern in placeholder_patterns:
-            if re.search(pattern, simplified_report):
-                report = re.sub(pattern, footer, simplified_report)
-                placeholder_found = True
-                log("已替换基本报告页脚中的明确占位符为实时时间", important=True)
-                break
-        
-        # 如果没有找到明确的占位符，尝试使用通用模式
-        if not placeholder_found and re.search(footer_pattern, simplified_report):
-            report = re.sub(footer_pattern, footer, simplified_report)
-            log("已替换基本报告页脚中的日期为实时时间", important=True)
-        elif not placeholder_found:
-            # 如果没有找到页脚，则添加到报告末尾
-            report += f"\n\n---\n{footer}\n"
-            log("未找到页脚，已添加带有实时时间的页脚到基本报告", important=True)
-        
-        log(f"迭代对比精简报告生成完成，长度: {len(simplified_report)} 字符", important=True)
-        return simplified_report
-    
-    # 以下是原有的完整报告生成逻辑，仅在非迭代模式下执行
-    if is_iteration and formatted_prev_cases:
-        log("生成包含迭代对比分析的报告", important=True)
+    return assemble_test_coverage_chart(build_test_coverage_chart_parts(test_cases), evaluation_result)
 
-    # 确保日志记录按照正确的顺序执行
-    await asyncio.sleep(0.1)  # 添加小延迟，确保日志顺序
 
-    # 从评估结果中提取关键数据用于可视化
-    mermaid_data = {
-        "scores": {},
-        "duplicate_rates": {
-            "ai": 0,
-            "golden": 0
-        },
-        "duplicate_types": {},
-        "coverage": []
-    }
+def render_coverage_reason(evaluation_result):
+    """
+    渲染评测结果中的测试覆盖分析说明，附加在测试覆盖流程图之后
 
-    # 尝试从评估结果获取测试用例数据
-    ai_testcases = []
-    if isinstance(evaluation_result, dict):
-        # 尝试从不同可能的字段中提取测试用例
-        if "test_cases" in evaluation_result:
-            ai_testcases = evaluation_result.get("test_cases", [])
-        elif "detailed_report" in evaluation_result and "test_coverage" in evaluation_result["detailed_report"]:
-            if "analysis" in evaluation_result["detailed_report"]["test_coverage"]:
-                coverage_analysis = evaluation_result["detailed_report"]["test_coverage"]["analysis"]
-                # 尝试从覆盖分析中提取基本信息用于生成流程图
-                if "covered_features" in coverage_analysis:
-                    covered_features = coverage_analysis["covered_features"]
-                    # 将覆盖的功能点转换为简单的测试用例结构
-                    ai_testcases = [{"case_id": f"FEAT-{i + 1}", "title": feature}
-                                    for i, feature in enumerate(covered_features)]
+    :param evaluation_result: 评测结果
+    :return: Markdown文本，没有覆盖分析时返回空字符串
+    """
+    if evaluation_result and isinstance(evaluation_result, dict):
+        if "detailed_report" in evaluation_result and "test_coverage" in evaluation_result["detailed_report"]:
+            test_coverage = evaluation_result["detailed_report"]["test_coverage"]
+            if isinstance(test_coverage, dict) and test_coverage.get("reason"):
+                return "\n**测试覆盖分析**：  \n" + test_coverage["reason"] + "  \n"
+    return ""
 
-    # 如果ai_testcases为空，但有formatted_ai_cases，则使用formatted_ai_cases
-    if not ai_testcases and formatted_ai_cases:
-        log("使用formatted_ai_cases作为测试用例数据源", important=True)
-        # 处理不同格式的formatted_ai_cases
-        if isinstance(formatted_ai_cases, dict):
-            if "testcases" in formatted_ai_cases and "test_cases" in formatted_ai_cases["testcases"]:
-                ai_testcases = formatted_ai_cases["testcases"]["test_cases"]
-            elif "test_cases" in formatted_ai_cases:
-                ai_testcases = formatted_ai_cases["test_cases"]
-            # 处理原始格式的测试用例（如包含functional、security等分类的字典）
-            else:
-                log("检测到原始格式的测试用例，直接传递给覆盖率分析函数", important=True)
-                ai_testcases = formatted_ai_cases
 
-        log(f"提取的测试用例数据类型: {type(ai_testcases)}", important=True)
-        if isinstance(ai_testcases, dict):
-            log(f"测试用例字典包含的键: {', '.join(ai_testcases.keys())}", important=True)
-        elif isinstance(ai_testcases, list):
-            log(f"测试用例列表长度: {len(ai_testcases)}", important=True)
+def extract_report_testcases(formatted_ai_cases):
+    """
+    从格式化后的AI测试用例中提取用于覆盖率分析的测试用例
 
-    # 动态生成测试覆盖流程图
-    coverage_chart = generate_test_coverage_flow_chart(ai_testcases, evaluation_result)
+    :param formatted_ai_cases: 格式化后的AI测试用例
+    :return: TestCase列表
+    """
+    test_cases = normalize_test_cases(formatted_ai_cases)
+    log(f"使用formatted_ai_cases作为测试用例数据源，共{len(test_cases)}个测试用例", important=True)
+    return test_cases
 
-    # 如果启用迭代对比，生成迭代对比图表
-    iteration_comparison_chart = ""
-    if is_iteration and formatted_prev_cases and formatted_ai_cases and isinstance(evaluation_result, dict):
-        log("生成迭代对比图表", important=True)
-        
-        # 提取当前迭代和上一次迭代的测试用例
-        current_testcases = []
-        prev_testcases = []
 
-        # 提取当前迭代测试用例
-        if formatted_ai_cases:
-            if "testcases" in formatted_ai_cases and "test_cases" in formatted_ai_cases["testcases"]:
-                current_testcases = formatted_ai_cases["testcases"]["test_cases"]
+def render_duplicate_section(evaluation_result):
+    """
+    渲染重复测试用例分析部分（重复率、重复类型、模块分布和合并建议方案）
 
-        # 提取上一次迭代测试用例
-        if formatted_prev_cases:
-            if "testcases" in formatted_prev_cases and "test_cases" in formatted_prev_cases["testcases"]:
-                prev_testcases = formatted_prev_cases["testcases"]["test_cases"]
-
-        # 生成测试用例数量对比图表
-        count_chart = "## 📊 迭代测试用例数量对比\n\n"
-        prev_count = len(prev_testcases) if isinstance(prev_testcases, list) else 0
-        current_count = len(current_testcases) if isinstance(current_testcases, list) else 0
-        count_change = current_count - prev_count
-        count_change_percent = round((count_change / prev_count * 100) if prev_count > 0 else 0, 2)
-
-        # 生成数量对比条形图
-        count_chart += "```mermaid\nbar\n"
-        count_chart += "    title 测试用例数量变化\n"
-        count_chart += "    xlabel 迭代版本\n"
-        count_chart += "    ylabel 测试用例数量\n"
-        count_chart += f"    \"上一次迭代\" {prev_count}\n"
-        count_chart += f"    \"当前迭代\" {current_count}\n"
-        count_chart += "```\n\n"
-
-        # 添加数量变化描述
-        count_chart += f"### 数量变化分析\n\n"
-
-        if count_change > 0:
-            count_chart += f"📈 **增加**: +{count_change}个测试用例 (+{count_change_percent}%)\n\n"
-        elif count_change < 0:
-            count_chart += f"📉 **减少**: {count_change}个测试用例 ({count_change_percent}%)\n\n"
-        else:
-            count_chart += f"📊 **无变化**: 测试用例数量保持不变\n\n"
-
-        # 从评估结果中提取重复率数据
-        if "duplicate_info" in evaluation_result:
-            duplicate_info = evaluation_result["duplicate_info"]
-            current_duplicate_rate = duplicate_info.get("ai_duplicate_rate", 0)
-
-            # 从迭代对比数据中提取上一次迭代的重复率
-            prev_duplicate_rate = 0
-            if "iteration_comparison_data" in evaluation_result:
-                iteration_data = evaluation_result["iteration_comparison_data"]
-                prev_duplicate_rate = iteration_data.get("prev_duplicate_rate", 0)
-
-            # 计算重复率变化
-            duplicate_rate_change = current_duplicate_rate - prev_duplicate_rate
-
-            # 生成重复率对比图表
-            count_chart += "### 重复率变化\n\n"
-            count_chart += "```mermaid\nbar\n"
-            count_chart += "    title 测试用例重复率变化\n"
-            count_chart += "    xlabel 迭代版本\n"
-            count_chart += "    ylabel 重复率(%)\n"
-            count_chart += f"    \"上一次迭代\" {prev_duplicate_rate}\n"
-            count_chart += f"    \"当前迭代\" {current_duplicate_rate}\n"
-            count_chart += "```\n\n"
-
-            # 添加重复率变化描述
-            if duplicate_rate_change > 0:
-                count_chart += f"⚠️ **增加**: +{duplicate_rate_change:.2f}个百分点\n\n"
-            elif duplicate_rate_change < 0:
-                count_chart += f"✅ **减少**: {duplicate_rate_change:.2f}个百分点\n\n"
-            else:
-                count_chart += f"📊 **无变化**: 重复率保持不变\n\n"
-
-        # 从评估结果中提取迭代对比分析数据
-        if "detailed_report" in evaluation_result and "iteration_comparison" in evaluation_result["detailed_report"]:
-            iteration_comparison = evaluation_result["detailed_report"]["iteration_comparison"]
-
-            # 添加迭代改进得分
-            improvement_score = iteration_comparison.get("score", "N/A")
-            count_chart += f"### 迭代改进得分: {improvement_score}/5.0\n\n"
-
-            # 添加主要改进点
-            if "key_improvements" in iteration_comparison and iteration_comparison["key_improvements"]:
-                count_chart += "### 主要改进点\n\n"
-                for improvement in iteration_comparison["key_improvements"]:
-                    count_chart += f"✅ {improvement}\n"
-                count_chart += "\n"
-
-            # 添加主要退步点
-            if "key_regressions" in iteration_comparison and iteration_comparison["key_regressions"]:
-                count_chart += "### 主要退步点\n\n"
-                for regression in iteration_comparison["key_regressions"]:
-                    count_chart += f"⚠️ {regression}\n"
-                count_chart += "\n"
-
-            # 添加下一次迭代建议
-            if "next_iteration_suggestions" in iteration_comparison and iteration_comparison["next_iteration_suggestions"]:
-                count_chart += "### 下一次迭代建议\n\n"
-                for suggestion in iteration_comparison["next_iteration_suggestions"]:
-                    count_chart += f"📝 {suggestion}\n"
-                count_chart += "\n"
-
-            # 添加迭代对比理由
-            if "reason" in iteration_comparison:
-                count_chart += "### 详细分析\n\n"
-                count_chart += f"{iteration_comparison['reason']}\n\n"
-
-        # 将迭代对比图表添加到总的迭代对比图表中
-        iteration_comparison_chart = "# 🔄 迭代前后对比分析\n\n" + count_chart
-
-    # 添加测试覆盖状态的实际文字描述
-    # 从评估结果中提取覆盖度相关信息
-    coverage_status = {
-        "功能验证": "missing",
-        "异常处理": "missing",
-        "边界测试": "missing",
-        "输入验证": "missing",
-        "超时处理": "missing",
-        "安全检查": "missing",
-        "最大值测试": "missing",
-        "最小值测试": "missing"
-    }
-
-    # 如果有评估结果，从中提取信息增强覆盖分析
-    if evaluation_result and isinstance(evaluation_result, dict):
-        # 从评测结果中分析各维度分数，推断覆盖状态
-        detailed = evaluation_result.get("detailed_report", {})
-
-        # 功能覆盖度评分影响"功能验证"状态
-        try:
-            functional_score = float(detailed.get("functional_coverage", {}).get("score", 0))
-            if functional_score >= 4.0:
-                coverage_status["功能验证"] = "covered"
-            elif functional_score >= 3.0:
-                coverage_status["功能验证"] = "partial"
-
-            # 缺陷发现能力评分影响"异常处理"和"安全检查"状态
-            defect_score = float(detailed.get("defect_detection", {}).get("score", 0))
-            if defect_score >= 4.0:
-                coverage_status["异常处理"] = "covered"
-            elif defect_score >= 3.0:
-                coverage_status["异常处理"] = "partial"
-
-            # 测试覆盖度评分影响"边界测试"状态
-            test_coverage_score = float(detailed.get("test_coverage", {}).get("score", 0))
-            if test_coverage_score >= 4.0:
-                coverage_status["边界测试"] = "covered"
-            elif test_coverage_score >= 3.0:
-                coverage_status["边界测试"] = "partial"
-
-            # 安全与经济性评分影响"安全检查"状态
-            security_score = float(detailed.get("security_economy", {}).get("score", 0))
-            if security_score >= 4.0:
-                coverage_status["安全检查"] = "covered"
-            elif security_score >= 3.0:
-                coverage_status["安全检查"] = "partial"
-        except (ValueError, TypeError):
-            # 如果评分无法转换为浮点数，跳过
-            pass
-
-    # 提取功能计数
-    feature_counts = {}
-    for case in ai_testcases:
-        title = case.get("title", "").lower()
-        case_id = case.get("case_id", "")
-
-        # 基于测试用例标题和ID分析覆盖类型
-        if "功能" in title or "流程" in title or "FUNC" in case_id:
-            feature_counts["功能验证"] = feature_counts.get("功能验证", 0) + 1
-
-        if "异常" in title or "错误" in title or "EXCEP" in case_id:
-            feature_counts["异常处理"] = feature_counts.get("异常处理", 0) + 1
-
-        if "边界" in title or "极限" in title or "BOUND" in case_id:
-            feature_counts["边界测试"] = feature_counts.get("边界测试", 0) + 1
-
-        if "输入" in title and ("验证" in title or "校验" in title):
-            feature_counts["输入验证"] = feature_counts.get("输入验证", 0) + 1
-
-        if "超时" in title or "timeout" in title.lower():
-            feature_counts["超时处理"] = feature_counts.get("超时处理", 0) + 1
-
-        if "安全" in title or "攻击" in title or "漏洞" in title or "SEC" in case_id:
-            feature_counts["安全检查"] = feature_counts.get("安全检查", 0) + 1
-
-        if "最大" in title or "上限" in title or "max" in title.lower():
-            feature_counts["最大值测试"] = feature_counts.get("最大值测试", 0) + 1
-
-        if "最小" in title or "下限" in title or "min" in title.lower():
-            feature_counts["最小值测试"] = feature_counts.get("最小值测试", 0) + 1
-
-    # 根据功能计数调整覆盖状态
-    # 如果计数为0，保持为"missing"
-    # 如果计数大于0但评估结果未覆盖，设为"partial"
-    for feature, count in feature_counts.items():
-        if count > 0 and coverage_status[feature] == "missing":
-            coverage_status[feature] = "partial"
-
-    # 提取各维度评分
-    if isinstance(evaluation_result, dict) and "detailed_report" in evaluation_result:
-        detailed = evaluation_result["detailed_report"]
-
-        # 提取评分数据
-        for key, value in detailed.items():
-            if isinstance(value, dict) and "score" in value:
-                score_key = key.replace("_", " ").title()
-                try:
-                    score_value = float(value["score"])
-                    mermaid_data["scores"][score_key] = score_value
-                except (ValueError, TypeError):
-                    mermaid_data["scores"][score_key] = value["score"]
-
-    # 获取整体评分
-    overall_score = "N/A"
-    if isinstance(evaluation_result, dict) and "evaluation_summary" in evaluation_result:
-        overall_score = evaluation_result["evaluation_summary"].get("overall_score", "N/A")
-        mermaid_data["scores"]["Overall Score"] = overall_score
-
-    # 生成评分雷达图
-    # 由于Mermaid不支持真正的雷达图，改用Markdown表格和评分表示
-    radar_chart = f"## 📊 综合评分 (总体: {overall_score}/5.0)\n\n"
-    radar_chart += "| 评估维度 | 得分 | 评分可视化 |\n"
-    radar_chart += "|---------|------|------------|\n"
-
-    # 获取维度数据
-    dimension_scores = []
-    for name, score in mermaid_data["scores"].items():
-        if name != "Overall Score":  # 排除总体评分
-            try:
-                # 确保分数是数值
-                score_value = float(score) if isinstance(score, str) else score
-                # 将英文维度名称转为中文
-                chinese_name = name
-                if name == "Format Compliance":
-                    chinese_name = "格式合规性"
-                elif name == "Content Accuracy":
-                    chinese_name = "内容准确性"
-                elif name == "Test Coverage":
-                    chinese_name = "测试覆盖度"
-                elif name == "Functional Coverage":
-                    chinese_name = "功能覆盖度"
-                elif name == "Defect Detection":
-                    chinese_name = "缺陷发现能力"
-                elif name == "Engineering Efficiency":
-                    chinese_name = "工程效率"
-                elif name == "Semantic Quality":
-                    chinese_name = "语义质量"
-                elif name == "Security Economy":
-                    chinese_name = "安全与经济性"
-                elif name == "Duplicate Analysis":
-                    chinese_name = "重复性分析"
-                dimension_scores.append((chinese_name, score_value))
-            except (ValueError, TypeError):
-                # 如果无法转换为数值，跳过
-                continue
-
-    # 按评分从高到低排序
-    dimension_scores.sort(key=lambda x: x[1], reverse=True)
-
-    # 添加数据行
-    if dimension_scores:
-        for name, score in dimension_scores:
-            # 生成评分可视化
-            score_int = int(score)
-            stars = "★" * score_int + "☆" * (5 - score_int)
-            radar_chart += f"| {name} | {score} | {stars} |\n"
-
-    radar_chart += "\n"
-
-    # 添加专门的评分图
-    radar_chart += "```mermaid\npie\n    title 各维度评分分布\n"
-    for name, score in dimension_scores:
-        short_name = name.replace("Coverage", "覆盖").replace("Analysis", "分析")
-        radar_chart += f"    \"{short_name}\" : {score}\n"
-    radar_chart += "```\n\n"
-
-    # 提取重复率和重复类型数据
-    ai_duplicate_rate = 0
-    golden_duplicate_rate = 0
-    duplicate_types = {}
+    :param evaluation_result: 评测结果，至少包含重复信息字段（见DUPLICATE_RESULT_FIELDS）
+    :return: Markdown文本
+    """
+    # 提取重复率和重复类型数据
+    ai_duplicate_rate = 0
+    golden_duplicate_rate = 0
+    duplicate_types = {}
 
     # 尝试从评估结果中找到重复率数据
     if "duplicate_types" in evaluation_result:
@@ -1645,8 +1187,6 @@ async def generate_markdown_report(session: aiohttp.ClientSession, evaluation_re
             if duplicate_info:
                 ai_duplicate_rate = duplicate_info.get("ai_duplicate_rate", 0)
                 golden_duplicate_rate = duplicate_info.get("golden_duplicate_rate", 0)
-                mermaid_data["duplicate_rates"]["ai"] = float(ai_duplicate_rate)
-                mermaid_data["duplicate_rates"]["golden"] = float(golden_duplicate_rate)
         except:
             # 如果提取失败，保留初始化值
             pass
@@ -1660,10 +1200,8 @@ async def generate_markdown_report(session: aiohttp.ClientSession, evaluation_re
                 golden_rates = re.findall(r"黄金[^0-9]*([0-9.]+)%", dup_analysis["reason"])
 
                 if ai_rates:
-                    mermaid_data["duplicate_rates"]["ai"] = float(ai_rates[0])
                     ai_duplicate_rate = float(ai_rates[0])
                 if golden_rates:
-                    mermaid_data["duplicate_rates"]["golden"] = float(golden_rates[0])
                     golden_duplicate_rate = float(golden_rates[0])
 
     # 尝试从评估结果中提取重复类型数据
@@ -1680,8 +1218,6 @@ async def generate_markdown_report(session: aiohttp.ClientSession, evaluation_re
                     "预期结果重复": duplicate_types.get("expected_results", 0),
                     "混合重复": duplicate_types.get("mixed", 0)
                 }
-                # 保存到mermaid_data
-                mermaid_data["duplicate_types"] = dup_types
         except:
             pass
     else:
@@ -1698,8 +1234,6 @@ async def generate_markdown_report(session: aiohttp.ClientSession, evaluation_re
             if steps_dup:
                 dup_types["步骤重复"] = int(steps_dup[0])
 
-            # 保存到mermaid_data
-            mermaid_data["duplicate_types"] = dup_types
 
     # 合并生成重复测试用例分析图
     duplicate_combined_chart = "## 🔄 重复测试用例分析\n\n"
@@ -1824,20 +1358,392 @@ async def generate_markdown_report(session: aiohttp.ClientSession, evaluation_re
             # 去除特殊字符，避免Mermaid语法错误
             title = title.replace("(", "").replace(")", "").replace("[", "").replace("]", "")
 
-            # 确保节点ID不含特殊字符
-            node_id = ''.join(c for c in str(node_id) if c.isalnum() or c in ['-', '_'])
+            # 确保节点ID不含特殊字符
+            node_id = ''.join(c for c in str(node_id) if c.isalnum() or c in ['-', '_'])
+
+            # 添加到图表中
+            merge_chart += f"    {node_id}[\"{case_ids}\"] --> Merge{index}[\"{title}\"]\n"
+
+        merge_chart += "```\n\n"
+    else:
+        # 没有合并建议或合并建议格式不适合生成图表
+        merge_chart = "### 🛠️ 合并建议方案\n\n"
+        merge_chart += "> 当前测试用例不需要合并或没有提供合并建议信息\n\n"
+
+    # 将合并建议图添加到重复分析后面
+    duplicate_combined_chart += merge_chart
+
+    return duplicate_combined_chart
+
+
+def precompute_report_artifacts(formatted_ai_cases, duplicate_fields):
+    """
+    预先生成报告中与评委评分无关的部分，在等待评委评测期间于后台线程中执行
+
+    :param formatted_ai_cases: 格式化后的AI测试用例
+    :param duplicate_fields: 重复信息字段，即evaluate_test_cases传给on_duplicates_ready的内容
+    :return: 预生成的报告部分，供generate_markdown_report的report_artifacts参数使用
+    """
+    start_time = time.time()
+    artifacts = {
+        "duplicate_fields": duplicate_fields,
+        "duplicates": render_duplicate_section(duplicate_fields)
+    }
+    test_cases = extract_report_testcases(formatted_ai_cases) if formatted_ai_cases else []
+    if test_cases:
+        # 覆盖分析说明依赖评委评测结果，此处只生成流程图主体，报告生成时再组装
+        artifacts["coverage_chart_parts"] = build_test_coverage_chart_parts(test_cases)
+    log(f"报告预生成完成，耗时: {time.time() - start_time:.2f}秒", important=True)
+    return artifacts
+
+
+def render_iteration_report(evaluation_result):
+    """
+    根据评测结果渲染迭代对比精简报告，只包含总体评分、合并建议和改进建议，不调用LLM
+
+    :param evaluation_result: 评测结果
+    :return: Markdown格式的报告
+    """
+    if not isinstance(evaluation_result, dict):
+        return "# 迭代评测报告生成失败\n\n无法解析评测结果，请检查数据格式。"
+
+    # 根据实际评估框架设置标志
+    is_using_collab_eval = get_evaluation_framework(evaluation_result) == "CollabEval"
+
+    # 生成精简的迭代对比报告
+    simplified_report = "# 🔄 迭代前后对比分析报告\n\n"
+
+    # 添加总体评分信息
+    if "evaluation_summary" in evaluation_result:
+        overall_score = evaluation_result["evaluation_summary"].get("overall_score", "N/A")
+        simplified_report += f"## 总体评分\n\n**总体评分**: {overall_score}/5.0\n\n"
+
+        # 添加最终建议
+        final_suggestion = evaluation_result["evaluation_summary"].get("final_suggestion", "无建议")
+
+        # 替换可能不正确的评测框架描述
+        if "【CollabEval三阶段综合评测】" in final_suggestion and not is_using_collab_eval:
+            final_suggestion = final_suggestion.replace("【CollabEval三阶段综合评测】", "【多评委综合评测】")
+        elif "【多评委综合评测】" in final_suggestion and is_using_collab_eval:
+            final_suggestion = final_suggestion.replace("【多评委综合评测】", "【CollabEval三阶段综合评测】")
+
+        simplified_report += f"## 总体建议\n\n{final_suggestion}\n\n"
+
+    # 添加合并建议部分
+    simplified_report += "## 🛠️ 合并建议\n\n"
+
+    # 从evaluation_result中提取合并建议
+    merge_suggestions = []
+    if "duplicate_info" in evaluation_result and "merge_suggestions" in evaluation_result["duplicate_info"]:
+        merge_suggestions = evaluation_result["duplicate_info"]["merge_suggestions"]
+    elif "detailed_report" in evaluation_result and "duplicate_analysis" in evaluation_result["detailed_report"]:
+        if "merge_suggestions" in evaluation_result["detailed_report"]["duplicate_analysis"]:
+            merge_suggestions = evaluation_result["detailed_report"]["duplicate_analysis"]["merge_suggestions"]
+
+    if merge_suggestions:
+        if isinstance(merge_suggestions, str):
+            # 如果merge_suggestions是字符串，直接添加
+            simplified_report += merge_suggestions + "\n\n"
+        elif isinstance(merge_suggestions, list) and len(merge_suggestions) > 0:
+            # 如果是列表，遍历添加每个合并建议
+            for i, suggestion in enumerate(merge_suggestions):
+                simplified_report += f"### 合并建议 {i+1}\n\n"
+                if isinstance(suggestion, dict):
+                    # 提取重要信息
+                    case_ids = suggestion.get("case_ids", [])
+                    case_ids_str = ", ".join(str(case_id) for case_id in case_ids[:5])
+                    if len(case_ids) > 5:
+                        case_ids_str += f"... 等{len(case_ids)}个"
+
+                    if "merged_case" in suggestion:
+                        merged_case = suggestion["merged_case"]
+                        simplified_report += f"- **涉及测试用例**: {case_ids_str}\n"
+                        simplified_report += f"- **合并后标题**: {merged_case.get('title', '无标题')}\n"
+
+                        # 添加步骤和预期结果摘要
+                        steps = merged_case.get("steps", [])
+                        if steps and len(steps) > 0:
+                            simplified_report += "- **合并后步骤**:\n"
+                            for step in steps[:3]:
+                                simplified_report += f"  - {step}\n"
+                            if len(steps) > 3:
+                                simplified_report += f"  - ...等{len(steps)}个步骤\n"
+
+                        expected = merged_case.get("expected_results", [])
+                        if expected and len(expected) > 0:
+                            simplified_report += "- **合并后预期结果**:\n"
+                            for exp in expected[:3]:
+                                simplified_report += f"  - {exp}\n"
+                            if len(expected) > 3:
+                                simplified_report += f"  - ...等{len(expected)}个预期结果\n"
+                else:
+                    simplified_report += f"{suggestion}\n"
+
+                simplified_report += "\n"
+        else:
+            simplified_report += "未找到需要合并的测试用例。\n\n"
+    else:
+        simplified_report += "未找到需要合并的测试用例。\n\n"
+
+    # 添加改进建议部分
+    simplified_report += "## 📝 改进建议\n\n"
+
+    # 从迭代对比中提取改进建议
+    if "detailed_report" in evaluation_result and "iteration_comparison" in evaluation_result["detailed_report"]:
+        iteration_comparison = evaluation_result["detailed_report"]["iteration_comparison"]
+
+        # 添加迭代对比分数
+        score = iteration_comparison.get("score", "N/A")
+        simplified_report += f"**迭代改进得分**: {score}/5.0\n\n"
+
+        # 添加主要改进点
+        if "key_improvements" in iteration_comparison and iteration_comparison["key_improvements"]:
+            simplified_report += "### 主要改进点\n\n"
+            for improvement in iteration_comparison["key_improvements"]:
+                simplified_report += f"✅ {improvement}\n"
+            simplified_report += "\n"
+
+        # 添加主要退步点
+        if "key_regressions" in iteration_comparison and iteration_comparison["key_regressions"]:
+            simplified_report += "### 主要退步点\n\n"
+            for regression in iteration_comparison["key_regressions"]:
+                simplified_report += f"⚠️ {regression}\n"
+            simplified_report += "\n"
+
+        # 添加下一次迭代建议
+        if "next_iteration_suggestions" in iteration_comparison and iteration_comparison["next_iteration_suggestions"]:
+            simplified_report += "### 下一次迭代建议\n\n"
+            for suggestion in iteration_comparison["next_iteration_suggestions"]:
+                simplified_report += f"📝 {suggestion}\n"
+            simplified_report += "\n"
+
+        # 添加简要理由说明
+        if "reason" in iteration_comparison:
+            reason = iteration_comparison["reason"]
+            # 如果理由太长，只取前300个字符
+            if len(reason) > 300:
+                simplified_report += f"### 简要分析\n\n{reason[:300]}...\n\n"
+            else:
+                simplified_report += f"### 简要分析\n\n{reason}\n\n"
+    else:
+        # 提取一般性改进建议
+        if "evaluation_summary" in evaluation_result and "final_suggestion" in evaluation_result["evaluation_summary"]:
+            suggestion = evaluation_result["evaluation_summary"]["final_suggestion"]
+            simplified_report += f"{suggestion}\n\n"
+        else:
+            simplified_report += "无具体改进建议。\n\n"
+
+    # 添加重复率信息
+    if "duplicate_info" in evaluation_result:
+        duplicate_info = evaluation_result["duplicate_info"]
+        ai_duplicate_rate = duplicate_info.get("ai_duplicate_rate", 0)
+
+        # 如果迭代对比数据可用，添加重复率变化
+        if "iteration_comparison_data" in evaluation_result:
+            iteration_data = evaluation_result["iteration_comparison_data"]
+            prev_duplicate_rate = iteration_data.get("prev_duplicate_rate", 0)
+            duplicate_rate_change = ai_duplicate_rate - prev_duplicate_rate
+
+            simplified_report += "## 📊 重复率分析\n\n"
+            simplified_report += f"- **当前迭代重复率**: {ai_duplicate_rate}%\n"
+            simplified_report += f"- **上一次迭代重复率**: {prev_duplicate_rate}%\n"
+            simplified_report += f"- **变化**: {'+' if duplicate_rate_change > 0 else ''}{duplicate_rate_change:.2f}个百分点\n\n"
+
+    # 添加页脚
+    from datetime import datetime
+    # 确保使用实时时间
+    current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
+
+    # 构建页脚
+    footer = f"**生成时间：{current_time} • gogogo出发喽评估中心**"
+
+    # 检查是否已有页脚，如果有则替换，否则添加
+    footer_pattern = r"\*\*生成时间：(.*?)(?:•|·|\*) *gogogo出发喽评估中心\*\*"
+    placeholder_patterns = [
+        r"\*\*生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心\*\*",
+        r"\*\*生成时间：DATETIME_PLACEHOLDER(?:•|·|\*) *gogogo出发喽评估中心\*\*",
+        r"\*\*生成时间：<.*?>(?:•|·|\*) *gogogo出发喽评估中心\*\*"
+    ]
+
+    # 先检查是否有明确的占位符
+    placeholder_found = False
+    for pattern in placeholder_patterns:
+        if re.search(pattern, simplified_report):
+            simplified_report = re.sub(pattern, footer, simplified_report)
+            placeholder_found = True
+            log("已替换基本报告页脚中的明确占位符为实时时间", important=True)
+            break
+
+    # 如果没有找到明确的占位符，尝试使用通用模式
+    if not placeholder_found and re.search(footer_pattern, simplified_report):
+        simplified_report = re.sub(footer_pattern, footer, simplified_report)
+        log("已替换基本报告页脚中的日期为实时时间", important=True)
+    elif not placeholder_found:
+        # 如果没有找到页脚，则添加到报告末尾
+        simplified_report += f"\n\n---\n{footer}\n"
+        log("未找到页脚，已添加带有实时时间的页脚到基本报告", important=True)
+
+    log(f"迭代对比精简报告生成完成，长度: {len(simplified_report)} 字符", important=True)
+    return simplified_report
+
+
+def build_report_sections(evaluation_result, formatted_ai_cases=None, formatted_prev_cases=None, report_artifacts=None,
+                          is_iteration=False):
+    """
+    在本地渲染报告中的数据部分（评估框架、评分、迭代对比、重复分析、覆盖流程图和委员会信息），不调用LLM
+
+    :param evaluation_result: 评测结果
+    :param formatted_ai_cases: 格式化后的AI测试用例（可选），用于生成覆盖流程图
+    :param formatted_prev_cases: 格式化后的上一次迭代测试用例（可选），用于迭代对比
+    :param report_artifacts: precompute_report_artifacts预先生成的报告部分（可选）
+    :param is_iteration: 是否生成迭代对比图表
+    :return: 报告部分，供generate_basic_report的sections参数使用
+    """
+    # 尝试从评估结果获取测试用例数据
+    ai_testcases = []
+    if isinstance(evaluation_result, dict):
+        # 尝试从不同可能的字段中提取测试用例
+        if "test_cases" in evaluation_result:
+            ai_testcases = evaluation_result.get("test_cases", [])
+        elif "detailed_report" in evaluation_result and "test_coverage" in evaluation_result["detailed_report"]:
+            if "analysis" in evaluation_result["detailed_report"]["test_coverage"]:
+                coverage_analysis = evaluation_result["detailed_report"]["test_coverage"]["analysis"]
+                # 尝试从覆盖分析中提取基本信息用于生成流程图
+                if "covered_features" in coverage_analysis:
+                    covered_features = coverage_analysis["covered_features"]
+                    # 将覆盖的功能点转换为简单的测试用例结构
+                    ai_testcases = [{"case_id": f"FEAT-{i + 1}", "title": feature}
+                                    for i, feature in enumerate(covered_features)]
+
+    # 如果ai_testcases为空，但有formatted_ai_cases，则使用formatted_ai_cases
+    coverage_chart = None
+    if not ai_testcases and formatted_ai_cases:
+        if report_artifacts and report_artifacts.get("coverage_chart_parts"):
+            # 覆盖流程图主体已在评委评测期间根据formatted_ai_cases预先生成，只需补充评测结果中的覆盖分析
+            log("使用预先生成的测试覆盖流程图", important=True)
+            coverage_chart = assemble_test_coverage_chart(report_artifacts["coverage_chart_parts"], evaluation_result)
+        else:
+            ai_testcases = extract_report_testcases(formatted_ai_cases)
+    ai_testcases = normalize_test_cases(ai_testcases)
+
+    # 动态生成测试覆盖流程图
+    if coverage_chart is None:
+        coverage_chart = generate_test_coverage_flow_chart(ai_testcases, evaluation_result)
+
+    # 如果启用迭代对比，生成迭代对比图表
+    iteration_comparison_chart = ""
+    if is_iteration and formatted_prev_cases and formatted_ai_cases and isinstance(evaluation_result, dict):
+        log("生成迭代对比图表", important=True)
+        
+        # 提取当前迭代和上一次迭代的测试用例
+        current_testcases = normalize_test_cases(formatted_ai_cases)
+        prev_testcases = normalize_test_cases(formatted_prev_cases)
+
+        # 生成测试用例数量对比图表
+        count_chart = "## 📊 迭代测试用例数量对比\n\n"
+        prev_count = len(prev_testcases)
+        current_count = len(current_testcases)
+        count_change = current_count - prev_count
+        count_change_percent = round((count_change / prev_count * 100) if prev_count > 0 else 0, 2)
+
+        # 生成数量对比条形图
+        count_chart += "```mermaid\nbar\n"
+        count_chart += "    title 测试用例数量变化\n"
+        count_chart += "    xlabel 迭代版本\n"
+        count_chart += "    ylabel 测试用例数量\n"
+        count_chart += f"    \"上一次迭代\" {prev_count}\n"
+        count_chart += f"    \"当前迭代\" {current_count}\n"
+        count_chart += "```\n\n"
+
+        # 添加数量变化描述
+        count_chart += f"### 数量变化分析\n\n"
+
+        if count_change > 0:
+            count_chart += f"📈 **增加**: +{count_change}个测试用例 (+{count_change_percent}%)\n\n"
+        elif count_change < 0:
+            count_chart += f"📉 **减少**: {count_change}个测试用例 ({count_change_percent}%)\n\n"
+        else:
+            count_chart += f"📊 **无变化**: 测试用例数量保持不变\n\n"
+
+        # 从评估结果中提取重复率数据
+        if "duplicate_info" in evaluation_result:
+            duplicate_info = evaluation_result["duplicate_info"]
+            current_duplicate_rate = duplicate_info.get("ai_duplicate_rate", 0)
+
+            # 从迭代对比数据中提取上一次迭代的重复率
+            prev_duplicate_rate = 0
+            if "iteration_comparison_data" in evaluation_result:
+                iteration_data = evaluation_result["iteration_comparison_data"]
+                prev_duplicate_rate = iteration_data.get("prev_duplicate_rate", 0)
+
+            # 计算重复率变化
+            duplicate_rate_change = current_duplicate_rate - prev_duplicate_rate
+
+            # 生成重复率对比图表
+            count_chart += "### 重复率变化\n\n"
+            count_chart += "```mermaid\nbar\n"
+            count_chart += "    title 测试用例重复率变化\n"
+            count_chart += "    xlabel 迭代版本\n"
+            count_chart += "    ylabel 重复率(%)\n"
+            count_chart += f"    \"上一次迭代\" {prev_duplicate_rate}\n"
+            count_chart += f"    \"当前迭代\" {current_duplicate_rate}\n"
+            count_chart += "```\n\n"
+
+            # 添加重复率变化描述
+            if duplicate_rate_change > 0:
+                count_chart += f"⚠️ **增加**: +{duplicate_rate_change:.2f}个百分点\n\n"
+            elif duplicate_rate_change < 0:
+                count_chart += f"✅ **减少**: {duplicate_rate_change:.2f}个百分点\n\n"
+            else:
+                count_chart += f"📊 **无变化**: 重复率保持不变\n\n"
+
+        # 从评估结果中提取迭代对比分析数据
+        if "detailed_report" in evaluation_result and "iteration_comparison" in evaluation_result["detailed_report"]:
+            iteration_comparison = evaluation_result["detailed_report"]["iteration_comparison"]
+
+            # 添加迭代改进得分
+            improvement_score = iteration_comparison.get("score", "N/A")
+            count_chart += f"### 迭代改进得分: {improvement_score}/5.0\n\n"
+
+            # 添加主要改进点
+            if "key_improvements" in iteration_comparison and iteration_comparison["key_improvements"]:
+                count_chart += "### 主要改进点\n\n"
+                for improvement in iteration_comparison["key_improvements"]:
+                    count_chart += f"✅ {improvement}\n"
+                count_chart += "\n"
+
+            # 添加主要退步点
+            if "key_regressions" in iteration_comparison and iteration_comparison["key_regressions"]:
+                count_chart += "### 主要退步点\n\n"
+                for regression in iteration_comparison["key_regressions"]:
+                    count_chart += f"⚠️ {regression}\n"
+                count_chart += "\n"
+
+            # 添加下一次迭代建议
+            if "next_iteration_suggestions" in iteration_comparison and iteration_comparison["next_iteration_suggestions"]:
+                count_chart += "### 下一次迭代建议\n\n"
+                for suggestion in iteration_comparison["next_iteration_suggestions"]:
+                    count_chart += f"📝 {suggestion}\n"
+                count_chart += "\n"
+
+            # 添加迭代对比理由
+            if "reason" in iteration_comparison:
+                count_chart += "### 详细分析\n\n"
+                count_chart += f"{iteration_comparison['reason']}\n\n"
+
+        # 将迭代对比图表添加到总的迭代对比图表中
+        iteration_comparison_chart = "# 🔄 迭代前后对比分析\n\n" + count_chart
 
-            # 添加到图表中
-            merge_chart += f"    {node_id}[\"{case_ids}\"] --> Merge{index}[\"{title}\"]\n"
+    # 生成评分表格和评分分布图
+    radar_chart = render_score_section(evaluation_result)
 
-        merge_chart += "```\n\n"
+    # 生成重复测试用例分析和合并建议部分，重复信息与评委评测期间预先生成时一致则直接使用
+    if report_artifacts and report_artifacts.get("duplicates") and \
+            report_artifacts.get("duplicate_fields") == {key: evaluation_result.get(key) for key in DUPLICATE_RESULT_FIELDS}:
+        log("使用预先生成的重复测试用例分析", important=True)
+        duplicate_combined_chart = report_artifacts["duplicates"]
     else:
-        # 没有合并建议或合并建议格式不适合生成图表
-        merge_chart = "### 🛠️ 合并建议方案\n\n"
-        merge_chart += "> 当前测试用例不需要合并或没有提供合并建议信息\n\n"
-
-    # 将合并建议图添加到重复分析后面
-    duplicate_combined_chart += merge_chart
+        duplicate_combined_chart = render_duplicate_section(evaluation_result)
 
     # 添加树状评估框架图模板
     evaluation_framework_chart = """## 🌳 测试用例评估框架
@@ -1874,17 +1780,8 @@ graph TD
 
     # 检查是否是CollabEval结果
     is_collab_eval = evaluation_result.get("collab_eval_result", False)
-    # 检查实际使用的评估框架
-    actual_framework = "Standard"
-    if "evaluation_framework" in evaluation_result:
-        actual_framework = evaluation_result["evaluation_framework"]
-    elif "committee_summary" in evaluation_result and "evaluation_framework" in evaluation_result["committee_summary"]:
-        actual_framework = evaluation_result["committee_summary"]["evaluation_framework"]
-    elif "committee_info" in evaluation_result and "evaluation_framework" in evaluation_result["committee_info"]:
-        actual_framework = evaluation_result["committee_info"]["evaluation_framework"]
-
     # 根据实际评估框架设置标志
-    is_using_collab_eval = actual_framework == "CollabEval"
+    is_using_collab_eval = get_evaluation_framework(evaluation_result) == "CollabEval"
     collab_eval_info = ""
 
     if is_collab_eval and "committee_summary" in evaluation_result:
@@ -1967,554 +1864,593 @@ graph TD
                         collab_eval_info += f"{i+1}. {area}\n"
                     collab_eval_info += "\n"
 
-    # 在提示中说明使用更新的图表语法
-    prompt = f"""
-# 任务
-基于提供的测试用例评估结果，生成一份详细的Markdown格式评估报告，包含Mermaid图表可视化关键数据。
-"""
+    return {
+        "framework": evaluation_framework_chart,
+        "scores": radar_chart,
+        "iteration": iteration_comparison_chart,
+        "duplicates": duplicate_combined_chart,
+        "coverage": coverage_chart,
+        "committee": collab_eval_info if evaluation_result.get("collab_eval_result", False) else ""
+    }
 
-    # 如果是迭代对比，增加迭代对比任务说明
+
+async def generate_markdown_report(session: aiohttp.ClientSession, evaluation_result, is_iteration=False, formatted_ai_cases=None, formatted_prev_cases=None,
+                                   report_artifacts=None):
+    """
+    生成Markdown格式的评测报告
+
+    :param session: aiohttp会话
+    :param evaluation_result: 评测结果
+    :param is_iteration: 是否启用迭代前后对比功能
+    :param formatted_ai_cases: 格式化后的AI测试用例（可选），用于迭代对比
+    :param formatted_prev_cases: 格式化后的上一次迭代测试用例（可选），用于迭代对比
+    :param report_artifacts: precompute_report_artifacts预先生成的报告部分（可选）
+    :return: Markdown格式的报告
+    """
+    log("开始生成Markdown报告", important=True)
+    
+    # 在迭代模式下生成精简报告，只包含合并建议和改进建议
+    if is_iteration:
+        log("生成包含迭代对比分析的精简报告，只包含合并建议和改进建议", important=True)
+        log(f"参数检查: is_iteration={is_iteration}, formatted_ai_cases类型={type(formatted_ai_cases)}, formatted_prev_cases类型={type(formatted_prev_cases)}")
+        log(f"评测结果类型: {type(evaluation_result)}, 是字典: {isinstance(evaluation_result, dict)}")
+        if isinstance(evaluation_result, dict):
+            log(f"评测结果键: {', '.join(evaluation_result.keys())}")
+            if "iteration_comparison" in evaluation_result:
+                log("评测结果中包含迭代对比数据")
+            elif "iteration_comparison_data" in evaluation_result:
+                log("评测结果中包含迭代对比数据(data)")
+            else:
+                log("警告: 评测结果中不包含迭代对比数据", level="WARNING")
+        
+        # 确保日志记录按照正确的顺序执行
+        await asyncio.sleep(0.05)  # 添加小延迟，确保日志顺序
+        
+        return render_iteration_report(evaluation_result)
+    
+    # 以下是原有的完整报告生成逻辑，仅在非迭代模式下执行
     if is_iteration and formatted_prev_cases:
-        prompt += f"""
-# 迭代对比任务
-本次评估包含迭代前后对比分析，需要重点关注测试用例在本次迭代中的质量改进情况，并提出针对性建议。
-"""
+        log("生成包含迭代对比分析的报告", important=True)
 
-    prompt += f"""
-# 评估结果
-```json
-{json.dumps(evaluation_result, ensure_ascii=False, indent=2)}
-```
+    # 确保日志记录按照正确的顺序执行
+    await asyncio.sleep(0.1)  # 添加小延迟，确保日志顺序
 
-# 报告要求
-请生成一份专业、详细的Markdown格式评估报告，包含以下内容：
+    report_sections = build_report_sections(evaluation_result, formatted_ai_cases, formatted_prev_cases,
+                                            report_artifacts, is_iteration=is_iteration)
 
-1. **报告标题与摘要**：{("【CollabEval三阶段评测】" if is_using_collab_eval else "【多评委综合评测】") if evaluation_result.get("is_committee_result", False) else ""}简要总结评估结果"""
+    # 报告主体由本地模板渲染，LLM只并发撰写各叙述段落
+    narratives = await generate_report_narratives(session, evaluation_result,
+                                                  is_iteration=bool(is_iteration and formatted_prev_cases))
+    return generate_basic_report(evaluation_result, sections=report_sections, narratives=narratives)
 
-    # 如果是迭代对比，在标题中添加迭代对比标识
-    if is_iteration:
-        prompt = prompt.replace("简要总结评估结果", "【迭代对比分析】简要总结评估结果")
 
-    prompt += f"""
-2. **评估指标与方法**：说明使用的评估标准和方法，并包含评估框架图
-{evaluation_framework_chart}
-3. **综合评分**：使用提供的表格和饼图展示各维度评分
-{radar_chart}"""
+def render_case_matching_section(evaluation_result, max_items=10):
+    """
+    渲染用例对应关系分析部分（黄金标准用例覆盖率、AI用例对应率及未匹配用例）
 
-    # 如果启用迭代对比，在适当位置添加迭代对比图表
-    if is_iteration and iteration_comparison_chart:
-        prompt += f"""
-4. **迭代前后对比**：分析当前迭代与上一次迭代的测试用例质量变化
-{iteration_comparison_chart}"""
-
-        # 调整后续内容的序号
-        prompt += """
-5. **详细分析**：
-   - 功能覆盖度分析
-   - 缺陷发现能力分析
-   - 工程效率分析
-   - 语义质量分析
-   - 安全与经济性分析
-6. **重复测试用例分析**：
-   - 重复测试用例比率与类型的综合分析
-   - 测试用例合并建议
-"""
+    :param evaluation_result: 评测结果，需包含case_matching字段
+    :param max_items: 未覆盖/未对应用例最多列出的数量
+    :return: Markdown文本，没有匹配结果时返回空字符串
+    """
+    case_matching = evaluation_result.get("case_matching") if isinstance(evaluation_result, dict) else None
+    if not isinstance(case_matching, dict) or not case_matching.get("golden_count"):
+        return ""
+
+    section = "## 🎯 用例对应关系分析\n\n"
+    section += "| 指标 | 数值 |\n|------|------|\n"
+    section += f"| 黄金标准用例覆盖率 | {case_matching['coverage_ratio'] * 100:.1f}% " \
+               f"({case_matching['covered_count']}/{case_matching['golden_count']}) |\n"
+    section += f"| AI用例对应率 | {case_matching['precision_ratio'] * 100:.1f}% " \
+               f"({case_matching['matched_count']}/{case_matching['ai_count']}) |\n\n"
+
+    uncovered = [item for item in case_matching.get("golden_coverage", []) if not item.get("covered")]
+    if uncovered:
+        section += "**未被AI用例覆盖的黄金标准用例：**\n\n"
+        section += "| 黄金用例ID | 标题 | 最相近的AI用例 | 相似度 |\n|-----------|------|---------------|--------|\n"
+        for item in sorted(uncovered, key=lambda x: x.get("score", 0))[:max_items]:
+            section += f"| {item['case_id']} | {item['title']} | {item.get('best_ai_case_id') or '-'} | {item.get('score', 0)} |\n"
+        if len(uncovered) > max_items:
+            section += f"\n> 共{len(uncovered)}个黄金标准用例未被覆盖，仅列出相似度最低的{max_items}个\n"
+        section += "\n"
+
+    unmatched = [item for item in case_matching.get("ai_precision", []) if not item.get("matched")]
+    if unmatched:
+        section += "**未对应任何黄金标准用例的AI用例（可能是新增场景或无关用例）：**\n\n"
+        section += "| AI用例ID | 标题 | 相似度 |\n|---------|------|--------|\n"
+        for item in sorted(unmatched, key=lambda x: x.get("score", 0))[:max_items]:
+            section += f"| {item['case_id']} | {item['title']} | {item.get('score', 0)} |\n"
+        if len(unmatched) > max_items:
+            section += f"\n> 共{len(unmatched)}个AI用例未对应到黄金标准用例，仅列出相似度最低的{max_items}个\n"
+        section += "\n"
+
+    return section
+
+
+def render_sampling_section(evaluation_result):
+    """
+    渲染抽样评测的不确定性说明（样本构成和各维度得分的置信区间）
+
+    :param evaluation_result: 评测结果，需包含sampling字段
+    :return: Markdown文本，非抽样评测时返回空字符串
+    """
+    sampling = evaluation_result.get("sampling") if isinstance(evaluation_result, dict) else None
+    if not isinstance(sampling, dict):
+        return ""
+
+    confidence = f"{sampling['confidence'] * 100:.0f}%"
+    if sampling.get("interval_method") == "bootstrap":
+        interval_note = f"置信区间由各组得分的{sampling['bootstrap_rounds']}次自助法重抽样估计"
+    elif sampling.get("interval_method") == "t":
+        interval_note = "样本组较少，置信区间按各组得分的t分布估计"
     else:
-        prompt += """
-4. **详细分析**：
-   - 功能覆盖度分析
-   - 缺陷发现能力分析
-   - 工程效率分析
-   - 语义质量分析
-   - 安全与经济性分析
-5. **重复测试用例分析**：
-   - 重复测试用例比率与类型的综合分析
-   - 测试用例合并建议
-"""
+        interval_note = "成功评测的样本组不足2组，无法估计置信区间"
+    section = "## 🎲 抽样评测与不确定性\n\n"
+    section += f"> 本报告的评分基于分层抽样：从{sampling['population']}个AI测试用例（{sampling['cluster_count']}个重复用例簇）中" \
+               f"按类别分层抽取{sampling['sample_size']}个，分为{sampling['replicates']}组独立评测" \
+               f"（成功{sampling['successful_replicates']}组），得分为各组均值，" \
+               f"{interval_note}。重复率和用例对应关系为全量统计结果。\n\n"
+
+    overall = sampling.get("overall_score")
+    if overall:
+        section += f"**总体评分**: {overall['mean']}（{confidence}置信区间 {format_interval(overall)}）\n\n"
+
+    if sampling.get("dimensions"):
+        section += f"| 评估维度 | 估计得分 | {confidence}置信区间 | 组间标准差 |\n"
+        section += "|---------|---------|------------|-----------|\n"
+        for key, estimate in sampling["dimensions"].items():
+            name = DIMENSION_CHINESE_NAMES.get(key, key.replace("_", " ").title())
+            section += f"| {name} | {estimate['mean']} | {format_interval(estimate)} | {estimate['std']} |\n"
+        section += "\n"
+
+    if sampling.get("strata"):
+        section += "| 类别 | 用例数 | 重复用例簇 | 抽样数 |\n|------|-------|-----------|-------|\n"
+        for name, stratum in sampling["strata"].items():
+            section += f"| {name} | {stratum['population']} | {stratum['clusters']} | {stratum['sampled']} |\n"
+        section += "\n"
+
+    if sampling["successful_replicates"] < 2:
+        section += "> ⚠️ 成功评测的样本组少于2组，无法估计得分的不确定性，请谨慎参考评分。\n\n"
+    return section
+
+
+def render_score_section(evaluation_result):
+    """
+    渲染综合评分部分（评分表格和评分分布饼图）
 
-    # 添加重复测试用例分析图表
-    prompt += f"""
-{duplicate_combined_chart}
-"""
+    :param evaluation_result: 评测结果
+    :return: Markdown文本
+    """
+    overall_score = "N/A"
+    if isinstance(evaluation_result, dict) and "evaluation_summary" in evaluation_result:
+        overall_score = evaluation_result["evaluation_summary"].get("overall_score", "N/A")
 
-    # 继续添加覆盖率分析等后续内容
-    if is_iteration:
-        prompt += f"""
-7. **测试覆盖率分析**：
-   - 关键流程和功能覆盖情况
-{coverage_chart}
-"""
-    else:
-        prompt += f"""
-6. **测试覆盖率分析**：
-   - 关键流程和功能覆盖情况
-{coverage_chart}
-"""
+    # 由于Mermaid不支持真正的雷达图，改用Markdown表格和评分表示
+    radar_chart = f"## 📊 综合评分 (总体: {overall_score}/5.0)\n\n"
+    radar_chart += "| 评估维度 | 得分 | 评分可视化 |\n"
+    radar_chart += "|---------|------|------------|\n"
 
-    # 如果是CollabEval结果，添加CollabEval信息部分
-    if evaluation_result.get("collab_eval_result", False):
-        if is_iteration:
-            prompt += f"""
-8. **{("CollabEval三阶段评测" if is_using_collab_eval else "标准多评委评测")}**：
-   - {("三阶段评测流程" if is_using_collab_eval else "评测流程")}
-   - 评委评分情况与争议维度
-   - {("主席决策理由" if is_using_collab_eval else "结果聚合机制")}
-{collab_eval_info}
-"""
-        else:
-            prompt += f"""
-7. **{("CollabEval三阶段评测" if is_using_collab_eval else "标准多评委评测")}**：
-   - {("三阶段评测流程" if is_using_collab_eval else "评测流程")}
-   - 评委评分情况与争议维度
-   - {("主席决策理由" if is_using_collab_eval else "结果聚合机制")}
-{collab_eval_info}
-"""
-    else:
-        if is_iteration:
-            prompt += """
-8. **优缺点对比**：列出AI生成测试用例相对于人工标准的优势和劣势
-"""
-        else:
-            prompt += """
-7. **优缺点对比**：列出AI生成测试用例相对于人工标准的优势和劣势
-"""
+    # 提取各维度评分，并将英文维度名称转为中文
+    dimension_scores = []
+    if isinstance(evaluation_result, dict) and isinstance(evaluation_result.get("detailed_report"), dict):
+        for key, value in evaluation_result["detailed_report"].items():
+            if isinstance(value, dict) and "score" in value:
+                try:
+                    score_value = float(value["score"])
+                except (ValueError, TypeError):
+                    # 如果无法转换为数值，跳过
+                    continue
+                name = DIMENSION_CHINESE_NAMES.get(key, key.replace("_", " ").title())
+                dimension_scores.append((name, score_value))
 
-    # 添加通用部分，根据是否启用迭代对比调整序号
-    if is_iteration:
-        prompt += """
-9. **改进建议**：给出3-5条具体可行的改进AI生成测试用例的建议，包括如何减少重复
-10. **综合结论**：总结AI测试用例的整体表现和适用场景
-"""
-    else:
-        prompt += """
-8. **改进建议**：给出3-5条具体可行的改进AI生成测试用例的建议，包括如何减少重复
-9. **综合结论**：总结AI测试用例的整体表现和适用场景
-"""
+    # 按评分从高到低排序
+    dimension_scores.sort(key=lambda x: x[1], reverse=True)
 
-    # 美化要求
-    prompt += """
-# 美化要求
-1. 请使用更丰富的Markdown格式元素来增强报告的可读性，如适当使用分隔线、引用块、表情符号等
-2. 为关键数据添加醒目的标记，如重要的评分、显著的差异等
-3. 在评分部分使用中文维度名称和星号评分可视化
-4. 为报告添加简洁美观的页眉页脚
-5. 添加有针对性的改进建议，使结论更具操作性
-
-# 特别说明
-- 请不要在报告中添加"模块分布"相关的饼图，只保留文字描述形式的模块分布信息
-- 不要使用饼图展示测试用例类型分布
-"""
+    for name, score in dimension_scores:
+        # 生成评分可视化
+        score_int = max(0, min(5, int(score)))
+        stars = "★" * score_int + "☆" * (5 - score_int)
+        radar_chart += f"| {name} | {score} | {stars} |\n"
 
-    # 如果是CollabEval结果，添加额外说明
-    if is_collab_eval:
-        prompt += """
-- 在CollabEval部分，突出显示三阶段评测的过程和价值，特别强调辩论协作如何提高评测质量
-- 在描述评委评分时，关注分歧点以及主席是如何处理这些分歧的
-"""
+    radar_chart += "\n"
 
-    prompt += """
-# 页脚格式
-请在报告末尾添加一行页脚，使用以下格式（不要替换DATETIME_PLACEHOLDER，保持原样）：
-**生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心**
+    # 添加专门的评分图
+    radar_chart += "```mermaid\npie\n    title 各维度评分分布\n"
+    for name, score in dimension_scores:
+        radar_chart += f"    \"{name}\" : {score}\n"
+    radar_chart += "```\n\n"
+    return radar_chart
 
-系统会自动将DATETIME_PLACEHOLDER替换为实时时间，请不要自行填写任何日期时间。
 
-请确保使用上面提供的图表模板，这些模板已经包含了从评估结果中提取的实际数据。
-这些图表使用的是较为通用的Mermaid语法，确保与大多数Markdown查看器兼容。
-你可以根据评估结果调整图表内容，但要保持```mermaid语法格式。
-直接以# 开头的标题开始你的报告，不要在开头写"markdown"，不要包含其他解释。
-"""
+def build_report_narrative_context(evaluation_result, is_iteration=False):
+    """
+    从评测结果中提取撰写叙述段落所需的精简上下文，只序列化一次供各段落共用
 
-    system_prompt = "你是一位精通软件测试和技术文档写作的专家。请根据评估结果生成一份专业、清晰的Markdown格式报告，并使用Mermaid图表可视化关键数据。请直接保留并使用我提供的评分表格格式，不要修改其结构。请直接输出Markdown格式，不要尝试输出JSON。严格禁止在文档开头添加'markdown'这个词，直接以'# '开头的标题开始。不要在内容外包含```或```markdown标记，完全避免使用代码块，但保留提供的Mermaid图表语法。"
+    :param evaluation_result: 评测结果
+    :param is_iteration: 是否包含迭代对比分析
+    :return: 紧凑的JSON字符串
+    """
+    context = {}
+    if not isinstance(evaluation_result, dict):
+        return "{}"
+
+    summary = evaluation_result.get("evaluation_summary", {})
+    if isinstance(summary, dict):
+        context["overall_score"] = summary.get("overall_score", "N/A")
+        context["final_suggestion"] = str(summary.get("final_suggestion", ""))[:REPORT_NARRATIVE_REASON_CHARS]
+
+    dimensions = {}
+    detailed = evaluation_result.get("detailed_report", {})
+    if isinstance(detailed, dict):
+        for key, value in detailed.items():
+            if not isinstance(value, dict) or "score" not in value:
+                continue
+            dimension = {
+                "score": value.get("score"),
+                "reason": str(value.get("reason", ""))[:REPORT_NARRATIVE_REASON_CHARS]
+            }
+            analysis = value.get("analysis")
+            if isinstance(analysis, dict):
+                for field in ("covered_features", "missed_features_or_scenarios", "scenario_types_found"):
+                    if isinstance(analysis.get(field), list):
+                        dimension[field] = analysis[field][:10]
+            dimensions[DIMENSION_CHINESE_NAMES.get(key, key)] = dimension
+    context["dimensions"] = dimensions
+
+    duplicate_info = evaluation_result.get("duplicate_info", {})
+    if isinstance(duplicate_info, dict):
+        context["duplicate"] = {
+            "ai_duplicate_rate": duplicate_info.get("ai_duplicate_rate", 0),
+            "golden_duplicate_rate": duplicate_info.get("golden_duplicate_rate", 0),
+            "duplicate_types": evaluation_result.get("duplicate_types", {}),
+            "merge_suggestion_count": len(duplicate_info.get("merge_suggestions", []) or [])
+        }
 
-    # 使用较高的temperature值，生成更有创意的报告
-    max_retries = 3
-    for retry_count in range(max_retries):
-        try:
-            # 添加随机请求ID，确保每次请求都是全新的
-            request_id = f"report-{int(time.time())}-{retry_count}-{uuid.uuid4().hex[:8]}"
-            log(f"生成报告请求ID: {request_id}")
-            
-            result = await async_call_llm(
-                session,
-                prompt,
-                system_prompt,
-                temperature=LLM_TEMPERATURE_REPORT,  # 使用配置中的较高temperature值
-                use_cache=False,  # 禁用缓存，确保每次评测都是全新的
-                retries=2  # 设置内部重试次数
-            )
-
-            if not result:
-                log_error(f"生成Markdown报告失败 (尝试 {retry_count + 1}/{max_retries})", important=True)
-                if retry_count < max_retries - 1:
-                    log(f"等待2秒后重试...", important=True)
-                    await asyncio.sleep(2)
-                    continue
-                else:
-                    return "# 评测报告生成失败\n\n无法生成详细报告，请检查评测结果或重试。"
-
-            # 检查返回的结果类型
-            if isinstance(result, dict):
-                # 如果返回的是字典，检查是否包含文本内容
-                if "text" in result and result["text"]:
-                    # 返回文本内容
-                    markdown_content = result["text"]
-                    log("成功生成Markdown报告", important=True)
-                    # 添加小延迟，确保日志顺序
-                    await asyncio.sleep(0.1)
-
-                    # 在返回前替换占位符
-                    from datetime import datetime
-                    current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
-                    footer = f"**生成时间：{current_time} • gogogo出发喽评估中心**"
-
-                    # 替换占位符
-                    import re
-                    placeholder_patterns = [
-                        r"\*\*生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心\*\*",
-                        r"\*\*生成时间：DATETIME_PLACEHOLDER(?:•|·|\*) *gogogo出发喽评估中心\*\*",
-                        r"\*\*生成时间：<.*?>(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-                    ]
-
-                    placeholder_found = False
-                    for pattern in placeholder_patterns:
-                        if re.search(pattern, markdown_content):
-                            markdown_content = re.sub(pattern, footer, markdown_content)
-                            placeholder_found = True
-                            log("已替换markdown_content中的占位符为实时时间", important=True)
-                            break
+    sampling = evaluation_result.get("sampling")
+    if isinstance(sampling, dict):
+        context["sampling"] = {
+            "population": sampling.get("population"),
+            "sample_size": sampling.get("sample_size"),
+            "confidence": sampling.get("confidence"),
+            "overall_score": sampling.get("overall_score"),
+            "dimension_intervals": {
+                DIMENSION_CHINESE_NAMES.get(key, key): [estimate["ci_low"], estimate["ci_high"]]
+                for key, estimate in (sampling.get("dimensions") or {}).items()
+            }
+        }
 
-                    if not placeholder_found:
-                        log("markdown_content中未找到占位符，将检查是否有其他格式的时间戳", level="WARNING")
-
-                    return markdown_content
-                elif "error" in result:
-                    # 返回错误信息
-                    log_error(f"生成Markdown报告失败: {result['error']}")
-                    if retry_count < max_retries - 1:
-                        log(f"等待2秒后重试...", important=True)
-                        await asyncio.sleep(2)
-                        continue
-                    else:
-                        return f"# 评测报告生成失败\n\n{result['error']}"
-                elif "api_response" in result:
-                    # API返回了原始响应但无法解析
-                    log_error(f"API返回的响应无法解析为有效内容 (尝试 {retry_count + 1}/{max_retries})")
-                    if retry_count < max_retries - 1:
-                        log(f"等待2秒后重试...", important=True)
-                        await asyncio.sleep(2)
-                        continue
-                    else:
-                        # 尝试生成一个基本报告
-                        return generate_basic_report(evaluation_result)
-                else:
-                    # 尝试将字典转换为Markdown
-                    try:
-                        md_content = "# AI测试用例评估报告\n\n"
-
-                        if "evaluation_summary" in result:
-                            summary = result["evaluation_summary"]
-                            md_content += f"## 摘要\n\n"
-                            md_content += f"**总体评分**: {summary.get('overall_score', 'N/A')}\n\n"
-                            md_content += f"**改进建议**: {summary.get('final_suggestion', 'N/A')}\n\n"
-
-                        if "detailed_report" in result:
-                            md_content += f"## 详细评估\n\n"
-                            detailed = result["detailed_report"]
-
-                            for key, value in detailed.items():
-                                if isinstance(value, dict) and "score" in value:
-                                    md_content += f"### {key.replace('_', ' ').title()}\n\n"
-                                    md_content += f"**评分**: {value.get('score', 'N/A')}\n\n"
-                                    md_content += f"**理由**: {value.get('reason', 'N/A')}\n\n"
-
-                                    if key == "duplicate_analysis" and "merge_suggestions" in value:
-                                        md_content += f"**合并建议**: {value.get('merge_suggestions', 'N/A')}\n\n"
-
-                                    if "analysis" in value and isinstance(value["analysis"], dict):
-                                        analysis = value["analysis"]
-                                        if "covered_features" in analysis:
-                                            md_content += "**覆盖的功能**:\n\n"
-                                            for feature in analysis["covered_features"]:
-                                                md_content += f"- {feature}\n"
-                                            md_content += "\n"
-
-                                        if "missed_features_or_scenarios" in analysis:
-                                            md_content += "**未覆盖的功能或场景**:\n\n"
-                                            for feature in analysis["missed_features_or_scenarios"]:
-                                                md_content += f"- {feature}\n"
-                                            md_content += "\n"
-
-                                        if "scenario_types_found" in analysis:
-                                            md_content += "**发现的场景类型**:\n\n"
-                                            for scenario in analysis["scenario_types_found"]:
-                                                md_content += f"- {scenario}\n"
-                                            md_content += "\n"
-
-                        log("成功从字典生成Markdown报告", important=True)
-                        # 添加小延迟，确保日志顺序
-                        await asyncio.sleep(0.1)
-
-                        # 在返回前替换占位符
-                        from datetime import datetime
-                        current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
-                        footer = f"**生成时间：{current_time} • gogogo出发喽评估中心**"
-
-                        # 替换占位符
-                        import re
-                        placeholder_patterns = [
-                            r"\*\*生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心\*\*",
-                            r"\*\*生成时间：DATETIME_PLACEHOLDER(?:•|·|\*) *gogogo出发喽评估中心\*\*",
-                            r"\*\*生成时间：<.*?>(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-                        ]
-
-                        placeholder_found = False
-                        for pattern in placeholder_patterns:
-                            if re.search(pattern, md_content):
-                                md_content = re.sub(pattern, footer, md_content)
-                                placeholder_found = True
-                                log("已替换md_content中的占位符为实时时间", important=True)
-                                break
-
-                        if not placeholder_found:
-                            log("md_content中未找到占位符，将检查是否有其他格式的时间戳", level="WARNING")
-
-                        return md_content
-                    except Exception as e:
-                        log_error(f"从字典生成Markdown报告失败: {e}")
-                        if retry_count < max_retries - 1:
-                            log(f"等待2秒后重试...", important=True)
-                            await asyncio.sleep(2)
-                            continue
-                        else:
-                            # 如果无法转换为Markdown，直接返回JSON字符串
-                            return f"# 评测报告\n\n```\n{json.dumps(result, ensure_ascii=False, indent=2)}\n```"
-
-            # 如果返回的不是字典，而是字符串，直接返回
-            if isinstance(result, str):
-                log("LLM直接返回了Markdown文本", important=True)
-                # 添加小延迟，确保日志顺序
-                await asyncio.sleep(0.1)
-                # 删除Markdown文本顶部的"markdown"前缀
-                if result.strip().startswith("markdown"):
-                    result = result.strip().replace("markdown", "", 1).strip()
-                    log("已删除Markdown文本顶部的'markdown'前缀", important=True)
-                    # 添加小延迟，确保日志顺序
-                    await asyncio.sleep(0.1)
-
-                # 在返回前替换占位符
-                from datetime import datetime
-                current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
-                footer = f"**生成时间：{current_time} • gogogo出发喽评估中心**"
-
-                # 替换占位符
-                import re
-                placeholder_patterns = [
-                    r"\*\*生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心\*\*",
-                    r"\*\*生成时间：DATETIME_PLACEHOLDER(?:•|·|\*) *gogogo出发喽评估中心\*\*",
-                    r"\*\*生成时间：<.*?>(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-                ]
-
-                placeholder_found = False
-                for pattern in placeholder_patterns:
-                    if re.search(pattern, result):
-                        result = re.sub(pattern, footer, result)
-                        placeholder_found = True
-                        log("已替换LLM生成报告中的占位符为实时时间", important=True)
-                        break
-
-                if not placeholder_found:
-                    log("LLM生成报告中未找到占位符，将检查是否有其他格式的时间戳", level="WARNING")
-
-                return result
-
-            # 尝试使用extract_valid_json函数从结果中提取有效的JSON
-            try:
-                log("尝试从LLM响应中提取有效的JSON", important=True)
-                extracted_json = extract_valid_json(str(result))
-                if extracted_json:
-                    log("成功从LLM响应中提取有效的JSON", important=True)
-
-                    # 将提取的JSON转换为Markdown
-                    try:
-                        md_content = "# AI测试用例评估报告\n\n"
-
-                        if "evaluation_summary" in extracted_json:
-                            summary = extracted_json["evaluation_summary"]
-                            md_content += f"## 摘要\n\n"
-                            md_content += f"**总体评分**: {summary.get('overall_score', 'N/A')}\n\n"
-                            md_content += f"**改进建议**: {summary.get('final_suggestion', 'N/A')}\n\n"
-
-                        if "detailed_report" in extracted_json:
-                            md_content += f"## 详细评估\n\n"
-                            detailed = extracted_json["detailed_report"]
-
-                            for key, value in detailed.items():
-                                if isinstance(value, dict) and "score" in value:
-                                    md_content += f"### {key.replace('_', ' ').title()}\n\n"
-                                    md_content += f"**评分**: {value.get('score', 'N/A')}\n\n"
-                                    md_content += f"**理由**: {value.get('reason', 'N/A')}\n\n"
-
-                                    if key == "duplicate_analysis" and "merge_suggestions" in value:
-                                        md_content += f"**合并建议**: {value.get('merge_suggestions', 'N/A')}\n\n"
-
-                                    if "analysis" in value and isinstance(value["analysis"], dict):
-                                        analysis = value["analysis"]
-                                        if "covered_features" in analysis:
-                                            md_content += "**覆盖的功能**:\n\n"
-                                            for feature in analysis["covered_features"]:
-                                                md_content += f"- {feature}\n"
-                                            md_content += "\n"
-
-                                        if "missed_features_or_scenarios" in analysis:
-                                            md_content += "**未覆盖的功能或场景**:\n\n"
-                                            for feature in analysis["missed_features_or_scenarios"]:
-                                                md_content += f"- {feature}\n"
-                                            md_content += "\n"
-
-                                        if "scenario_types_found" in analysis:
-                                            md_content += "**发现的场景类型**:\n\n"
-                                            for scenario in analysis["scenario_types_found"]:
-                                                md_content += f"- {scenario}\n"
-                                            md_content += "\n"
-
-                        log("成功从提取的JSON生成Markdown报告", important=True)
-
-                        # 在返回前替换占位符
-                        from datetime import datetime
-                        current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
-                        footer = f"**生成时间：{current_time} • gogogo出发喽评估中心**"
-
-                        # 替换占位符
-                        import re
-                        placeholder_patterns = [
-                            r"\*\*生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心\*\*",
-                            r"\*\*生成时间：DATETIME_PLACEHOLDER(?:•|·|\*) *gogogo出发喽评估中心\*\*",
-                            r"\*\*生成时间：<.*?>(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-                        ]
-
-                        placeholder_found = False
-                        for pattern in placeholder_patterns:
-                            if re.search(pattern, md_content):
-                                md_content = re.sub(pattern, footer, md_content)
-                                placeholder_found = True
-                                log("已替换提取JSON生成的md_content中的占位符为实时时间", important=True)
-                                break
-
-                        if not placeholder_found:
-                            log("提取JSON生成的md_content中未找到占位符", level="WARNING")
-
-                        return md_content
-                    except Exception as e:
-                        log_error(f"从提取的JSON生成Markdown报告失败: {e}")
-                else:
-                    log_error("从LLM响应中提取有效的JSON失败")
-            except Exception as e:
-                log_error(f"尝试提取JSON时出错: {e}")
+    case_matching = evaluation_result.get("case_matching")
+    if isinstance(case_matching, dict):
+        context["case_matching"] = {
+            "golden_coverage_ratio": case_matching.get("coverage_ratio", 0),
+            "ai_precision_ratio": case_matching.get("precision_ratio", 0),
+            "uncovered_golden_cases": [item["title"] for item in case_matching.get("golden_coverage", [])
+                                       if not item.get("covered")][:10]
+        }
 
-            if retry_count < max_retries - 1:
-                log(f"等待2秒后重试...", important=True)
-                await asyncio.sleep(2)
-            else:
-                # 最后一次尝试失败，生成基本报告
-                return generate_basic_report(evaluation_result)
-        except Exception as e:
-            log_error(f"生成报告时发生异常 (尝试 {retry_count + 1}/{max_retries}): {str(e)}")
-            if retry_count < max_retries - 1:
-                log(f"等待2秒后重试...", important=True)
-                await asyncio.sleep(2)
-            else:
-                # 最后一次尝试失败，生成基本报告
-                return generate_basic_report(evaluation_result)
+    if is_iteration and isinstance(detailed, dict) and isinstance(detailed.get("iteration_comparison"), dict):
+        iteration_comparison = detailed["iteration_comparison"]
+        context["iteration_comparison"] = {
+            "score": iteration_comparison.get("score"),
+            "key_improvements": iteration_comparison.get("key_improvements", [])[:5],
+            "key_regressions": iteration_comparison.get("key_regressions", [])[:5]
+        }
+
+    if evaluation_result.get("is_committee_result", False):
+        context["evaluation_framework"] = get_evaluation_framework(evaluation_result)
 
-    # 如果所有重试都失败，返回一个基本报告
-    return generate_basic_report(evaluation_result)
+    return json.dumps(context, ensure_ascii=False, separators=(",", ":"))
 
 
-def generate_basic_report(evaluation_result):
+def get_evaluation_framework(evaluation_result):
     """
-    当LLM生成报告失败时，生成一个基本的报告
-    
+    获取评测结果实际使用的评估框架
+
     :param evaluation_result: 评测结果
-    :return: 基本的Markdown报告
+    :return: "CollabEval"或"Standard"
     """
-    try:
-        # 提取评分
-        overall_score = "N/A"
-        if isinstance(evaluation_result, dict) and "evaluation_summary" in evaluation_result:
-            overall_score = evaluation_result["evaluation_summary"].get("overall_score", "N/A")
-        
-        # 提取建议
-        final_suggestion = "无法获取建议"
-        if isinstance(evaluation_result, dict) and "evaluation_summary" in evaluation_result:
-            final_suggestion = evaluation_result["evaluation_summary"].get("final_suggestion", "无法获取建议")
-        
-        # 构建基本报告
-        report = f"""# AI测试用例评估报告
+    if "evaluation_framework" in evaluation_result:
+        return evaluation_result["evaluation_framework"]
+    for key in ("committee_summary", "committee_info"):
+        if isinstance(evaluation_result.get(key), dict) and "evaluation_framework" in evaluation_result[key]:
+            return evaluation_result[key]["evaluation_framework"]
+    return "Standard"
 
-## 摘要
 
-**总体评分**: {overall_score}/5.0
+async def generate_report_narrative(session: aiohttp.ClientSession, section_key, context_text):
+    """
+    调用LLM撰写单个叙述段落
+
+    :param session: aiohttp会话
+    :param section_key: 段落键，见REPORT_NARRATIVE_SECTIONS
+    :param context_text: build_report_narrative_context生成的评测上下文
+    :return: 段落文本，失败则返回None
+    """
+    title, requirement = REPORT_NARRATIVE_SECTIONS[section_key]
+    prompt = f"""
+# 任务
+根据测试用例评估结果，为评估报告撰写"{title}"段落。
 
-**改进建议**: {final_suggestion}
+# 评估结果摘要
+```json
+{context_text}
+```
 
-## 详细评估
+# 写作要求
+{requirement}。不超过{REPORT_NARRATIVE_MAX_CHARS}字，不要包含标题、表格或图表，只使用评估结果中给出的数据。
 
+# 输出格式
+```json
+{{"narrative": "段落内容（可使用Markdown列表和加粗）"}}
+```
 """
-        
-        # 添加详细评估
-        if isinstance(evaluation_result, dict) and "detailed_report" in evaluation_result:
-            detailed = evaluation_result["detailed_report"]
-            for key, value in detailed.items():
-                if isinstance(value, dict) and "score" in value:
-                    report += f"### {key.replace('_', ' ').title()}\n\n"
-                    report += f"**评分**: {value.get('score', 'N/A')}\n\n"
-                    report += f"**理由**: {value.get('reason', 'N/A')}\n\n"
-        
-        # 添加页脚
+    system_prompt = "你是一位精通软件测试和技术文档写作的专家。请只输出指定的JSON格式。"
+
+    result = await async_call_llm(
+        session,
+        prompt,
+        system_prompt,
+        temperature=LLM_TEMPERATURE_REPORT,
+        use_cache=False,
+        retries=2
+    )
+
+    narrative = None
+    if isinstance(result, dict):
+        narrative = result.get("narrative") or result.get("text")
+    elif isinstance(result, str):
+        narrative = result
+
+    if not isinstance(narrative, str) or not narrative.strip():
+        return None
+    return narrative.strip()
+
+
+def build_fallback_narrative(section_key, evaluation_result):
+    """
+    LLM撰写失败时，根据评测结果直接生成叙述段落
+
+    :param section_key: 段落键，见REPORT_NARRATIVE_SECTIONS
+    :param evaluation_result: 评测结果
+    :return: 段落文本
+    """
+    if not isinstance(evaluation_result, dict):
+        return "无法解析评测结果。"
+
+    summary = evaluation_result.get("evaluation_summary", {})
+    if not isinstance(summary, dict):
+        summary = {}
+    overall_score = summary.get("overall_score", "N/A")
+    final_suggestion = summary.get("final_suggestion", "无法获取建议")
+
+    # 各维度（中文名称, 评分, 理由）
+    dimensions = []
+    detailed = evaluation_result.get("detailed_report", {})
+    if isinstance(detailed, dict):
+        for key, value in detailed.items():
+            if isinstance(value, dict) and "score" in value:
+                try:
+                    score = float(value["score"])
+                except (ValueError, TypeError):
+                    score = None
+                dimensions.append((DIMENSION_CHINESE_NAMES.get(key, key.replace("_", " ").title()),
+                                   score, str(value.get("reason", "N/A"))))
+
+    if section_key == "summary":
+        sampling_overall = (evaluation_result.get("sampling") or {}).get("overall_score")
+        if sampling_overall:
+            return f"本次评估基于分层抽样，总体评分估计为 **{overall_score}/5.0**" \
+                   f"（{evaluation_result['sampling']['confidence'] * 100:.0f}%置信区间 " \
+                   f"{format_interval(sampling_overall)}）。{final_suggestion}"
+        return f"本次评估总体评分为 **{overall_score}/5.0**。{final_suggestion}"
+
+    if section_key == "detailed_analysis":
+        if not dimensions:
+            return "评测结果中没有各维度的详细评分。"
+        return "\n".join(f"- **{name}**（{score if score is not None else 'N/A'}/5.0）：{reason}"
+                         for name, score, reason in dimensions)
+
+    if section_key == "pros_cons":
+        # 评分最高和最低的各3个维度
+        scored = sorted((d for d in dimensions if d[1] is not None), key=lambda d: d[1], reverse=True)
+        strengths = [f"- {name}：{reason[:REPORT_NARRATIVE_REASON_CHARS]}"
+                     for name, score, reason in scored[:3] if score >= 4.0]
+        weaknesses = [f"- {name}：{reason[:REPORT_NARRATIVE_REASON_CHARS]}"
+                      for name, score, reason in scored[::-1][:3] if score < 3.0]
+        text = "**优势**\n\n" + ("\n".join(strengths) if strengths else "- 暂无评分达到4.0及以上的维度")
+        text += "\n\n**劣势**\n\n" + ("\n".join(weaknesses) if weaknesses else "- 暂无评分低于3.0的维度")
+        return text
+
+    if section_key == "suggestions":
+        suggestions = []
+        iteration_comparison = detailed.get("iteration_comparison", {}) if isinstance(detailed, dict) else {}
+        if isinstance(iteration_comparison, dict):
+            suggestions.extend(iteration_comparison.get("next_iteration_suggestions", []) or [])
+        if final_suggestion:
+            suggestions.append(final_suggestion)
+        # 评分最低的维度优先改进
+        scored = sorted((d for d in dimensions if d[1] is not None), key=lambda d: d[1])
+        for name, score, _ in scored[:2]:
+            if score < 4.0:
+                suggestions.append(f"重点提升{name}（当前{score}/5.0）")
+        duplicate_info = evaluation_result.get("duplicate_info", {})
+        if isinstance(duplicate_info, dict) and duplicate_info.get("merge_suggestions"):
+            suggestions.append(f"参考重复测试用例分析中的{len(duplicate_info['merge_suggestions'])}条合并建议，减少重复用例")
+        return "\n".join(f"{i + 1}. {s}" for i, s in enumerate(suggestions)) if suggestions else "无具体改进建议。"
+
+    if section_key == "conclusion":
+        try:
+            score = float(overall_score)
+        except (ValueError, TypeError):
+            return f"总体评分为 {overall_score}/5.0。{final_suggestion}"
+        if score >= 4.0:
+            level = "整体质量较高，可直接作为测试工作的主要参考"
+        elif score >= 3.0:
+            level = "整体质量中等，需结合人工评审补充和修正后使用"
+        else:
+            level = "整体质量偏低，建议仅作为辅助参考并以人工用例为准"
+        return f"AI生成测试用例总体评分为 **{score}/5.0**，{level}。"
+
+    return ""
+
+
+async def generate_report_narratives(session: aiohttp.ClientSession, evaluation_result, is_iteration=False):
+    """
+    并发撰写报告中的全部叙述段落，单个段落失败或超时时使用本地生成的段落
+
+    :param session: aiohttp会话
+    :param evaluation_result: 评测结果
+    :param is_iteration: 是否包含迭代对比分析
+    :return: 段落键到段落文本的映射
+    """
+    start_time = time.time()
+    context_text = build_report_narrative_context(evaluation_result, is_iteration)
+    section_keys = list(REPORT_NARRATIVE_SECTIONS.keys())
+    log(f"并发撰写{len(section_keys)}个报告叙述段落，上下文长度: {len(context_text)}", important=True)
+
+    results = await asyncio.gather(
+        *(asyncio.wait_for(generate_report_narrative(session, key, context_text), timeout=REPORT_NARRATIVE_TIMEOUT)
+          for key in section_keys),
+        return_exceptions=True
+    )
+
+    narratives = {}
+    for key, result in zip(section_keys, results):
+        if isinstance(result, str):
+            narratives[key] = result
+        else:
+            reason = "超时" if isinstance(result, asyncio.TimeoutError) else (str(result) if result else "返回为空")
+            log(f"叙述段落[{REPORT_NARRATIVE_SECTIONS[key][0]}]生成失败({reason})，使用本地生成的段落", level="WARNING")
+            narratives[key] = build_fallback_narrative(key, evaluation_result)
+
+    log(f"报告叙述段落生成完成，耗时: {time.time() - start_time:.2f}秒", important=True)
+    return narratives
+
+
+def generate_basic_report(evaluation_result, sections=None, narratives=None):
+    """
+    根据评测结果渲染Markdown报告。表格、图表等数据部分直接由评测结果生成，
+    叙述段落使用传入的narratives，缺失时根据评测结果生成，因此不依赖LLM也能得到完整报告
+
+    :param evaluation_result: 评测结果
+    :param sections: 预先渲染的报告部分（可选），键为framework/scores/iteration/duplicates/coverage/committee
+    :param narratives: 叙述段落（可选），键见REPORT_NARRATIVE_SECTIONS
+    :return: Markdown报告
+    """
+    try:
+        sections = sections or {}
+        narratives = narratives or {}
+
+        def narrative(key):
+            return narratives.get(key) or build_fallback_narrative(key, evaluation_result)
+
+        # 报告标题与评测框架标识
+        report = "# AI测试用例评估报告\n\n"
+        if isinstance(evaluation_result, dict) and evaluation_result.get("is_committee_result", False):
+            framework_label = "【CollabEval三阶段评测】" if get_evaluation_framework(evaluation_result) == "CollabEval" else "【多评委综合评测】"
+            if sections.get("iteration"):
+                framework_label += "【迭代对比分析】"
+            if evaluation_result.get("sampling"):
+                framework_label += "【分层抽样评测】"
+            report += f"> {framework_label}\n\n"
+        elif isinstance(evaluation_result, dict) and evaluation_result.get("sampling"):
+            report += "> 【分层抽样评测】\n\n"
+
+        report += f"## 📋 {REPORT_NARRATIVE_SECTIONS['summary'][0]}\n\n{narrative('summary')}\n\n---\n\n"
+
+        if sections.get("framework"):
+            report += sections["framework"]
+        report += sections.get("scores") or render_score_section(evaluation_result)
+        report += render_sampling_section(evaluation_result)
+        if sections.get("iteration"):
+            report += sections["iteration"]
+
+        report += f"## 🔍 {REPORT_NARRATIVE_SECTIONS['detailed_analysis'][0]}\n\n{narrative('detailed_analysis')}\n\n"
+
+        report += render_case_matching_section(evaluation_result)
+        if sections.get("duplicates"):
+            report += sections["duplicates"]
+        if sections.get("coverage"):
+            report += f"## 🧭 测试覆盖率分析\n\n{sections['coverage']}\n"
+        if sections.get("committee"):
+            report += f"## 👥 评委委员会评测\n\n{sections['committee']}"
+
+        report += f"## ⚖️ {REPORT_NARRATIVE_SECTIONS['pros_cons'][0]}\n\n{narrative('pros_cons')}\n\n"
+        report += f"## 📝 {REPORT_NARRATIVE_SECTIONS['suggestions'][0]}\n\n{narrative('suggestions')}\n\n"
+        report += f"## 🎯 {REPORT_NARRATIVE_SECTIONS['conclusion'][0]}\n\n{narrative('conclusion')}\n\n"
+
+        # 添加页脚，确保使用实时时间
         from datetime import datetime
-        # 确保使用实时时间
         current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
+        report += f"---\n**生成时间：{current_time} • gogogo出发喽评估中心**\n"
 
-        # 构建页脚
-        footer = f"**生成时间：{current_time} • gogogo出发喽评估中心**"
-        
-        # 检查是否已有页脚，如果有则替换，否则添加
-        import re
-        footer_pattern = r"\*\*生成时间：(.*?)(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-        placeholder_patterns = [
-            r"\*\*生成时间：DATETIME_PLACEHOLDER • gogogo出发喽评估中心\*\*",
-            r"\*\*生成时间：DATETIME_PLACEHOLDER(?:•|·|\*) *gogogo出发喽评估中心\*\*",
-            r"\*\*生成时间：<.*?>(?:•|·|\*) *gogogo出发喽评估中心\*\*"
-        ]
-        
-        # 先检查是否有明确的占位符
-        placeholder_found = False
-        for pattern in placeholder_patterns:
-            if re.search(pattern, report):
-                report = re.sub(pattern, footer, report)
-                placeholder_found = True
-                log("已替换基本报告页脚中的明确占位符为实时时间", important=True)
-                break
-        
-        # 如果没有找到明确的占位符，尝试使用通用模式
-        if not placeholder_found and re.search(footer_pattern, report):
-            report = re.sub(footer_pattern, footer, report)
-            log("已替换基本报告页脚中的日期为实时时间", important=True)
-        elif not placeholder_found:
-            # 如果没有找到页脚，则添加到报告末尾
-            report += f"\n\n---\n{footer}\n"
-            log("未找到页脚，已添加带有实时时间的页脚到基本报告", important=True)
-        
-        log("成功生成基本Markdown报告", important=True)
+        log("成功生成Markdown报告", important=True)
         return report
-        
+
     except Exception as e:
         log_error(f"生成基本报告失败: {str(e)}")
         return "# 评测报告生成失败\n\n无法生成详细报告，请检查评测结果或重试。"
 
 
-async def evaluate_and_generate_report(session: aiohttp.ClientSession, ai_cases, golden_cases, report_file, is_iteration=False, prev_iteration_cases=None, evaluation_result=None):
+def render_local_reports(evaluation_result, formatted_ai_cases=None, report_artifacts=None, include_iteration=False):
+    """
+    不调用LLM，根据评测结果重新渲染全部报告变体，用于迟到评委合并后刷新已发布的报告。
+    LLM撰写的叙述段落引用的是合并前的评分，因此叙述段落改为根据合并后的评测结果在本地生成
+
+    :param evaluation_result: 评测结果
+    :param formatted_ai_cases: 格式化后的AI测试用例（可选），用于生成覆盖流程图
+    :param report_artifacts: precompute_report_artifacts预先生成的报告部分（可选）
+    :param include_iteration: 是否同时渲染迭代报告
+    :return: 变体名称到报告内容的映射，标准报告为"standard"，迭代报告为"iteration"
+    """
+    reports = {
+        "standard": generate_basic_report(
+            evaluation_result,
+            sections=build_report_sections(evaluation_result, formatted_ai_cases, report_artifacts=report_artifacts),
+            narratives={key: build_fallback_narrative(key, evaluation_result) for key in REPORT_NARRATIVE_SECTIONS}
+        )
+    }
+    if include_iteration:
+        reports["iteration"] = render_iteration_report(evaluation_result)
+    return reports
+
+
+async def generate_reports_concurrently(report_jobs, timeout=None):
+    """
+    并发生成多个相互独立的报告变体，共享同一截止时间
+
+    单个变体失败或超时不会影响其他变体，截止时间到达后仍未完成的变体会被取消
+
+    :param report_jobs: 变体名称到报告生成协程的映射
+    :param timeout: 所有变体共享的截止时间（秒），None表示不限制
+    :return: 变体名称到报告内容的映射，失败或超时的变体为None
+    """
+    start_time = time.time()
+    tasks = {name: asyncio.create_task(job) for name, job in report_jobs.items()}
+    done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    reports = {}
+    for name, task in tasks.items():
+        if task in pending:
+            log_error(f"{name}报告在{timeout}秒截止时间内未完成，已取消")
+            reports[name] = None
+        elif task.exception() is not None:
+            log_error(f"{name}报告生成失败: {task.exception()}")
+            reports[name] = None
+        else:
+            reports[name] = task.result()
+
+    succeeded = sum(1 for report in reports.values() if report)
+    log(f"报告并发生成完成: {succeeded}/{len(reports)}个成功，耗时: {time.time() - start_time:.2f}秒", important=True)
+    return reports
+
+
+async def evaluate_and_generate_report(session: aiohttp.ClientSession, ai_cases, golden_cases, report_file, is_iteration=False, prev_iteration_cases=None, evaluation_result=None,
+                                      report_artifacts=None):
     """
     生成Markdown报告
 
@@ -2525,6 +2461,7 @@ async def evaluate_and_generate_report(session: aiohttp.ClientSession, ai_cases,
     :param is_iteration: 是否启用迭代前后对比功能
     :param prev_iteration_cases: 上一次迭代的测试用例（可选），仅在is_iteration为true时有效
     :param evaluation_result: 已有的评测结果（可选），如果提供则不再进行评测
+    :param report_artifacts: precompute_report_artifacts预先生成的报告部分（可选）
     :return: 评估结果和Markdown报告
     """
     log("开始生成报告", important=True)
@@ -2543,38 +2480,35 @@ async def evaluate_and_generate_report(session: aiohttp.ClientSession, ai_cases,
     else:
         log("使用已有评测结果生成报告", important=True)
 
-    # 生成报告
-    markdown_report = None
-    markdown_report_iteration = None
-    
-    # 如果是迭代模式，需要生成两种报告：简洁的迭代报告和完整的标准报告
+    # 各报告变体相互独立，作为并发任务在同一截止时间内生成
+    report_jobs = {
+        "standard": generate_markdown_report(session, evaluation_result, is_iteration=False,
+                                             formatted_ai_cases=ai_cases, report_artifacts=report_artifacts)
+    }
+    # 迭代模式下额外生成简洁的迭代报告
     if is_iteration:
-        # 生成简洁的迭代报告
-        log("生成简洁的迭代报告", important=True)
-        markdown_report_iteration = await generate_markdown_report(session, evaluation_result, is_iteration=True, 
-                                                           formatted_ai_cases=ai_cases, formatted_prev_cases=prev_iteration_cases)
-        
-        # 生成完整的标准报告（不使用迭代参数）
-        log("生成完整的标准报告", important=True)
-        markdown_report = await generate_markdown_report(session, evaluation_result, is_iteration=False, 
-                                                 formatted_ai_cases=ai_cases)
-    else:
-        # 非迭代模式，只生成一种报告
-        markdown_report = await generate_markdown_report(session, evaluation_result, 
-                                                 formatted_ai_cases=ai_cases)
-
-    # 确保至少有一个报告生成成功
-    if (not markdown_report and not markdown_report_iteration) or (markdown_report and len(markdown_report.strip()) < 10):
-        # 如果报告为空或内容太少，生成一个基本报告
+        report_jobs["iteration"] = generate_markdown_report(session, evaluation_result, is_iteration=True,
+                                                            formatted_ai_cases=ai_cases,
+                                                            formatted_prev_cases=prev_iteration_cases)
+    reports = await generate_reports_concurrently(report_jobs, timeout=REPORT_GENERATION_DEADLINE)
+
+    markdown_report = reports.get("standard")
+    if not markdown_report or len(markdown_report.strip()) < 10:
+        # 标准报告失败或内容太少时，使用预生成的报告部分和本地生成的叙述段落直接渲染报告
         log("生成的Markdown报告为空或内容不足，尝试生成基本报告", important=True)
-        markdown_report = generate_basic_report(evaluation_result)
-        
+        try:
+            markdown_report = render_local_reports(evaluation_result, ai_cases, report_artifacts)["standard"]
+        except Exception as e:
+            log_error(f"渲染报告数据部分失败，基本报告只包含评分和叙述段落: {str(e)}")
+            markdown_report = generate_basic_report(evaluation_result)
+
         if not markdown_report or len(markdown_report.strip()) < 10:
             log("生成Markdown报告失败", important=True)
             return {
                 "success": False,
                 "error": "生成Markdown报告失败"
             }
+        reports["standard"] = markdown_report
 
     # 准备返回结果
     result = {
@@ -2585,62 +2519,42 @@ async def evaluate_and_generate_report(session: aiohttp.ClientSession, ai_cases,
             "report_json": report_file.replace("evaluation_markdown", "evaluation_json").replace(".md", ".json")
         }
     }
-    
-    # 添加相应的报告到结果中
-    if markdown_report:
-        result["markdown_report"] = markdown_report
-        result["report"] = markdown_report
-        log(f"已添加标准报告到结果，长度: {len(markdown_report)}", important=True)
-        
-    if markdown_report_iteration:
-        result["report_iteration"] = markdown_report_iteration
-        log(f"已添加迭代报告到结果，长度: {len(markdown_report_iteration)}", important=True)
-    elif is_iteration:
-        log("迭代模式已启用但迭代报告为空，未能添加迭代报告", level="WARNING")
-    
+
+    # 添加相应的报告到结果中，标准报告对应report字段，其他变体对应report_<变体名>字段
+    result["markdown_report"] = markdown_report
+    result["report"] = markdown_report
+    log(f"已添加标准报告到结果，长度: {len(markdown_report)}", important=True)
+
+    for name in report_jobs:
+        if name == "standard":
+            continue
+        if reports.get(name):
+            result[f"report_{name}"] = reports[name]
+            log(f"已添加{name}报告到结果，长度: {len(reports[name])}", important=True)
+        else:
+            log(f"{name}报告生成失败，未能添加到结果", level="WARNING")
+
     # 记录最终返回的字段
     log(f"最终结果包含以下字段: {', '.join(result.keys())}", important=True)
-    
-    # 如果是迭代模式，保存两种报告
+
+    # 保存各报告，标准报告保存到report_file，其他变体保存到report_file加变体名后缀
     try:
-        if is_iteration:
-            # 保存完整的标准报告
-            if markdown_report:
-                # 确保目录存在
-                os.makedirs(os.path.dirname(report_file), exist_ok=True)
-                with open(report_file, 'w', encoding='utf-8', errors='ignore') as f:
-                    f.write(markdown_report)
-                # 验证文件写入成功
-                if os.path.exists(report_file) and os.path.getsize(report_file) > 0:
-                    log(f"完整的标准评测报告已保存到 {report_file} (大小: {os.path.getsize(report_file)}字节)", important=True)
-                else:
-                    log(f"警告：文件写入可能失败，文件大小为0或文件不存在: {report_file}", level="WARNING")
-            
-            # 保存简洁的迭代报告
-            if markdown_report_iteration:
-                iteration_report_file = report_file.replace(".md", "_iteration.md")
-                # 确保目录存在
-                os.makedirs(os.path.dirname(iteration_report_file), exist_ok=True)
-                with open(iteration_report_file, 'w', encoding='utf-8', errors='ignore') as f:
-                    f.write(markdown_report_iteration)
-                # 验证文件写入成功
-                if os.path.exists(iteration_report_file) and os.path.getsize(iteration_report_file) > 0:
-                    log(f"简洁的迭代评测报告已保存到 {iteration_report_file} (大小: {os.path.getsize(iteration_report_file)}字节)", important=True)
-                else:
-                    log(f"警告：文件写入可能失败，文件大小为0或文件不存在: {iteration_report_file}", level="WARNING")
-                result["files"]["report_iteration_md"] = iteration_report_file
-        else:
-            # 非迭代模式，只保存一种报告
+        for name, report_content in reports.items():
+            if not report_content:
+                continue
+            variant_file = report_file if name == "standard" else report_file.replace(".md", f"_{name}.md")
             # 确保目录存在
-            os.makedirs(os.path.dirname(report_file), exist_ok=True)
-            with open(report_file, 'w', encoding='utf-8', errors='ignore') as f:
-                f.write(markdown_report)
+            os.makedirs(os.path.dirname(variant_file), exist_ok=True)
+            with open(variant_file, 'w', encoding='utf-8', errors='ignore') as f:
+                f.write(report_content)
             # 验证文件写入成功
-            if os.path.exists(report_file) and os.path.getsize(report_file) > 0:
-                log(f"Markdown格式的评测报告已保存到 {report_file} (大小: {os.path.getsize(report_file)}字节)", important=True)
+            if os.path.exists(variant_file) and os.path.getsize(variant_file) > 0:
+                log(f"{name}评测报告已保存到 {variant_file} (大小: {os.path.getsize(variant_file)}字节)", important=True)
             else:
-                log(f"警告：文件写入可能失败，文件大小为0或文件不存在: {report_file}", level="WARNING")
-            
+                log(f"警告：文件写入可能失败，文件大小为0或文件不存在: {variant_file}", level="WARNING")
+            if name != "standard":
+                result["files"][f"report_{name}_md"] = variant_file
+
         # 保存评测结果JSON文件
         json_file = report_file.replace("evaluation_markdown", "evaluation_json").replace(".md", ".json")
         try:
@@ -2669,7 +2583,10 @@ async def evaluate_with_committee(session: aiohttp.ClientSession,
                                   ai_cases: Dict,
                                   golden_cases: Dict,
                                   duplicate_info_text: str = "",
-                                  use_collab_eval: bool = None) -> Dict:
+                                  use_collab_eval: bool = None,
+                                  payload: CasePayload = None,
+                                  on_late_result=None,
+                                  use_judge_cache: bool = True) -> Dict:
     """
     使用评委委员会评测测试用例
 
@@ -2678,12 +2595,17 @@ async def evaluate_with_committee(session: aiohttp.ClientSession,
     :param golden_cases: 黄金标准测试用例
     :param duplicate_info_text: 重复测试用例分析信息
     :param use_collab_eval: 是否使用CollabEval框架，如果为None则使用配置文件中的设置
+    :param payload: 预先构建的用例负载，各评委共用
+    :param on_late_result: 迟到评委结果合并后的回调（可选），提供时启用法定人数模式
+    :param use_judge_cache: 是否复用评委结果缓存，False则调用全部评委并刷新缓存
     :return: 汇总后的评测结果
     """
     try:
         # 直接使用委员会模块中的函数
         from committee import evaluate_with_committee as committee_evaluate
-        return await committee_evaluate(session, ai_cases, golden_cases, duplicate_info_text, use_collab_eval)
+        return await committee_evaluate(session, ai_cases, golden_cases, duplicate_info_text, use_collab_eval,
+                                        payload=payload, on_late_result=on_late_result,
+                                        use_judge_cache=use_judge_cache)
     except TypeError as e:
         # 处理参数不匹配的情况
         log_error(f"调用委员会评测函数出现参数不匹配: {str(e)}", important=True)
@@ -2,6 +2,7 @@ import json
 import aiohttp
 from logger import log
 from llm_api import async_call_llm
+from testcase_model import normalize_test_cases, test_cases_to_dicts
 
 
 async def fix_json_format(session: aiohttp.ClientSession, broken_json_str):
@@ -87,191 +88,16 @@ async def format_test_cases(session: aiohttp.ClientSession, file_content, file_t
                 log(f"无法修复{file_type}测试用例JSON格式", level="ERROR")
                 return None
 
-        # 提取所有测试用例，不限制数量
-        all_test_cases = []
+        # 一次遍历提取并规范化所有测试用例，不限制数量
+        test_cases = normalize_test_cases(data)
+        log(f"从原始数据中提取并规范化{len(test_cases)}个测试用例", important=True)
+        formatted_test_cases = test_cases_to_dicts(test_cases)
 
-        # 从原始数据中提取测试用例，处理各种可能的格式
+        category_keys = []
         if isinstance(data, dict):
-            # 新增格式支持：按类别分组的测试用例，如{"functional":[...], "security":[...]}
             category_keys = [key for key in data.keys() if isinstance(data[key], list)]
-            if category_keys and all(isinstance(data[key], list) for key in category_keys):
+            if category_keys:
                 log(f"检测到按类别分组的测试用例格式")
-                for category in category_keys:
-                    for case in data[category]:
-                        if isinstance(case, dict):
-                            # 添加类别信息
-                            case["category"] = category
-                            all_test_cases.append(case)
-            # 新增格式支持：处理test_cases.json中的特殊嵌套格式
-            elif "testcases" in data and isinstance(data["testcases"], dict) and "test_cases" in data["testcases"]:
-                test_cases_obj = data["testcases"]["test_cases"]
-                # 处理test_cases是包含各类别测试用例的对象的情况
-                if isinstance(test_cases_obj, dict):
-                    for category, cases in test_cases_obj.items():
-                        if isinstance(cases, list):
-                            for case in cases:
-                                if isinstance(case, dict):
-                                    # 添加类别信息
-                                    case["category"] = category
-                                all_test_cases.append(case)
-                # 如果test_cases直接是列表
-                elif isinstance(test_cases_obj, list):
-                    all_test_cases = test_cases_obj
-
-            # 新增格式支持：{"测试用例":{"功能测试":[...],"安全性测试":[...],...}}
-            elif "测试用例" in data:
-                log(f"检测到新格式测试用例数据")
-                test_categories = data["测试用例"]
-                if isinstance(test_categories, dict):
-                    for category, cases in test_categories.items():
-                        if isinstance(cases, list):
-                            for case in cases:
-                                # 添加类别信息
-                                if isinstance(case, dict):
-                                    case["category"] = category
-                                all_test_cases.append(case)
-            # 情况1：顶层有testcases字段
-            elif "testcases" in data:
-                if isinstance(data["testcases"], dict) and "test_cases" in data["testcases"]:
-                    all_test_cases = data["testcases"]["test_cases"]
-                elif isinstance(data["testcases"], list):
-                    all_test_cases = data["testcases"]
-                elif isinstance(data["testcases"], dict) and "test_suite" in data["testcases"]:
-                    # 特殊情况，可能有嵌套结构
-                    if "test_cases" in data["testcases"]:
-                        all_test_cases = data["testcases"]["test_cases"]
-            # 情况2：顶层有test_cases字段
-            elif "test_cases" in data:
-                if isinstance(data["test_cases"], list):
-                    all_test_cases = data["test_cases"]
-                elif isinstance(data["test_cases"], dict):
-                    # 合并所有分类下的测试用例
-                    for category, cases in data["test_cases"].items():
-                        if isinstance(cases, list):
-                            # 添加类别信息
-                            for case in cases:
-                                if isinstance(case, dict):
-                                    case["category"] = category
-                            all_test_cases.extend(cases)
-            # 情况3：可能有其他命名的字段包含测试用例
-            elif any(key for key in data.keys() if "case" in key.lower() or "test" in key.lower()):
-                for key in data.keys():
-                    if "case" in key.lower() or "test" in key.lower():
-                        if isinstance(data[key], list):
-                            all_test_cases.extend(data[key])
-                        elif isinstance(data[key], dict):
-                            all_test_cases.append(data[key])
-        # 情况4：顶层直接是测试用例列表
-        elif isinstance(data, list):
-            all_test_cases = data
-
-        log(f"从原始数据中提取到{len(all_test_cases)}个测试用例", important=True)
-
-        # 格式化所有测试用例到统一格式
-        formatted_test_cases = []
-        for i, case in enumerate(all_test_cases):
-            if not isinstance(case, dict):
-                log(f"警告：跳过非字典格式的测试用例 {case}")
-                continue
-
-            # 获取原始case_id，并保存为original_case_id
-            original_case_id = case.get("case_id", "")
-            
-            # 为没有case_id的情况生成一个备用case_id
-            if not original_case_id:
-                original_case_id = case.get("id", "")
-                if not original_case_id:
-                    original_case_id = f"TC-FUNC-{i + 1:03d}"
-            
-            # 保存原始的case_id，无论其格式如何
-            case_id = original_case_id
-            
-            # 生成格式化的case_id作为备用，但不替换原始case_id
-            formatted_case_id = case_id
-            if not formatted_case_id.startswith("TC-") and not formatted_case_id.startswith("FUNC-"):
-                formatted_case_id = f"FUNC-SCEN-{i + 1:03d}"
-
-            # 确保title字段
-            title_candidates = ["title", "标题", "测试标题", "test_title", "name", "测试名称"]
-            title = None
-            for candidate in title_candidates:
-                if candidate in case:
-                    title = case[candidate]
-                    break
-            if not title:
-                title = f"Test Case {i + 1}"
-
-            # 确保preconditions字段
-            preconditions_candidates = ["preconditions", "前置条件", "pre_conditions", "prerequisites", "前提条件"]
-            preconditions = None
-            for candidate in preconditions_candidates:
-                if candidate in case and case[candidate]:
-                    preconditions = case[candidate]
-                    break
-            if not preconditions:
-                preconditions = ""
-
-            # 转换前置条件为字符串
-            if isinstance(preconditions, list):
-                preconditions = "\n".join([str(item) for item in preconditions if item])
-
-            # 确保steps字段
-            steps_candidates = ["steps", "步骤", "test_steps", "测试步骤", "操作步骤", "actions"]
-            steps = None
-            for candidate in steps_candidates:
-                if candidate in case and case[candidate]:
-                    steps = case[candidate]
-                    break
-            if not steps:
-                steps = []
-
-            # 转换步骤为列表
-            if not isinstance(steps, list):
-                if isinstance(steps, str) and steps.strip():
-                    # 尝试分割字符串成为列表
-                    if "\n" in steps:
-                        steps = steps.split("\n")
-                    else:
-                        steps = [steps]
-                else:
-                    steps = []
-
-            # 确保expected_results字段
-            expected_candidates = ["expected_results", "预期结果", "expected", "assertions", "expected_outcome", "结果"]
-            expected_results = None
-            for candidate in expected_candidates:
-                if candidate in case and case[candidate]:
-                    expected_results = case[candidate]
-                    break
-            if not expected_results:
-                expected_results = []
-
-            # 转换预期结果为列表
-            if not isinstance(expected_results, list):
-                if isinstance(expected_results, str) and expected_results.strip():
-                    # 尝试分割字符串成为列表
-                    if "\n" in expected_results:
-                        expected_results = expected_results.split("\n")
-                    else:
-                        expected_results = [expected_results]
-                else:
-                    expected_results = []
-
-            # 构建格式化后的测试用例
-            formatted_case = {
-                "case_id": case_id,  # 使用原始case_id
-                "formatted_case_id": formatted_case_id,  # 保存格式化后的case_id作为备用
-                "title": title,
-                "preconditions": preconditions,
-                "steps": [str(step).strip() for step in steps if step],
-                "expected_results": [str(result).strip() for result in expected_results if result]
-            }
-
-            # 保留类别信息
-            if "category" in case:
-                formatted_case["category"] = case["category"]
-
-            formatted_test_cases.append(formatted_case)
 
         # 构建最终格式
         test_suite_name = "B端产品登录功能测试用例"
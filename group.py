@@ -6,6 +6,7 @@ import time
 import requests
 # 核心修复：从 typing 导入 Tuple, List, Dict
 from typing import Union, List, Dict, Tuple
+from testcase_model import normalize_test_cases as to_test_cases
 
 # --- 配置区 ---
 API_URL = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
@@ -19,15 +20,14 @@ REPORT_JSON_FILE = "evaluation_report_structured.json"
 # --- 数据标准化模块 ---
 def normalize_test_cases(test_cases_data: List[Dict], prefix: str) -> List[Dict]:
     normalized_list = []
-    for i, case in enumerate(test_cases_data):
-        steps_str = "\n".join(case.get("操作步骤", []))
-        expected_results_str = "\n".join(case.get("预期结果", []))
+    # 字段名兼容和步骤/预期结果的规范化统一由TestCase完成，这里只转换为本脚本使用的格式
+    for i, case in enumerate(to_test_cases(test_cases_data)):
         normalized_case = {
             "id": f"{prefix}_{i+1:03d}",
-            "title": case.get("标题", "无标题"),
-            "preconditions": case.get("前置条件", ""),
-            "steps": steps_str,
-            "expected_results": expected_results_str
+            "title": case.title,
+            "preconditions": case.preconditions,
+            "steps": case.steps_text,
+            "expected_results": case.expected_text
         }
         normalized_list.append(normalized_case)
     return normalized_list
@@ -0,0 +1,153 @@
+"""
+评委结果缓存模块
+以 (评委模型, 评测提示模板版本, 用例负载哈希) 为键缓存每位评委的阶段1独立评测结果，
+同一批用例再次评测或调整评委组成时只调用缺少结果的评委，并统计缓存命中率
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+from config import JUDGE_RESULT_CACHE_ENABLED, JUDGE_RESULT_CACHE_TTL, JUDGE_RESULT_CACHE_DIR, LLM_TEMPERATURE
+from logger import log, log_error
+
+_cache_lock = threading.Lock()
+
+# 进程内的命中统计：评委 -> {"hits": 命中次数, "misses": 未命中次数}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def build_judge_cache_key(judge_model: str, prompt_version: int, payload_digest: str) -> str:
+    """
+    构建评委结果缓存键
+
+    :param judge_model: 评委模型名称
+    :param prompt_version: 评测提示模板版本
+    :param payload_digest: 用例负载的内容哈希（CasePayload.digest）
+    :return: 缓存键
+    """
+    parts = [judge_model, f"prompt:{prompt_version}", payload_digest, f"temperature:{LLM_TEMPERATURE}"]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _cache_file_path(cache_key: str) -> str:
+    """获取缓存键对应的缓存文件路径"""
+    return os.path.join(JUDGE_RESULT_CACHE_DIR, f"{cache_key}.json")
+
+
+def _record(judge_model: str, hit: bool):
+    """记录一次缓存查询"""
+    with _cache_lock:
+        judge_stats = _stats.setdefault(judge_model, {"hits": 0, "misses": 0})
+        judge_stats["hits" if hit else "misses"] += 1
+
+
+def get_cached_judge_result(judge_model: str, cache_key: str) -> Optional[Dict]:
+    """
+    读取缓存的评委结果
+
+    :param judge_model: 评委模型名称，用于命中统计
+    :param cache_key: build_judge_cache_key生成的缓存键
+    :return: 缓存的阶段1评测结果，不存在、已过期或缓存被禁用时返回None
+    """
+    if not JUDGE_RESULT_CACHE_ENABLED:
+        return None
+
+    cache_file = _cache_file_path(cache_key)
+    if not os.path.exists(cache_file):
+        _record(judge_model, False)
+        return None
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except Exception as e:
+        log_error(f"读取评委结果缓存失败: {str(e)}")
+        _record(judge_model, False)
+        return None
+
+    age = time.time() - entry.get("cached_at", 0)
+    if JUDGE_RESULT_CACHE_TTL is not None and 0 <= JUDGE_RESULT_CACHE_TTL < age:
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+        _record(judge_model, False)
+        return None
+
+    _record(judge_model, True)
+    log(f"命中评委 {judge_model} 的结果缓存，缓存时间: {age:.0f}秒前", model_name=judge_model)
+    return entry.get("result")
+
+
+def save_judge_result(judge_model: str, cache_key: str, result: Dict) -> bool:
+    """
+    保存评委结果到缓存
+
+    :param judge_model: 评委模型名称
+    :param cache_key: build_judge_cache_key生成的缓存键
+    :param result: 有效的阶段1评测结果
+    :return: 是否保存成功
+    """
+    if not JUDGE_RESULT_CACHE_ENABLED:
+        return False
+
+    os.makedirs(JUDGE_RESULT_CACHE_DIR, exist_ok=True)
+    cache_file = _cache_file_path(cache_key)
+    temp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"cached_at": time.time(), "judge_model": judge_model, "result": result}, f, ensure_ascii=False)
+        # 原子替换，避免并发请求读到写了一半的文件
+        os.replace(temp_file, cache_file)
+        return True
+    except Exception as e:
+        log_error(f"保存评委结果缓存失败: {str(e)}", model_name=judge_model)
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        return False
+
+
+def get_judge_cache_stats() -> Dict:
+    """
+    获取进程启动以来的评委结果缓存命中统计
+
+    :return: 总命中次数、未命中次数、命中率和按评委的统计
+    """
+    with _cache_lock:
+        per_judge = {judge: dict(judge_stats) for judge, judge_stats in _stats.items()}
+    hits = sum(judge_stats["hits"] for judge_stats in per_judge.values())
+    misses = sum(judge_stats["misses"] for judge_stats in per_judge.values())
+    for judge_stats in per_judge.values():
+        total = judge_stats["hits"] + judge_stats["misses"]
+        judge_stats["hit_rate"] = round(judge_stats["hits"] / total, 4) if total else 0.0
+    return {
+        "enabled": JUDGE_RESULT_CACHE_ENABLED,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "per_judge": per_judge
+    }
+
+
+def clear_judge_cache() -> int:
+    """
+    清除所有评委结果缓存
+
+    :return: 删除的缓存文件数量
+    """
+    removed = 0
+    with _cache_lock:
+        if os.path.isdir(JUDGE_RESULT_CACHE_DIR):
+            for file_name in os.listdir(JUDGE_RESULT_CACHE_DIR):
+                if file_name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(JUDGE_RESULT_CACHE_DIR, file_name))
+                        removed += 1
+                    except OSError:
+                        pass
+    log(f"已清除{removed}个评委结果缓存", important=True)
+    return removed
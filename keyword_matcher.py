@@ -0,0 +1,218 @@
+"""
+多模式关键词匹配模块
+基于Aho-Corasick自动机实现，一次扫描文本即可得到所有关键词类别的命中情况，
+替代"逐类别、逐关键词做子串查找"的嵌套循环
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class KeywordAutomaton:
+    """Aho-Corasick多模式匹配自动机，按类别汇总关键词命中情况"""
+
+    def __init__(self, keyword_groups: Dict[str, Iterable[str]]):
+        """
+        编译关键词自动机
+
+        :param keyword_groups: 类别到关键词列表的映射，如config.COVERAGE_KEYWORDS。
+                               关键词统一转为小写，调用方需传入已转为小写的文本
+        """
+        self.categories = list(keyword_groups.keys())
+        self.full_mask = (1 << len(self.categories)) - 1
+
+        # 节点转移表、失败指针、类别位掩码、输出（类别下标, 关键词长度）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._mask: List[int] = [0]
+        self._outputs: List[Tuple[Tuple[int, int], ...]] = [()]
+
+        for index, category in enumerate(self.categories):
+            for keyword in keyword_groups[category]:
+                if keyword:
+                    self._add_keyword(str(keyword).lower(), index)
+
+        self._build_failure_links()
+
+    def _add_keyword(self, keyword: str, category_index: int):
+        """将关键词插入字典树"""
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._mask.append(0)
+                self._outputs.append(())
+            node = next_node
+
+        output = (category_index, len(keyword))
+        if output not in self._outputs[node]:
+            self._outputs[node] += (output,)
+        self._mask[node] |= 1 << category_index
+
+    def _build_failure_links(self):
+        """广度优先构建失败指针，并沿失败链合并输出"""
+        queue = deque()
+        for node in self._goto[0].values():
+            self._fail[node] = 0
+            queue.append(node)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+
+                self._mask[child] |= self._mask[self._fail[child]]
+                self._outputs[child] += self._outputs[self._fail[child]]
+
+    def _step(self, node: int, char: str) -> int:
+        """沿转移表和失败链前进一个字符"""
+        goto = self._goto
+        while node and char not in goto[node]:
+            node = self._fail[node]
+        return goto[node].get(char, 0)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str, int]]:
+        """
+        遍历文本中的所有关键词命中
+
+        :param text: 待匹配文本（小写）
+        :return: (起始位置, 类别, 关键词长度) 的迭代器
+        """
+        node = 0
+        for position, char in enumerate(text):
+            node = self._step(node, char)
+            for category_index, length in self._outputs[node]:
+                yield position - length + 1, self.categories[category_index], length
+
+    def match_mask(self, text: str) -> int:
+        """
+        逐字符运行自动机，计算文本命中的类别位掩码
+
+        :param text: 待匹配文本（小写）
+        :return: 类别位掩码，第i位对应self.categories[i]
+        """
+        node = 0
+        mask = 0
+        masks = self._mask
+        full_mask = self.full_mask
+        for char in text:
+            node = self._step(node, char)
+            mask |= masks[node]
+            if mask == full_mask:
+                # 全部类别均已命中，不必扫描剩余文本
+                break
+        return mask
+
+    def mask_to_categories(self, mask: int) -> Set[str]:
+        """将类别位掩码转换为类别集合"""
+        return {category for index, category in enumerate(self.categories) if mask >> index & 1}
+
+    def match_categories(self, text: str) -> Set[str]:
+        """
+        获取文本命中的类别集合
+
+        :param text: 待匹配文本（小写）
+        :return: 命中的类别集合
+        """
+        return self.mask_to_categories(self.match_mask(text))
+
+    def count_hits(self, text: str) -> Dict[str, int]:
+        """
+        统计文本中各类别关键词的命中次数
+
+        :param text: 待匹配文本（小写）
+        :return: 类别到命中次数的映射（包含未命中的类别）
+        """
+        counts = dict.fromkeys(self.categories, 0)
+        for _, category, _ in self.iter_matches(text):
+            counts[category] += 1
+        return counts
+
+    def first_positions(self, text: str) -> Dict[str, int]:
+        """
+        获取各类别关键词在文本中首次出现的起始位置
+
+        :param text: 待匹配文本（小写）
+        :return: 类别到起始位置的映射，只包含命中的类别
+        """
+        positions = {}
+        for start, category, _ in self.iter_matches(text):
+            if category not in positions or start < positions[category]:
+                positions[category] = start
+        return positions
+
+    def batch_masks(self, texts: Iterable[str]) -> List[int]:
+        """
+        批量计算多条文本的类别位掩码，相同文本只扫描一次
+
+        :param texts: 待匹配文本列表（小写）
+        :return: 与输入顺序一致的类别位掩码列表
+        """
+        mask_cache = {}
+        masks = []
+        for text in texts:
+            mask = mask_cache.get(text)
+            if mask is None:
+                mask = mask_cache[text] = self.match_mask(text)
+            masks.append(mask)
+        return masks
+
+    def batch_match(self, texts: Iterable[str]) -> List[Set[str]]:
+        """
+        批量匹配多条文本
+
+        :param texts: 待匹配文本列表（小写）
+        :return: 与输入顺序一致的命中类别集合列表
+        """
+        mask_cache = {}
+        results = []
+        for mask in self.batch_masks(texts):
+            categories = mask_cache.get(mask)
+            if categories is None:
+                categories = mask_cache[mask] = self.mask_to_categories(mask)
+            results.append(categories)
+        return results
+
+    def batch_count(self, texts: Iterable[str]) -> Dict[str, int]:
+        """
+        批量统计每个类别被多少条文本命中
+
+        :param texts: 待匹配文本列表（小写）
+        :return: 类别到命中文本数量的映射
+        """
+        counts = [0] * len(self.categories)
+        for mask in self.batch_masks(texts):
+            index = 0
+            while mask:
+                if mask & 1:
+                    counts[index] += 1
+                mask >>= 1
+                index += 1
+        return dict(zip(self.categories, counts))
+
+
+# 按关键词配置缓存已编译的自动机，避免重复构建
+_automaton_cache: Dict[Tuple, KeywordAutomaton] = {}
+
+
+def get_keyword_automaton(keyword_groups: Dict[str, Iterable[str]]) -> KeywordAutomaton:
+    """
+    获取关键词配置对应的自动机，同一配置只编译一次
+
+    :param keyword_groups: 类别到关键词列表的映射
+    :return: 已编译的KeywordAutomaton
+    """
+    cache_key = tuple((category, tuple(keywords)) for category, keywords in keyword_groups.items())
+    automaton = _automaton_cache.get(cache_key)
+    if automaton is None:
+        automaton = _automaton_cache[cache_key] = KeywordAutomaton(keyword_groups)
+    return automaton
@@ -0,0 +1,349 @@
+"""
+排行榜评测模块
+多个AI测试用例集（如不同生成模型、不同提示词版本的产出）对比同一黄金标准时，
+共用一个HTTP会话以及黄金标准的格式化、重复分析和匹配索引，各候选并发评测，
+最后生成对比排行榜报告
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+from datetime import datetime
+from config import get_leaderboard_file_paths, LEADERBOARD_MAX_CONCURRENT_CANDIDATES
+from logger import log, log_error, start_logging, end_logging
+from formatter import format_test_cases
+from evaluator import evaluate_test_cases, prepare_golden_context, render_local_reports, DIMENSION_CHINESE_NAMES
+from llm_api import clear_cache
+from result_cache import build_result_cache_key, get_cached_result, save_result_to_cache
+from core import load_default_golden_cases, create_client_session
+
+
+def _to_score(value):
+    """将评分转换为浮点数，无法转换时返回None"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_leaderboard_entry(name, evaluation_result, case_count=0, cache_hit=False):
+    """
+    从单个候选的评测结果中提取排行榜所需的指标
+
+    :param name: 候选名称
+    :param evaluation_result: 评测结果，评测失败时为None
+    :param case_count: 候选的测试用例数量
+    :param cache_hit: 是否命中评测结果缓存
+    :return: 排行榜条目
+    """
+    entry = {
+        "name": name,
+        "success": bool(evaluation_result),
+        "case_count": case_count,
+        "cache_hit": cache_hit,
+        "overall_score": None,
+        "dimensions": {},
+        "duplicate_rate": None,
+        "coverage_ratio": None,
+        "precision_ratio": None,
+        "overall_interval": None
+    }
+    if not isinstance(evaluation_result, dict):
+        return entry
+
+    summary = evaluation_result.get("evaluation_summary") or {}
+    entry["overall_score"] = _to_score(summary.get("overall_score"))
+    for key, value in (evaluation_result.get("detailed_report") or {}).items():
+        if isinstance(value, dict) and _to_score(value.get("score")) is not None:
+            entry["dimensions"][key] = _to_score(value["score"])
+
+    duplicate_info = evaluation_result.get("duplicate_info") or {}
+    entry["duplicate_rate"] = duplicate_info.get("ai_duplicate_rate")
+    case_matching = evaluation_result.get("case_matching") or {}
+    entry["coverage_ratio"] = case_matching.get("coverage_ratio")
+    entry["precision_ratio"] = case_matching.get("precision_ratio")
+
+    sampling_overall = (evaluation_result.get("sampling") or {}).get("overall_score")
+    if sampling_overall and sampling_overall.get("ci_low") is not None:
+        entry["overall_interval"] = [sampling_overall["ci_low"], sampling_overall["ci_high"]]
+    return entry
+
+
+def build_cached_result(evaluation_result, formatted_ai_cases=None):
+    """
+    将候选的评测结果整理为与async_main返回值相同的结构，单次评测相同用例集时可直接命中缓存。
+    排行榜模式不为候选生成LLM报告，报告在本地渲染
+
+    :param evaluation_result: 候选的评测结果
+    :param formatted_ai_cases: 格式化后的候选测试用例（可选），用于生成覆盖流程图
+    :return: 可写入评测结果缓存的结果
+    """
+    report = render_local_reports(evaluation_result, formatted_ai_cases)["standard"]
+    return {
+        "success": True,
+        "evaluation_result": evaluation_result,
+        "files": {},
+        "report": report,
+        "markdown_report": report
+    }
+
+
+def rank_leaderboard(entries):
+    """
+    按总分（相同时按黄金标准覆盖率）从高到低排名，评测失败或没有总分的候选排在最后
+
+    :param entries: 排行榜条目列表
+    :return: 排名后的条目列表，成功的条目带有rank字段，总分和覆盖率都相同的候选名次相同，
+             其后的名次顺延（如1、1、3），其余条目的rank为None
+    """
+    def sort_key(entry):
+        return (entry["success"] and entry["overall_score"] is not None,
+                entry["overall_score"] or 0, entry["coverage_ratio"] or 0)
+
+    ranked = sorted(entries, key=sort_key, reverse=True)
+    previous_key = None
+    for position, entry in enumerate(ranked, 1):
+        if entry["success"] and entry["overall_score"] is not None:
+            key = sort_key(entry)
+            entry["rank"] = ranked[position - 2]["rank"] if key == previous_key else position
+            previous_key = key
+        else:
+            entry["rank"] = None
+    return ranked
+
+
+def render_leaderboard_report(ranked_entries, golden_count=0):
+    """
+    渲染排行榜Markdown报告
+
+    :param ranked_entries: rank_leaderboard返回的条目列表
+    :param golden_count: 黄金标准测试用例数量
+    :return: Markdown文本
+    """
+    def percent(value):
+        return f"{value * 100:.1f}%" if value is not None else "N/A"
+
+    successful = [entry for entry in ranked_entries if entry["rank"]]
+    report = "# AI测试用例排行榜\n\n"
+    report += f"> 共{len(ranked_entries)}个候选用例集对比同一黄金标准（{golden_count}个用例），" \
+              f"成功评测{len(successful)}个\n\n"
+
+    report += "## 🏆 总体排名\n\n"
+    report += "| 排名 | 候选 | 总分 | 用例数 | 黄金标准覆盖率 | AI用例对应率 | 重复率 |\n"
+    report += "|------|------|------|-------|--------------|------------|-------|\n"
+    for entry in ranked_entries:
+        if entry["rank"]:
+            overall = f"{entry['overall_score']}"
+            if entry["overall_interval"]:
+                overall += f"（{entry['overall_interval'][0]} ~ {entry['overall_interval'][1]}）"
+            duplicate_rate = f"{entry['duplicate_rate']}%" if entry["duplicate_rate"] is not None else "N/A"
+            report += f"| {entry['rank']} | {entry['name']} | {overall} | {entry['case_count']} | " \
+                      f"{percent(entry['coverage_ratio'])} | {percent(entry['precision_ratio'])} | {duplicate_rate} |\n"
+        else:
+            report += f"| - | {entry['name']} | 评测失败 | {entry['case_count']} | - | - | - |\n"
+    report += "\n"
+    if any(entry["overall_interval"] for entry in successful):
+        report += "> 括号内为抽样评测的总分置信区间。区间不重叠的候选之间差异显著；" \
+                  "区间重叠时不能据此判断差异不显著，需要增大样本量后再比较。\n\n"
+
+    # 各维度得分对比，标出每个维度的最高分
+    dimension_keys = []
+    for entry in successful:
+        dimension_keys.extend(key for key in entry["dimensions"] if key not in dimension_keys)
+    if dimension_keys:
+        report += "## 📊 各维度得分对比\n\n"
+        report += "| 评估维度 | " + " | ".join(entry["name"] for entry in successful) + " |\n"
+        report += "|---------|" + "|".join("------" for _ in successful) + "|\n"
+        for key in dimension_keys:
+            scores = [entry["dimensions"].get(key) for entry in successful]
+            best = max((score for score in scores if score is not None), default=None)
+            cells = []
+            for score in scores:
+                if score is None:
+                    cells.append("N/A")
+                else:
+                    cells.append(f"**{score}**" if score == best else f"{score}")
+            name = DIMENSION_CHINESE_NAMES.get(key, key.replace("_", " ").title())
+            report += f"| {name} | " + " | ".join(cells) + " |\n"
+        report += "\n"
+
+        report += "## 🥇 各维度最佳候选\n\n"
+        for key in dimension_keys:
+            scored = [(entry["dimensions"][key], entry["name"]) for entry in successful if key in entry["dimensions"]]
+            if scored:
+                best_score = max(score for score, _ in scored)
+                leaders = "、".join(name for score, name in scored if score == best_score)
+                report += f"- **{DIMENSION_CHINESE_NAMES.get(key, key)}**：{leaders}（{best_score}）\n"
+        report += "\n"
+
+    failed = [entry["name"] for entry in ranked_entries if not entry["rank"]]
+    if failed:
+        report += "## ⚠️ 评测失败的候选\n\n" + "\n".join(f"- {name}" for name in failed) + "\n\n"
+
+    current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
+    report += f"---\n**生成时间：{current_time} • gogogo出发喽评估中心**\n"
+    return report
+
+
+async def async_leaderboard_main(candidates, golden_cases_data=None, use_cache=True, sample_size=None):
+    """
+    排行榜评测：多个AI测试用例集对比同一黄金标准
+
+    黄金标准只格式化和预处理一次；各候选共用一个HTTP会话（连接池上限即全局LLM并发上限），
+    并发评测的候选数量不超过LEADERBOARD_MAX_CONCURRENT_CANDIDATES
+
+    :param candidates: 候选名称到AI测试用例数据（JSON字符串）的映射
+    :param golden_cases_data: 黄金标准测试用例数据（可选），JSON字符串，None则从goldenset文件夹加载
+    :param use_cache: 是否复用已有的单次评测结果缓存
+    :param sample_size: 抽样评测的样本量（可选），含义同async_main
+    :return: 排行榜结果
+    """
+    clear_cache()
+    start_logging()
+    start_time = time.time()
+    log(f"启动排行榜评测，候选用例集数量: {len(candidates)}", important=True)
+
+    if not candidates:
+        end_logging()
+        return {"success": False, "error": "没有提供候选测试用例集"}
+
+    golden_cases_raw_text = golden_cases_data if golden_cases_data is not None else load_default_golden_cases()
+    if golden_cases_raw_text is None:
+        end_logging()
+        return {"success": False, "error": "加载黄金标准测试用例失败"}
+
+    leaderboard_file, leaderboard_json_file = get_leaderboard_file_paths()
+
+    # 已有单次评测结果缓存的候选无需重新评测，新评测的候选结果写入同一缓存
+    cache_keys = {name: build_result_cache_key(ai_cases_data, golden_cases_raw_text, sample_size=sample_size)
+                  for name, ai_cases_data in candidates.items()}
+    evaluation_results = {}
+    cache_hits = set()
+    case_counts = {}
+    if use_cache:
+        for name in candidates:
+            cached = get_cached_result(cache_keys[name])
+            if cached and cached.get("evaluation_result"):
+                evaluation_results[name] = cached["evaluation_result"]
+                cache_hits.add(name)
+                log(f"候选 {name} 命中评测结果缓存", important=True)
+    pending = {name: data for name, data in candidates.items() if name not in cache_hits}
+
+    session_id = str(uuid.uuid4())
+    log(f"创建排行榜评测会话: {session_id}", important=True)
+    golden_count = 0
+    async with create_client_session(session_id) as session:
+        # 黄金标准和各候选并行格式化，黄金标准只格式化一次
+        formatted = await asyncio.gather(
+            format_test_cases(session, golden_cases_raw_text, "Golden"),
+            *[format_test_cases(session, data, "AI") for data in pending.values()]
+        )
+        formatted_golden_cases, formatted_candidates = formatted[0], dict(zip(pending, formatted[1:]))
+        if not formatted_golden_cases:
+            end_logging()
+            return {"success": False, "error": "格式化黄金标准测试用例失败"}
+
+        golden_testcases = formatted_golden_cases.get("testcases", {}).get("test_cases", [])
+        golden_count = len(golden_testcases)
+        golden_context = prepare_golden_context(golden_testcases)
+        log(f"黄金标准预处理完成，共{golden_count}个用例，将由{len(pending)}个候选共用", important=True)
+
+        semaphore = asyncio.Semaphore(LEADERBOARD_MAX_CONCURRENT_CANDIDATES)
+
+        async def evaluate_candidate(name, formatted_ai_cases):
+            if not formatted_ai_cases:
+                log_error(f"格式化候选 {name} 的测试用例失败")
+                return None
+            async with semaphore:
+                candidate_start = time.time()
+                log(f"开始评测候选: {name}", important=True)
+                result = await evaluate_test_cases(session, formatted_ai_cases, formatted_golden_cases,
+                                                   sample_size=sample_size, golden_context=golden_context)
+                log(f"候选 {name} 评测完成，耗时{time.time() - candidate_start:.2f}秒", important=True)
+                return result
+
+        results = await asyncio.gather(
+            *[evaluate_candidate(name, formatted_ai_cases) for name, formatted_ai_cases in formatted_candidates.items()],
+            return_exceptions=True
+        )
+        for name, result in zip(formatted_candidates, results):
+            if isinstance(result, BaseException):
+                log_error(f"候选 {name} 评测出错: {str(result)}")
+                result = None
+            evaluation_results[name] = result
+            formatted_ai_cases = formatted_candidates[name]
+            if formatted_ai_cases:
+                case_counts[name] = len(formatted_ai_cases.get("testcases", {}).get("test_cases", []))
+            if result and not result.get("error"):
+                try:
+                    save_result_to_cache(cache_keys[name], build_cached_result(result, formatted_ai_cases))
+                except Exception as e:
+                    log_error(f"缓存候选 {name} 的评测结果失败", e)
+
+    for name in cache_hits:
+        case_counts[name] = (evaluation_results[name].get("case_matching") or {}).get("ai_count", 0)
+
+    entries = rank_leaderboard([
+        build_leaderboard_entry(name, evaluation_results.get(name), case_counts.get(name, 0), name in cache_hits)
+        for name in candidates
+    ])
+    markdown_report = render_leaderboard_report(entries, golden_count)
+
+    files = {}
+    try:
+        os.makedirs(os.path.dirname(leaderboard_file), exist_ok=True)
+        os.makedirs(os.path.dirname(leaderboard_json_file), exist_ok=True)
+        with open(leaderboard_file, 'w', encoding='utf-8') as f:
+            f.write(markdown_report)
+        with open(leaderboard_json_file, 'w', encoding='utf-8') as f:
+            json.dump({"leaderboard": entries, "evaluation_results": evaluation_results}, f, ensure_ascii=False, indent=2)
+        files = {"leaderboard_md": leaderboard_file, "leaderboard_json": leaderboard_json_file}
+        log(f"排行榜报告已保存到 {leaderboard_file}", important=True)
+    except Exception as e:
+        log_error("保存排行榜报告失败", e)
+
+    log(f"排行榜评测完成，总耗时{time.time() - start_time:.2f}秒", important=True)
+    end_logging()
+    return {
+        "success": any(entry["rank"] for entry in entries),
+        "leaderboard": entries,
+        "markdown_report": markdown_report,
+        "evaluation_results": evaluation_results,
+        "files": files
+    }
+
+
+def leaderboard_main(candidate_files, golden_cases_file=None, use_cache=True, sample_size=None):
+    """
+    排行榜评测的同步入口
+
+    :param candidate_files: 候选名称到AI测试用例文件路径的映射
+    :param golden_cases_file: 黄金标准测试用例文件路径（可选）
+    :param use_cache: 是否复用已有的单次评测结果缓存
+    :param sample_size: 抽样评测的样本量（可选）
+    :return: 排行榜结果
+    """
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    candidates = {}
+    for name, file_path in candidate_files.items():
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                candidates[name] = f.read()
+        except Exception as e:
+            log_error(f"读取候选 {name} 的测试用例文件 {file_path} 失败", e)
+            return {"success": False, "error": f"读取候选 {name} 的测试用例文件失败: {e}"}
+
+    golden_cases_data = None
+    if golden_cases_file:
+        try:
+            with open(golden_cases_file, 'r', encoding='utf-8') as f:
+                golden_cases_data = f.read()
+        except Exception as e:
+            log_error(f"读取黄金标准测试用例文件 {golden_cases_file} 失败", e)
+            return {"success": False, "error": f"读取黄金标准测试用例文件失败: {e}"}
+
+    return asyncio.run(async_leaderboard_main(candidates, golden_cases_data, use_cache=use_cache,
+                                              sample_size=sample_size))
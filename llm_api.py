@@ -9,6 +9,7 @@ import threading
 from typing import Optional, Dict, List
 from config import API_URL, VOLC_BEARER_TOKEN, MODEL_NAME, MAX_TOKEN_SIZE, LLM_CACHE_SIZE, LLM_TEMPERATURE, LLM_CACHE_ENABLED, AIOHTTP_TIMEOUT
 from logger import log, log_error
+from testcase_model import normalize_test_cases, test_cases_to_dicts
 from functools import lru_cache
 import hashlib
 import itertools
@@ -594,36 +595,25 @@ def extract_sample_cases(json_data, max_cases=None):
     try:
         data = json.loads(json_data)
 
-        # 提取所有测试用例
-        all_cases = []
-
-        # 处理test_cases.json格式
-        if isinstance(data, dict) and "testcases" in data:
-            testcases = data["testcases"]
-            if isinstance(testcases, dict) and "test_cases" in testcases:
-                all_cases = testcases["test_cases"] if max_cases is None else testcases["test_cases"][:max_cases]
-            elif isinstance(testcases, list):
-                all_cases = testcases if max_cases is None else testcases[:max_cases]
-
-        # 处理golden_cases.json格式
-        elif isinstance(data, dict) and "test_cases" in data:
-            test_cases = data["test_cases"]
-            if isinstance(test_cases, dict):
-                # 将各类别的测试用例合并
-                for category, cases in test_cases.items():
-                    all_cases.extend(cases if max_cases is None else cases[:max_cases // len(test_cases.keys())])
-                    if max_cases is not None and len(all_cases) >= max_cases:
-                        all_cases = all_cases[:max_cases]
-                        break
-
-        # 如果找不到测试用例，尝试从顶层提取
-        if not all_cases and isinstance(data, list):
-            all_cases = data if max_cases is None else data[:max_cases]
+        # 提取并规范化所有测试用例
+        all_cases = normalize_test_cases(data)
+
+        # 限制数量时各类别按相同配额提取，避免样本只包含前几个类别
+        if max_cases is not None and len(all_cases) > max_cases:
+            categories = list(dict.fromkeys(case.category for case in all_cases))
+            quota = max(max_cases // len(categories), 1)
+            taken = {}
+            sampled = []
+            for case in all_cases:
+                if taken.get(case.category, 0) < quota:
+                    taken[case.category] = taken.get(case.category, 0) + 1
+                    sampled.append(case)
+            all_cases = sampled[:max_cases]
 
         # 构建样本数据
         sample_data = {
             "success": True,
-            "testcases": all_cases
+            "testcases": test_cases_to_dicts(all_cases)
         }
 
         return json.dumps(sample_data, ensure_ascii=False)
@@ -84,8 +84,24 @@ if __name__ == "__main__":
         parser.add_argument("--golden", help="黄金标准测试用例文件路径")
         parser.add_argument("--iteration", action="store_true", help="是否启用迭代前后对比功能")
         parser.add_argument("--prev", help="上一次迭代的测试用例文件路径，仅在--iteration为true时有效")
+        parser.add_argument("--no-cache", action="store_true", help="跳过评测结果缓存，强制重新评测")
+        parser.add_argument("--sample-size", type=int, default=None,
+                            help="启用分层抽样评测并指定样本量，0表示根据目标精度推算样本量")
+        parser.add_argument("--candidate", action="append", metavar="NAME=PATH",
+                            help="排行榜模式的候选AI测试用例文件，可重复指定，多个候选对比同一黄金标准")
         args = parser.parse_args(sys.argv[2:])
-        main(args.ai, args.golden, is_iteration=args.iteration, prev_iteration_file=args.prev)
+        if args.candidate:
+            from leaderboard import leaderboard_main
+            candidate_files = {}
+            for item in args.candidate:
+                name, separator, path = item.partition("=")
+                if not separator:
+                    name, path = os.path.splitext(os.path.basename(item))[0], item
+                candidate_files[name] = path
+            leaderboard_main(candidate_files, args.golden, use_cache=not args.no_cache, sample_size=args.sample_size)
+        else:
+            main(args.ai, args.golden, is_iteration=args.iteration, prev_iteration_file=args.prev,
+                 use_cache=not args.no_cache, sample_size=args.sample_size)
     else:
         # API模式（默认）
         try:
@@ -0,0 +1,216 @@
+"""
+重复检测候选对生成模块
+对步骤文本的字符n-gram计算MinHash签名，再用分段局部敏感哈希（banded LSH）只挑出可能相似的用例对，
+代替逐对枚举，使重复分析的耗时和内存随用例数量近似线性增长
+"""
+import random
+import zlib
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterator, List, Sequence, Tuple
+from config import (
+    DUPLICATE_SIMILARITY_THRESHOLD, DUPLICATE_LSH_MIN_CASES, DUPLICATE_LSH_NUM_PERM, DUPLICATE_LSH_SHINGLE_SIZE,
+    DUPLICATE_LSH_THRESHOLD_RATIO, DUPLICATE_LSH_FALSE_NEGATIVE_WEIGHT, DUPLICATE_LSH_SEED
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 哈希取模使用的素数，保证 a*x+b 在64位无符号整数内不溢出
+_MERSENNE_PRIME = 4294967291
+_MAX_HASH = 0xFFFFFFFF
+# 计算LSH参数时数值积分的步数
+_INTEGRATION_STEPS = 100
+
+
+def shingle_hashes(text: str, size: int = None) -> List[int]:
+    """
+    计算文本字符n-gram的32位哈希集合，空白字符不参与分片
+
+    :param text: 文本
+    :param size: n-gram长度，None则使用配置中的DUPLICATE_LSH_SHINGLE_SIZE
+    :return: 去重后的哈希值列表
+    """
+    size = size or DUPLICATE_LSH_SHINGLE_SIZE
+    text = "".join(text.lower().split())
+    if len(text) <= size:
+        return [zlib.crc32(text.encode("utf-8"))] if text else []
+    return list({zlib.crc32(text[i:i + size].encode("utf-8")) for i in range(len(text) - size + 1)})
+
+
+def similarity_to_jaccard(similarity: float) -> float:
+    """
+    将字符多重集合上的Dice相似度（SequenceMatcher.quick_ratio）换算为等价的Jaccard相似度
+
+    :param similarity: Dice相似度
+    :return: Jaccard相似度
+    """
+    return similarity / (2 - similarity) if similarity < 2 else 1.0
+
+
+def _false_positive_probability(threshold: float, bands: int, rows: int) -> float:
+    """相似度低于阈值的用例对成为候选的概率（对相似度积分）"""
+    step = threshold / _INTEGRATION_STEPS
+    return sum(1 - (1 - ((i + 0.5) * step) ** rows) ** bands for i in range(_INTEGRATION_STEPS)) * step
+
+
+def _false_negative_probability(threshold: float, bands: int, rows: int) -> float:
+    """相似度高于阈值的用例对未成为候选的概率（对相似度积分）"""
+    step = (1 - threshold) / _INTEGRATION_STEPS
+    return sum((1 - (threshold + (i + 0.5) * step) ** rows) ** bands for i in range(_INTEGRATION_STEPS)) * step
+
+
+@lru_cache(maxsize=32)
+def optimal_lsh_params(threshold: float, num_perm: int, false_negative_weight: float = None) -> Tuple[int, int]:
+    """
+    选择分段数和每段行数，使漏检概率和误检概率的加权和最小
+
+    :param threshold: Jaccard相似度阈值
+    :param num_perm: MinHash签名长度
+    :param false_negative_weight: 漏检的权重（0-1），越大召回率越高、候选对越多，None则使用配置值
+    :return: (分段数, 每段行数)
+    """
+    weight = DUPLICATE_LSH_FALSE_NEGATIVE_WEIGHT if false_negative_weight is None else false_negative_weight
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            error = (1 - weight) * _false_positive_probability(threshold, bands, rows) + \
+                    weight * _false_negative_probability(threshold, bands, rows)
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """使用 (a*x+b) mod p 哈希族计算MinHash签名"""
+
+    def __init__(self, num_perm: int = None, seed: int = None):
+        """
+        :param num_perm: 签名长度，None则使用配置中的DUPLICATE_LSH_NUM_PERM
+        :param seed: 生成哈希参数的随机种子，相同种子得到相同签名
+        """
+        self.num_perm = num_perm or DUPLICATE_LSH_NUM_PERM
+        rng = random.Random(DUPLICATE_LSH_SEED if seed is None else seed)
+        self.a = [rng.randint(1, _MERSENNE_PRIME - 1) for _ in range(self.num_perm)]
+        self.b = [rng.randint(0, _MERSENNE_PRIME - 1) for _ in range(self.num_perm)]
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, hashes: Sequence[int]) -> Tuple[int, ...]:
+        """
+        计算MinHash签名
+
+        :param hashes: shingle_hashes返回的哈希值列表
+        :return: 长度为num_perm的签名，空集合返回全为最大值的签名
+        """
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+        if np is not None:
+            values = np.array(hashes, dtype=np.uint64)[None, :]
+            return tuple(((self._a * values + self._b) % np.uint64(_MERSENNE_PRIME)).min(axis=1).tolist())
+        return tuple(min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in zip(self.a, self.b))
+
+
+class LSHIndex:
+    """分段局部敏感哈希索引：签名的任一分段完全相同的两个条目成为候选对"""
+
+    def __init__(self, bands: int, rows: int):
+        """
+        :param bands: 分段数
+        :param rows: 每段行数
+        """
+        self.bands = bands
+        self.rows = rows
+        self.buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+
+    def add(self, key: int, signature: Sequence[int]):
+        """
+        加入一个条目
+
+        :param key: 条目键（生成候选对时为下标）
+        :param signature: MinHash签名
+        """
+        for band, buckets in enumerate(self.buckets):
+            start = band * self.rows
+            buckets.setdefault(tuple(signature[start:start + self.rows]), []).append(key)
+
+    def remove(self, key, signature: Sequence[int]):
+        """
+        移除一个条目
+
+        :param key: 条目键
+        :param signature: 加入时使用的MinHash签名
+        """
+        for band, buckets in enumerate(self.buckets):
+            start = band * self.rows
+            band_key = tuple(signature[start:start + self.rows])
+            keys = buckets.get(band_key)
+            if keys and key in keys:
+                keys.remove(key)
+                if not keys:
+                    del buckets[band_key]
+
+    def query(self, signature: Sequence[int]) -> List:
+        """
+        查找与给定签名至少有一个分段相同的条目
+
+        :param signature: MinHash签名
+        :return: 条目键列表，按首次出现的顺序去重
+        """
+        found = {}
+        for band, buckets in enumerate(self.buckets):
+            start = band * self.rows
+            for key in buckets.get(tuple(signature[start:start + self.rows]), ()):
+                found[key] = True
+        return list(found)
+
+    def candidate_pairs(self) -> Iterator[Tuple[int, int]]:
+        """
+        遍历所有候选对，每对只出现一次
+
+        :return: (较小下标, 较大下标) 的迭代器
+        """
+        seen = set()
+        for buckets in self.buckets:
+            for keys in buckets.values():
+                if len(keys) < 2:
+                    continue
+                for pair in combinations(keys, 2):
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+
+def create_lsh(similarity_threshold: float = None) -> Tuple[MinHasher, LSHIndex]:
+    """
+    按配置创建MinHash签名计算器和空的LSH索引
+
+    :param similarity_threshold: 相似度阈值（SequenceMatcher.quick_ratio），None则使用DUPLICATE_SIMILARITY_THRESHOLD
+    :return: (MinHasher, LSHIndex)
+    """
+    similarity_threshold = DUPLICATE_SIMILARITY_THRESHOLD if similarity_threshold is None else similarity_threshold
+    # n-gram集合的Jaccard相似度低于字符多重集合的相似度，按比例放宽阈值以保证召回率
+    jaccard_threshold = similarity_to_jaccard(similarity_threshold) * DUPLICATE_LSH_THRESHOLD_RATIO
+    hasher = MinHasher()
+    bands, rows = optimal_lsh_params(jaccard_threshold, hasher.num_perm)
+    return hasher, LSHIndex(bands, rows)
+
+
+def find_candidate_pairs(texts: List[str], similarity_threshold: float = None) -> List[Tuple[int, int]]:
+    """
+    找出可能相似的文本对，数量不超过DUPLICATE_LSH_MIN_CASES时返回全部文本对
+
+    :param texts: 文本列表
+    :param similarity_threshold: 相似度阈值（SequenceMatcher.quick_ratio），None则使用DUPLICATE_SIMILARITY_THRESHOLD
+    :return: (下标i, 下标j) 列表，i < j
+    """
+    if len(texts) <= DUPLICATE_LSH_MIN_CASES:
+        return list(combinations(range(len(texts)), 2))
+
+    hasher, index = create_lsh(similarity_threshold)
+    for position, text in enumerate(texts):
+        index.add(position, hasher.signature(shingle_hashes(text)))
+    return list(index.candidate_pairs())
@@ -0,0 +1,220 @@
+"""
+评测结果缓存模块
+以输入测试用例的规范化内容哈希和相关配置指纹为键，缓存完整的评测结果和报告，
+相同的输入和配置再次评测时直接返回已有结果
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import config
+from config import RESULT_CACHE_ENABLED, RESULT_CACHE_TTL, RESULT_CACHE_DIR
+from logger import log, log_error
+
+# 影响评测结果的配置项，任一项变化都会使已有缓存失效
+RESULT_CACHE_CONFIG_KEYS = (
+    "MODEL_NAME",
+    "ENABLE_MULTI_JUDGES",
+    "JUDGE_MODELS",
+    "ENABLE_COLLAB_EVAL",
+    "CHAIRMAN_MODEL",
+    "LOW_CONSENSUS_THRESHOLD",
+    "HIGH_DISAGREEMENT_THRESHOLD",
+    "DEBATE_MAX_ROUNDS",
+    "EVALUATION_DIMENSIONS",
+    "LLM_TEMPERATURE",
+    "LLM_TEMPERATURE_REPORT",
+    "MAX_TOKEN_SIZE",
+    "REPORT_NARRATIVE_TIMEOUT",
+    "REPORT_NARRATIVE_MAX_CHARS",
+    "REPORT_NARRATIVE_REASON_CHARS",
+    "REPORT_GENERATION_DEADLINE",
+    "DUPLICATE_SIMILARITY_THRESHOLD",
+    "DUPLICATE_MIXED_STEPS_WEIGHT",
+    "DUPLICATE_MIXED_SIMILARITY_THRESHOLD",
+    "DUPLICATE_LSH_MIN_CASES",
+    "DUPLICATE_LSH_NUM_PERM",
+    "DUPLICATE_LSH_SHINGLE_SIZE",
+    "DUPLICATE_LSH_THRESHOLD_RATIO",
+    "DUPLICATE_LSH_FALSE_NEGATIVE_WEIGHT",
+    "DUPLICATE_LSH_SEED",
+    "DUPLICATE_TOKEN_JACCARD_RATIO",
+    "DUPLICATE_SIMILARITY_ENGINE",
+    "DUPLICATE_VECTOR_SIMILARITY_THRESHOLD",
+    "DUPLICATE_VECTOR_NGRAM_SIZES",
+    "DUPLICATE_VECTOR_DIMENSION",
+    "CASE_MATCH_THRESHOLD",
+    "SAMPLING_ENABLED",
+    "SAMPLING_MIN_CASES",
+    "SAMPLING_SAMPLE_SIZE",
+    "SAMPLING_TARGET_MARGIN",
+    "SAMPLING_SCORE_STD",
+    "SAMPLING_CONFIDENCE",
+    "SAMPLING_REPLICATES",
+    "SAMPLING_BOOTSTRAP_ROUNDS",
+    "SAMPLING_BOOTSTRAP_MIN_REPLICATES",
+    "SAMPLING_RANDOM_SEED",
+    "COVERAGE_FULL_THRESHOLD",
+    "COVERAGE_PARTIAL_THRESHOLD",
+    "COVERAGE_KEYWORDS",
+    "DEBATE_STAGE_TIMEOUT",
+    "DEBATE_BATCH_MODE",
+    "COMMITTEE_EARLY_STOP",
+    "COMMITTEE_EARLY_STOP_QUORUM",
+    "COMMITTEE_LAUNCH_MODE",
+    "COMMITTEE_QUORUM",
+    "COMMITTEE_QUORUM_SOFT_DEADLINE",
+    "COMMITTEE_TRIM_RATIO"
+)
+
+# 缓存格式版本，结果结构变化时递增以使旧缓存失效
+RESULT_CACHE_VERSION = 2
+
+_cache_lock = threading.Lock()
+
+
+def canonical_content_hash(data):
+    """
+    计算测试用例数据的规范化内容哈希，键顺序和空白差异不影响结果
+
+    :param data: JSON字符串或已解析的对象，None表示未提供
+    :return: SHA-256十六进制字符串
+    """
+    if data is None:
+        return "none"
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except (json.JSONDecodeError, ValueError):
+            # 无法解析时按去除首尾空白的原始文本计算
+            return hashlib.sha256(data.strip().encode('utf-8')).hexdigest()
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def config_fingerprint():
+    """
+    计算影响评测结果的配置指纹
+
+    :return: SHA-256十六进制字符串
+    """
+    settings = {key: getattr(config, key, None) for key in RESULT_CACHE_CONFIG_KEYS}
+    settings["__version__"] = RESULT_CACHE_VERSION
+    return canonical_content_hash(settings)
+
+
+def build_result_cache_key(ai_cases_data, golden_cases_data, is_iteration=False, prev_iteration_data=None,
+                           sample_size=None):
+    """
+    构建评测结果缓存键
+
+    :param ai_cases_data: AI测试用例数据
+    :param golden_cases_data: 黄金标准测试用例数据
+    :param is_iteration: 是否启用迭代前后对比功能
+    :param prev_iteration_data: 上一次迭代的测试用例数据（可选）
+    :param sample_size: 调用方指定的抽样评测样本量（可选）
+    :return: 缓存键
+    """
+    parts = [
+        canonical_content_hash(ai_cases_data),
+        canonical_content_hash(golden_cases_data),
+        "iteration" if is_iteration else "standard",
+        canonical_content_hash(prev_iteration_data if is_iteration else None),
+        config_fingerprint()
+    ]
+    if sample_size is not None:
+        parts.append(f"sample:{sample_size}")
+    return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()
+
+
+def _cache_file_path(cache_key):
+    """获取缓存键对应的缓存文件路径"""
+    return os.path.join(RESULT_CACHE_DIR, f"{cache_key}.json")
+
+
+def get_cached_result(cache_key, ttl=None):
+    """
+    读取缓存的评测结果
+
+    :param cache_key: 缓存键
+    :param ttl: 缓存有效期（秒），None则使用配置中的RESULT_CACHE_TTL
+    :return: 缓存的评测结果，不存在、已过期或缓存被禁用时返回None
+    """
+    if not RESULT_CACHE_ENABLED:
+        return None
+
+    ttl = RESULT_CACHE_TTL if ttl is None else ttl
+    cache_file = _cache_file_path(cache_key)
+    if not os.path.exists(cache_file):
+        return None
+
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except Exception as e:
+        log_error(f"读取评测结果缓存失败: {str(e)}")
+        return None
+
+    age = time.time() - entry.get("cached_at", 0)
+    if ttl is not None and ttl >= 0 and age > ttl:
+        log(f"评测结果缓存已过期（{age:.0f}秒 > {ttl}秒），将重新评测", important=True)
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+        return None
+
+    log(f"命中评测结果缓存，缓存时间: {age:.0f}秒前", important=True)
+    return entry.get("result")
+
+
+def save_result_to_cache(cache_key, result):
+    """
+    保存评测结果到缓存，只缓存成功的结果
+
+    :param cache_key: 缓存键
+    :param result: async_main返回的评测结果
+    :return: 是否保存成功
+    """
+    if not RESULT_CACHE_ENABLED or not result or not result.get("success", False):
+        return False
+
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    cache_file = _cache_file_path(cache_key)
+    temp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+    try:
+        with _cache_lock:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"cached_at": time.time(), "result": result}, f, ensure_ascii=False)
+            # 原子替换，避免并发请求读到写了一半的文件
+            os.replace(temp_file, cache_file)
+        log(f"评测结果已缓存: {cache_file}", important=True)
+        return True
+    except Exception as e:
+        log_error(f"保存评测结果缓存失败: {str(e)}")
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        return False
+
+
+def clear_result_cache():
+    """
+    清除所有评测结果缓存
+
+    :return: 删除的缓存文件数量
+    """
+    removed = 0
+    with _cache_lock:
+        if os.path.isdir(RESULT_CACHE_DIR):
+            for file_name in os.listdir(RESULT_CACHE_DIR):
+                if file_name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(RESULT_CACHE_DIR, file_name))
+                        removed += 1
+                    except OSError:
+                        pass
+    log(f"已清除{removed}个评测结果缓存", important=True)
+    return removed
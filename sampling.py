@@ -0,0 +1,429 @@
+"""
+大规模测试用例集的分层抽样评测模块
+按用例类别分层、以重复用例簇为抽样单元，抽取若干组互不重叠的样本组分别评测，
+再以各样本组的得分为单位估计各维度得分的置信区间：样本组较少时使用t分布区间，
+样本组足够多时用自助法（bootstrap）重抽样
+"""
+import copy
+import math
+import random
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+from config import (
+    SAMPLING_ENABLED, SAMPLING_MIN_CASES, SAMPLING_SAMPLE_SIZE, SAMPLING_TARGET_MARGIN, SAMPLING_SCORE_STD,
+    SAMPLING_CONFIDENCE, SAMPLING_REPLICATES, SAMPLING_BOOTSTRAP_ROUNDS, SAMPLING_BOOTSTRAP_MIN_REPLICATES,
+    SAMPLING_RANDOM_SEED
+)
+from testcase_model import TestCase
+from disjoint_set import DisjointSet
+
+# 评分范围，置信区间截断到该范围内
+SCORE_RANGE = (1.0, 5.0)
+
+
+def _t_two_sided_probability(t: float, df: int) -> float:
+    """计算自由度为df的t分布落在[-t, t]内的概率（整数自由度的闭式解）"""
+    theta = math.atan(t / math.sqrt(df))
+    cos2 = math.cos(theta) ** 2
+    if df % 2:
+        # 奇数自由度：2/π·(θ + sinθ·cosθ·(1 + 2/3·cos²θ + 2·4/(3·5)·cos⁴θ + ...))
+        term, total = 1.0, 1.0 if df > 1 else 0.0
+        for k in range(1, (df - 1) // 2):
+            term *= cos2 * (2 * k) / (2 * k + 1)
+            total += term
+        return 2 / math.pi * (theta + math.sin(theta) * math.cos(theta) * total)
+    # 偶数自由度：sinθ·(1 + 1/2·cos²θ + 1·3/(2·4)·cos⁴θ + ...)
+    term, total = 1.0, 1.0
+    for k in range(1, df // 2):
+        term *= cos2 * (2 * k - 1) / (2 * k)
+        total += term
+    return math.sin(theta) * total
+
+
+def t_critical_value(confidence: float, df: int) -> float:
+    """
+    计算双侧t分布临界值
+
+    :param confidence: 置信水平
+    :param df: 自由度，不小于1
+    :return: 临界值t，使t分布落在[-t, t]内的概率等于confidence
+    """
+    low, high = 0.0, 1.0
+    while _t_two_sided_probability(high, df) < confidence:
+        high *= 2
+    for _ in range(100):
+        middle = (low + high) / 2
+        if _t_two_sided_probability(middle, df) < confidence:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def _critical_value(confidence: float, replicates: int) -> float:
+    """置信区间使用的临界值：样本组不少于2组时为t分布临界值，否则退化为正态分布临界值"""
+    if replicates >= 2:
+        return t_critical_value(confidence, replicates - 1)
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def derive_sample_size(population: int, margin: float = None, confidence: float = None,
+                       score_std: float = None, replicates: int = None) -> int:
+    """
+    根据目标精度推算样本量（含有限总体校正）
+
+    置信区间以样本组得分为单位估计。n个用例平均分为R组时，每组得分的标准差约为σ/√(n/R)，
+    R个组得分均值的t分布区间半宽约为t(R-1)·σ/√n，因此按t(R-1)而不是正态临界值推算样本量
+
+    :param population: 总体用例数量
+    :param margin: 目标置信区间半宽，None则使用配置中的SAMPLING_TARGET_MARGIN
+    :param confidence: 置信水平，None则使用配置中的SAMPLING_CONFIDENCE
+    :param score_std: 单个用例得分标准差的先验估计，None则使用配置中的SAMPLING_SCORE_STD
+    :param replicates: 样本组数量，None则使用配置中的SAMPLING_REPLICATES
+    :return: 样本量，不超过总体数量
+    """
+    margin = SAMPLING_TARGET_MARGIN if margin is None else margin
+    confidence = SAMPLING_CONFIDENCE if confidence is None else confidence
+    score_std = SAMPLING_SCORE_STD if score_std is None else score_std
+    replicates = SAMPLING_REPLICATES if replicates is None else replicates
+    if population <= 0:
+        return 0
+    if margin <= 0:
+        return population
+
+    n0 = (_critical_value(confidence, replicates) * score_std / margin) ** 2
+    return min(population, math.ceil(n0 / (1 + (n0 - 1) / population)))
+
+
+def resolve_sample_size(population: int, sample_size: Optional[int] = None) -> int:
+    """
+    确定本次评测的样本量
+
+    :param population: AI测试用例数量
+    :param sample_size: 调用方指定的样本量，None表示按配置决定是否抽样，0表示根据目标精度推算
+    :return: 样本量，0表示不抽样（评测全部用例）
+    """
+    if sample_size is None:
+        if not SAMPLING_ENABLED or population <= SAMPLING_MIN_CASES:
+            return 0
+        sample_size = SAMPLING_SAMPLE_SIZE
+
+    if not sample_size or sample_size <= 0:
+        sample_size = derive_sample_size(population)
+    # 每个样本组至少一个用例，且样本量不小于总体时没有必要抽样
+    sample_size = max(sample_size, SAMPLING_REPLICATES)
+    return sample_size if sample_size < population else 0
+
+
+def build_case_clusters(test_cases: List[TestCase], duplicate_info: Dict = None) -> List[List[int]]:
+    """
+    根据重复分析结果将测试用例划分为重复用例簇，标题重复或步骤相似的用例归入同一簇
+
+    :param test_cases: TestCase列表
+    :param duplicate_info: find_duplicate_test_cases的返回值（可选）
+    :return: 用例下标列表的列表，每个簇按下标升序，簇之间按首个下标升序
+    """
+    id_to_index = {}
+    for index, case in enumerate(test_cases):
+        id_to_index.setdefault(case.case_id, index)
+
+    clusters = DisjointSet(len(test_cases))
+    if duplicate_info:
+        for field in ("title_duplicates", "steps_duplicates"):
+            for group in duplicate_info.get(field, []):
+                indices = [id_to_index[case_id] for case_id in group.get("case_ids", []) if case_id in id_to_index]
+                for other in indices[1:]:
+                    clusters.union(indices[0], other)
+    return clusters.clusters()
+
+
+def _case_category(case) -> str:
+    """获取测试用例的类别，缺失时归为未分类"""
+    return case.category or "未分类"
+
+
+def allocate_sample(sample_size: int, stratum_sizes: Dict[str, int], capacities: Dict[str, int]) -> Dict[str, int]:
+    """
+    按各层用例数量比例分配样本量（最大余数法）
+
+    分配总数不超过样本量和抽样单元总数；样本量足够时每层至少一个单元，
+    抽样单元少于份额的层只分配其全部单元，不足部分按份额差额继续分给仍有剩余单元的层
+
+    :param sample_size: 样本量
+    :param stratum_sizes: 各层用例数量
+    :param capacities: 各层抽样单元（重复用例簇）数量
+    :return: 各层分配的抽样单元数量
+    """
+    total = min(sample_size, sum(capacities.values()))
+    population = sum(stratum_sizes.values())
+    if total <= 0 or population <= 0:
+        return {name: 0 for name in stratum_sizes}
+
+    quotas = {name: total * size / population for name, size in stratum_sizes.items()}
+    allocation = {name: min(capacities[name], int(quota)) for name, quota in quotas.items()}
+    # 每层至少一个单元，样本量不足以覆盖所有层时优先保证份额大的层
+    for name in sorted(quotas, key=lambda key: (-quotas[key], key)):
+        if sum(allocation.values()) >= total:
+            break
+        if allocation[name] == 0 and capacities[name] > 0:
+            allocation[name] = 1
+
+    remaining = total - sum(allocation.values())
+    while remaining > 0:
+        # 剩余名额按份额与已分配数量的差额从大到小分给仍有剩余单元的层
+        open_strata = sorted((name for name in quotas if allocation[name] < capacities[name]),
+                             key=lambda key: (allocation[key] - quotas[key], key))
+        for name in open_strata[:remaining]:
+            allocation[name] += 1
+            remaining -= 1
+    return allocation
+
+
+def build_sample_plan(test_cases: List[TestCase], duplicate_info: Dict = None, sample_size: int = None,
+                      replicates: int = None, seed: int = None) -> Dict:
+    """
+    生成分层抽样方案
+
+    以用例类别分层，各层按用例数量比例分配样本量；层内以重复用例簇为抽样单元，
+    每个被抽中的簇只取一个代表用例送评，重复程度由全量重复分析单独统计。
+    抽中的单元轮流分配到各样本组，使每个样本组都是一份独立的分层样本
+
+    :param test_cases: AI测试用例（TestCase列表）
+    :param duplicate_info: find_duplicate_test_cases的返回值（可选）
+    :param sample_size: 样本量，None或0则根据目标精度推算
+    :param replicates: 样本组数量，None则使用配置中的SAMPLING_REPLICATES
+    :param seed: 随机种子，None则使用配置中的SAMPLING_RANDOM_SEED
+    :return: 抽样方案，包含各样本组的用例和分层统计
+    """
+    replicates = max(1, SAMPLING_REPLICATES if replicates is None else replicates)
+    seed = SAMPLING_RANDOM_SEED if seed is None else seed
+    population = len(test_cases)
+    if not sample_size:
+        sample_size = derive_sample_size(population, replicates=replicates)
+    rng = random.Random(seed)
+
+    # 按类别分层，层内的抽样单元为重复用例簇
+    strata: Dict[str, List[List[int]]] = {}
+    for cluster in build_case_clusters(test_cases, duplicate_info):
+        strata.setdefault(_case_category(test_cases[cluster[0]]), []).append(cluster)
+
+    stratum_sizes = {name: sum(len(cluster) for cluster in clusters) for name, clusters in strata.items()}
+    allocation = allocate_sample(sample_size, stratum_sizes,
+                                 {name: len(clusters) for name, clusters in strata.items()})
+
+    samples: List[List[Dict]] = [[] for _ in range(replicates)]
+    strata_summary = {}
+    offset = 0
+    for name in sorted(strata):
+        clusters = strata[name]
+        chosen = rng.sample(clusters, allocation[name])
+        for position, cluster in enumerate(chosen):
+            samples[(offset + position) % replicates].append(test_cases[cluster[0]])
+        # 各层从不同的样本组开始分配，使样本组大小均衡
+        offset += len(chosen)
+        strata_summary[name] = {
+            "population": stratum_sizes[name],
+            "clusters": len(clusters),
+            "sampled": len(chosen)
+        }
+
+    samples = [sample for sample in samples if sample]
+    return {
+        "population": population,
+        "cluster_count": sum(len(clusters) for clusters in strata.values()),
+        "sample_size": sum(len(sample) for sample in samples),
+        "replicates": samples,
+        "strata": strata_summary,
+        "seed": seed
+    }
+
+
+def bootstrap_interval(values: List[float], rounds: int = None, confidence: float = None,
+                       rng: random.Random = None) -> Optional[Tuple[float, float]]:
+    """
+    用自助法估计均值的置信区间（百分位法），样本较少时区间明显偏窄，只适用于样本组较多的情况
+
+    :param values: 各样本组的得分
+    :param rounds: 重抽样次数，None则使用配置中的SAMPLING_BOOTSTRAP_ROUNDS
+    :param confidence: 置信水平，None则使用配置中的SAMPLING_CONFIDENCE
+    :param rng: 随机数生成器（可选）
+    :return: (下限, 上限)，得分少于2个时无法估计，返回None
+    """
+    rounds = SAMPLING_BOOTSTRAP_ROUNDS if rounds is None else rounds
+    confidence = SAMPLING_CONFIDENCE if confidence is None else confidence
+    rng = rng or random.Random(SAMPLING_RANDOM_SEED)
+    if len(values) < 2:
+        return None
+
+    count = len(values)
+    means = sorted(sum(rng.choices(values, k=count)) / count for _ in range(rounds))
+    alpha = (1 - confidence) / 2
+    low_index = int(alpha * (rounds - 1))
+    high_index = int(math.ceil((1 - alpha) * (rounds - 1)))
+    return means[low_index], means[high_index]
+
+
+def t_interval(values: List[float], confidence: float = None) -> Optional[Tuple[float, float]]:
+    """
+    用t分布估计均值的置信区间
+
+    :param values: 各样本组的得分
+    :param confidence: 置信水平，None则使用配置中的SAMPLING_CONFIDENCE
+    :return: (下限, 上限)，得分少于2个时无法估计，返回None
+    """
+    confidence = SAMPLING_CONFIDENCE if confidence is None else confidence
+    if len(values) < 2:
+        return None
+
+    count = len(values)
+    mean = sum(values) / count
+    std = math.sqrt(sum((value - mean) ** 2 for value in values) / (count - 1))
+    half_width = t_critical_value(confidence, count - 1) * std / math.sqrt(count)
+    return mean - half_width, mean + half_width
+
+
+def interval_method(count: int) -> Optional[str]:
+    """
+    根据有效样本组数量选择置信区间的估计方法
+
+    :param count: 有效样本组数量
+    :return: "t"、"bootstrap"，少于2组时返回None表示无法估计
+    """
+    if count < 2:
+        return None
+    return "bootstrap" if count >= SAMPLING_BOOTSTRAP_MIN_REPLICATES else "t"
+
+
+def format_interval(estimate: Dict) -> str:
+    """
+    格式化置信区间
+
+    :param estimate: _score_estimate返回的得分估计
+    :return: "下限 ~ 上限"，无法估计时返回"无法估计"
+    """
+    if estimate.get("ci_low") is None or estimate.get("ci_high") is None:
+        return "无法估计"
+    return f"{estimate['ci_low']} ~ {estimate['ci_high']}"
+
+
+def _to_score(value) -> Optional[float]:
+    """将评分转换为浮点数，无法转换时返回None"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _score_estimate(values: List[float], rng: random.Random, rounds: int, confidence: float) -> Dict:
+    """计算得分的点估计、标准差和置信区间，无法估计的区间上下限为None"""
+    mean = sum(values) / len(values)
+    std = math.sqrt(sum((value - mean) ** 2 for value in values) / (len(values) - 1)) if len(values) > 1 else 0.0
+    method = interval_method(len(values))
+    if method == "bootstrap":
+        interval = bootstrap_interval(values, rounds, confidence, rng)
+    else:
+        interval = t_interval(values, confidence)
+    if interval:
+        interval = max(interval[0], SCORE_RANGE[0]), min(interval[1], SCORE_RANGE[1])
+    return {
+        "mean": round(mean, 2),
+        "std": round(std, 3),
+        "ci_low": round(interval[0], 2) if interval else None,
+        "ci_high": round(interval[1], 2) if interval else None,
+        "interval_method": method,
+        "samples": [round(value, 2) for value in values]
+    }
+
+
+def combine_sample_results(results: List[Dict], plan: Dict, rounds: int = None,
+                           confidence: float = None) -> Optional[Dict]:
+    """
+    合并各样本组的评测结果：各维度得分和总分取样本组均值，并附上以样本组为单位估计的置信区间
+
+    :param results: 各样本组的评测结果，失败的样本组为None
+    :param plan: build_sample_plan返回的抽样方案
+    :param rounds: 重抽样次数，None则使用配置中的SAMPLING_BOOTSTRAP_ROUNDS
+    :param confidence: 置信水平，None则使用配置中的SAMPLING_CONFIDENCE
+    :return: 合并后的评测结果，所有样本组都失败时返回None
+    """
+    rounds = SAMPLING_BOOTSTRAP_ROUNDS if rounds is None else rounds
+    confidence = SAMPLING_CONFIDENCE if confidence is None else confidence
+    valid_results = [result for result in results if isinstance(result, dict)]
+    if not valid_results:
+        return None
+
+    rng = random.Random(plan.get("seed", SAMPLING_RANDOM_SEED))
+    dimension_estimates = {}
+    dimension_keys = []
+    for result in valid_results:
+        detailed = result.get("detailed_report")
+        if isinstance(detailed, dict):
+            dimension_keys.extend(key for key in detailed if key not in dimension_keys)
+
+    for key in dimension_keys:
+        values = []
+        for result in valid_results:
+            dimension = (result.get("detailed_report") or {}).get(key)
+            score = _to_score(dimension.get("score")) if isinstance(dimension, dict) else None
+            if score is not None:
+                values.append(score)
+        if values:
+            dimension_estimates[key] = _score_estimate(values, rng, rounds, confidence)
+
+    overall_values = [
+        score for score in (
+            _to_score((result.get("evaluation_summary") or {}).get("overall_score")) for result in valid_results
+        ) if score is not None
+    ]
+    overall_estimate = _score_estimate(overall_values, rng, rounds, confidence) if overall_values else None
+
+    # 以得分最接近总体均值的样本组结果作为文字部分的代表
+    if overall_estimate:
+        representative = min(
+            valid_results,
+            key=lambda result: abs((_to_score((result.get("evaluation_summary") or {}).get("overall_score"))
+                                    or 0.0) - overall_estimate["mean"])
+        )
+    else:
+        representative = valid_results[0]
+    combined = copy.deepcopy(representative)
+
+    detailed = combined.get("detailed_report")
+    if isinstance(detailed, dict):
+        for key, estimate in dimension_estimates.items():
+            if isinstance(detailed.get(key), dict):
+                detailed[key]["score"] = estimate["mean"]
+    if overall_estimate and isinstance(combined.get("evaluation_summary"), dict):
+        combined["evaluation_summary"]["overall_score"] = overall_estimate["mean"]
+
+    combined["sampling"] = {
+        "population": plan["population"],
+        "cluster_count": plan["cluster_count"],
+        "sample_size": plan["sample_size"],
+        "replicates": len(plan["replicates"]),
+        "successful_replicates": len(valid_results),
+        "confidence": confidence,
+        "bootstrap_rounds": rounds,
+        "interval_method": interval_method(len(valid_results)),
+        "seed": plan.get("seed"),
+        "strata": plan["strata"],
+        "overall_score": overall_estimate,
+        "dimensions": dimension_estimates
+    }
+    return combined
+
+
+def format_sampling_note(plan: Dict, replicate_index: int) -> str:
+    """
+    生成样本组评测提示中的抽样说明
+
+    :param plan: build_sample_plan返回的抽样方案
+    :param replicate_index: 样本组下标
+    :return: Markdown文本
+    """
+    sample = plan["replicates"][replicate_index]
+    return f"""
+# 抽样评测说明
+本次评测的AI测试用例是从全部{plan['population']}个用例中按类别分层抽取的第{replicate_index + 1}/{len(plan['replicates'])}组样本（{len(sample)}个用例，重复用例簇只抽取一个代表）。
+上文的重复情况和用例对应关系为全部用例的统计结果。请根据样本推断全部用例的质量进行评分，功能覆盖度请结合全量用例对应关系评估，不要因为样本数量少于黄金标准而扣分。
+"""
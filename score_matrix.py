@@ -0,0 +1,359 @@
+"""
+评委评分矩阵模块
+将各评委的逐维度评分整理为 评委×维度 的评分矩阵，缺失或无法解析的评分由掩码排除。
+各维度的均值、方差、截尾均值、按EVALUATION_DIMENSIONS权重计算的加权总分和争议维度都在这里计算，
+标准多评委评测、CollabEval辩论和主席决策共用同一个矩阵，离线重放时也可以从已保存的矩阵恢复统计结果
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence
+from config import EVALUATION_DIMENSIONS, COMMITTEE_TRIM_RATIO
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 评委逐项打分的评分维度
+SCORE_DIMENSIONS = [
+    "format_compliance", "content_accuracy", "test_coverage",
+    "functional_coverage", "defect_detection", "engineering_efficiency",
+    "semantic_quality", "security_economy", "duplicate_analysis"
+]
+
+# EVALUATION_DIMENSIONS中的维度名称对应的评分维度
+DIMENSION_KEYS = {
+    "功能覆盖度": "functional_coverage",
+    "缺陷发现能力": "defect_detection",
+    "工程效率": "engineering_efficiency",
+    "语义质量": "semantic_quality",
+    "安全与经济性": "security_economy"
+}
+
+
+def parse_score(value: Any) -> Optional[float]:
+    """
+    解析评分
+
+    :param value: 评委给出的评分，可以是数字或数字字符串
+    :return: 浮点数评分，缺失、无法解析或不是有限数时返回None
+    """
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return score if math.isfinite(score) else None
+
+
+def dimension_weights(dimensions: Sequence[str]) -> List[float]:
+    """
+    按EVALUATION_DIMENSIONS获取各评分维度的权重
+
+    :param dimensions: 评分维度列表
+    :return: 与dimensions对应的权重列表，不参与加权总分的维度权重为0
+    """
+    weights = {DIMENSION_KEYS[name]: weight for name, weight in EVALUATION_DIMENSIONS.items() if name in DIMENSION_KEYS}
+    return [float(weights.get(dimension, 0.0)) for dimension in dimensions]
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    """计算平均值，空列表返回None"""
+    return sum(values) / len(values) if values else None
+
+
+def _variance(values: List[float]) -> Optional[float]:
+    """计算总体方差，空列表返回None，只有一个评分时方差为0"""
+    if not values:
+        return None
+    if len(values) == 1:
+        return 0.0
+    mean = sum(values) / len(values)
+    return sum((x - mean) ** 2 for x in values) / len(values)
+
+
+def _trimmed_mean(values: List[float], ratio: float) -> Optional[float]:
+    """计算截尾均值，两端各去掉ratio比例的评分，至少保留一个评分"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    cut = min(int(len(ordered) * ratio), (len(ordered) - 1) // 2)
+    return _mean(ordered[cut:len(ordered) - cut])
+
+
+class ScoreMatrix:
+    """评委×维度的评分矩阵，每个单元格保存评分和对应的理由"""
+
+    def __init__(self, judges: Sequence[str], dimensions: Sequence[str] = None,
+                 scores: Sequence[Sequence[Any]] = None, reasons: Sequence[Sequence[str]] = None,
+                 overall_scores: Sequence[Any] = None):
+        """
+        :param judges: 评委列表，对应矩阵的行
+        :param dimensions: 评分维度列表，对应矩阵的列，None则使用SCORE_DIMENSIONS
+        :param scores: 评分矩阵，缺失的评分为None
+        :param reasons: 与scores同形状的评分理由
+        :param overall_scores: 各评委给出的总体评分
+        """
+        self.judges = list(judges)
+        self.dimensions = list(dimensions or SCORE_DIMENSIONS)
+        self._judge_index = {judge: row for row, judge in enumerate(self.judges)}
+        self._dimension_index = {dimension: column for column, dimension in enumerate(self.dimensions)}
+        self.weights = dimension_weights(self.dimensions)
+
+        rows, columns = len(self.judges), len(self.dimensions)
+        self._scores = [[None] * columns for _ in range(rows)]
+        self._reasons = [[""] * columns for _ in range(rows)]
+        self._overall = [None] * rows
+        for row in range(rows):
+            for column in range(columns):
+                if scores is not None:
+                    self._scores[row][column] = parse_score(scores[row][column])
+                if reasons is not None:
+                    self._reasons[row][column] = reasons[row][column] or ""
+            if overall_scores is not None:
+                self._overall[row] = parse_score(overall_scores[row])
+        self._array = None
+
+    @classmethod
+    def from_results(cls, judge_results: Dict[str, Dict], dimensions: Sequence[str] = None) -> "ScoreMatrix":
+        """
+        由评委的评测结果构建评分矩阵
+
+        :param judge_results: {评委: 包含evaluation_summary和detailed_report的评测结果}
+        :param dimensions: 评分维度列表，None则使用SCORE_DIMENSIONS
+        :return: ScoreMatrix
+        """
+        matrix = cls([], dimensions)
+        for judge, result in judge_results.items():
+            matrix.add_result(judge, result)
+        return matrix
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScoreMatrix":
+        """
+        由to_dict的输出恢复评分矩阵，用于离线重放已保存的评测结果
+
+        :param data: to_dict返回的字典
+        :return: ScoreMatrix
+        """
+        return cls(data["judges"], data["dimensions"], data.get("scores"), data.get("reasons"),
+                   data.get("overall_scores"))
+
+    def to_dict(self) -> Dict:
+        """
+        导出可JSON序列化的评分矩阵，缺失的评分为None
+
+        :return: 包含评委、维度、评分、理由和总体评分的字典
+        """
+        return {
+            "judges": list(self.judges),
+            "dimensions": list(self.dimensions),
+            "scores": [list(row) for row in self._scores],
+            "reasons": [list(row) for row in self._reasons],
+            "overall_scores": list(self._overall)
+        }
+
+    def add_result(self, judge: str, result: Dict):
+        """
+        追加一位评委的评测结果作为新的一行，用于合并迟到评委的结果
+
+        :param judge: 评委，不能与已有评委重复
+        :param result: 包含evaluation_summary和detailed_report的评测结果
+        """
+        if judge in self._judge_index:
+            raise ValueError(f"评分矩阵中已有评委 {judge}")
+        detailed_report = result.get("detailed_report") or {}
+        scores, reasons = [], []
+        for dimension in self.dimensions:
+            dim_data = detailed_report.get(dimension)
+            dim_data = dim_data if isinstance(dim_data, dict) else {}
+            scores.append(parse_score(dim_data.get("score")))
+            reasons.append(dim_data.get("reason") or "")
+        summary = result.get("evaluation_summary") or {}
+        self._judge_index[judge] = len(self.judges)
+        self.judges.append(judge)
+        self._scores.append(scores)
+        self._reasons.append(reasons)
+        self._overall.append(parse_score(summary.get("overall_score")))
+        self._array = None
+
+    def set_score(self, judge: str, dimension: str, score: Any, reason: str = None):
+        """
+        更新单个评分，用于合并辩论后修订的评分
+
+        :param judge: 评委
+        :param dimension: 评分维度
+        :param score: 新评分，无法解析时该单元格被掩码排除
+        :param reason: 新的评分理由，None则保留原理由
+        """
+        row, column = self._judge_index[judge], self._dimension_index[dimension]
+        self._scores[row][column] = parse_score(score)
+        if reason is not None:
+            self._reasons[row][column] = reason
+        self._array = None
+
+    def _values(self):
+        """获取numpy评分数组（缺失的评分为NaN）和有效掩码，未安装numpy时返回None"""
+        if np is None:
+            return None
+        if self._array is None:
+            values = np.array([[np.nan if score is None else score for score in row] for row in self._scores],
+                              dtype=np.float64).reshape(len(self.judges), len(self.dimensions))
+            self._array = (values, ~np.isnan(values))
+        return self._array
+
+    def column(self, dimension: str) -> List[float]:
+        """
+        获取某一维度全部有效评分，按评委顺序排列
+
+        :param dimension: 评分维度
+        :return: 评分列表
+        """
+        column = self._dimension_index[dimension]
+        return [row[column] for row in self._scores if row[column] is not None]
+
+    def counts(self) -> Dict[str, int]:
+        """各维度的有效评分数量"""
+        arrays = self._values()
+        if arrays is not None:
+            return dict(zip(self.dimensions, arrays[1].sum(axis=0).tolist()))
+        return {dimension: len(self.column(dimension)) for dimension in self.dimensions}
+
+    def means(self) -> Dict[str, Optional[float]]:
+        """各维度有效评分的平均值，没有有效评分的维度为None"""
+        arrays = self._values()
+        if arrays is None:
+            return {dimension: _mean(self.column(dimension)) for dimension in self.dimensions}
+        values, mask = arrays
+        counts = mask.sum(axis=0)
+        sums = np.where(mask, values, 0.0).sum(axis=0)
+        return {dimension: (float(sums[i] / counts[i]) if counts[i] else None)
+                for i, dimension in enumerate(self.dimensions)}
+
+    def variances(self) -> Dict[str, Optional[float]]:
+        """各维度有效评分的总体方差，没有有效评分的维度为None"""
+        arrays = self._values()
+        if arrays is None:
+            return {dimension: _variance(self.column(dimension)) for dimension in self.dimensions}
+        values, mask = arrays
+        counts = mask.sum(axis=0)
+        safe_counts = np.maximum(counts, 1)
+        means = np.where(mask, values, 0.0).sum(axis=0) / safe_counts
+        squares = np.where(mask, (values - means) ** 2, 0.0).sum(axis=0) / safe_counts
+        return {dimension: (float(squares[i]) if counts[i] else None) for i, dimension in enumerate(self.dimensions)}
+
+    def trimmed_means(self, ratio: float = None) -> Dict[str, Optional[float]]:
+        """
+        各维度有效评分的截尾均值
+
+        :param ratio: 两端各去掉的评分比例，None则使用配置中的COMMITTEE_TRIM_RATIO
+        :return: {维度: 截尾均值}，没有有效评分的维度为None
+        """
+        ratio = COMMITTEE_TRIM_RATIO if ratio is None else ratio
+        return {dimension: _trimmed_mean(self.column(dimension), ratio) for dimension in self.dimensions}
+
+    def weighted_totals(self) -> Dict[str, Optional[float]]:
+        """
+        按EVALUATION_DIMENSIONS权重计算各评委的加权总分，缺失维度的权重按其余维度重新归一化
+
+        :return: {评委: 加权总分}，没有任何加权维度评分的评委为None
+        """
+        arrays = self._values()
+        if arrays is None:
+            totals = {}
+            for judge, row in zip(self.judges, self._scores):
+                pairs = [(weight, score) for weight, score in zip(self.weights, row) if weight and score is not None]
+                weight_sum = sum(weight for weight, _ in pairs)
+                totals[judge] = sum(weight * score for weight, score in pairs) / weight_sum if weight_sum else None
+            return totals
+        values, mask = arrays
+        weights = np.where(mask, np.array(self.weights, dtype=np.float64), 0.0)
+        weight_sums = weights.sum(axis=1)
+        weighted = (np.where(mask, values, 0.0) * weights).sum(axis=1)
+        return {judge: (float(weighted[i] / weight_sums[i]) if weight_sums[i] else None)
+                for i, judge in enumerate(self.judges)}
+
+    def weighted_total(self, dimension_scores: Dict[str, Optional[float]] = None) -> Optional[float]:
+        """
+        按EVALUATION_DIMENSIONS权重计算委员会的加权总分
+
+        :param dimension_scores: {维度: 评分}，None则使用各维度的平均值
+        :return: 加权总分，没有任何加权维度评分时为None
+        """
+        dimension_scores = self.means() if dimension_scores is None else dimension_scores
+        pairs = [(weight, dimension_scores.get(dimension))
+                 for weight, dimension in zip(self.weights, self.dimensions) if weight]
+        pairs = [(weight, score) for weight, score in pairs if score is not None]
+        weight_sum = sum(weight for weight, _ in pairs)
+        return sum(weight * score for weight, score in pairs) / weight_sum if weight_sum else None
+
+    def disagreements(self, threshold: float) -> List[str]:
+        """
+        方差达到阈值的维度
+
+        :param threshold: 方差阈值
+        :return: 维度列表，按dimensions顺序
+        """
+        variances = self.variances()
+        return [dimension for dimension in self.dimensions
+                if variances[dimension] is not None and variances[dimension] >= threshold]
+
+    def has_consensus(self, threshold: float) -> bool:
+        """
+        判断评委是否在全部维度上达成共识
+
+        :param threshold: 低共识方差阈值
+        :return: 每个维度都有全部评委的有效评分且方差低于阈值时返回True
+        """
+        counts = self.counts()
+        if any(count < len(self.judges) for count in counts.values()):
+            return False
+        return not self.disagreements(threshold)
+
+    def overall_scores(self) -> Dict[str, Any]:
+        """各评委给出的总体评分，无法解析的记为N/A"""
+        return {judge: ("N/A" if score is None else score) for judge, score in zip(self.judges, self._overall)}
+
+    def overall_mean(self) -> Optional[float]:
+        """各评委总体评分的平均值，没有有效总体评分时为None"""
+        return _mean([score for score in self._overall if score is not None])
+
+    def dimension_details(self, dimension: str) -> Dict[str, Any]:
+        """
+        某一维度的评分、理由和各评委数据，作为辩论和主席决策的输入
+
+        :param dimension: 评分维度
+        :return: 包含scores、reasons、judge_data的字典，judge_data只包含给出理由的评委
+        """
+        column = self._dimension_index[dimension]
+        scores, reasons, judge_data = [], [], {}
+        for judge, score_row, reason_row in zip(self.judges, self._scores, self._reasons):
+            score, reason = score_row[column], reason_row[column]
+            if score is None:
+                continue
+            scores.append(score)
+            if reason:
+                reasons.append(reason)
+                judge_data[judge] = {"score": score, "reason": reason}
+        return {"scores": scores, "reasons": reasons, "judge_data": judge_data}
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        汇总评分矩阵的统计结果
+
+        :return: 各维度的有效评分数、均值、方差和截尾均值，以及委员会和各评委的加权总分
+        """
+        counts, means, variances, trimmed = self.counts(), self.means(), self.variances(), self.trimmed_means()
+        weighted_total = self.weighted_total(means)
+        return {
+            "dimensions": {
+                dimension: {
+                    "count": counts[dimension],
+                    "mean": None if means[dimension] is None else round(means[dimension], 2),
+                    "variance": None if variances[dimension] is None else round(variances[dimension], 3),
+                    "trimmed_mean": None if trimmed[dimension] is None else round(trimmed[dimension], 2)
+                }
+                for dimension in self.dimensions
+            },
+            "weighted_total": None if weighted_total is None else round(weighted_total, 2),
+            "judge_weighted_totals": {judge: None if total is None else round(total, 2)
+                                      for judge, total in self.weighted_totals().items()}
+        }
@@ -0,0 +1,256 @@
+"""
+测试用例数据模型模块
+将各种输入格式的测试用例一次性规范化为紧凑的TestCase记录（__slots__、类别字符串驻留、
+预先拼接的匹配文本和内容哈希），下游的格式化、重复分析、匹配和报告都直接使用该类型，
+不再各自遍历原始字典，也不再原地修改输入数据
+"""
+import sys
+import json
+import hashlib
+from typing import Dict, Iterator, List, Tuple
+
+# 各字段的候选键名，按优先级排列
+TITLE_FIELDS = ("title", "标题", "测试标题", "test_title", "name", "测试名称")
+PRECONDITION_FIELDS = ("preconditions", "前置条件", "pre_conditions", "prerequisites", "前提条件")
+STEP_FIELDS = ("steps", "步骤", "test_steps", "测试步骤", "操作步骤", "actions")
+EXPECTED_FIELDS = ("expected_results", "预期结果", "expected", "assertions", "expected_outcome", "结果")
+
+# to_dict输出的规范字段名，原始用例中的同名字段不作为额外字段保留
+CANONICAL_FIELDS = ("case_id", "formatted_case_id", "title", "preconditions", "steps", "expected_results", "category")
+
+
+def _first_field(raw: Dict, fields: Tuple[str, ...], require_truthy: bool = True) -> Tuple[str, object]:
+    """按优先级取第一个存在（且非空）的字段，返回(字段名, 字段值)，都不存在时返回(None, None)"""
+    for field in fields:
+        if field in raw and (raw[field] or not require_truthy):
+            return field, raw[field]
+    return None, None
+
+
+def _to_lines(value) -> Tuple[str, ...]:
+    """将步骤或预期结果统一转换为去除首尾空白的字符串元组"""
+    if not value:
+        return ()
+    if not isinstance(value, list):
+        if not isinstance(value, str) or not value.strip():
+            return ()
+        value = value.split("\n") if "\n" in value else [value]
+    return tuple(str(item).strip() for item in value if item)
+
+
+class TestCase:
+    """规范化后的测试用例记录"""
+
+    __slots__ = ("case_id", "formatted_case_id", "title", "preconditions", "steps", "expected_results",
+                 "category", "extra", "text", "content_hash")
+
+    def __init__(self, case_id: str, title: str, preconditions: str = "", steps: Tuple[str, ...] = (),
+                 expected_results: Tuple[str, ...] = (), category: str = "", formatted_case_id: str = None,
+                 extra: Dict = None):
+        """
+        创建测试用例记录
+
+        :param case_id: 用例ID
+        :param title: 标题
+        :param preconditions: 前置条件
+        :param steps: 测试步骤
+        :param expected_results: 预期结果
+        :param category: 类别，为空表示未分类
+        :param formatted_case_id: 格式化后的备用用例ID，None则与case_id相同
+        :param extra: 原始用例中的其他字段（如优先级、自定义字段），to_dict时原样输出
+        """
+        self.case_id = case_id
+        self.formatted_case_id = formatted_case_id or case_id
+        self.title = title
+        self.preconditions = preconditions
+        self.steps = tuple(steps)
+        self.expected_results = tuple(expected_results)
+        # 类别取值很少，驻留后所有用例共用同一个字符串对象
+        self.category = sys.intern(category) if category else ""
+        # 大多数用例没有额外字段，为空时不保存字典
+        self.extra = dict(extra) if extra else None
+
+        # 标题、前置条件、步骤和预期结果拼接的小写文本，供重复分析、用例匹配和关键词扫描使用
+        parts = [title]
+        if preconditions:
+            parts.append(preconditions)
+        parts.extend(self.steps)
+        parts.extend(self.expected_results)
+        self.text = " ".join(parts).lower()
+
+        # 内容哈希不含用例ID和类别，内容完全相同的用例哈希相同
+        content = "\x1f".join((title, preconditions, "\n".join(self.steps), "\n".join(self.expected_results)))
+        self.content_hash = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+    @classmethod
+    def from_raw(cls, raw: Dict, index: int = 0, category: str = None) -> "TestCase":
+        """
+        从原始测试用例字典创建记录，兼容中英文字段名
+
+        :param raw: 原始测试用例字典
+        :param index: 用例在输入中的序号，用于生成缺失的用例ID和标题
+        :param category: 所属分组的类别，None则使用用例自身的category字段
+        :return: TestCase
+        """
+        used_fields = set(CANONICAL_FIELDS)
+        case_id = raw.get("case_id")
+        if not case_id and raw.get("id"):
+            case_id = raw["id"]
+            used_fields.add("id")
+        case_id = str(case_id or f"TC-FUNC-{index + 1:03d}")
+        formatted_case_id = raw.get("formatted_case_id")
+        if not formatted_case_id:
+            formatted_case_id = case_id if case_id.startswith(("TC-", "FUNC-")) else f"FUNC-SCEN-{index + 1:03d}"
+
+        title_field, title = _first_field(raw, TITLE_FIELDS, require_truthy=False)
+        if not title:
+            title = f"Test Case {index + 1}"
+
+        preconditions_field, preconditions = _first_field(raw, PRECONDITION_FIELDS)
+        if isinstance(preconditions, list):
+            preconditions = "\n".join(str(item) for item in preconditions if item)
+        steps_field, steps = _first_field(raw, STEP_FIELDS)
+        expected_field, expected_results = _first_field(raw, EXPECTED_FIELDS)
+
+        # 已映射到规范字段的原始字段之外的内容（如优先级、自定义字段）原样保留，评委看到的内容与原始用例一致
+        used_fields.update((title_field, preconditions_field, steps_field, expected_field))
+        extra = {key: value for key, value in raw.items() if key not in used_fields}
+
+        if category is None:
+            category = raw.get("category") or ""
+        return cls(
+            case_id=case_id,
+            title=str(title),
+            preconditions=str(preconditions or ""),
+            steps=_to_lines(steps),
+            expected_results=_to_lines(expected_results),
+            category=str(category),
+            formatted_case_id=str(formatted_case_id),
+            extra=extra
+        )
+
+    @property
+    def steps_text(self) -> str:
+        """以换行拼接的步骤文本"""
+        return "\n".join(self.steps)
+
+    @property
+    def expected_text(self) -> str:
+        """以换行拼接的预期结果文本"""
+        return "\n".join(self.expected_results)
+
+    def to_dict(self) -> Dict:
+        """
+        转换为统一格式的测试用例字典，用于JSON序列化和评测提示
+
+        :return: 测试用例字典
+        """
+        case = {
+            "case_id": self.case_id,
+            "formatted_case_id": self.formatted_case_id,
+            "title": self.title,
+            "preconditions": self.preconditions,
+            "steps": list(self.steps),
+            "expected_results": list(self.expected_results)
+        }
+        if self.category:
+            case["category"] = self.category
+        if self.extra:
+            case.update(self.extra)
+        return case
+
+    def __repr__(self):
+        return f"TestCase({self.case_id!r}, {self.title!r})"
+
+
+def _iter_group(groups: Dict) -> Iterator[Tuple[object, str]]:
+    """遍历按类别分组的测试用例，类别取分组键"""
+    for category, cases in groups.items():
+        if isinstance(cases, list):
+            for case in cases:
+                yield case, category
+
+
+def iter_raw_cases(data) -> Iterator[Tuple[object, str]]:
+    """
+    遍历各种输入格式中的测试用例，不修改输入数据
+
+    :param data: 已解析的测试用例数据
+    :return: (原始测试用例, 分组类别或None) 的迭代器
+    """
+    if isinstance(data, list):
+        for case in data:
+            yield case, None
+        return
+    if not isinstance(data, dict):
+        return
+
+    # 按类别分组的测试用例，如{"functional":[...], "security":[...]}
+    category_keys = [key for key in data.keys() if isinstance(data[key], list)]
+    if category_keys:
+        for key in category_keys:
+            for case in data[key]:
+                if isinstance(case, (dict, TestCase)):
+                    yield case, key
+    # 统一格式：{"testcases": {"test_cases": [...] 或 {类别: [...]}}}
+    elif "testcases" in data and isinstance(data["testcases"], dict) and "test_cases" in data["testcases"]:
+        test_cases = data["testcases"]["test_cases"]
+        if isinstance(test_cases, dict):
+            yield from _iter_group(test_cases)
+        elif isinstance(test_cases, list):
+            for case in test_cases:
+                yield case, None
+    # {"测试用例": {"功能测试": [...], ...}}
+    elif "测试用例" in data:
+        if isinstance(data["测试用例"], dict):
+            yield from _iter_group(data["测试用例"])
+    # 旧格式：{"test_cases": [...] 或 {类别: [...]}}
+    elif "test_cases" in data:
+        if isinstance(data["test_cases"], list):
+            for case in data["test_cases"]:
+                yield case, None
+        elif isinstance(data["test_cases"], dict):
+            yield from _iter_group(data["test_cases"])
+    # 其他命名中包含case或test的字段
+    else:
+        for key, value in data.items():
+            if "case" in key.lower() or "test" in key.lower():
+                if isinstance(value, list):
+                    for case in value:
+                        yield case, None
+                elif isinstance(value, dict):
+                    yield value, None
+
+
+def normalize_test_cases(data) -> List[TestCase]:
+    """
+    一次遍历将任意支持的格式规范化为TestCase列表，已经是TestCase的元素原样保留
+
+    :param data: JSON字符串、已解析的测试用例数据或TestCase列表
+    :return: TestCase列表，非字典格式的元素会被跳过
+    """
+    if isinstance(data, list) and all(isinstance(case, TestCase) for case in data):
+        return list(data)
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except (json.JSONDecodeError, ValueError):
+            return []
+
+    cases = []
+    for index, (raw, category) in enumerate(iter_raw_cases(data)):
+        if isinstance(raw, TestCase):
+            cases.append(raw)
+        elif isinstance(raw, dict):
+            cases.append(TestCase.from_raw(raw, index, category))
+    return cases
+
+
+def test_cases_to_dicts(cases: List[TestCase]) -> List[Dict]:
+    """
+    将TestCase列表转换为字典列表，用于JSON序列化和评测提示
+
+    :param cases: TestCase列表
+    :return: 测试用例字典列表
+    """
+    return [case.to_dict() for case in cases]
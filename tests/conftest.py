@@ -0,0 +1,38 @@
+"""
+pytest公共配置：将项目根目录加入模块搜索路径，日志写入临时目录，并提供示例测试用例
+"""
+import json
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import logger  # noqa: E402
+from testcase_model import normalize_test_cases  # noqa: E402
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_log_files(tmp_path_factory):
+    """测试期间的日志写入临时目录，不修改仓库中的日志文件"""
+    log_dir = tmp_path_factory.mktemp("log")
+    logger.LOG_FILE = str(log_dir / "evaluation_log.txt")
+    logger.ERROR_LOG_FILE = str(log_dir / "error_log.txt")
+    yield
+
+
+@pytest.fixture(scope="session")
+def testset_cases():
+    """testset/test_cases.json中规范化后的AI测试用例"""
+    with open(os.path.join(ROOT_DIR, "testset", "test_cases.json"), encoding="utf-8") as f:
+        return normalize_test_cases(json.load(f))
+
+
+@pytest.fixture(scope="session")
+def golden_cases():
+    """goldenset/golden_cases.json中规范化后的黄金标准测试用例"""
+    with open(os.path.join(ROOT_DIR, "goldenset", "golden_cases.json"), encoding="utf-8") as f:
+        return normalize_test_cases(json.load(f))
@@ -0,0 +1,99 @@
+"""
+analyzer模块测试：进程池逐批比较时在途批次数有上限，结果按批次顺序产出，以及相似度引擎的选择和回退
+"""
+import concurrent.futures
+from itertools import combinations
+
+import pytest
+
+import analyzer
+
+
+class RecordingExecutor:
+    """在当前进程中同步执行的进程池替身，记录提交的批次"""
+
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.submitted = []
+        initializer(*initargs)
+        RecordingExecutor.instance = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, batch):
+        self.submitted.append(batch)
+        future = concurrent.futures.Future()
+        future.set_result(fn(batch))
+        return future
+
+
+@pytest.fixture
+def steps_batches(testset_cases, monkeypatch):
+    """测试集中步骤文本的全部用例对，每5对一批，并以替身代替进程池"""
+    monkeypatch.setattr(analyzer.concurrent.futures, "ProcessPoolExecutor", RecordingExecutor)
+    monkeypatch.setattr(analyzer, "DUPLICATE_PROCESS_MIN_PAIRS", 1)
+    monkeypatch.setattr(analyzer, "_worker_steps_texts", None)
+    texts = [case.steps_text for case in testset_cases]
+    pairs = list(combinations(range(len(texts)), 2))
+    return texts, [pairs[start:start + 5] for start in range(0, len(pairs), 5)]
+
+
+def test_pair_batches_keep_bounded_window(steps_batches):
+    """每产出一批只补充一批，在途批次不超过2倍进程数"""
+    texts, batches = steps_batches
+    assert len(batches) > 4 * 2
+
+    results = []
+    for yielded, batch_result in enumerate(analyzer.iter_verified_pair_batches(texts, batches, workers=2), 1):
+        assert len(RecordingExecutor.instance.submitted) <= yielded + 2 * 2
+        results.append(batch_result)
+
+    assert RecordingExecutor.instance.submitted == batches
+    assert results == [analyzer.compare_steps_similarity(texts, batch) for batch in batches]
+
+
+def test_pair_batches_stop_submitting_when_closed(steps_batches):
+    """调用方提前停止迭代后不再提交新的批次"""
+    texts, batches = steps_batches
+    iterator = analyzer.iter_verified_pair_batches(texts, batches, workers=2)
+    next(iterator)
+    iterator.close()
+    assert len(RecordingExecutor.instance.submitted) == 2 * 2 + 1
+
+
+@pytest.mark.parametrize("engine, backend, suite_id, expected", [
+    ("vector", True, "suite", "vector"),
+    ("vector", False, "suite", "index"),
+    ("vector", False, None, "sequence"),
+    ("sequence", True, "suite", "index"),
+    ("sequence", True, None, "sequence"),
+])
+def test_select_similarity_engine(monkeypatch, engine, backend, suite_id, expected):
+    """向量化引擎优先，不可用时提供用例集标识则使用增量重复索引，否则逐对比较"""
+    monkeypatch.setattr(analyzer, "DUPLICATE_SIMILARITY_ENGINE", engine)
+    monkeypatch.setattr(analyzer, "VECTOR_BACKEND_AVAILABLE", backend)
+    monkeypatch.setattr(analyzer, "DUPLICATE_INDEX_ENABLED", True)
+    assert analyzer.select_similarity_engine(suite_id) == expected
+
+
+def test_vector_fallback_warns_once_per_comparison(testset_cases, monkeypatch):
+    """向量化引擎不可用时每次比较只记录一次回退警告"""
+    monkeypatch.setattr(analyzer, "DUPLICATE_SIMILARITY_ENGINE", "vector")
+    monkeypatch.setattr(analyzer, "VECTOR_BACKEND_AVAILABLE", False)
+    warnings = []
+
+    def log(message, level="INFO", **kwargs):
+        if level == "WARNING":
+            warnings.append(message)
+
+    monkeypatch.setattr(analyzer, "log", log)
+    case_text_map = {case.case_id: case.steps_text for case in testset_cases if case.steps}
+
+    list(analyzer.iter_similar_case_clusters(case_text_map))
+    assert len(warnings) == 1
+    analyzer.find_similar_case_pairs(case_text_map)
+    assert len(warnings) == 2
@@ -0,0 +1,76 @@
+"""
+case_matcher模块测试：倒排索引的相似度与逐个黄金用例直接计算一致，以及示例数据上的覆盖率
+"""
+import json
+import math
+import os
+from collections import Counter
+
+import pytest
+
+import testcase_model
+from case_matcher import GoldenCaseIndex, format_match_facts, match_test_cases
+from conftest import ROOT_DIR
+from tokenizer import token_ids
+
+
+def load_formatted(path):
+    """加载格式化后的示例用例（评测流程实际使用的输入）"""
+    with open(os.path.join(ROOT_DIR, path), encoding="utf-8") as f:
+        return testcase_model.normalize_test_cases(json.load(f))
+
+
+def brute_force_scores(index, text):
+    """逐个黄金用例计算BM25加权向量的余弦相似度，不使用倒排索引"""
+    query_counts = Counter(token_ids(text))
+    query = index._weights(query_counts, sum(query_counts.values()))
+    query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+    scores = {}
+    for doc_index, case in enumerate(index.cases):
+        doc_counts = Counter(token_ids(case.text))
+        doc = index._weights(doc_counts, sum(doc_counts.values()))
+        dot = sum(weight * doc.get(term, 0.0) for term, weight in query.items())
+        doc_norm = math.sqrt(sum(weight * weight for weight in doc.values()))
+        if dot and query_norm and doc_norm:
+            scores[doc_index] = dot / (query_norm * doc_norm)
+    return scores
+
+
+def test_index_scores_match_brute_force(testset_cases, golden_cases):
+    """倒排索引得到的相似度与逐个黄金用例直接计算一致"""
+    index = GoldenCaseIndex(golden_cases)
+    for case in testset_cases[:30]:
+        scores = index.score(case.text)
+        expected = brute_force_scores(index, case.text)
+        assert scores.keys() == expected.keys()
+        for doc_index, value in expected.items():
+            assert scores[doc_index] == pytest.approx(value)
+
+
+def test_sample_data_coverage():
+    """格式化示例数据的黄金标准覆盖率与报告中的数值一致，复用索引结果不变"""
+    ai_cases = load_formatted("testset/formatted_test_cases.json")
+    golden_cases = load_formatted("goldenset/formatted_golden_cases.json")
+    result = match_test_cases(ai_cases, golden_cases)
+    assert (result["covered_count"], result["golden_count"], result["ai_count"]) == (48, 67, len(ai_cases))
+    assert result["coverage_ratio"] == round(48 / 67, 4)
+    assert match_test_cases(ai_cases, golden_cases, index=GoldenCaseIndex(golden_cases)) == result
+    assert "71.6% (48/67)" in format_match_facts(result)
+
+
+def test_identical_case_matches_itself(golden_cases):
+    """与黄金用例内容相同的AI用例相似度为1"""
+    result = match_test_cases(golden_cases[:1], golden_cases)
+    assert result["ai_precision"][0]["best_golden_case_id"] == golden_cases[0].case_id
+    assert result["ai_precision"][0]["score"] == pytest.approx(1.0)
+
+
+def test_unrelated_and_empty_inputs(golden_cases):
+    """没有共同词项的用例不对应任何黄金用例，空输入的比例为0"""
+    unrelated = [testcase_model.TestCase("X-1", "qwerty zxcvb")]
+    result = match_test_cases(unrelated, golden_cases)
+    assert result["ai_precision"][0] == {
+        "case_id": "X-1", "title": "qwerty zxcvb", "matched": False, "best_golden_case_id": None, "score": 0.0
+    }
+    empty = match_test_cases([], [])
+    assert (empty["coverage_ratio"], empty["precision_ratio"]) == (0.0, 0.0)
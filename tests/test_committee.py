@@ -0,0 +1,279 @@
+"""
+committee模块测试：用桩评委协程验证评委阶段的并发控制和迟到评委合并
+"""
+import asyncio
+
+import pytest
+
+import committee
+import judge_cache
+from case_payload import CasePayload
+from committee import EvaluationCommittee, late_merge_tasks
+from score_matrix import SCORE_DIMENSIONS, ScoreMatrix
+
+
+def judge_result(score, reason="理由", overrides=None):
+    """
+    评委结果，全部评分维度默认给出相同评分
+
+    :param overrides: {维度: 评分}，覆盖个别维度的评分
+    """
+    overrides = overrides or {}
+    return {
+        "evaluation_summary": {"overall_score": score, "final_suggestion": f"建议{score}"},
+        "detailed_report": {dimension: {"score": overrides.get(dimension, score), "reason": reason}
+                            for dimension in SCORE_DIMENSIONS}
+    }
+
+
+@pytest.fixture(autouse=True)
+def committee_config(monkeypatch):
+    """关闭评委结果缓存，默认等待全部评委"""
+    monkeypatch.setattr(judge_cache, "JUDGE_RESULT_CACHE_ENABLED", False)
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP", False)
+    monkeypatch.setattr(committee, "COMMITTEE_LAUNCH_MODE", "parallel")
+    monkeypatch.setattr(committee, "COMMITTEE_QUORUM", 0)
+
+
+def make_committee(judges, session=None):
+    """
+    创建使用桩评委的委员会
+
+    :param judges: {评委: (延迟秒数, 评测结果)}
+    :return: (委员会, 已启动的评委列表)
+    """
+    panel = EvaluationCommittee(session)
+    panel.judges = list(judges)
+    panel.use_judge_cache = False
+    started = []
+
+    async def evaluate_with_judge(judge_model, payload):
+        started.append(judge_model)
+        delay, result = judges[judge_model]
+        await asyncio.sleep(delay)
+        return result
+
+    panel.evaluate_with_judge = evaluate_with_judge
+    return panel, started
+
+
+PAYLOAD = CasePayload({"cases": [1]}, {"cases": [2]})
+
+
+def test_quorum_returns_at_k_of_n_and_merges_late_judge(monkeypatch):
+    """达到法定人数即返回，迟到评委完成后按全部有效评委重新计算平均分"""
+    monkeypatch.setattr(committee, "COMMITTEE_QUORUM", 2)
+    panel, _ = make_committee({"a": (0.01, judge_result(3.0)), "b": (0.02, judge_result(4.0)),
+                               "c": (0.2, judge_result(5.0))})
+
+    async def run():
+        judge_results, info, late_tasks = await panel.run_judge_stage(PAYLOAD, allow_late=True)
+        assert info["contributors"] == ["a", "b"]
+        assert info["late_judges"] == ["c"]
+        assert "达到法定人数2" in info["stop_reason"]
+        published = await panel.aggregate_judge_results(judge_results, info, PAYLOAD, {})
+        assert published["evaluation_summary"]["overall_score"] == 3.5
+
+        updates = []
+        merged = await panel.merge_late_results(published, judge_results, late_tasks, info, updates.append)
+        return merged, updates
+
+    merged, updates = asyncio.run(run())
+    assert updates == [merged]
+    assert merged["evaluation_summary"]["overall_score"] == 4.0
+    assert merged["detailed_report"]["functional_coverage"]["score"] == 4.0
+    assert merged["committee_summary"]["judge_scores"] == {"a": 3.0, "b": 4.0, "c": 5.0}
+    assert merged["committee_summary"]["panel"]["contributors"] == ["a", "b", "c"]
+    assert merged["committee_summary"]["panel"]["late_merged"] == ["c"]
+    assert merged["committee_summary"]["panel"]["late_judges"] == []
+
+
+def test_quorum_returns_at_soft_deadline(monkeypatch):
+    """超过软截止时间后只要有一位有效评委即返回，失败的迟到评委不改变已发布的结果"""
+    monkeypatch.setattr(committee, "COMMITTEE_QUORUM", 3)
+    monkeypatch.setattr(committee, "COMMITTEE_QUORUM_SOFT_DEADLINE", 0.05)
+    panel, _ = make_committee({"a": (0.01, judge_result(3.0)), "b": (0.3, {"error": "评测超时"}),
+                               "c": (0.3, {"error": "评测超时"})})
+
+    async def run():
+        judge_results, info, late_tasks = await panel.run_judge_stage(PAYLOAD, allow_late=True)
+        published = await panel.aggregate_judge_results(judge_results, info, PAYLOAD, {})
+        updates = []
+        merged = await panel.merge_late_results(published, judge_results, late_tasks, info, updates.append)
+        return info, published, merged, updates
+
+    info, published, merged, updates = asyncio.run(run())
+    assert info["contributors"] == ["a"]
+    assert sorted(info["late_judges"]) == ["b", "c"]
+    assert "软截止时间" in info["stop_reason"]
+    assert merged is published and updates == []
+
+
+def test_collab_eval_waits_for_all_judges(monkeypatch):
+    """CollabEval模式下即使提供了回调也不按法定人数返回"""
+    monkeypatch.setattr(committee, "COMMITTEE_QUORUM", 1)
+    session = object()
+    panel, _ = make_committee({"a": (0.01, judge_result(3.0)), "b": (0.05, judge_result(4.0))}, session)
+    panel.use_collab_eval = True
+
+    async def aggregate(judge_results, info, payload, stage_timings):
+        return {"panel": info, "judges": list(judge_results)}
+
+    panel.aggregate_judge_results = aggregate
+
+    async def run():
+        result = await panel.run_committee_evaluation(None, None, payload=PAYLOAD, on_late_result=lambda _: None)
+        return result, late_merge_tasks(session)
+
+    result, pending = asyncio.run(run())
+    assert result["judges"] == ["a", "b"]
+    assert result["panel"]["late_judges"] == []
+    assert pending == []
+
+
+def test_early_stop_cancels_remaining_judges(monkeypatch):
+    """有效评委达到法定人数且全部维度达成共识后取消仍在评测的评委"""
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP", True)
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP_QUORUM", 2)
+    panel, started = make_committee({"a": (0.01, judge_result(4.0)), "b": (0.02, judge_result(4.2)),
+                                     "c": (5.0, judge_result(1.0))})
+
+    async def run():
+        judge_results, info, late_tasks = await panel.run_judge_stage(PAYLOAD)
+        result = await panel.aggregate_judge_results(judge_results, info, PAYLOAD, {})
+        return judge_results, info, late_tasks, result
+
+    judge_results, info, late_tasks, result = asyncio.run(run())
+    assert started == ["a", "b", "c"]
+    assert list(judge_results) == ["a", "b"]
+    assert late_tasks == {}
+    assert info["contributors"] == ["a", "b"]
+    assert info["cancelled"] == ["c"]
+    assert info["not_launched"] == []
+    assert info["stopped_early"]
+    assert info["stop_reason"] == f"2位评委在全部维度上的评分方差均低于{panel.low_consensus_threshold}"
+    assert result["evaluation_summary"]["overall_score"] == 4.1
+    assert result["committee_summary"]["judge_scores"] == {"a": 4.0, "b": 4.2}
+
+
+def test_priority_launch_starts_only_quorum_when_judges_agree(monkeypatch):
+    """priority模式只启动法定人数的评委，达成共识后其余评委不启动"""
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP", True)
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP_QUORUM", 2)
+    monkeypatch.setattr(committee, "COMMITTEE_LAUNCH_MODE", "priority")
+    panel, started = make_committee({name: (0.01, judge_result(4.0)) for name in ("a", "b", "c", "d")})
+
+    judge_results, info, _ = asyncio.run(panel.run_judge_stage(PAYLOAD))
+    assert started == ["a", "b"]
+    assert list(judge_results) == ["a", "b"]
+    assert info["mode"] == "priority"
+    assert info["cancelled"] == []
+    assert info["not_launched"] == ["c", "d"]
+    assert info["stopped_early"]
+
+
+def test_priority_launch_replaces_failed_judge(monkeypatch):
+    """priority模式下评委失败时按顺序追加评委补足法定人数"""
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP", True)
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP_QUORUM", 2)
+    monkeypatch.setattr(committee, "COMMITTEE_LAUNCH_MODE", "priority")
+    panel, started = make_committee({"a": (0.01, judge_result(4.0)), "b": (0.01, {"error": "评测超时"}),
+                                     "c": (0.01, judge_result(4.2)), "d": (0.01, judge_result(1.0))})
+
+    judge_results, info, _ = asyncio.run(panel.run_judge_stage(PAYLOAD))
+    assert started == ["a", "b", "c"]
+    assert info["contributors"] == ["a", "c"]
+    assert info["not_launched"] == ["d"]
+    assert judge_results["b"] == {"error": "评测超时"}
+    assert info["stopped_early"]
+
+
+def test_priority_launch_without_consensus_runs_every_judge(monkeypatch):
+    """未达成共识时逐个追加评委直到全部完成"""
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP", True)
+    monkeypatch.setattr(committee, "COMMITTEE_EARLY_STOP_QUORUM", 2)
+    monkeypatch.setattr(committee, "COMMITTEE_LAUNCH_MODE", "priority")
+    panel, started = make_committee({"a": (0.01, judge_result(2.0)), "b": (0.01, judge_result(5.0)),
+                                     "c": (0.01, judge_result(3.0))})
+
+    judge_results, info, _ = asyncio.run(panel.run_judge_stage(PAYLOAD))
+    assert started == ["a", "b", "c"]
+    assert info["contributors"] == ["a", "b", "c"]
+    assert info["not_launched"] == [] and info["cancelled"] == []
+    assert not info["stopped_early"]
+    assert info["stop_reason"] == "全部评委完成评测，未达成共识"
+
+
+DISPUTED = ("functional_coverage", "defect_detection")
+
+
+def collab_committee(debate_delays):
+    """
+    创建CollabEval委员会：评委a和b在DISPUTED维度上分歧较大，主席决策失败时按评委平均分汇总
+
+    :param debate_delays: {评委: 辩论延迟秒数}，辩论把评分修订为3.0
+    :return: (委员会, 阶段1评委结果, 被取消的辩论)
+    """
+    panel, _ = make_committee({})
+    panel.use_collab_eval = True
+    judge_results = {"a": judge_result(4.0, overrides={dimension: 2.0 for dimension in DISPUTED}),
+                     "b": judge_result(4.0)}
+    cancelled = []
+
+    async def debate_dimension(judge_model, dimension, initial_scores, reasons):
+        try:
+            await asyncio.sleep(debate_delays[judge_model])
+        except asyncio.CancelledError:
+            cancelled.append((judge_model, dimension))
+            raise
+        return {"revised_evaluation": {"score": 3.0, "reason": "辩论后修订"}}
+
+    async def chairman_decision(dimension_results, judge_scores, high_variance_dimensions):
+        return {"error": "主席决策失败"}
+
+    panel.debate_dimension = debate_dimension
+    panel.chairman_decision = chairman_decision
+    return panel, judge_results, cancelled
+
+
+def test_debate_deadline_keeps_initial_scores(monkeypatch):
+    """阶段2超过时限时取消未完成的辩论，相应评委保留初始评分"""
+    monkeypatch.setattr(committee, "DEBATE_BATCH_MODE", False)
+    monkeypatch.setattr(committee, "DEBATE_STAGE_TIMEOUT", 0.05)
+    panel, judge_results, cancelled = collab_committee({"a": 0, "b": 5.0})
+    info = {"contributors": ["a", "b"]}
+
+    result = asyncio.run(panel.aggregate_judge_results(judge_results, info, PAYLOAD, {}))
+    summary = result["committee_summary"]
+    assert sorted(cancelled) == [("b", dimension) for dimension in sorted(DISPUTED)]
+    assert summary["stage2_debate_occurred"]
+    assert summary["stage2_debate_stats"] == {"mode": "per_dimension", "calls": 4, "scheduled": 4,
+                                              "completed": 2, "failed": 0, "cancelled": 2}
+    stage1_matrix = ScoreMatrix.from_dict(summary["stage1_score_matrix"])
+    for dimension in DISPUTED:
+        assert stage1_matrix.column(dimension) == [2.0, 4.0]
+        assert judge_results["a"]["detailed_report"][dimension]["score"] == 3.0
+        assert judge_results["b"]["detailed_report"][dimension]["score"] == 4.0
+        assert result["detailed_report"][dimension]["score"] == 3.5
+    assert result["detailed_report"]["semantic_quality"]["score"] == 4.0
+
+
+def test_batch_debate_one_call_per_judge(monkeypatch):
+    """批量辩论每个评委只调用一次，未给出修订评分的维度保留初始评分"""
+    monkeypatch.setattr(committee, "DEBATE_BATCH_MODE", True)
+    panel, judge_results, _ = collab_committee({})
+    calls = []
+
+    async def debate_dimensions(judge_model, disputed):
+        calls.append((judge_model, sorted(disputed)))
+        if judge_model == "a":
+            return {"functional_coverage": {"revised_evaluation": {"score": 3.0, "reason": "辩论后修订"}}}
+        return {}
+
+    panel.debate_dimensions = debate_dimensions
+    result = asyncio.run(panel.aggregate_judge_results(judge_results, {}, PAYLOAD, {}))
+    assert calls == [("a", sorted(DISPUTED)), ("b", sorted(DISPUTED))]
+    assert result["committee_summary"]["stage2_debate_stats"] == {
+        "mode": "batch", "calls": 2, "scheduled": 4, "completed": 1, "failed": 3, "cancelled": 0}
+    assert result["detailed_report"]["functional_coverage"]["score"] == 3.5
+    assert result["detailed_report"]["defect_detection"]["score"] == 3.0
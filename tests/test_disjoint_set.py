@@ -0,0 +1,60 @@
+"""
+disjoint_set模块测试：簇划分与连通分量一致，且与合并顺序无关
+"""
+import random
+
+from disjoint_set import DisjointSet
+
+
+def brute_force_components(size, pairs):
+    """对无向图做深度优先搜索得到的连通分量"""
+    neighbours = {item: set() for item in range(size)}
+    for a, b in pairs:
+        neighbours[a].add(b)
+        neighbours[b].add(a)
+    seen, components = set(), []
+    for start in range(size):
+        if start in seen:
+            continue
+        stack, component = [start], []
+        seen.add(start)
+        while stack:
+            item = stack.pop()
+            component.append(item)
+            for other in neighbours[item] - seen:
+                seen.add(other)
+                stack.append(other)
+        components.append(sorted(component))
+    return components
+
+
+def test_clusters_match_connected_components():
+    """随机用例对的簇划分与连通分量一致，簇内和簇之间都按下标升序"""
+    rng = random.Random(11)
+    for _ in range(20):
+        size = rng.randint(1, 60)
+        pairs = [(rng.randrange(size), rng.randrange(size)) for _ in range(rng.randint(0, size))]
+        clusters = DisjointSet(size)
+        clusters.union_pairs(pairs)
+        assert clusters.clusters() == brute_force_components(size, pairs)
+
+
+def test_result_independent_of_union_order():
+    """合并顺序不影响簇划分和根"""
+    pairs = [(5, 9), (1, 5), (9, 3), (7, 8), (2, 2)]
+    forward, backward = DisjointSet(10), DisjointSet(10)
+    forward.union_pairs(pairs)
+    backward.union_pairs([(b, a) for a, b in reversed(pairs)])
+    assert forward.clusters() == backward.clusters()
+    assert [forward.find(item) for item in range(10)] == [backward.find(item) for item in range(10)]
+    assert forward.find(9) == 1
+
+
+def test_union_and_min_size():
+    """union返回是否合并了不同集合，min_size过滤单元素簇，可直接传入带相似度的三元组"""
+    clusters = DisjointSet(5)
+    assert clusters.union(0, 3)
+    assert not clusters.union(3, 0)
+    clusters.union_pairs([(1, 4, 0.93)])
+    assert clusters.clusters(min_size=2) == [[0, 3], [1, 4]]
+    assert clusters.clusters() == [[0, 3], [1, 4], [2]]
@@ -0,0 +1,112 @@
+"""
+duplicate_index模块测试：增量同步的结果与全量两两比较一致，比较方式或配置变化时重新构建，以及保存和加载
+"""
+from collections import OrderedDict
+from itertools import combinations
+
+import pytest
+
+import config
+import duplicate_index
+from analyzer import verify_candidate_pairs
+from duplicate_index import DuplicateIndex
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    """索引写入临时目录，不使用已加载的索引"""
+    monkeypatch.setattr(duplicate_index, "DUPLICATE_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(duplicate_index, "_indexes", OrderedDict())
+    return tmp_path
+
+
+@pytest.fixture
+def steps_map(testset_cases):
+    """{case_id: 步骤文本}"""
+    return {case.case_id: case.steps_text for case in testset_cases if case.steps}
+
+
+def exhaustive_pairs(case_text_map):
+    """全部用例两两比较得到的相似用例对"""
+    texts = list(case_text_map.values())
+    return verify_candidate_pairs(texts, list(combinations(range(len(texts)), 2)))
+
+
+def test_sync_add_change_remove_matches_full_comparison(steps_map):
+    """新增、变化和删除用例后，相似用例对与全量两两比较一致，且只比较变化的用例"""
+    case_ids = list(steps_map)
+    index = DuplicateIndex("suite")
+    stats = index.sync({case_id: steps_map[case_id] for case_id in case_ids[:80]})
+    assert (stats["added"], stats["rebuilt"]) == (80, False)
+    assert index.exhaustive
+
+    current = {case_id: steps_map[case_id] for case_id in case_ids if case_id != case_ids[2]}
+    current[case_ids[5]] = steps_map[case_ids[1]] + "，检查结果"
+    stats = index.sync(current)
+    assert stats == {"added": 18, "changed": 1, "removed": 1, "unchanged": 78,
+                     "compared_pairs": 19 * 78 + 19 * 18 // 2, "rebuilt": False}
+    assert case_ids[2] not in index.entries
+    assert index.similar_pairs(list(current)) == exhaustive_pairs(current)
+    assert [case_ids[1], case_ids[5]] in [cluster[:2] for cluster in index.clusters(list(current))]
+
+
+def test_comparison_mode_change_rebuilds_index(steps_map, monkeypatch):
+    """用例数跨过DUPLICATE_LSH_MIN_CASES时整体重建，结果与按当前方式新建的索引一致"""
+    monkeypatch.setattr(duplicate_index, "DUPLICATE_LSH_MIN_CASES", 50)
+    case_ids = list(steps_map)
+    small = {case_id: steps_map[case_id] for case_id in case_ids[:50]}
+    index = DuplicateIndex("suite")
+    index.sync(small)
+    assert index.exhaustive
+
+    stats = index.sync(steps_map)
+    assert stats["rebuilt"] and stats["added"] == len(steps_map) and stats["unchanged"] == 0
+    assert not index.exhaustive
+    fresh = DuplicateIndex("fresh")
+    fresh.sync(steps_map)
+    assert index.similar_pairs(case_ids) == fresh.similar_pairs(case_ids)
+
+    stats = index.sync(small)
+    assert stats["rebuilt"] and index.exhaustive
+    assert set(index.entries) == set(small)
+    assert index.similar_pairs(list(small)) == exhaustive_pairs(small)
+
+
+def test_save_and_load_round_trip(steps_map, monkeypatch):
+    """加载的索引与保存时一致，并由签名重建LSH桶，之后的增量同步与未保存的索引相同"""
+    monkeypatch.setattr(duplicate_index, "DUPLICATE_LSH_MIN_CASES", 10)
+    case_ids = list(steps_map)
+    initial = {case_id: steps_map[case_id] for case_id in case_ids[:-1]}
+    index = DuplicateIndex("suite")
+    index.sync(initial)
+    assert index.save()
+
+    loaded = DuplicateIndex.load("suite")
+    assert (loaded.entries, loaded.edges, loaded.exhaustive) == (index.entries, index.edges, False)
+    assert loaded.sync(initial)["compared_pairs"] == 0
+
+    expected = index.sync(steps_map)
+    assert loaded.sync(steps_map) == expected
+    assert loaded.similar_pairs(case_ids) == index.similar_pairs(case_ids)
+
+
+def test_config_change_invalidates_saved_index(steps_map, monkeypatch):
+    """影响相似用例对的配置变化后，已保存的索引不再使用"""
+    index = DuplicateIndex("suite")
+    index.sync(steps_map)
+    index.save()
+    assert len(DuplicateIndex.load("suite").entries) == len(steps_map)
+
+    monkeypatch.setattr(config, "DUPLICATE_SIMILARITY_THRESHOLD", config.DUPLICATE_SIMILARITY_THRESHOLD + 0.05)
+    loaded = DuplicateIndex.load("suite")
+    assert loaded.entries == {} and loaded.exhaustive is None
+
+
+def test_incremental_pairs_saved_and_cleared(steps_map, index_dir):
+    """find_similar_pairs_incremental保存变化后的索引，清除索引后重新构建得到相同结果"""
+    pairs = duplicate_index.find_similar_pairs_incremental("suite", steps_map)
+    assert pairs == exhaustive_pairs(steps_map)
+    assert len(list(index_dir.glob("*.pkl"))) == 1
+
+    assert duplicate_index.clear_duplicate_index("suite") == 1
+    assert duplicate_index.find_similar_pairs_incremental("suite", steps_map) == pairs
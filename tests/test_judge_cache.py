@@ -0,0 +1,77 @@
+"""
+judge_cache模块测试：评委结果缓存键、有效期和命中统计
+"""
+import json
+import time
+
+import pytest
+
+import judge_cache
+from judge_cache import (
+    build_judge_cache_key, clear_judge_cache, get_cached_judge_result, get_judge_cache_stats, save_judge_result
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """缓存写入临时目录，命中统计从零开始"""
+    monkeypatch.setattr(judge_cache, "JUDGE_RESULT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(judge_cache, "JUDGE_RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(judge_cache, "JUDGE_RESULT_CACHE_TTL", 3600)
+    monkeypatch.setattr(judge_cache, "_stats", {})
+    return tmp_path
+
+
+def test_key_depends_on_model_prompt_payload_and_temperature(monkeypatch):
+    """评委模型、提示模板版本、用例负载和温度任一变化都会改变缓存键"""
+    key = build_judge_cache_key("judge-a", 1, "digest")
+    assert key == build_judge_cache_key("judge-a", 1, "digest")
+    assert len({key, build_judge_cache_key("judge-b", 1, "digest"), build_judge_cache_key("judge-a", 2, "digest"),
+                build_judge_cache_key("judge-a", 1, "other")}) == 4
+    monkeypatch.setattr(judge_cache, "LLM_TEMPERATURE", 0.9)
+    assert build_judge_cache_key("judge-a", 1, "digest") != key
+
+
+def test_save_load_and_stats(cache_dir):
+    """保存后命中缓存，命中率按评委统计"""
+    key = build_judge_cache_key("judge-a", 1, "digest")
+    assert get_cached_judge_result("judge-a", key) is None
+    assert save_judge_result("judge-a", key, {"evaluation_summary": {"overall_score": 4}})
+    assert get_cached_judge_result("judge-a", key) == {"evaluation_summary": {"overall_score": 4}}
+    assert list(cache_dir.glob("*.tmp")) == []
+
+    stats = get_judge_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert stats["per_judge"]["judge-a"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_expired_entry_is_removed(cache_dir, monkeypatch):
+    """超过有效期的缓存计为未命中并被删除，有效期为None时永不过期"""
+    key = build_judge_cache_key("judge-a", 1, "digest")
+    save_judge_result("judge-a", key, {"ok": True})
+    cache_file = cache_dir / f"{key}.json"
+    entry = json.loads(cache_file.read_text(encoding="utf-8"))
+    entry["cached_at"] = time.time() - 100
+    cache_file.write_text(json.dumps(entry), encoding="utf-8")
+
+    monkeypatch.setattr(judge_cache, "JUDGE_RESULT_CACHE_TTL", None)
+    assert get_cached_judge_result("judge-a", key) == {"ok": True}
+    monkeypatch.setattr(judge_cache, "JUDGE_RESULT_CACHE_TTL", 10)
+    assert get_cached_judge_result("judge-a", key) is None
+    assert not cache_file.exists()
+    assert get_judge_cache_stats()["per_judge"]["judge-a"]["misses"] == 1
+
+
+def test_disabled_cache_and_clear(cache_dir, monkeypatch):
+    """禁用缓存时不读不写也不计入统计，clear_judge_cache删除全部缓存文件"""
+    key = build_judge_cache_key("judge-a", 1, "digest")
+    save_judge_result("judge-a", key, {"ok": True})
+    save_judge_result("judge-b", build_judge_cache_key("judge-b", 1, "digest"), {"ok": True})
+
+    monkeypatch.setattr(judge_cache, "JUDGE_RESULT_CACHE_ENABLED", False)
+    assert get_cached_judge_result("judge-a", key) is None
+    assert not save_judge_result("judge-a", "other", {"ok": True})
+    assert get_judge_cache_stats()["hits"] + get_judge_cache_stats()["misses"] == 0
+
+    assert clear_judge_cache() == 2
+    assert list(cache_dir.iterdir()) == []
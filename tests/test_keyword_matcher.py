@@ -0,0 +1,78 @@
+"""
+keyword_matcher模块测试：自动机的各种匹配结果与逐关键词子串查找一致
+"""
+import random
+
+from config import COVERAGE_KEYWORDS
+from keyword_matcher import KeywordAutomaton, get_keyword_automaton
+
+
+def brute_force_categories(keyword_groups, text):
+    """原实现的逐类别、逐关键词子串查找"""
+    return {category for category, keywords in keyword_groups.items()
+            if any(keyword.lower() in text for keyword in keywords)}
+
+
+def brute_force_count(keyword_groups, text):
+    """逐关键词统计所有（可重叠的）出现次数"""
+    counts = {}
+    for category, keywords in keyword_groups.items():
+        total = 0
+        for keyword in set(keyword.lower() for keyword in keywords):
+            total += sum(1 for i in range(len(text)) if text.startswith(keyword, i))
+        counts[category] = total
+    return counts
+
+
+def case_text(case):
+    """与测试覆盖流程图一致的用例匹配文本"""
+    return case.text + " " + case.category.lower() + " " + case.case_id
+
+
+def test_testset_categories_match_brute_force(testset_cases):
+    """testset中每个用例命中的覆盖类别与逐关键词子串查找一致"""
+    automaton = get_keyword_automaton(COVERAGE_KEYWORDS)
+    texts = [case_text(case) for case in testset_cases]
+    expected = [brute_force_categories(COVERAGE_KEYWORDS, text) for text in texts]
+    assert automaton.batch_match(texts) == expected
+    assert [automaton.match_categories(text) for text in texts] == expected
+
+
+def test_overlapping_keywords():
+    """首尾重叠和互相包含的关键词都能命中，命中次数包含重叠的出现"""
+    groups = {"x": ["aba", "a"], "y": ["abab"], "z": ["ba"], "w": ["bab"]}
+    automaton = KeywordAutomaton(groups)
+    rng = random.Random(7)
+    texts = ["".join(rng.choice("ab ") for _ in range(rng.randint(0, 12))) for _ in range(500)]
+    for text in texts:
+        assert automaton.match_categories(text) == brute_force_categories(groups, text)
+        assert automaton.count_hits(text) == brute_force_count(groups, text)
+
+
+def test_batch_matches_per_text_scan():
+    """批量匹配与逐条匹配的类别位掩码一致，批量计数统计命中每个类别的文本数"""
+    groups = {"x": ["最大值", "最大", "边界"], "y": ["超时", "time-out", "时"], "z": ["值", "max"]}
+    automaton = KeywordAutomaton(groups)
+    rng = random.Random(3)
+    alphabet = list("最大小值边界超时ame x-\n") + ["time-out", "max"]
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(300)]
+    expected = [brute_force_categories(groups, text) for text in texts]
+    assert automaton.batch_match(texts) == expected
+    assert automaton.batch_masks(texts) == [automaton.match_mask(text) for text in texts]
+    assert automaton.batch_count(texts) == {category: sum(category in hits for hits in expected)
+                                            for category in groups}
+
+
+def test_first_positions_and_empty_text():
+    """首次出现位置取各类别关键词中最靠前的起始位置，空文本没有命中"""
+    automaton = KeywordAutomaton({"x": ["cd", "bcd"], "y": ["z"]})
+    assert automaton.first_positions("abcdcd") == {"x": 1}
+    assert automaton.match_categories("") == set()
+    assert automaton.batch_match([]) == []
+
+
+def test_automaton_cached_per_configuration():
+    """同一关键词配置只编译一次"""
+    groups = {"x": ["a", "b"]}
+    assert get_keyword_automaton(groups) is get_keyword_automaton({"x": ["a", "b"]})
+    assert get_keyword_automaton(groups) is not get_keyword_automaton({"x": ["a"]})
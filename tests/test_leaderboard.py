@@ -0,0 +1,110 @@
+"""
+leaderboard模块测试：排名和并列、评测失败与缺少维度时的报告渲染，以及候选评测结果写入结果缓存
+"""
+import asyncio
+import contextlib
+import json
+import os
+
+import pytest
+
+import leaderboard
+import result_cache
+from leaderboard import build_leaderboard_entry, rank_leaderboard, render_leaderboard_report
+from result_cache import build_result_cache_key, get_cached_result
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def evaluation(overall, coverage=0.5, **dimensions):
+    """包含总分、各维度评分和黄金标准覆盖率的评测结果"""
+    return {
+        "evaluation_summary": {"overall_score": overall},
+        "detailed_report": {key: {"score": score, "reason": "理由"} for key, score in dimensions.items()},
+        "duplicate_info": {"ai_duplicate_rate": 5.0},
+        "case_matching": {"coverage_ratio": coverage, "precision_ratio": 0.6, "ai_count": 10}
+    }
+
+
+@pytest.fixture
+def ranked():
+    """包含并列、覆盖率决胜、缺少维度、没有总分和评测失败的候选"""
+    return rank_leaderboard([
+        build_leaderboard_entry("failed", None, 8),
+        build_leaderboard_entry("low", evaluation(3.0, functional_coverage=3.0), 10),
+        build_leaderboard_entry("tie-a", evaluation(4.0, 0.8, functional_coverage=4.0, defect_detection=3.5), 10),
+        build_leaderboard_entry("no-score", evaluation("N/A", functional_coverage=2.0), 10),
+        build_leaderboard_entry("tie-b", evaluation(4.0, 0.8, functional_coverage=4.0), 10),
+        build_leaderboard_entry("top", evaluation(4.0, 0.9, defect_detection=3.0), 10),
+    ])
+
+
+def test_rank_orders_by_score_then_coverage(ranked):
+    """总分相同时覆盖率高的在前，总分和覆盖率都相同时名次并列，失败和没有总分的候选不参与排名"""
+    assert [(entry["name"], entry["rank"]) for entry in ranked] == [
+        ("top", 1), ("tie-a", 2), ("tie-b", 2), ("low", 4), ("no-score", None), ("failed", None)]
+    assert ranked[4]["success"] and ranked[4]["overall_score"] is None
+    assert ranked[5]["success"] is False
+
+
+def test_report_marks_failures_and_missing_dimensions(ranked):
+    """评测失败的候选单独列出，缺少的维度显示N/A，并列最高分的候选都标为最佳"""
+    report = render_leaderboard_report(ranked, golden_count=20)
+    assert "共6个候选用例集对比同一黄金标准（20个用例），成功评测4个" in report
+    assert "| 2 | tie-a | 4.0 | 10 | 80.0% | 60.0% | 5.0% |" in report
+    assert "| - | failed | 评测失败 | 8 | - | - | - |" in report
+    assert "## ⚠️ 评测失败的候选\n\n- no-score\n- failed\n" in report
+    # 维度列按排名顺序：top、tie-a、tie-b、low
+    assert "| 功能覆盖度 | N/A | **4.0** | **4.0** | 3.0 |" in report
+    assert "| 缺陷发现能力 | 3.0 | **3.5** | N/A | N/A |" in report
+    assert "- **功能覆盖度**：tie-a、tie-b（4.0）" in report
+    assert "置信区间" not in report
+
+
+def test_report_shows_sampling_interval():
+    """抽样评测的候选显示总分置信区间和区间的解读说明"""
+    result = evaluation(3.8, functional_coverage=3.8)
+    result["sampling"] = {"overall_score": {"estimate": 3.8, "ci_low": 3.5, "ci_high": 4.1}}
+    unavailable = evaluation(3.6)
+    unavailable["sampling"] = {"overall_score": {"estimate": 3.6, "ci_low": None, "ci_high": None}}
+    report = render_leaderboard_report(rank_leaderboard([
+        build_leaderboard_entry("sampled", result, 10), build_leaderboard_entry("single", unavailable, 10)]))
+    assert "| 1 | sampled | 3.8（3.5 ~ 4.1） |" in report
+    assert "| 2 | single | 3.6 |" in report
+    assert "区间不重叠的候选之间差异显著" in report
+
+
+def test_evaluated_candidates_are_cached(tmp_path, monkeypatch):
+    """排行榜中新评测的候选写入结果缓存，再次评测时直接命中，评测失败的候选不缓存"""
+    with open(os.path.join(ROOT_DIR, "testset", "formatted_test_cases.json"), encoding="utf-8") as f:
+        formatted_cases = json.load(f)
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(leaderboard, "get_leaderboard_file_paths",
+                        lambda: (str(tmp_path / "leaderboard.md"), str(tmp_path / "leaderboard.json")))
+    monkeypatch.setattr(leaderboard, "create_client_session", lambda session_id: contextlib.nullcontext())
+    monkeypatch.setattr(leaderboard, "prepare_golden_context", lambda golden_testcases: None)
+    evaluated = []
+
+    async def format_test_cases(session, data, label):
+        return formatted_cases
+
+    async def evaluate_test_cases(session, formatted_ai_cases, formatted_golden_cases, **kwargs):
+        evaluated.append(kwargs["sample_size"])
+        return evaluation(4.2, functional_coverage=4.2) if len(evaluated) == 1 else None
+
+    monkeypatch.setattr(leaderboard, "format_test_cases", format_test_cases)
+    monkeypatch.setattr(leaderboard, "evaluate_test_cases", evaluate_test_cases)
+    candidates = {"good": '{"cases": [1]}', "bad": '{"cases": [2]}'}
+
+    result = asyncio.run(leaderboard.async_leaderboard_main(candidates, '{"golden": []}'))
+    assert [entry["name"] for entry in result["leaderboard"] if entry["rank"]] == ["good"]
+    cached = get_cached_result(build_result_cache_key(candidates["good"], '{"golden": []}'))
+    assert cached["success"] and cached["evaluation_result"] == result["evaluation_results"]["good"]
+    assert "**4.2/5.0**" in cached["report"] and cached["files"] == {}
+    assert get_cached_result(build_result_cache_key(candidates["bad"], '{"golden": []}')) is None
+
+    result = asyncio.run(leaderboard.async_leaderboard_main(candidates, '{"golden": []}'))
+    # 第二次只重新评测失败的候选
+    assert evaluated == [None, None, None]
+    assert [entry["name"] for entry in result["leaderboard"] if entry["cache_hit"]] == ["good"]
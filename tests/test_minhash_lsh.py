@@ -0,0 +1,88 @@
+"""
+minhash_lsh模块测试：LSH候选对不漏掉逐对比较找到的相似用例，强制使用LSH时重复分析结果不变
+"""
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import pytest
+
+import minhash_lsh
+from analyzer import find_duplicate_test_cases
+from config import DUPLICATE_SIMILARITY_THRESHOLD
+from minhash_lsh import LSHIndex, MinHasher, find_candidate_pairs, optimal_lsh_params, shingle_hashes
+
+
+def brute_force_similar_pairs(texts):
+    """原实现的逐对比较：所有文本对中quick_ratio超过阈值的文本对"""
+    return {(i, j) for i, j in combinations(range(len(texts)), 2)
+            if SequenceMatcher(None, texts[i], texts[j]).quick_ratio() > DUPLICATE_SIMILARITY_THRESHOLD}
+
+
+def summarize(duplicate_info):
+    """重复分析结果中与用例划分有关的部分"""
+    return (duplicate_info["duplicate_count"], duplicate_info["duplicate_types"]["title"],
+            duplicate_info["duplicate_types"]["steps"],
+            [sorted(group["case_ids"]) for group in duplicate_info["steps_duplicates"]])
+
+
+def test_testset_brute_force_reference(testset_cases):
+    """示例数据逐对比较的结果：3组重复，标题重复4个，步骤重复4对"""
+    assert summarize(find_duplicate_test_cases(testset_cases)) == (3, 4, 4, [["002", "003", "044", "073"]])
+
+
+def test_lsh_candidates_cover_brute_force_pairs(testset_cases, monkeypatch):
+    """强制使用LSH时候选对包含逐对比较找到的全部相似文本对，且远少于全部文本对"""
+    monkeypatch.setattr(minhash_lsh, "DUPLICATE_LSH_MIN_CASES", 0)
+    texts = [case.steps_text for case in testset_cases if case.steps]
+    expected = brute_force_similar_pairs(texts)
+    candidates = set(find_candidate_pairs(texts))
+    assert expected and expected <= candidates
+    assert len(candidates) < len(texts) * (len(texts) - 1) // 4
+
+
+def test_forced_lsh_duplicate_analysis_matches_brute_force(testset_cases, monkeypatch):
+    """强制使用LSH时重复分析结果与逐对比较完全一致"""
+    expected = find_duplicate_test_cases(testset_cases)
+    monkeypatch.setattr(minhash_lsh, "DUPLICATE_LSH_MIN_CASES", 0)
+    assert find_duplicate_test_cases(testset_cases) == expected
+
+
+def test_small_inputs_use_all_pairs():
+    """文本数量不超过DUPLICATE_LSH_MIN_CASES时返回全部文本对"""
+    assert find_candidate_pairs(["a", "b", "c"]) == [(0, 1), (0, 2), (1, 2)]
+
+
+@pytest.mark.skipif(minhash_lsh.np is None, reason="需要numpy")
+def test_signature_numpy_matches_fallback(monkeypatch):
+    """numpy与纯Python计算的MinHash签名一致"""
+    hasher = MinHasher(num_perm=32, seed=5)
+    hashes = shingle_hashes("打开登录页面，输入用户名和密码，点击登录")
+    signature = hasher.signature(hashes)
+    monkeypatch.setattr(minhash_lsh, "np", None)
+    assert hasher.signature(hashes) == signature
+    assert hasher.signature([]) == (minhash_lsh._MAX_HASH,) * 32
+
+
+def test_lsh_index_add_query_remove():
+    """签名相同的条目互为候选，移除后不再出现"""
+    hasher = MinHasher(num_perm=16, seed=1)
+    index = LSHIndex(bands=4, rows=4)
+    same = hasher.signature(shingle_hashes("输入错误的密码"))
+    other = hasher.signature(shingle_hashes("完全不同的一段文字内容"))
+    index.add("a", same)
+    index.add("b", same)
+    index.add("c", other)
+    assert list(index.candidate_pairs()) == [("a", "b")]
+    assert index.query(same) == ["a", "b"]
+    index.remove("a", same)
+    assert index.query(same) == ["b"]
+    assert list(index.candidate_pairs()) == []
+
+
+def test_optimal_params_fit_signature():
+    """分段参数不超过签名长度，阈值越低每段行数越少"""
+    bands, rows = optimal_lsh_params(0.5, 128)
+    assert bands * rows <= 128
+    assert optimal_lsh_params(0.3, 128)[1] <= optimal_lsh_params(0.8, 128)[1]
+    assert shingle_hashes("") == []
+    assert shingle_hashes("A b") == shingle_hashes("ab")
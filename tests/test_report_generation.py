@@ -0,0 +1,94 @@
+"""
+报告生成测试：标准报告失败时的基本报告保留预生成的数据部分，迭代报告在本地渲染
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+import evaluator
+from analyzer import find_duplicate_test_cases
+from case_matcher import match_test_cases
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def formatted_ai_cases():
+    """testset/formatted_test_cases.json中的格式化AI测试用例"""
+    with open(os.path.join(ROOT_DIR, "testset", "formatted_test_cases.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def evaluation_result(testset_cases, golden_cases):
+    """包含重复信息、用例对应关系和委员会信息的评测结果"""
+    duplicate_info = find_duplicate_test_cases(testset_cases)
+    return {
+        "evaluation_summary": {"overall_score": 3.6, "final_suggestion": "【多评委综合评测】补充异常场景"},
+        "detailed_report": {
+            "functional_coverage": {"score": 3.5, "reason": "覆盖主要流程"},
+            "defect_detection": {"score": 3.2, "reason": "异常场景较少"}
+        },
+        "duplicate_types": duplicate_info["duplicate_types"],
+        "duplicate_categories": duplicate_info.get("duplicate_categories", {}),
+        "duplicate_info": {
+            "ai_duplicate_rate": duplicate_info["duplicate_rate"],
+            "golden_duplicate_rate": 0,
+            "merge_suggestions": duplicate_info.get("merge_suggestions", [])
+        },
+        "case_matching": match_test_cases(testset_cases, golden_cases),
+        "is_committee_result": True,
+        "collab_eval_result": True,
+        "committee_summary": {"evaluation_framework": "CollabEval", "judge_scores": {"judge-a": 3.6}}
+    }
+
+
+def test_fallback_report_keeps_precomputed_sections(evaluation_result, formatted_ai_cases, tmp_path, monkeypatch):
+    """标准报告失败时，基本报告仍包含重复分析、用例对应关系、覆盖流程图和委员会信息"""
+    async def failing_report(*args, **kwargs):
+        raise RuntimeError("narrative service unavailable")
+
+    monkeypatch.setattr(evaluator, "generate_markdown_report", failing_report)
+    monkeypatch.setattr(evaluator, "end_logging", lambda: None)
+    duplicate_fields = {key: evaluation_result[key] for key in evaluator.DUPLICATE_RESULT_FIELDS}
+    artifacts = evaluator.precompute_report_artifacts(formatted_ai_cases, duplicate_fields)
+    report_file = str(tmp_path / "evaluation_markdown" / "report.md")
+
+    result = asyncio.run(evaluator.evaluate_and_generate_report(
+        None, formatted_ai_cases, None, report_file, evaluation_result=evaluation_result, report_artifacts=artifacts))
+
+    report = result["report"]
+    assert result["success"]
+    assert artifacts["duplicates"] in report
+    assert evaluator.render_case_matching_section(evaluation_result) in report
+    assert "## 🧭 测试覆盖率分析" in report
+    assert "## 👥 评委委员会评测" in report
+    assert evaluator.build_fallback_narrative("summary", evaluation_result) in report
+    with open(report_file, encoding="utf-8") as f:
+        assert f.read() == report
+
+
+def test_iteration_report_uses_evaluation_framework(evaluation_result):
+    """迭代报告按实际评估框架替换总体建议中的框架描述"""
+    report = evaluator.render_iteration_report(evaluation_result)
+    assert "【CollabEval三阶段综合评测】补充异常场景" in report
+    evaluation_result["committee_summary"]["evaluation_framework"] = "Standard"
+    assert "【多评委综合评测】补充异常场景" in evaluator.render_iteration_report(evaluation_result)
+    assert evaluator.render_iteration_report(None).startswith("# 迭代评测报告生成失败")
+
+
+def test_local_reports_follow_merged_scores(evaluation_result, formatted_ai_cases):
+    """迟到评委合并后重新渲染的报告使用合并后的评分"""
+    evaluation_result.update(collab_eval_result=False, committee_summary={"evaluation_framework": "Standard"})
+    evaluator.apply_late_committee_result(evaluation_result, {
+        "evaluation_summary": {"overall_score": 4.4},
+        "detailed_report": {"functional_coverage": {"score": 4.6}},
+        "committee_summary": {"evaluation_framework": "Standard", "judge_scores": {"a": 4.2, "b": 4.6}}
+    })
+    reports = evaluator.render_local_reports(evaluation_result, formatted_ai_cases, include_iteration=True)
+    assert "**4.4/5.0**" in reports["standard"]
+    assert evaluator.render_score_section(evaluation_result) in reports["standard"]
+    assert "**总体评分**: 4.4/5.0" in reports["iteration"]
+    assert set(reports) == {"standard", "iteration"}
@@ -0,0 +1,110 @@
+"""
+result_cache模块测试：缓存键的规范化和配置指纹，以及缓存有效期
+"""
+import json
+import os
+import re
+import time
+
+import pytest
+
+import config
+import result_cache
+from result_cache import build_result_cache_key, canonical_content_hash, get_cached_result, save_result_to_cache
+
+
+# 不影响评测结果的配置项：连接和并发参数、文件路径、缓存和索引的开关与容量、不改变结果的性能参数，以及未使用的配置
+NON_RESULT_CONFIG_KEYS = {
+    "API_URL", "VOLC_BEARER_TOKEN", "TASK_STATUS_MAX_ENTRIES", "MAX_JUDGES_CONCURRENCY",
+    "ENABLE_BATCH_PROCESSING", "BATCH_SIZE", "BATCH_CONCURRENCY", "MAX_CASES_COUNT", "FORMAT_CASES_LIMIT",
+    "AI_CASES_FILE", "GOLDEN_CASES_FILE", "FORMATTED_AI_CASES_FILE", "FORMATTED_GOLDEN_CASES_FILE", "LOG_FILE",
+    "MAX_CONCURRENT_REQUESTS", "AIOHTTP_CONNECTOR_LIMIT", "AIOHTTP_CONNECTOR_TTL", "AIOHTTP_TIMEOUT",
+    "LLM_CACHE_SIZE", "LLM_CACHE_ENABLED", "RESULT_CACHE_ENABLED", "RESULT_CACHE_TTL", "RESULT_CACHE_DIR",
+    "JUDGE_RESULT_CACHE_ENABLED", "JUDGE_RESULT_CACHE_TTL", "JUDGE_RESULT_CACHE_DIR", "TOKEN_CACHE_SIZE",
+    "DUPLICATE_PROCESS_WORKERS", "DUPLICATE_PROCESS_MIN_PAIRS", "DUPLICATE_PROCESS_CHUNK_SIZE",
+    "DUPLICATE_VECTOR_BLOCK_SIZE", "DUPLICATE_INDEX_ENABLED", "DUPLICATE_INDEX_DIR", "DUPLICATE_INDEX_MAX_SUITES",
+    "LEADERBOARD_MAX_CONCURRENT_CANDIDATES"
+}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """缓存写入临时目录中尚未创建的子目录"""
+    cache_path = tmp_path / "evaluation_results"
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_DIR", str(cache_path))
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", True)
+    return cache_path
+
+
+def test_every_config_setting_is_classified():
+    """config中的每个配置项要么参与配置指纹，要么明确列为不影响评测结果"""
+    settings = {name for name in vars(config) if re.fullmatch(r"[A-Z][A-Z0-9_]*", name)}
+    keys = set(result_cache.RESULT_CACHE_CONFIG_KEYS)
+    assert settings - keys - NON_RESULT_CONFIG_KEYS == set()
+    assert keys & NON_RESULT_CONFIG_KEYS == set()
+    assert keys <= settings
+
+
+def test_content_hash_ignores_key_order_and_whitespace():
+    """键顺序和JSON空白不影响内容哈希"""
+    data = {"test_cases": [{"title": "登录", "steps": ["a", "b"]}], "name": "suite"}
+    text = '{\n  "name": "suite",\n  "test_cases": [{"steps": ["a", "b"], "title": "登录"}]\n}'
+    assert canonical_content_hash(data) == canonical_content_hash(text)
+    assert canonical_content_hash(None) == "none"
+    assert canonical_content_hash(" not json ") == canonical_content_hash("not json")
+
+
+def test_key_depends_on_inputs_mode_and_sample_size():
+    """用例内容、迭代模式、上一次迭代数据和样本量都会改变缓存键"""
+    ai, golden, prev = {"cases": [1]}, {"cases": [2]}, {"cases": [3]}
+    key = build_result_cache_key(ai, golden)
+    assert key == build_result_cache_key(json.dumps(ai), json.dumps(golden))
+    assert key != build_result_cache_key({"cases": [4]}, golden)
+    assert key != build_result_cache_key(ai, golden, is_iteration=True, prev_iteration_data=prev)
+    # 非迭代模式忽略上一次迭代数据
+    assert key == build_result_cache_key(ai, golden, prev_iteration_data=prev)
+    assert key != build_result_cache_key(ai, golden, sample_size=100)
+
+
+@pytest.mark.parametrize("config_key", result_cache.RESULT_CACHE_CONFIG_KEYS)
+def test_config_change_invalidates_key(monkeypatch, config_key):
+    """任一影响结果的配置项变化都会改变缓存键"""
+    key = build_result_cache_key({"a": 1}, {"b": 2})
+    monkeypatch.setattr(config, config_key, ("changed", getattr(config, config_key, None)), raising=False)
+    assert build_result_cache_key({"a": 1}, {"b": 2}) != key
+
+
+def test_save_and_load(cache_dir):
+    """只缓存成功的结果，读取时返回原结果，缓存目录在首次保存时创建"""
+    result = {"success": True, "evaluation_result": {"score": 4.5}}
+    assert result_cache.clear_result_cache() == 0
+    assert get_cached_result("key") is None
+    assert save_result_to_cache("key", result)
+    assert get_cached_result("key") == result
+    assert not save_result_to_cache("failed", {"success": False})
+    assert get_cached_result("failed") is None
+    assert [name for name in os.listdir(cache_dir) if name.endswith(".tmp")] == []
+    assert result_cache.clear_result_cache() == 1
+    assert get_cached_result("key") is None
+
+
+def test_expired_entry_is_removed(cache_dir):
+    """超过有效期的缓存返回None并被删除，有效期为负数表示永不过期"""
+    save_result_to_cache("key", {"success": True})
+    cache_file = cache_dir / "key.json"
+    entry = json.loads(cache_file.read_text(encoding="utf-8"))
+    entry["cached_at"] = time.time() - 100
+    cache_file.write_text(json.dumps(entry), encoding="utf-8")
+
+    assert get_cached_result("key", ttl=-1) == {"success": True}
+    assert get_cached_result("key", ttl=1000) == {"success": True}
+    assert get_cached_result("key", ttl=10) is None
+    assert not cache_file.exists()
+
+
+def test_disabled_cache(cache_dir, monkeypatch):
+    """禁用缓存时不读不写"""
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", False)
+    assert not save_result_to_cache("key", {"success": True})
+    assert get_cached_result("key") is None
+    assert not cache_dir.exists()
@@ -0,0 +1,156 @@
+"""
+sampling模块测试：样本量推算、重复用例簇、分层抽样方案和样本组结果合并
+"""
+import random
+
+import pytest
+
+import sampling
+from analyzer import find_duplicate_test_cases
+from sampling import (
+    allocate_sample, bootstrap_interval, build_case_clusters, build_sample_plan, combine_sample_results,
+    derive_sample_size, format_interval, resolve_sample_size, t_critical_value, t_interval
+)
+from testcase_model import normalize_test_cases
+
+
+def make_cases(count, categories=("functional", "security")):
+    """生成按类别轮流分配的测试用例"""
+    return normalize_test_cases([
+        {"case_id": f"TC-{i:04d}", "title": f"用例{i}", "steps": [f"步骤{i}"], "category": categories[i % len(categories)]}
+        for i in range(count)
+    ])
+
+
+def test_derive_sample_size():
+    """样本量按样本组数量对应的t分布临界值和有限总体校正推算，不超过总体数量"""
+    assert derive_sample_size(0) == 0
+    assert derive_sample_size(10, margin=0) == 10
+    # t(3) = 3.182，n0 = (3.182 / 0.25)² = 162.0，有限总体校正后为140
+    assert derive_sample_size(1000, margin=0.25, confidence=0.95, score_std=1.0, replicates=4) == 140
+    # 只有一组时退化为正态近似
+    assert derive_sample_size(1000, margin=0.25, confidence=0.95, score_std=1.0, replicates=1) == 58
+    assert derive_sample_size(1000, replicates=30) < derive_sample_size(1000, replicates=4)
+    assert derive_sample_size(30, margin=0.25, confidence=0.95, score_std=1.0) <= 30
+    assert derive_sample_size(100000) >= derive_sample_size(1000)
+
+
+def test_resolve_sample_size(monkeypatch):
+    """未指定样本量时按配置决定是否抽样，样本量不小于总体时不抽样"""
+    monkeypatch.setattr(sampling, "SAMPLING_ENABLED", False)
+    assert resolve_sample_size(5000) == 0
+    monkeypatch.setattr(sampling, "SAMPLING_ENABLED", True)
+    monkeypatch.setattr(sampling, "SAMPLING_MIN_CASES", 1000)
+    assert resolve_sample_size(500) == 0
+    assert resolve_sample_size(5000) == derive_sample_size(5000)
+    assert resolve_sample_size(100, sample_size=200) == 0
+    assert resolve_sample_size(100, sample_size=1) == sampling.SAMPLING_REPLICATES
+
+
+def test_duplicate_cases_share_a_cluster(testset_cases):
+    """标题重复和步骤相似的用例归入同一簇，每个用例恰好属于一个簇"""
+    duplicate_info = find_duplicate_test_cases(testset_cases)
+    clusters = build_case_clusters(testset_cases, duplicate_info)
+    assert sorted(index for cluster in clusters for index in cluster) == list(range(len(testset_cases)))
+    cluster_of = {index: tuple(cluster) for cluster in clusters for index in cluster}
+    id_to_index = {case.case_id: index for index, case in enumerate(testset_cases)}
+    for group in duplicate_info["title_duplicates"] + duplicate_info["steps_duplicates"]:
+        assert len({cluster_of[id_to_index[case_id]] for case_id in group["case_ids"]}) == 1
+
+
+def test_sample_plan_is_stratified_disjoint_and_deterministic():
+    """样本组互不重叠，各层按比例分配样本量，相同种子得到相同方案"""
+    cases = make_cases(400, categories=("functional", "functional", "functional", "security"))
+    plan = build_sample_plan(cases, sample_size=40, replicates=4, seed=1)
+    sampled = [case.case_id for sample in plan["replicates"] for case in sample]
+    assert len(sampled) == len(set(sampled)) == plan["sample_size"] == 40
+    assert plan["strata"]["functional"]["sampled"] == 30
+    assert plan["strata"]["security"]["sampled"] == 10
+    assert [len(sample) for sample in plan["replicates"]] == [10, 10, 10, 10]
+
+    again = build_sample_plan(cases, sample_size=40, replicates=4, seed=1)
+    assert [[case.case_id for case in sample] for sample in again["replicates"]] == \
+        [[case.case_id for case in sample] for sample in plan["replicates"]]
+
+
+def test_sample_plan_caps_total_with_many_small_strata():
+    """小层很多时每层至少一个单元的下限不会使样本量超出"""
+    cases = make_cases(950, categories=("main",)) + make_cases(50, categories=tuple(f"small{i}" for i in range(50)))
+    plan = build_sample_plan(cases, sample_size=20, replicates=4, seed=0)
+    assert plan["sample_size"] == 20
+    assert plan["strata"]["main"]["sampled"] >= 1
+    assert sum(stratum["sampled"] for stratum in plan["strata"].values()) == 20
+
+
+def test_sample_plan_redistributes_shortfall():
+    """单元数少于份额的层的不足部分分给仍有剩余单元的层"""
+    allocation = allocate_sample(40, {"a": 50, "b": 50}, {"a": 5, "b": 50})
+    assert allocation == {"a": 5, "b": 35}
+    assert allocate_sample(100, {"a": 50, "b": 50}, {"a": 5, "b": 20}) == {"a": 5, "b": 20}
+    assert allocate_sample(2, {"a": 10, "b": 5, "c": 1}, {"a": 10, "b": 5, "c": 1}) == {"a": 1, "b": 1, "c": 0}
+
+    # 重复用例使第一层只有2个簇，份额的其余部分由第二层补足
+    cases = make_cases(20, categories=("dup",)) + make_cases(20, categories=("unique",))
+    duplicate_info = {"title_duplicates": [{"case_ids": [case.case_id for case in cases[:10]]},
+                                           {"case_ids": [case.case_id for case in cases[10:20]]}]}
+    for case in cases[20:]:
+        case.case_id = f"U-{case.case_id}"
+    plan = build_sample_plan(cases, duplicate_info, sample_size=12, replicates=2, seed=0)
+    assert plan["strata"]["dup"]["sampled"] == 2
+    assert plan["strata"]["unique"]["sampled"] == 10
+    assert plan["sample_size"] == 12
+
+
+def test_t_interval():
+    """t分布区间与查表结果一致，少于2个得分时无法估计"""
+    assert t_critical_value(0.95, 3) == pytest.approx(3.1824, abs=1e-4)
+    assert t_critical_value(0.95, 1) == pytest.approx(12.7062, abs=1e-4)
+    assert t_critical_value(0.9, 10) == pytest.approx(1.8125, abs=1e-4)
+    low, high = t_interval([3.0, 3.5, 4.0, 4.5], confidence=0.95)
+    assert (low, high) == (pytest.approx(2.7229, abs=1e-4), pytest.approx(4.7771, abs=1e-4))
+    assert t_interval([]) is None
+    assert t_interval([3.0]) is None
+
+
+def test_bootstrap_interval():
+    """少于2个得分时无法估计，常数得分的区间退化为一点，区间包含样本均值"""
+    assert bootstrap_interval([]) is None
+    assert bootstrap_interval([3.0]) is None
+    assert bootstrap_interval([4.0, 4.0, 4.0], rounds=100) == (4.0, 4.0)
+    values = [2.0, 3.0, 4.0, 5.0]
+    low, high = bootstrap_interval(values, rounds=500, confidence=0.9, rng=random.Random(0))
+    assert low <= sum(values) / len(values) <= high
+
+
+def test_combine_sample_results():
+    """合并结果取各样本组均值，失败的样本组被忽略"""
+    plan = build_sample_plan(make_cases(40), sample_size=8, replicates=2, seed=0)
+
+    def result(score):
+        return {"evaluation_summary": {"overall_score": score},
+                "detailed_report": {"functional_coverage": {"score": score, "reason": f"{score}"}}}
+
+    assert combine_sample_results([None, None], plan) is None
+    combined = combine_sample_results([result(3.0), None, result(4.0)], plan, rounds=100)
+    assert combined["evaluation_summary"]["overall_score"] == pytest.approx(3.5)
+    assert combined["detailed_report"]["functional_coverage"]["score"] == pytest.approx(3.5)
+    assert combined["sampling"]["successful_replicates"] == 2
+    assert combined["sampling"]["overall_score"]["samples"] == [3.0, 4.0]
+    assert combined["sampling"]["interval_method"] == "t"
+    # 两组的t分布区间很宽，截断到评分范围内
+    assert (combined["sampling"]["overall_score"]["ci_low"], combined["sampling"]["overall_score"]["ci_high"]) == (1.0, 5.0)
+
+    single = combine_sample_results([result(3.0), None], plan)
+    assert single["sampling"]["interval_method"] is None
+    assert single["sampling"]["overall_score"]["ci_low"] is None
+    assert format_interval(single["sampling"]["overall_score"]) == "无法估计"
+
+
+def test_combine_uses_bootstrap_for_many_replicates(monkeypatch):
+    """成功的样本组足够多时使用自助法区间"""
+    monkeypatch.setattr(sampling, "SAMPLING_BOOTSTRAP_MIN_REPLICATES", 3)
+    plan = build_sample_plan(make_cases(40), sample_size=8, replicates=4, seed=0)
+    combined = combine_sample_results([{"evaluation_summary": {"overall_score": score}} for score in (3, 4, 4, 5)],
+                                      plan, rounds=200)
+    assert combined["sampling"]["interval_method"] == "bootstrap"
+    assert combined["sampling"]["overall_score"]["interval_method"] == "bootstrap"
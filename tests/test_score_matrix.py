@@ -0,0 +1,147 @@
+"""
+score_matrix模块测试：numpy与纯Python两种实现的统计结果一致，并与逐项直接计算的结果一致
+"""
+import statistics
+
+import pytest
+
+import score_matrix
+from score_matrix import SCORE_DIMENSIONS, ScoreMatrix, parse_score
+
+JUDGE_RESULTS = {
+    "judge-a": {
+        "evaluation_summary": {"overall_score": "4.2"},
+        "detailed_report": {
+            "functional_coverage": {"score": 4, "reason": "覆盖主要流程"},
+            "defect_detection": {"score": "3.5", "reason": "异常场景较少"},
+            "engineering_efficiency": {"score": 4},
+            "semantic_quality": {"score": 5, "reason": "描述清晰"},
+            "security_economy": {"score": "N/A"}
+        }
+    },
+    "judge-b": {
+        "evaluation_summary": {"overall_score": 3.8},
+        "detailed_report": {
+            "functional_coverage": {"score": 2, "reason": "缺少边界用例"},
+            "defect_detection": {"score": 4},
+            "engineering_efficiency": {"score": 3},
+            "semantic_quality": {"score": 4},
+            "security_economy": {"score": 3}
+        }
+    },
+    "judge-c": {
+        "evaluation_summary": {"overall_score": "bad"},
+        "detailed_report": {
+            "functional_coverage": {"score": 5},
+            "defect_detection": {"score": float("nan")},
+            "semantic_quality": {"score": 4},
+            "security_economy": {"score": 4}
+        }
+    }
+}
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def backend(request, monkeypatch):
+    """分别使用numpy和纯Python实现"""
+    if request.param == "numpy":
+        if score_matrix.np is None:
+            pytest.skip("需要numpy")
+    else:
+        monkeypatch.setattr(score_matrix, "np", None)
+    return request.param
+
+
+def expected_column(dimension):
+    """直接从评委结果中取出某一维度的有效评分"""
+    values = []
+    for result in JUDGE_RESULTS.values():
+        score = parse_score((result["detailed_report"].get(dimension) or {}).get("score"))
+        if score is not None:
+            values.append(score)
+    return values
+
+
+def test_parse_score():
+    """只接受有限数值"""
+    assert parse_score("3.5") == 3.5
+    assert parse_score(4) == 4.0
+    for value in (None, "N/A", float("nan"), float("inf"), {}):
+        assert parse_score(value) is None
+
+
+def test_statistics_match_direct_computation(backend):
+    """各维度的有效评分数、均值和方差与直接计算一致"""
+    matrix = ScoreMatrix.from_results(JUDGE_RESULTS)
+    counts, means, variances = matrix.counts(), matrix.means(), matrix.variances()
+    for dimension in SCORE_DIMENSIONS:
+        values = expected_column(dimension)
+        assert counts[dimension] == len(values)
+        if values:
+            assert means[dimension] == pytest.approx(statistics.fmean(values))
+            assert variances[dimension] == pytest.approx(statistics.pvariance(values))
+        else:
+            assert means[dimension] is None and variances[dimension] is None
+
+
+def test_weighted_totals_renormalize_missing_dimensions(backend):
+    """缺失维度的权重按其余维度重新归一化"""
+    totals = ScoreMatrix.from_results(JUDGE_RESULTS).weighted_totals()
+    assert totals["judge-a"] == pytest.approx((0.30 * 4 + 0.25 * 3.5 + 0.20 * 4 + 0.15 * 5) / 0.90)
+    assert totals["judge-b"] == pytest.approx(0.30 * 2 + 0.25 * 4 + 0.20 * 3 + 0.15 * 4 + 0.10 * 3)
+    assert totals["judge-c"] == pytest.approx((0.30 * 5 + 0.15 * 4 + 0.10 * 4) / 0.55)
+    assert ScoreMatrix(["empty"]).weighted_totals() == {"empty": None}
+
+
+def test_backends_agree():
+    """numpy与纯Python实现的统计结果完全一致"""
+    if score_matrix.np is None:
+        pytest.skip("需要numpy")
+    with_numpy = ScoreMatrix.from_results(JUDGE_RESULTS).statistics()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(score_matrix, "np", None)
+        assert ScoreMatrix.from_results(JUDGE_RESULTS).statistics() == with_numpy
+
+
+def test_disagreement_and_consensus(backend):
+    """方差达到阈值的维度为争议维度，有缺失评分时不算达成共识"""
+    matrix = ScoreMatrix.from_results(JUDGE_RESULTS)
+    assert matrix.disagreements(1.0) == ["functional_coverage"]
+    assert not matrix.has_consensus(10.0)
+
+    agreed = ScoreMatrix(["a", "b"], ["functional_coverage"], [[4], [4.5]])
+    assert agreed.has_consensus(1.0)
+    agreed.set_score("b", "functional_coverage", 1)
+    assert not agreed.has_consensus(1.0)
+
+
+def test_trimmed_means():
+    """截尾均值两端各去掉一定比例的评分，且至少保留一个评分"""
+    matrix = ScoreMatrix(["a", "b", "c", "d", "e"], ["functional_coverage"], [[1], [3], [3], [4], [5]])
+    assert matrix.trimmed_means(0.2)["functional_coverage"] == pytest.approx(10 / 3)
+    assert matrix.trimmed_means(0.0)["functional_coverage"] == pytest.approx(16 / 5)
+    assert matrix.trimmed_means(0.5)["functional_coverage"] == pytest.approx(3)
+
+
+def test_round_trip_and_add_result():
+    """to_dict/from_dict往返不变，追加评委后统计更新，重复评委报错"""
+    matrix = ScoreMatrix.from_results({judge: JUDGE_RESULTS[judge] for judge in ("judge-a", "judge-b")})
+    restored = ScoreMatrix.from_dict(matrix.to_dict())
+    assert restored.to_dict() == matrix.to_dict()
+    assert restored.statistics() == matrix.statistics()
+
+    restored.add_result("judge-c", JUDGE_RESULTS["judge-c"])
+    assert restored.statistics() == ScoreMatrix.from_results(JUDGE_RESULTS).statistics()
+    with pytest.raises(ValueError):
+        restored.add_result("judge-a", JUDGE_RESULTS["judge-a"])
+
+
+def test_overall_scores_and_details():
+    """无法解析的总体评分记为N/A，维度详情只包含有效评分和给出理由的评委"""
+    matrix = ScoreMatrix.from_results(JUDGE_RESULTS)
+    assert matrix.overall_scores() == {"judge-a": 4.2, "judge-b": 3.8, "judge-c": "N/A"}
+    assert matrix.overall_mean() == pytest.approx(4.0)
+    details = matrix.dimension_details("functional_coverage")
+    assert details["scores"] == [4.0, 2.0, 5.0]
+    assert details["reasons"] == ["覆盖主要流程", "缺少边界用例"]
+    assert set(details["judge_data"]) == {"judge-a", "judge-b"}
@@ -0,0 +1,29 @@
+"""
+tokenizer模块测试：中英文混合分词、词项ID的稳定性和缓存
+"""
+from tokenizer import token_id, token_ids, token_set, tokenize, vocabulary_size
+
+
+def test_tokenize_mixed_text():
+    """英文单词在前，中文按连续片段切分为二元组，单字片段保留为单字"""
+    assert tokenize("点击login按钮 ok 的") == ["login", "ok", "点击", "按钮", "的"]
+    assert tokenize("输入密码") == ["输入", "入密", "密码"]
+    assert tokenize("user_name2 ,。！") == ["user_name2"]
+    assert tokenize("") == []
+
+
+def test_token_ids_are_stable_and_case_insensitive():
+    """同一词项总是得到同一ID，token_ids切分前转为小写"""
+    first = token_id("登录")
+    assert token_id("登录") == first
+    size = vocabulary_size()
+    assert token_id("登录") == first and vocabulary_size() == size
+    assert list(token_ids("LOGIN 登录")) == [token_id("login"), first]
+    assert token_ids("Login 登录") == token_ids("login 登录")
+
+
+def test_token_set_and_cache():
+    """词项集合去重，相同文本返回缓存的同一对象"""
+    assert token_set("密码密码") == {token_id("密码"), token_id("码密")}
+    assert token_ids("重复的文本") is token_ids("重复的文本")
+    assert token_set("重复的文本") is token_set("重复的文本")
@@ -0,0 +1,77 @@
+"""
+vector_similarity模块测试：分块稀疏矩阵乘法的结果与逐对计算余弦相似度一致，以及向量化引擎的回退
+"""
+import math
+from itertools import combinations
+
+import pytest
+
+import analyzer
+from config import DUPLICATE_VECTOR_SIMILARITY_THRESHOLD
+from vector_similarity import VECTOR_BACKEND_AVAILABLE, build_ngram_matrix, ngram_features, similar_pairs
+
+requires_backend = pytest.mark.skipif(not VECTOR_BACKEND_AVAILABLE, reason="需要numpy和scipy")
+
+
+def brute_force_cosine_pairs(texts, threshold):
+    """逐对计算n-gram词频向量的余弦相似度，返回超过阈值的文本对"""
+    vectors = [ngram_features(text) for text in texts]
+    norms = [math.sqrt(sum(count * count for count in vector.values())) for vector in vectors]
+    pairs = {}
+    for i, j in combinations(range(len(texts)), 2):
+        if not norms[i] or not norms[j]:
+            continue
+        dot = sum(count * vectors[j].get(feature, 0) for feature, count in vectors[i].items())
+        similarity = dot / (norms[i] * norms[j])
+        if similarity > threshold:
+            pairs[(i, j)] = similarity
+    return pairs
+
+
+@requires_backend
+@pytest.mark.parametrize("block_size", [1, 7, 1024])
+def test_block_product_matches_brute_force(testset_cases, block_size):
+    """任意分块大小下，超过阈值的文本对和相似度都与逐对计算一致"""
+    texts = [case.steps_text for case in testset_cases if case.steps]
+    threshold = 0.7
+    expected = brute_force_cosine_pairs(texts, threshold)
+    found = similar_pairs(build_ngram_matrix(texts), threshold, block_size=block_size)
+    assert [(i, j) for i, j, _ in found] == sorted(expected)
+    for i, j, similarity in found:
+        assert similarity == pytest.approx(expected[(i, j)], abs=1e-5)
+
+
+@requires_backend
+def test_vector_engine_duplicate_analysis(testset_cases, monkeypatch):
+    """
+    向量化引擎的步骤重复为余弦相似度超过阈值的用例对，标题重复与逐对比较引擎相同。
+    余弦相似度与quick_ratio是不同的度量，示例数据上找到的步骤相似用例对不同
+    """
+    sequence_result = analyzer.find_duplicate_test_cases(testset_cases)
+    monkeypatch.setattr(analyzer, "DUPLICATE_SIMILARITY_ENGINE", "vector")
+    vector_result = analyzer.find_duplicate_test_cases(testset_cases)
+
+    assert vector_result["title_duplicates"] == sequence_result["title_duplicates"]
+    assert vector_result["duplicate_types"]["title"] == 4
+
+    cases_with_steps = [case for case in testset_cases if case.steps]
+    expected = brute_force_cosine_pairs([case.steps_text for case in cases_with_steps],
+                                        DUPLICATE_VECTOR_SIMILARITY_THRESHOLD)
+    assert vector_result["duplicate_types"]["steps"] == len(expected)
+    expected_ids = {frozenset((cases_with_steps[i].case_id, cases_with_steps[j].case_id)) for i, j in expected}
+    found_ids = {frozenset(group["case_ids"]) for group in vector_result["steps_duplicates"]}
+    assert found_ids == expected_ids == {frozenset(("033", "084"))}
+
+
+def test_vector_engine_falls_back_without_backend(testset_cases, monkeypatch):
+    """未安装numpy或scipy时向量化引擎回退到逐对比较引擎"""
+    expected = analyzer.find_duplicate_test_cases(testset_cases)
+    monkeypatch.setattr(analyzer, "DUPLICATE_SIMILARITY_ENGINE", "vector")
+    monkeypatch.setattr(analyzer, "VECTOR_BACKEND_AVAILABLE", False)
+    assert analyzer.find_duplicate_test_cases(testset_cases) == expected
+
+
+def test_ngram_features_ignore_case_and_whitespace():
+    """n-gram特征忽略大小写和空白"""
+    assert ngram_features("Ab c") == ngram_features("abc")
+    assert sum(ngram_features("abcd", sizes=(2,)).values()) == 3
@@ -0,0 +1,80 @@
+"""
+中英文混合分词模块
+将文本切分为中文字符二元组和英文单词，词项映射为进程内唯一的整数ID，
+每段文本的词项ID数组只计算一次并缓存，供重复分析的预筛选和用例匹配复用。
+词项ID只在当前进程内有效，不能持久化
+"""
+import re
+import threading
+from array import array
+from functools import lru_cache
+from typing import Dict, FrozenSet, List
+from config import TOKEN_CACHE_SIZE
+
+_ASCII_WORD_PATTERN = re.compile(r"[a-z0-9_]+")
+_CJK_RUN_PATTERN = re.compile(r"[一-鿿]+")
+
+# 词项到整数ID的映射
+_vocabulary: Dict[str, int] = {}
+_vocabulary_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文本切分为中文字符二元组和英文单词
+
+    :param text: 小写文本
+    :return: 词项列表，先英文单词后中文二元组
+    """
+    tokens = _ASCII_WORD_PATTERN.findall(text)
+    for run in _CJK_RUN_PATTERN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def token_id(token: str) -> int:
+    """
+    获取词项的整数ID，首次出现时分配
+
+    :param token: 词项
+    :return: 整数ID
+    """
+    value = _vocabulary.get(token)
+    if value is None:
+        with _vocabulary_lock:
+            value = _vocabulary.setdefault(token, len(_vocabulary))
+    return value
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def token_ids(text: str) -> array:
+    """
+    计算文本的词项ID数组（结果被缓存，调用方不能修改）
+
+    :param text: 文本，切分前转为小写
+    :return: 无符号整数数组，顺序与tokenize一致
+    """
+    return array("I", [token_id(token) for token in tokenize(text.lower())])
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def token_set(text: str) -> FrozenSet[int]:
+    """
+    计算文本的词项ID集合，用于Jaccard等集合相似度
+
+    :param text: 文本
+    :return: 词项ID集合
+    """
+    return frozenset(token_ids(text))
+
+
+def vocabulary_size() -> int:
+    """
+    获取已分配的词项数量
+
+    :return: 词项数量
+    """
+    return len(_vocabulary)
@@ -0,0 +1,106 @@
+"""
+向量化相似度计算模块
+将文本转换为哈希字符n-gram的词频向量（稀疏矩阵，行向量L2归一化），
+用分块稀疏矩阵乘法一次计算一批文本与其后所有文本的余弦相似度，只保留超过阈值的文本对。
+字符n-gram不依赖分词，中文文本同样适用。需要NumPy和SciPy，未安装时重复分析使用逐对比较引擎
+"""
+import zlib
+from collections import Counter
+from typing import List, Sequence, Tuple
+from config import DUPLICATE_VECTOR_NGRAM_SIZES, DUPLICATE_VECTOR_DIMENSION, DUPLICATE_VECTOR_BLOCK_SIZE
+
+try:
+    import numpy as np
+    from scipy import sparse
+
+    VECTOR_BACKEND_AVAILABLE = True
+except ImportError:
+    np = None
+    sparse = None
+    VECTOR_BACKEND_AVAILABLE = False
+
+
+def ngram_features(text: str, sizes: Sequence[int] = None, dimension: int = None) -> Counter:
+    """
+    计算文本的哈希字符n-gram词频，空白字符不参与分片
+
+    :param text: 文本
+    :param sizes: n-gram长度列表，None则使用配置中的DUPLICATE_VECTOR_NGRAM_SIZES
+    :param dimension: 哈希空间维度，None则使用配置中的DUPLICATE_VECTOR_DIMENSION
+    :return: {特征下标: 词频}
+    """
+    sizes = sizes or DUPLICATE_VECTOR_NGRAM_SIZES
+    dimension = dimension or DUPLICATE_VECTOR_DIMENSION
+    text = "".join(text.lower().split())
+    features = Counter()
+    for size in sizes:
+        for i in range(len(text) - size + 1):
+            features[zlib.crc32(text[i:i + size].encode("utf-8")) % dimension] += 1
+    return features
+
+
+def build_ngram_matrix(texts: List[str], sizes: Sequence[int] = None, dimension: int = None):
+    """
+    构建行向量L2归一化的n-gram稀疏矩阵，两行的点积即为余弦相似度
+
+    :param texts: 文本列表
+    :param sizes: n-gram长度列表
+    :param dimension: 哈希空间维度
+    :return: scipy.sparse.csr_matrix，形状为 (文本数, 维度)
+    """
+    dimension = dimension or DUPLICATE_VECTOR_DIMENSION
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        features = ngram_features(text, sizes, dimension)
+        indices.extend(features.keys())
+        data.extend(features.values())
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(texts), dimension)
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(matrix).tocsr()
+
+
+def similar_pairs(matrix, threshold: float, block_size: int = None) -> List[Tuple[int, int, float]]:
+    """
+    分块计算矩阵各行两两之间的余弦相似度，只保留超过阈值的行对
+
+    每块取block_size行，与其后所有行做一次稀疏矩阵乘法，内存占用由分块大小限制。
+
+    :param matrix: build_ngram_matrix返回的矩阵
+    :param threshold: 相似度阈值，严格大于该值的行对才保留
+    :param block_size: 每块的行数，None则使用配置中的DUPLICATE_VECTOR_BLOCK_SIZE
+    :return: (行i, 行j, 相似度) 列表，i < j，按i、j升序
+    """
+    block_size = block_size or DUPLICATE_VECTOR_BLOCK_SIZE
+    row_count = matrix.shape[0]
+    results = []
+    for start in range(0, row_count, block_size):
+        end = min(start + block_size, row_count)
+        # 只与当前块及其后的行相乘，上三角之外的部分不计算
+        product = (matrix[start:end] @ matrix[start:].T).tocoo()
+        mask = (product.data > threshold) & (product.col > product.row)
+        rows = product.row[mask] + start
+        cols = product.col[mask] + start
+        order = np.lexsort((cols, rows))
+        results.extend(zip(rows[order].tolist(), cols[order].tolist(), product.data[mask][order].tolist()))
+    return results
+
+
+def find_similar_text_pairs(texts: List[str], threshold: float) -> List[Tuple[int, int, float]]:
+    """
+    找出余弦相似度超过阈值的文本对
+
+    :param texts: 文本列表
+    :param threshold: 相似度阈值
+    :return: (下标i, 下标j, 相似度) 列表，i < j
+    """
+    if len(texts) < 2:
+        return []
+    return similar_pairs(build_ngram_matrix(texts), threshold)